@@ -5,17 +5,96 @@ Monitors: Hardhat, Mask, Safety Vest, Machinery, Vehicles
 Classes: Hardhat, Mask, NO-Hardhat, NO-Mask, NO-Safety Vest, Person, Safety Cone, Safety Vest, Machinery, Vehicle
 """
 
-from ultralytics import YOLO
-import cv2
 from datetime import datetime
 from pathlib import Path
 import argparse
+import sys
+import time
+
+import numpy as np
+
+from src.detection.association import associate, association_tables, worker_violations
+from src.detection.boxes import nms, tile_boxes
+from src.detection.ppe import CATEGORIES, category_lookup, result_arrays, tally
+from src.detection.temporal import TemporalFilter
+from src.detection.tracking import Tracker
+from src.detection.zones import Zones
+from src.utils.alerts import make_alert
+from src.utils.hard_examples import HardExampleMiner
+from src.utils.heatmap import HeatmapRecorder
+from src.utils.logger import configure_logging, get_logger, stop_logger
+
+# Heavy dependencies (ultralytics, torch, cv2) are imported where they are
+# first needed so that --help, --check-config and health checks start instantly.
 
 class SafetyMonitor:
-    def __init__(self, model_path, conf_threshold=0.5):
-        """Initialize the safety monitoring system"""
-        self.model = YOLO(model_path)
+    def __init__(self, model_path, conf_threshold=0.5, model=None, model_cache=True,
+                 config=None, health=None, preview=None, display=True, alerts=None,
+                 camera='default'):
+        """Initialize the safety monitoring system
+
+        ``model`` may be a preloaded model object (e.g. a stub for
+        benchmarking); when given, ``model_path`` is only used for display.
+        ``.pt`` weights are loaded through the pre-fused model cache unless
+        ``model_cache`` is False. ``health`` is an optional
+        ``src.utils.health.HealthProbe`` that is notified of every frame and
+        ``preview`` an optional ``src.inference.preview.PreviewServer`` that
+        receives annotated frames. ``display=False`` disables ``cv2.imshow``
+        for headless operation. With ``cascade.enabled`` in ``config`` the
+        model is wrapped in a person -> PPE ``CascadeDetector``. ``alerts`` is
+        an optional ``src.utils.alerts.AlertDispatcher`` that receives every
+        confirmed violation of a stream, tagged with ``camera``.
+        """
+        if model is None:
+            from src.inference.model_cache import load_model
+            model = load_model(model_path, use_cache=model_cache)
+        if (config or {}).get('cascade', {}).get('enabled'):
+            from src.detection.cascade import CascadeDetector
+            model = CascadeDetector.from_config(model, config)
+        self.model = model
         self.conf_threshold = conf_threshold
+        self._categories = category_lookup(self.model.names)
+        self._association = association_tables(self._categories)
+        self.config = config or {}
+        self.health = health
+        self.preview = preview
+        self.display = display
+        self.alerts = alerts
+        self.camera = camera
+        self.log = get_logger('edge_safety_monitor.monitor')
+        self.zones = Zones.from_config(self.config, camera)
+        self.imgsz = (self.config.get('model') or {}).get('input_size')
+        self.adaptive = None
+        self._last_annotated = None
+        if (self.config.get('adaptive') or {}).get('enabled'):
+            from src.inference.adaptive import AdaptiveController
+            self.adaptive = AdaptiveController.from_config(self.config)
+        self.frame_pool = None
+        self.memory = None
+        self._letterboxes = None
+        buffers = self.config.get('buffers') or {}
+        if buffers.get('enabled'):
+            from src.preprocessing.buffers import FramePool
+            pool_size = buffers.get('pool_size', 3)
+            if self.adaptive is not None:
+                # Skipped frames show the last annotated buffer - keep it out of the ring
+                pool_size = max(pool_size, self.adaptive.ladder[-1][2] + 1)
+            self.frame_pool = FramePool(pool_size)
+            if not self.config.get('cascade', {}).get('enabled'):
+                self._letterboxes = {}
+        if buffers.get('memory_report'):
+            from src.preprocessing.buffers import MemoryReport
+            self.memory = MemoryReport(buffers.get('report_warmup_frames', 30))
+        self.heatmap = None
+        if (self.config.get('heatmap') or {}).get('enabled'):
+            self.heatmap = HeatmapRecorder(self.config, camera)
+        self.miner = None
+        if (self.config.get('mining') or {}).get('enabled'):
+            self.miner = HardExampleMiner.from_config(self.config, self.model.names, camera)
+        self.tracker = None
+        self.temporal = None
+        if health is not None:
+            health.set_model_loaded(True)
         
         # PPE compliance tracking
         self.violations = {
@@ -30,91 +109,193 @@ class SafetyMonitor:
             'person_detections': 0,
             'safety_cone_detections': 0,
             'machinery_detections': 0,
-            'vehicle_detections': 0
+            'vehicle_detections': 0,
+            'unique_workers': 0,
+            'no_hardhat_episodes': 0,
+            'no_mask_episodes': 0,
+            'no_vest_episodes': 0
         }
         
         # Create outputs directory
         self.output_dir = Path("outputs/safety_monitoring")
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
-        print(f"✅ Safety Monitor Initialized")
-        print(f"📊 Model: {model_path}")
-        print(f"🎯 Classes: {self.model.names}")
-        print(f"⚠️  Confidence Threshold: {conf_threshold}")
-        print(f"👷 Monitoring PPE: Hardhat, Mask, Safety Vest, Machinery, Vehicles")
+        self.log.info(f"✅ Safety Monitor Initialized")
+        self.log.info(f"📊 Model: {model_path}")
+        self.log.info(f"🎯 Classes: {self.model.names}")
+        self.log.info(f"⚠️  Confidence Threshold: {conf_threshold}")
+        self.log.info(f"👷 Monitoring PPE: Hardhat, Mask, Safety Vest, Machinery, Vehicles")
+    
+    def start_stream(self):
+        """Reset per-stream state: violation hysteresis and (if enabled) worker tracks"""
+        self.temporal = TemporalFilter.from_config(self.config)
+        self.tracker = None
+        if (self.config.get('tracking') or {}).get('enabled', False):
+            self.tracker = Tracker.from_config(self.config)
+        if self.miner is not None:
+            self.miner.reset()
+        if self.memory is not None:
+            self.memory.start()
+    
+    def stream_state(self):
+        """Per-stream state a checkpoint needs to continue the stream later"""
+        return {
+            'violations': dict(self.violations),
+            'tracker': self.tracker,
+            'temporal': self.temporal,
+            'heatmap': self.heatmap.heatmap if self.heatmap is not None else None,
+        }
+    
+    def restore_stream_state(self, state):
+        """Continue a stream from ``stream_state()`` (call after ``start_stream``)"""
+        self.violations.update(state['violations'])
+        if self.tracker is not None and state['tracker'] is not None:
+            self.tracker = state['tracker']
+        if state['temporal'] is not None:
+            self.temporal = state['temporal']
+        if self.heatmap is not None and state['heatmap'] is not None:
+            self.heatmap.heatmap = state['heatmap']
+    
+    def read_frame(self, cap):
+        """``cap.read()``, decoding into the frame pool in buffer-pool mode"""
+        if self.frame_pool is None:
+            return cap.read()
+        return self.frame_pool.read(cap)
     
     def detect_violations(self, frame):
-        """Detect PPE compliance violations in a frame"""
-        results = self.model(frame, conf=self.conf_threshold, verbose=False)
+        """Detect PPE compliance violations in a frame
+
+        Violations are reported per worker: PPE boxes are associated with the
+        person wearing them, so duplicate or conflicting boxes on one worker
+        count once (see ``src.detection.association``). While tracking a
+        stream, violations also carry the worker's ``track_id`` and the
+        statistics count unique workers. With zones configured, detections in
+        ignored areas are dropped and each zone only enforces its own rules.
+        With mining enabled, hard frames are queued for labeling before
+        anything is drawn on them.
+        """
+        zone_map = self.zones.for_frame(frame) if self.zones is not None else None
+        results = self._infer(frame, zone_map)
         
         # Track detections in this frame
-        detections = {
-            'hardhat': 0,
-            'mask': 0,
-            'safety_vest': 0,
-            'no_hardhat': 0,
-            'no_mask': 0,
-            'no_vest': 0,
-            'person': 0,
-            'safety_cone': 0,
-            'machinery': 0,
-            'vehicle': 0
-        }
-        
+        detections = dict.fromkeys(CATEGORIES, 0)
+        detections['non_compliant_workers'] = 0
         violations_found = []
         
-        for r in results:
-            boxes = r.boxes
-            for box in boxes:
-                cls = int(box.cls[0])
-                conf = float(box.conf[0])
-                label = self.model.names[cls].lower()
-                
-                # Track all detections - normalize label names
-                if 'hardhat' in label and 'no' not in label:
-                    detections['hardhat'] += 1
-                    self.violations['hardhat_detections'] += 1
-                elif 'mask' in label and 'no' not in label:
-                    detections['mask'] += 1
-                    self.violations['mask_detections'] += 1
-                elif 'safety vest' in label and 'no' not in label:
-                    detections['safety_vest'] += 1
-                    self.violations['safety_vest_detections'] += 1
-                elif 'no' in label and 'hardhat' in label:
-                    detections['no_hardhat'] += 1
-                    self.violations['no_hardhat_detections'] += 1
-                    violations_found.append({'type': 'no_hardhat', 'confidence': conf})
-                elif 'no' in label and 'mask' in label:
-                    detections['no_mask'] += 1
-                    self.violations['no_mask_detections'] += 1
-                    violations_found.append({'type': 'no_mask', 'confidence': conf})
-                elif 'no' in label and 'vest' in label:
-                    detections['no_vest'] += 1
-                    self.violations['no_vest_detections'] += 1
-                    violations_found.append({'type': 'no_vest', 'confidence': conf})
-                elif 'person' in label:
-                    detections['person'] += 1
-                    self.violations['person_detections'] += 1
-                elif 'safety cone' in label or 'cone' in label:
-                    detections['safety_cone'] += 1
-                    self.violations['safety_cone_detections'] += 1
-                elif 'machinery' in label:
-                    detections['machinery'] += 1
-                    self.violations['machinery_detections'] += 1
-                elif 'vehicle' in label:
-                    detections['vehicle'] += 1
-                    self.violations['vehicle_detections'] += 1
+        for i, r in enumerate(results):
+            xyxy, confs, cls_ids = result_arrays(r)
+            association = associate(xyxy, confs, cls_ids, self._association)
+            if zone_map is not None:
+                keep = zone_map.keep_detections(xyxy, association)
+                if not keep.all():
+                    results[i] = r = r[keep]
+                    xyxy, confs, cls_ids = xyxy[keep], confs[keep], cls_ids[keep]
+                    association = associate(xyxy, confs, cls_ids, self._association)
+            counts, _ = tally(cls_ids, confs, self._categories)
+            for category, count in counts.items():
+                if count:
+                    detections[category] += count
+                    self.violations[f'{category}_detections'] += count
+            
+            found = worker_violations(association, xyxy, confs, cls_ids, self._categories)
+            if zone_map is not None:
+                found = zone_map.filter_violations(found)
+            track_ids = self._track(association, found) if self.tracker is not None else None
+            if self.miner is not None:
+                self.miner.observe(frame, xyxy, confs, cls_ids, association, track_ids)
+            violations_found.extend(found)
+            detections['non_compliant_workers'] += len({v['worker'] for v in found
+                                                         if v['worker'] is not None})
         
         return results, violations_found, detections
     
+    def _infer(self, frame, zone_map=None):
+        """Run the model at the current resolution
+
+        Only the monitored part of the frame is processed when zones allow
+        it, split into overlapping tiles when the adaptive controller asks
+        for more than one.
+        """
+        imgsz, tiles = self.imgsz, 1
+        if self.adaptive is not None:
+            imgsz, tiles = self.adaptive.imgsz, self.adaptive.tiles
+        crop = zone_map.crop_rect if zone_map is not None and self.zones.crop_to_zones else None
+        if crop is None and tiles == 1:
+            if self._letterboxes is not None:
+                return self._infer_letterboxed(frame, imgsz or 640)
+            kwargs = {'imgsz': imgsz} if imgsz else {}
+            return self.model(frame, conf=self.conf_threshold, verbose=False, **kwargs)
+        
+        from src.detection.cascade import make_results, predict_regions
+        height, width = frame.shape[:2]
+        x1, y1, x2, y2 = crop or (0, 0, width, height)
+        regions = tile_boxes((x1, y1, x2, y2), tiles) if x2 > x1 and y2 > y1 else []
+        xyxy, confs, cls_ids = predict_regions(self.model, frame, regions, imgsz, self.conf_threshold)
+        if len(regions) > 1:
+            # Objects on tile borders are found twice - keep the best box
+            iou = (self.config.get('inference') or {}).get('iou_threshold', 0.45)
+            keep = nms(xyxy, confs, iou, classes=cls_ids)
+            xyxy, confs, cls_ids = xyxy[keep], confs[keep], cls_ids[keep]
+        return [make_results(frame, self.model.names, xyxy, confs, cls_ids)]
+    
+    def _infer_letterboxed(self, frame, imgsz):
+        """Full-frame inference through a preallocated letterbox input tensor"""
+        from src.detection.cascade import make_results
+        from src.preprocessing.buffers import Letterbox
+        
+        letterbox = self._letterboxes.get(imgsz)
+        if letterbox is None:
+            letterbox = self._letterboxes[imgsz] = Letterbox(imgsz)
+        r = self.model(letterbox.as_tensor(frame), conf=self.conf_threshold, verbose=False)[0]
+        xyxy, confs, cls_ids = result_arrays(r)
+        return [make_results(frame, self.model.names, letterbox.scale_boxes(xyxy), confs, cls_ids)]
+    
+    def _track(self, association, violations):
+        """Update worker tracks for one frame; returns the track ID per person"""
+        ids, _ = self.tracker.update(association['person_boxes'], association['person_conf'])
+        for v in violations:
+            if v['worker'] is not None and ids[v['worker']] >= 0:
+                v['track_id'] = int(ids[v['worker']])
+        
+        self.violations['unique_workers'] = self.tracker.total_confirmed
+        return ids
+    
     def draw_violations(self, frame, results, violations, detections):
         """Draw bounding boxes and violation warnings with professional layout"""
-        # Draw detections with bounding boxes
-        annotated = results[0].plot()
+        import cv2
+
+        # Draw detections with bounding boxes (straight onto the pooled frame in buffer-pool mode)
+        if self.frame_pool is not None:
+            annotated = frame
+            self._draw_detections(annotated, results[0])
+        else:
+            annotated = results[0].plot()
+        
+        # Zone outlines: monitored zones in cyan, ignored ones in grey
+        if self.zones is not None:
+            zone_map = self.zones.for_frame(frame)
+            for label, (polygon, name) in enumerate(zip(zone_map.polygons, zone_map.names), start=1):
+                color = (255, 255, 0) if zone_map.monitored[label] else (128, 128, 128)
+                cv2.polylines(annotated, [polygon], True, color, 2)
+                cv2.putText(annotated, name, tuple(int(v) for v in polygon[0]),
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1)
         
         # Check for safety violations
         has_violations = len(violations) > 0
         
+        # Outline each non-compliant worker with what they are missing
+        missing = {}
+        for v in violations:
+            if v.get('worker') is not None:
+                name = f"ID {v['track_id']}" if 'track_id' in v else f"W{v['worker'] + 1}"
+                missing.setdefault(v['worker'], (v['box'], name, []))[2].append(v['type'])
+        for box, name, types in missing.values():
+            x1, y1, x2, y2 = (int(c) for c in box)
+            cv2.rectangle(annotated, (x1, y1), (x2, y2), (0, 0, 255), 3)
+            label = f"{name}: " + ", ".join(t.replace('_', '-') for t in types)
+            cv2.putText(annotated, label, (x1, max(y2 - 6, 12)),
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 2)
+        
         # ===== TOP BANNER - STATUS =====
         banner_height = 140
         cv2.rectangle(annotated, (0, 0), (annotated.shape[1], banner_height), 
@@ -127,7 +308,7 @@ class SafetyMonitor:
                    cv2.FONT_HERSHEY_DUPLEX, 1.2, status_color, 2)
         
         # Details line 1
-        details1 = f"Workers: {detections['person']} | Hardhats: {detections['hardhat']} | Masks: {detections['mask']} | Vests: {detections['safety_vest']}"
+        details1 = f"Workers: {detections['person']} ({detections.get('non_compliant_workers', 0)} non-compliant) | Hardhats: {detections['hardhat']} | Masks: {detections['mask']} | Vests: {detections['safety_vest']}"
         cv2.putText(annotated, details1, (15, 70), 
                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, status_color, 1)
         
@@ -157,81 +338,219 @@ class SafetyMonitor:
         
         return annotated
     
+    def process_frame(self, frame):
+        """Detect, count, annotate and publish one frame of a stream
+
+        Violations only show (and count) once ``safety.consecutive_frames``
+        frames confirmed them, and clear again with hysteresis. With the
+        adaptive controller, frames it skips reuse the last annotated frame.
+        """
+        if self.memory is not None:
+            self.memory.tick()
+        if self.adaptive is None:
+            return self._process_frame(frame)
+        
+        start = time.perf_counter()
+        if self.adaptive.should_process() or self._last_annotated is None:
+            annotated = self._last_annotated = self._process_frame(frame)
+        else:
+            annotated = self._last_annotated
+            if self.health is not None:
+                self.health.frame_done()
+        
+        change = self.adaptive.record(time.perf_counter() - start)
+        if change:
+            self.log.info(f"⚙️  Adaptive quality: {change}",
+                          extra={'event': 'adaptive', **self.adaptive.snapshot()})
+        return annotated
+    
+    def _process_frame(self, frame):
+        # Detect violations
+        results, violations, detections = self.detect_violations(frame)
+        self.violations['frames_processed'] += 1
+        
+        if self.temporal is not None:
+            removed = self.tracker.removed_ids if self.tracker is not None else ()
+            violations = self.temporal.update(violations, removed)
+            detections['non_compliant_workers'] = len({
+                v.get('track_id', v['worker']) for v in violations if v['worker'] is not None})
+            for violation_type in self.temporal.events:
+                detections[violation_type] = sum(v['type'] == violation_type for v in violations)
+            for violation_type, count in self.temporal.events.items():
+                self.violations[f'{violation_type}_episodes'] = count
+            if self.alerts is not None:
+                for key in self.temporal.raised:
+                    self.alerts.submit(make_alert(self.temporal.last(key), self.camera))
+        
+        if violations:
+            self.violations['violations_detected'] += 1
+        if self.heatmap is not None:
+            self.heatmap.update(frame, violations)
+        
+        # Draw results
+        annotated = self.draw_violations(frame, results, violations, detections)
+        
+        if self.health is not None:
+            self.health.frame_done()
+        if self.preview is not None:
+            self.preview.publish(annotated)
+        
+        return annotated
+    
+    def _draw_detections(self, img, result):
+        """Draw labelled boxes onto ``img`` in place (``Results.plot`` copies the frame)"""
+        import cv2
+        from ultralytics.utils.plotting import colors
+        
+        lw = max(round(sum(img.shape[:2]) / 2 * 0.003), 2)
+        scale, thickness = lw / 3, max(lw - 1, 1)
+        xyxy, confs, cls_ids = result_arrays(result)
+        for (x1, y1, x2, y2), score, cls in zip(xyxy.astype(np.int32).tolist(), confs.tolist(),
+                                                cls_ids.tolist()):
+            color = colors(cls, True)
+            cv2.rectangle(img, (x1, y1), (x2, y2), color, lw)
+            label = f"{self.model.names[cls]} {score:.2f}"
+            (tw, th), _ = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, scale, thickness)
+            top = max(y1 - th - 4, 0)
+            cv2.rectangle(img, (x1, top), (x1 + tw, top + th + 4), color, -1)
+            cv2.putText(img, label, (x1, top + th + 1), cv2.FONT_HERSHEY_SIMPLEX, scale,
+                       (255, 255, 255), thickness)
+    
+    def _print_memory_report(self):
+        """Steady-state allocations per frame (if the memory report is enabled)"""
+        if self.memory is None:
+            return
+        summary = self.memory.summary()
+        self.memory.stop()
+        self.log.info(f"\nMemory (steady state, {summary['frames']} frames):")
+        if not summary['frames']:
+            self.log.info(f"  Not enough frames after the {self.memory.warmup_frames}-frame warm-up")
+            return
+        self.log.info(f"  🧮 Allocated per frame: {summary['transient_kb_per_frame']} KB "
+              f"(retained {summary['retained_bytes_per_frame']} B)")
+        self.log.info(f"  ♻️  GC collections: {summary['gc_collections']}")
+        self.log.info(f"  📈 Peak RSS: {summary['peak_rss_mb']} MB")
+        if self.frame_pool is not None:
+            self.log.info(f"  🗃️  Frame buffers allocated: {self.frame_pool.allocations}")
+        for where, size, count in summary['top_growth']:
+            self.log.info(f"     +{size} B in {count} blocks at {where}")
+    
+    def _export_heatmap(self):
+        """Write the session's violation heatmaps (if enabled)"""
+        if self.heatmap is None:
+            return
+        paths = self.heatmap.export()
+        if paths:
+            self.log.info(f"🗺️  Violation heatmaps saved: {paths[0].parent}")
+    
+    def _report_mining(self):
+        """Hard examples queued for labeling (if mining is enabled)"""
+        if self.miner is None:
+            return
+        self.log.info(f"🧩 Hard examples: {self.miner.queued} queued this session, "
+                      f"{len(self.miner)} awaiting labeling in {self.miner.output_dir}")
+    
+    def _print_episode_summary(self):
+        """Confirmed violation episodes (and unique workers when tracking)"""
+        if self.temporal is None:
+            return
+        self.log.info(f"\nViolation Episodes (confirmed over {self.temporal.raise_frames} frames):")
+        if self.tracker is not None:
+            self.log.info(f"  👷 Unique Workers: {self.violations['unique_workers']}")
+        self.log.info(f"  ❌ No-Hardhat Episodes: {self.violations['no_hardhat_episodes']}")
+        self.log.info(f"  ❌ No-Mask Episodes: {self.violations['no_mask_episodes']}")
+        self.log.info(f"  ❌ No-Safety Vest Episodes: {self.violations['no_vest_episodes']}")
+    
     def monitor_webcam(self):
         """Monitor safety from webcam feed"""
-        print("\n🎥 Starting Webcam Monitoring...")
-        print("Press 'q' to quit, 's' to save snapshot")
+        import cv2
+
+        self.log.info("\n🎥 Starting Webcam Monitoring...")
+        self.log.info("Press 'q' to quit, 's' to save snapshot" if self.display else "Press Ctrl+C to stop")
         
         cap = cv2.VideoCapture(0)
+        self.start_stream()
         
         if not cap.isOpened():
-            print("❌ Error: Could not open webcam")
+            self.log.error("❌ Error: Could not open webcam")
             return
         
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                print("❌ Error: Could not read frame")
-                break
-            
-            # Detect violations
-            results, violations, detections = self.detect_violations(frame)
-            self.violations['frames_processed'] += 1
-            
-            if violations:
-                self.violations['violations_detected'] += 1
-            
-            # Draw results
-            annotated = self.draw_violations(frame, results, violations, detections)
-            
-            # Display
-            cv2.imshow('Safety Monitor - Press Q to quit', annotated)
-            
-            # Handle key presses
-            key = cv2.waitKey(1) & 0xFF
-            if key == ord('q'):
-                break
-            elif key == ord('s'):
-                # Save snapshot
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = self.output_dir / f"snapshot_{timestamp}.jpg"
-                cv2.imwrite(str(filename), annotated)
-                print(f"📸 Snapshot saved: {filename}")
+        try:
+            while True:
+                ret, frame = self.read_frame(cap)
+                if not ret:
+                    self.log.error("❌ Error: Could not read frame")
+                    break
+                
+                annotated = self.process_frame(frame)
+                
+                if not self.display:
+                    continue
+                
+                # Display
+                cv2.imshow('Safety Monitor - Press Q to quit', annotated)
+                
+                # Handle key presses
+                key = cv2.waitKey(1) & 0xFF
+                if key == ord('q'):
+                    break
+                elif key == ord('s'):
+                    # Save snapshot
+                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                    filename = self.output_dir / f"snapshot_{timestamp}.jpg"
+                    cv2.imwrite(str(filename), annotated)
+                    self.log.info(f"📸 Snapshot saved: {filename}")
+        except KeyboardInterrupt:
+            self.log.info("\n⏹️  Monitoring stopped")
         
         cap.release()
-        cv2.destroyAllWindows()
+        if self.display:
+            cv2.destroyAllWindows()
         
         # Print summary
         compliance_rate = ((self.violations['frames_processed'] - self.violations['violations_detected']) / self.violations['frames_processed'] * 100) if self.violations['frames_processed'] > 0 else 0
-        print("\n" + "="*70)
-        print("📊 MONITORING SESSION SUMMARY")
-        print("="*70)
-        print(f"Total Frames Processed: {self.violations['frames_processed']}")
-        print(f"Violation Frames: {self.violations['violations_detected']}")
-        print(f"Safety Compliance Rate: {compliance_rate:.2f}%")
-        print(f"\nPPE Detections Summary:")
-        print(f"  👷 Hardhats: {self.violations['hardhat_detections']}")
-        print(f"  😷 Masks: {self.violations['mask_detections']}")
-        print(f"  🦺 Safety Vests: {self.violations['safety_vest_detections']}")
-        print(f"\nViolations Detected:")
-        print(f"  ❌ No-Hardhat: {self.violations['no_hardhat_detections']}")
-        print(f"  ❌ No-Mask: {self.violations['no_mask_detections']}")
-        print(f"  ❌ No-Safety Vest: {self.violations['no_vest_detections']}")
-        print(f"\nOther Detections:")
-        print(f"  👤 Persons: {self.violations['person_detections']}")
-        print(f"  🚧 Safety Cones: {self.violations['safety_cone_detections']}")
-        print(f"  ⚙️ Machinery: {self.violations['machinery_detections']}")
-        print(f"  🚗 Vehicles: {self.violations['vehicle_detections']}")
-        print("="*70)
+        self.log.info("\n" + "="*70)
+        self.log.info("📊 MONITORING SESSION SUMMARY")
+        self.log.info("="*70)
+        self.log.info(f"Total Frames Processed: {self.violations['frames_processed']}")
+        self.log.info(f"Violation Frames: {self.violations['violations_detected']}")
+        self.log.info(f"Safety Compliance Rate: {compliance_rate:.2f}%")
+        self.log.info(f"\nPPE Detections Summary:")
+        self.log.info(f"  👷 Hardhats: {self.violations['hardhat_detections']}")
+        self.log.info(f"  😷 Masks: {self.violations['mask_detections']}")
+        self.log.info(f"  🦺 Safety Vests: {self.violations['safety_vest_detections']}")
+        self.log.info(f"\nViolations Detected:")
+        self.log.info(f"  ❌ No-Hardhat: {self.violations['no_hardhat_detections']}")
+        self.log.info(f"  ❌ No-Mask: {self.violations['no_mask_detections']}")
+        self.log.info(f"  ❌ No-Safety Vest: {self.violations['no_vest_detections']}")
+        self.log.info(f"\nOther Detections:")
+        self.log.info(f"  👤 Persons: {self.violations['person_detections']}")
+        self.log.info(f"  🚧 Safety Cones: {self.violations['safety_cone_detections']}")
+        self.log.info(f"  ⚙️ Machinery: {self.violations['machinery_detections']}")
+        self.log.info(f"  🚗 Vehicles: {self.violations['vehicle_detections']}")
+        self._print_episode_summary()
+        self._export_heatmap()
+        self._report_mining()
+        self._print_memory_report()
+        self.log.info("="*70)
     
-    def monitor_video(self, video_path):
-        """Monitor safety from video file"""
-        print(f"\n🎥 Processing Video: {video_path}")
+    def monitor_video(self, video_path, resume=False):
+        """Monitor safety from video file
+
+        With checkpointing (``checkpoint.enabled``) the output is written in
+        segments and the job is checkpointed periodically and on Ctrl+C (see
+        ``src.utils.checkpoint``); ``resume`` continues from the last
+        checkpoint of the same file.
+        """
+        import cv2
+
+        self.log.info(f"\n🎥 Processing Video: {video_path}")
         
         cap = cv2.VideoCapture(video_path)
+        self.start_stream()
         
         if not cap.isOpened():
-            print(f"❌ Error: Could not open video file: {video_path}")
+            self.log.error(f"❌ Error: Could not open video file: {video_path}")
             return
         
         # Get video properties
@@ -240,75 +559,133 @@ class SafetyMonitor:
         height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
         total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
         
-        # Setup video writer
+        self.log.info(f"📹 Video Properties: {width}x{height} @ {fps}fps, {total_frames} frames")
+        
+        checkpoint, state = None, None
+        if resume or (self.config.get('checkpoint') or {}).get('enabled'):
+            from src.utils.checkpoint import VideoCheckpoint, seek_frame, write_segment_list
+            checkpoint = VideoCheckpoint.from_config(self.config, video_path)
+            state = checkpoint.load() if resume else None
+            if state is None and resume:
+                self.log.warning(f"⚠️  No checkpoint for {video_path} - starting from the beginning")
+        if state is not None and state['complete']:
+            self.log.info(f"✅ Already processed: {len(state['segments'])} segments in {self.output_dir}")
+            cap.release()
+            return
+        
+        frame_count, segments = 0, []
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_path = self.output_dir / f"monitored_{timestamp}.mp4"
+        if state is not None:
+            if not seek_frame(cap, state['frame']):
+                self.log.error(f"❌ Error: Could not seek to frame {state['frame']} of {video_path}")
+                cap.release()
+                return
+            self.restore_stream_state(state)
+            frame_count, timestamp, segments = state['frame'], state['job'], list(state['segments'])
+            self.log.info(f"⏯️  Resuming at frame {frame_count}/{total_frames} "
+                          f"({len(segments)} segments written)")
+        
+        # Setup video writer (one segment per checkpoint interval when checkpointing)
         fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        out = cv2.VideoWriter(str(output_path), fourcc, fps, (width, height))
         
-        print(f"📹 Video Properties: {width}x{height} @ {fps}fps, {total_frames} frames")
-        
-        frame_count = 0
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-            
-            frame_count += 1
-            
-            # Detect violations
-            results, violations, detections = self.detect_violations(frame)
-            self.violations['frames_processed'] += 1
-            
-            if violations:
-                self.violations['violations_detected'] += 1
-            
-            # Draw results
-            annotated = self.draw_violations(frame, results, violations, detections)
-            
-            # Write frame
-            out.write(annotated)
-            
-            # Progress indicator
-            if frame_count % 30 == 0:
-                progress = (frame_count / total_frames * 100)
-                print(f"Processing... {frame_count}/{total_frames} frames ({progress:.1f}%)", end='\r')
+        def open_segment():
+            if checkpoint is None:
+                path = self.output_dir / f"monitored_{timestamp}.mp4"
+            else:
+                path = self.output_dir / f"monitored_{timestamp}_part{len(segments):03d}.mp4"
+            return path, cv2.VideoWriter(str(path), fourcc, fps, (width, height)), 0
+        
+        def save_checkpoint(complete=False):
+            """Close the current segment and record the job state up to ``frame_count``"""
+            nonlocal output_path, out, segment_frames
+            out.release()
+            if segment_frames:
+                segments.append(output_path.name)
+            else:
+                output_path.unlink(missing_ok=True)
+            checkpoint.save({**self.stream_state(), 'frame': frame_count, 'job': timestamp,
+                             'segments': segments, 'complete': complete})
+            if not complete:
+                output_path, out, segment_frames = open_segment()
+        
+        output_path, out, segment_frames = open_segment()
+        interrupted = False
+        try:
+            while True:
+                ret, frame = self.read_frame(cap)
+                if not ret:
+                    break
+                
+                annotated = self.process_frame(frame)
+                
+                # Write frame (only written frames count, so an interrupt never
+                # checkpoints a frame that is missing from the output)
+                out.write(annotated)
+                frame_count += 1
+                segment_frames += 1
+                if checkpoint is not None and checkpoint.due(frame_count):
+                    save_checkpoint()
+                
+                # Progress indicator
+                if frame_count % 30 == 0:
+                    progress = (frame_count / total_frames * 100)
+                    self.log.info(f"Processing... {frame_count}/{total_frames} frames ({progress:.1f}%)",
+                                  extra={'rate_key': 'progress', 'frame': frame_count})
+        except KeyboardInterrupt:
+            interrupted = True
+            self.log.info(f"\n⏹️  Stopped at frame {frame_count}")
         
         cap.release()
-        out.release()
+        if checkpoint is not None:
+            save_checkpoint(complete=not interrupted)
+            output_path = self.output_dir / f"monitored_{timestamp}_segments.txt"
+            write_segment_list(output_path, segments)
+            if interrupted:
+                self.log.info(f"💾 Checkpoint saved: {checkpoint.path} (continue with --resume)")
+        else:
+            out.release()
         
         # Print summary
         compliance_rate = ((self.violations['frames_processed'] - self.violations['violations_detected']) / self.violations['frames_processed'] * 100) if self.violations['frames_processed'] > 0 else 0
-        print("\n" + "="*70)
-        print("📊 VIDEO PROCESSING SUMMARY")
-        print("="*70)
-        print(f"Video Saved: {output_path}")
-        print(f"Total Frames Processed: {self.violations['frames_processed']}")
-        print(f"Violation Frames: {self.violations['violations_detected']}")
-        print(f"Safety Compliance Rate: {compliance_rate:.2f}%")
-        print(f"\nPPE Detections Summary:")
-        print(f"  👷 Hardhats: {self.violations['hardhat_detections']}")
-        print(f"  😷 Masks: {self.violations['mask_detections']}")
-        print(f"  🦺 Safety Vests: {self.violations['safety_vest_detections']}")
-        print(f"\nViolations Detected:")
-        print(f"  ❌ No-Hardhat: {self.violations['no_hardhat_detections']}")
-        print(f"  ❌ No-Mask: {self.violations['no_mask_detections']}")
-        print(f"  ❌ No-Safety Vest: {self.violations['no_vest_detections']}")
-        print(f"\nOther Detections:")
-        print(f"  👤 Persons: {self.violations['person_detections']}")
-        print(f"  🚧 Safety Cones: {self.violations['safety_cone_detections']}")
-        print(f"  ⚙️ Machinery: {self.violations['machinery_detections']}")
-        print(f"  🚗 Vehicles: {self.violations['vehicle_detections']}")
-        print("="*70)
+        self.log.info("\n" + "="*70)
+        self.log.info("📊 VIDEO PROCESSING SUMMARY")
+        self.log.info("="*70)
+        if checkpoint is not None:
+            self.log.info(f"Video Saved: {len(segments)} segments, listed in {output_path}")
+        else:
+            self.log.info(f"Video Saved: {output_path}")
+        self.log.info(f"Total Frames Processed: {self.violations['frames_processed']}")
+        self.log.info(f"Violation Frames: {self.violations['violations_detected']}")
+        self.log.info(f"Safety Compliance Rate: {compliance_rate:.2f}%")
+        self.log.info(f"\nPPE Detections Summary:")
+        self.log.info(f"  👷 Hardhats: {self.violations['hardhat_detections']}")
+        self.log.info(f"  😷 Masks: {self.violations['mask_detections']}")
+        self.log.info(f"  🦺 Safety Vests: {self.violations['safety_vest_detections']}")
+        self.log.info(f"\nViolations Detected:")
+        self.log.info(f"  ❌ No-Hardhat: {self.violations['no_hardhat_detections']}")
+        self.log.info(f"  ❌ No-Mask: {self.violations['no_mask_detections']}")
+        self.log.info(f"  ❌ No-Safety Vest: {self.violations['no_vest_detections']}")
+        self.log.info(f"\nOther Detections:")
+        self.log.info(f"  👤 Persons: {self.violations['person_detections']}")
+        self.log.info(f"  🚧 Safety Cones: {self.violations['safety_cone_detections']}")
+        self.log.info(f"  ⚙️ Machinery: {self.violations['machinery_detections']}")
+        self.log.info(f"  🚗 Vehicles: {self.violations['vehicle_detections']}")
+        self._print_episode_summary()
+        self._export_heatmap()
+        self._report_mining()
+        self._print_memory_report()
+        self.log.info("="*70)
     
     def monitor_image(self, image_path):
         """Monitor safety in a single image"""
-        print(f"\n📸 Processing Image: {image_path}")
+        import cv2
+
+        self.log.info(f"\n📸 Processing Image: {image_path}")
         
         # Read image
         frame = cv2.imread(image_path)
         if frame is None:
-            print(f"❌ Error: Could not read image: {image_path}")
+            self.log.error(f"❌ Error: Could not read image: {image_path}")
             return
         
         # Detect violations
@@ -323,34 +700,34 @@ class SafetyMonitor:
         cv2.imwrite(str(output_path), annotated)
         
         # Print summary
-        print("="*70)
-        print("📊 IMAGE DETECTION SUMMARY")
-        print("="*70)
-        print(f"Detections:")
+        self.log.info("="*70)
+        self.log.info("📊 IMAGE DETECTION SUMMARY")
+        self.log.info("="*70)
+        self.log.info(f"Detections:")
         for r in results:
             for box in r.boxes:
                 cls = int(box.cls[0])
                 conf = float(box.conf[0])
                 label = self.model.names[cls]
-                print(f"  - {label.upper()}: {conf*100:.1f}% confidence")
-        
-        print(f"\nPPE Summary:")
-        print(f"  👷 Hardhats: {detections['hardhat']}")
-        print(f"  😷 Masks: {detections['mask']}")
-        print(f"  🦺 Safety Vests: {detections['safety_vest']}")
-        print(f"  👤 Persons: {detections['person']}")
-        print(f"\nViolations:")
-        print(f"  ❌ No-Hardhat: {detections['no_hardhat']}")
-        print(f"  ❌ No-Mask: {detections['no_mask']}")
-        print(f"  ❌ No-Safety Vest: {detections['no_vest']}")
+                self.log.info(f"  - {label.upper()}: {conf*100:.1f}% confidence")
+        
+        self.log.info(f"\nPPE Summary:")
+        self.log.info(f"  👷 Hardhats: {detections['hardhat']}")
+        self.log.info(f"  😷 Masks: {detections['mask']}")
+        self.log.info(f"  🦺 Safety Vests: {detections['safety_vest']}")
+        self.log.info(f"  👤 Persons: {detections['person']}")
+        self.log.info(f"\nViolations:")
+        self.log.info(f"  ❌ No-Hardhat: {detections['no_hardhat']}")
+        self.log.info(f"  ❌ No-Mask: {detections['no_mask']}")
+        self.log.info(f"  ❌ No-Safety Vest: {detections['no_vest']}")
         
         if violations:
-            print(f"\n⚠️  SAFETY VIOLATIONS DETECTED: {len(violations)}")
+            self.log.info(f"\n⚠️  SAFETY VIOLATIONS DETECTED: {len(violations)}")
         else:
-            print(f"\n✅ All workers compliant with safety requirements")
+            self.log.info(f"\n✅ All workers compliant with safety requirements")
         
-        print(f"\n💾 Result saved: {output_path}")
-        print("="*70)
+        self.log.info(f"\n💾 Result saved: {output_path}")
+        self.log.info("="*70)
 
 
 def main():
@@ -361,26 +738,123 @@ def main():
                        help='Source: "webcam", video file path, or image file path')
     parser.add_argument('--conf', type=float, default=0.5,
                        help='Confidence threshold (0.0-1.0)')
+    parser.add_argument('--config', type=str, default='config/config.yaml',
+                       help='Path to config file')
+    parser.add_argument('--check-config', action='store_true',
+                       help='Validate the config file and exit')
+    parser.add_argument('--cascade', action='store_true',
+                       help='Run PPE detection on person crops only (see cascade section of config)')
+    parser.add_argument('--no-model-cache', action='store_true',
+                       help='Load weights directly instead of the pre-fused model cache')
+    parser.add_argument('--health', action='store_true',
+                       help='Publish a liveness/throughput heartbeat (see scripts/healthcheck.py)')
+    parser.add_argument('--adaptive', action='store_true',
+                       help='Adjust resolution/tiles/frame skip to hold edge.target_fps')
+    parser.add_argument('--buffer-pool', action='store_true',
+                       help='Decode, preprocess and render into preallocated buffers')
+    parser.add_argument('--memory-report', action='store_true',
+                       help='Report steady-state allocations per frame (tracemalloc, slow)')
+    parser.add_argument('--heatmap', action='store_true',
+                       help='Record violation heatmaps (see heatmap section of config)')
+    parser.add_argument('--checkpoint', action='store_true',
+                       help='Checkpoint video jobs periodically (see checkpoint section of config)')
+    parser.add_argument('--resume', action='store_true',
+                       help='Continue a video job from its last checkpoint (implies --checkpoint)')
+    parser.add_argument('--mine', action='store_true',
+                       help='Queue hard frames for labeling (see mining section of config)')
+    parser.add_argument('--no-alerts', action='store_true',
+                       help='Do not send alerts even if the alerts section is enabled')
+    parser.add_argument('--no-display', action='store_true',
+                       help='Do not open a local window (headless operation)')
+    parser.add_argument('--preview', action='store_true',
+                       help='Serve a live MJPEG preview for browsers (see preview section of config)')
+    parser.add_argument('--preview-port', type=int, default=None,
+                       help='Preview server port (overrides preview.port)')
     
     args = parser.parse_args()
     
+    from src.utils.config import load_config, validate_config
+    
+    if args.check_config:
+        errors = validate_config(load_config(args.config))
+        for error in errors:
+            print(f"❌ {error}")
+        if not errors:
+            print(f"✅ Config OK: {args.config}")
+        return 1 if errors else 0
+    
+    config = load_config(args.config) if Path(args.config).exists() else {}
+    if args.cascade:
+        config['cascade'] = dict(config.get('cascade') or {}, enabled=True)
+    if args.adaptive:
+        config['adaptive'] = dict(config.get('adaptive') or {}, enabled=True)
+    if args.buffer_pool or args.memory_report:
+        config['buffers'] = dict(config.get('buffers') or {})
+        if args.buffer_pool:
+            config['buffers']['enabled'] = True
+        if args.memory_report:
+            config['buffers']['memory_report'] = True
+    if args.heatmap:
+        config['heatmap'] = dict(config.get('heatmap') or {}, enabled=True)
+    if args.mine:
+        config['mining'] = dict(config.get('mining') or {}, enabled=True)
+    if args.checkpoint or args.resume:
+        config['checkpoint'] = dict(config.get('checkpoint') or {}, enabled=True)
+    configure_logging(config)
+    log = get_logger('edge_safety_monitor.monitor')
+    
+    # Start the health probe before loading the model so "starting" is visible
+    health = None
+    if args.health:
+        from src.utils.health import HealthProbe
+        health = HealthProbe.from_config(config).start()
+    
+    preview = None
+    if args.preview:
+        from src.inference.preview import PreviewServer
+        preview = PreviewServer.from_config(config, port=args.preview_port).start()
+        log.info(f"📺 Live preview: http://localhost:{preview.port}/")
+    
+    alerts = None
+    if (config.get('alerts') or {}).get('enabled') and not args.no_alerts:
+        from src.utils.alerts import AlertDispatcher
+        alerts = AlertDispatcher.from_config(config).start()
+        if health is not None:
+            health.register_queue('alerts', alerts.queue_depth)
+    
     # Initialize monitor
-    monitor = SafetyMonitor(args.model, args.conf)
+    camera = (config.get('alerts') or {}).get('camera_id') or \
+        (args.source if args.source.lower() == 'webcam' else Path(args.source).stem)
+    monitor = SafetyMonitor(args.model, args.conf, model_cache=not args.no_model_cache,
+                            config=config, health=health, preview=preview,
+                            display=not args.no_display, alerts=alerts, camera=camera)
     
     # Process based on source type
-    if args.source.lower() == 'webcam':
-        monitor.monitor_webcam()
-    elif Path(args.source).suffix.lower() in ['.mp4', '.avi', '.mov', '.mkv']:
-        monitor.monitor_video(args.source)
-    elif Path(args.source).suffix.lower() in ['.jpg', '.jpeg', '.png', '.bmp', '.jpeg']:
-        monitor.monitor_image(args.source)
-    else:
-        print(f"❌ Error: Unknown source type: {args.source}")
-        print("   Use 'webcam', video file (.mp4, .avi), or image file (.jpg, .png)")
+    try:
+        if args.source.lower() == 'webcam':
+            monitor.monitor_webcam()
+        elif Path(args.source).suffix.lower() in ['.mp4', '.avi', '.mov', '.mkv']:
+            monitor.monitor_video(args.source, resume=args.resume)
+        elif Path(args.source).suffix.lower() in ['.jpg', '.jpeg', '.png', '.bmp', '.jpeg']:
+            monitor.monitor_image(args.source)
+        else:
+            log.error(f"❌ Error: Unknown source type: {args.source}")
+            log.info("   Use 'webcam', video file (.mp4, .avi), or image file (.jpg, .png)")
+            return 1
+    finally:
+        if alerts is not None:
+            alerts.stop()
+        if health is not None:
+            health.stop()
+        if preview is not None:
+            preview.stop()
+        stop_logger()
+    
+    return 0
 
 
 if __name__ == "__main__":
     print("="*70)
     print("🦺 EDGE SAFETY MONITOR - Construction Site Safety Detection")
     print("="*70)
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Edge Safety Monitor - Model Compression Script
+==============================================
+Distills the deployed model into a narrower student and/or prunes its
+channels, fine-tunes it on the same dataset, and reports parameters, file
+size, CPU latency and mAP of teacher versus student.
+
+Author: Siddique Akber
+Date: October 2025
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.training.distill import DEFAULT_DISTILL_CONFIG, compress, profile_model
+from src.training.sweep import train_args
+from src.utils.config import load_config
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description='Edge Safety Monitor - Distillation and Pruning')
+    parser.add_argument('--teacher', type=str, default=None,
+                       help='Teacher weights (default: distill.teacher)')
+    parser.add_argument('--data', type=str, default='config/data.yaml',
+                       help='Path to data.yaml file')
+    parser.add_argument('--config', type=str, default=None,
+                       help='Path to config file (distill section)')
+    parser.add_argument('--width', type=float, default=None,
+                       help='Student width relative to the teacher (0 = prune the teacher only)')
+    parser.add_argument('--prune', type=float, default=None,
+                       help='Fraction of prunable channels to remove (0 = no pruning)')
+    parser.add_argument('--epochs', type=int, default=None,
+                       help='Distillation epochs')
+    parser.add_argument('--finetune-epochs', type=int, default=None,
+                       help='Fine-tuning epochs after pruning')
+    parser.add_argument('--student', type=str, default=None,
+                       help='Only compare an existing student with the teacher')
+    parser.add_argument('--name', type=str, default='edge_safety_monitor',
+                       help='Run name under runs/distill/')
+
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    settings = dict(DEFAULT_DISTILL_CONFIG)
+    settings.update(config.get('distill') or {})
+    for key, value in (('student_width', args.width), ('prune_ratio', args.prune),
+                       ('epochs', args.epochs), ('finetune_epochs', args.finetune_epochs)):
+        if value is not None:
+            settings[key] = value
+
+    teacher = Path(args.teacher or settings['teacher'])
+    if not teacher.is_absolute():
+        teacher = PROJECT_ROOT / teacher
+    data_yaml = PROJECT_ROOT / args.data
+    for path in (teacher, data_yaml):
+        if not path.exists():
+            print(f"❌ Error: Not found: {path}")
+            return 1
+    if not args.student and not settings['student_width'] and not settings['prune_ratio']:
+        print("❌ Error: Nothing to do (set --width and/or --prune)")
+        return 1
+
+    out_dir = PROJECT_ROOT / 'runs' / 'distill' / args.name
+    kwargs = train_args(config)
+    imgsz = kwargs['imgsz']
+
+    print("=" * 60)
+    print("🗜️  Model Compression")
+    print("=" * 60)
+    print(f"Teacher: {teacher}")
+    print(f"Student width: {settings['student_width'] or 'teacher architecture'}")
+    print(f"Prune ratio: {settings['prune_ratio']}")
+
+    if args.student:
+        student = Path(args.student)
+    else:
+        student = compress(teacher, data_yaml, settings, out_dir, train_kwargs=kwargs)
+
+    print("\n📊 Profiling teacher and student (CPU)...")
+    reports = {'teacher': profile_model(teacher, data_yaml, imgsz, settings['latency_runs']),
+               'student': profile_model(student, data_yaml, imgsz, settings['latency_runs'])}
+
+    print("\n" + "=" * 60)
+    print(f"{'':8} {'Params':>10} {'Size MB':>8} {'CPU p50 ms':>11} {'mAP50':>7} {'mAP50-95':>9}")
+    for name, report in reports.items():
+        print(f"{name:8} {report['params']:>10,} {report['size_mb'] or 0:>8.2f} "
+              f"{report['latency_ms']['p50']:>11.2f} {report['map50']:>7.4f} {report['map50_95']:>9.4f}")
+    t, s = reports['teacher'], reports['student']
+    print(f"{'ratio':8} {s['params'] / t['params']:>10.2f} "
+          f"{(s['size_mb'] or 0) / (t['size_mb'] or 1):>8.2f} "
+          f"{s['latency_ms']['p50'] / t['latency_ms']['p50']:>11.2f}")
+    print("=" * 60)
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    with open(out_dir / 'report.json', 'w') as f:
+        json.dump({'settings': settings, 'imgsz': imgsz, **reports}, f, indent=2)
+    print(f"\n🏆 Student: {student}")
+    print(f"📄 Report: {out_dir / 'report.json'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
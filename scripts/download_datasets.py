@@ -8,20 +8,27 @@ Downloads and organizes datasets for safety detection tasks:
 - Phone usage detection
 - Drowsiness detection
 
+Datasets with a direct download link can be listed in a manifest
+(config/datasets.yaml): they are fetched concurrently, resumed after an
+interruption, checksum-verified and extracted into data/raw/<source>/.
+
+    python scripts/download_datasets.py --manifest config/datasets.yaml
+
 Author: Siddique Akber
 Date: October 2025
 """
 
-import os
+import argparse
 import sys
 from pathlib import Path
-import requests
-from tqdm import tqdm
-import zipfile
-import shutil
 
 PROJECT_ROOT = Path(__file__).parent.parent
 DATA_DIR = PROJECT_ROOT / "data"
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.preprocessing.download import (DEFAULT_DOWNLOAD_CONFIG, DownloadError, download_all, fetch,
+                                        read_manifest)
+from src.utils.config import load_config
 
 
 def create_directory_structure():
@@ -41,31 +48,51 @@ def create_directory_structure():
     print("✓ Directory structure created")
 
 
-def download_file(url, destination):
-    """Download a file with progress bar."""
+def download_file(url, destination, sha256=None):
+    """Download a file, resuming a partial download and verifying ``sha256`` if given."""
     try:
-        response = requests.get(url, stream=True)
-        response.raise_for_status()
-        
-        total_size = int(response.headers.get('content-length', 0))
-        
-        with open(destination, 'wb') as file, tqdm(
-            desc=destination.name,
-            total=total_size,
-            unit='iB',
-            unit_scale=True,
-            unit_divisor=1024,
-        ) as progress_bar:
-            for data in response.iter_content(chunk_size=1024):
-                size = file.write(data)
-                progress_bar.update(size)
-        
+        result = fetch(url, destination, sha256=sha256)
+        print(f"✓ {Path(destination).name}: {result['bytes'] / 1e6:.1f} MB in {result['seconds']:.1f}s")
         return True
-    except Exception as e:
+    except DownloadError as e:
         print(f"Error downloading {url}: {e}")
         return False
 
 
+def download_from_manifest(manifest, settings, extract=True, force=False):
+    """Download every dataset in ``manifest``; returns the number of failures."""
+    entries = read_manifest(manifest)
+    if not entries:
+        print(f"⚠️  No datasets listed in {manifest}")
+        return 0
+    download_dir = Path(settings['download_dir'])
+    if not download_dir.is_absolute():
+        download_dir = PROJECT_ROOT / download_dir
+    print(f"⬇️  {len(entries)} dataset(s) from {manifest} -> {download_dir} "
+          f"({settings['workers']} concurrent downloads)")
+
+    def progress(event, entry, info):
+        if event == 'skipped':
+            print(f"  ♻️  {entry['name']}: already verified")
+        elif event == 'downloaded':
+            resumed = f", resumed at {info['resumed_at'] / 1e6:.1f} MB" if info['resumed_at'] else ""
+            print(f"  ✓ {entry['name']}: {info['bytes'] / 1e6:.1f} MB in {info['seconds']:.1f}s"
+                  f" ({info['bytes'] / 1e6 / max(info['seconds'], 1e-6):.1f} MB/s{resumed})")
+        elif event == 'extracted':
+            print(f"  📦 {entry['name']}: {info['members']} files -> {info['target']}")
+        else:
+            print(f"  ❌ {entry['name']}: {info['error']}")
+
+    stats = download_all(entries, download_dir, DATA_DIR, workers=settings['workers'],
+                         extract_workers=settings['extract_workers'], chunk_kb=settings['chunk_kb'],
+                         retries=settings['retries'], timeout_s=settings['timeout_s'],
+                         extract=extract, force=force, progress=progress)
+    print(f"\n📊 Downloaded {stats['downloaded']} ({stats['resumed']} resumed, "
+          f"{stats['bytes'] / 1e6:.1f} MB), skipped {stats['skipped']}, "
+          f"extracted {stats['extracted']}, failed {len(stats['failed'])}")
+    return len(stats['failed'])
+
+
 def print_dataset_instructions():
     """Print instructions for manually downloading datasets."""
     print("\n" + "=" * 70)
@@ -275,6 +302,11 @@ This directory contains all datasets for the Edge Safety Monitor project.
 
 - `annotations/` - Annotation files and metadata
 
+- `downloads/` - Archives fetched from `config/datasets.yaml` (and `state.json`)
+
+- `mining/` - Hard frames queued for labeling by `real_time_safety_monitor.py --mine`
+  (one YOLO-format folder per camera, with pre-annotations and `queue.json`)
+
 ## Download Instructions
 
 Run the dataset download script:
@@ -284,6 +316,13 @@ python scripts/download_datasets.py
 
 Follow the on-screen instructions to download datasets from Roboflow and Kaggle.
 
+Datasets with a direct download link can be listed in `config/datasets.yaml`
+(URL, optional `sha256` and `size`). The script then downloads them
+concurrently into `downloads/`, verifies their checksums and extracts
+archives into `raw/<name>/`. An interrupted download resumes where it
+stopped, and re-runs skip files that were already verified (`--force`
+downloads everything again).
+
 ## Data Format
 
 All datasets should be in YOLO format:
@@ -299,10 +338,19 @@ python scripts/prepare_data.py
 ```
 
 This will:
-1. Clean and validate data
-2. Split into train/val/test sets
-3. Apply data augmentation
-4. Generate processed dataset ready for training
+1. Convert VOC (`.xml`), COCO (`.json`) and YOLO (`.txt`) annotations to YOLO format
+2. Remap class names to the ids in `config/data.yaml` (e.g. `Hardhat` -> `helmet`)
+3. Drop near-duplicate images (pHash within `prepare.dedup_distance` bits), e.g. consecutive video frames
+4. Resize images (longest side `prepare.max_size`) and split them into train/val/test
+5. Report near-duplicates that ended up in different splits (train/val leakage)
+6. Write the processed dataset ready for training
+
+Work runs in a process pool. `data/processed/manifest.json` records a content
+hash per raw file, so re-runs only process new or changed files. Useful flags:
+
+- `--sources helmet vest`: prepare a subset
+- `--force`: rebuild everything
+- `--no-dedup`: keep near-duplicates
 """
     
     readme_path = DATA_DIR / "README.md"
@@ -314,6 +362,28 @@ This will:
 
 def main():
     """Main function to download datasets."""
+    parser = argparse.ArgumentParser(description='Edge Safety Monitor - Dataset Setup')
+    parser.add_argument('--manifest', type=str, default=None,
+                        help='Dataset manifest to download (default: download.manifest)')
+    parser.add_argument('--config', type=str, default=None,
+                        help='Path to config file (download section)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Concurrent downloads')
+    parser.add_argument('--no-extract', action='store_true',
+                        help='Download archives without extracting them')
+    parser.add_argument('--force', action='store_true',
+                        help='Download everything again, ignoring verified files')
+
+    args = parser.parse_args()
+
+    settings = dict(DEFAULT_DOWNLOAD_CONFIG)
+    settings.update(load_config(args.config).get('download') or {})
+    if args.workers:
+        settings['workers'] = args.workers
+    manifest = Path(args.manifest or settings['manifest'])
+    if not manifest.is_absolute() and not manifest.exists():
+        manifest = PROJECT_ROOT / manifest
+
     print("\n")
     print("╔" + "═" * 68 + "╗")
     print("║" + " " * 68 + "║")
@@ -330,6 +400,16 @@ def main():
     print("\n📝 Creating configuration files...")
     create_sample_data_yaml()
     create_readme_for_data()
+
+    if args.manifest or (manifest.exists() and read_manifest(manifest)):
+        if not manifest.exists():
+            print(f"❌ Error: Manifest not found: {manifest}")
+            return 1
+        failed = download_from_manifest(manifest, settings, extract=not args.no_extract, force=args.force)
+        print("\n📋 Next steps:")
+        print("   1. Run: python scripts/prepare_data.py")
+        print("   2. Start training: python scripts/train_model.py")
+        return 1 if failed else 0
     
     # Print download instructions
     print_dataset_instructions()
@@ -337,11 +417,12 @@ def main():
     print("\n✅ Setup complete!")
     print("\n📋 Next steps:")
     print("   1. Follow the instructions above to download datasets")
+    print("      (or list direct download links in config/datasets.yaml and re-run)")
     print("   2. Organize datasets in data/raw/ folders")
     print("   3. Run: python scripts/prepare_data.py")
     print("   4. Start training: python scripts/train_model.py")
+    return 0
 
 
 if __name__ == "__main__":
-    main()
-
+    sys.exit(main())
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Edge Safety Monitor - Evaluation Script
+=======================================
+Evaluates model files and inference backends on a labeled split: mAP50,
+mAP50-95, per-class precision/recall, per-worker violation accuracy and
+latency, swept over confidence thresholds. Predictions are cached per
+model and backend, so re-running (e.g. with other thresholds) does not
+repeat inference.
+
+    python scripts/evaluate.py --models models/ppe_detection_4classes/best.pt --backends pytorch onnx
+
+Author: Siddique Akber
+Date: October 2025
+"""
+
+import argparse
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import yaml
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.training.image_cache import dataset_images
+from src.utils.benchmark import backend_name
+from src.utils.config import load_config
+from src.utils.evaluation import (DEFAULT_EVALUATION_CONFIG, EXPORTS, cached_predictions, class_map,
+                                  evaluate, export_model, load_labels, remap_predictions)
+
+
+def resolve_backend(model, backend, imgsz):
+    """Model file to run for ``backend``: the model itself or its export."""
+    if backend in ('pytorch', backend_name(model)):
+        return Path(model)
+    if backend_name(model) != 'pytorch':
+        raise ValueError(f"only .pt weights can be exported (got {backend_name(model)})")
+    return export_model(model, backend, imgsz)
+
+
+def print_table(rows):
+    """Accuracy-vs-latency table, one row per model and backend."""
+    print("\n" + "=" * 110)
+    print(f"{'Model':<28} {'Backend':<18} {'mAP50':>7} {'mAP50-95':>9} {'conf':>5} {'P':>6} {'R':>6} "
+          f"{'Viol P':>7} {'Viol R':>7} {'Worker':>7} {'p50 ms':>8}")
+    print("-" * 110)
+    for row in rows:
+        name = Path(row['model']).name[-28:]
+        if 'error' in row:
+            print(f"{name:<28} {row['backend']:<18} unavailable: {row['error']}")
+            continue
+        best = next(t for t in row['thresholds'] if t['conf'] == row['best_conf'])
+        print(f"{name:<28} {row['backend']:<18} {row['map50']:>7.4f} {row['map50_95']:>9.4f} "
+              f"{row['best_conf']:>5.2f} {best['precision']:>6.3f} {best['recall']:>6.3f} "
+              f"{best['violation_precision']:>7.3f} {best['violation_recall']:>7.3f} "
+              f"{best['worker_accuracy']:>7.3f} {row['latency_ms']['p50']:>8.2f}")
+    print("=" * 110)
+
+
+def print_details(row):
+    """Threshold sweep and per-class results of one model/backend."""
+    print(f"\n📈 {Path(row['model']).name} ({row['backend']})")
+    print(f"  {'conf':>5} {'P':>6} {'R':>6} {'F1':>6} {'Viol P':>7} {'Viol R':>7} {'Worker':>7}")
+    for t in row['thresholds']:
+        print(f"  {t['conf']:>5.2f} {t['precision']:>6.3f} {t['recall']:>6.3f} {t['f1']:>6.3f} "
+              f"{t['violation_precision']:>7.3f} {t['violation_recall']:>7.3f} {t['worker_accuracy']:>7.3f}")
+    print(f"  {'class':<12} {'inst':>6} {'AP50':>6} {'AP50-95':>8} {'P':>6} {'R':>6}  (at conf {row['best_conf']:.2f})")
+    for name, c in row['per_class'].items():
+        print(f"  {name:<12} {c['instances']:>6} {c['ap50']:>6.3f} {c['ap50_95']:>8.3f} "
+              f"{c['precision']:>6.3f} {c['recall']:>6.3f}")
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description='Edge Safety Monitor - Evaluation')
+    parser.add_argument('--models', nargs='+', default=['models/ppe_detection_4classes/best.pt'],
+                        help='Model files to evaluate (.pt, .onnx, *_openvino_model, ...)')
+    parser.add_argument('--backends', nargs='+', default=['pytorch'],
+                        choices=['pytorch', *EXPORTS],
+                        help='Backends per .pt model (exported next to the weights when missing)')
+    parser.add_argument('--data', type=str, default='config/data.yaml',
+                        help='Path to data.yaml file')
+    parser.add_argument('--config', type=str, default=None,
+                        help='Path to config file (evaluation section)')
+    parser.add_argument('--split', type=str, default=None,
+                        help='Dataset split to evaluate (default: evaluation.split)')
+    parser.add_argument('--conf', type=float, nargs='+', default=None,
+                        help='Confidence thresholds to sweep')
+    parser.add_argument('--device', type=str, default='cpu',
+                        help='Inference device')
+    parser.add_argument('--refresh', action='store_true',
+                        help='Ignore cached predictions')
+    parser.add_argument('--output', type=str, default=None,
+                        help='JSON report path')
+
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    settings = dict(DEFAULT_EVALUATION_CONFIG)
+    settings.update(config.get('evaluation') or {})
+    if args.split:
+        settings['split'] = args.split
+    if args.conf:
+        settings['conf_thresholds'] = sorted(args.conf)
+    cache_dir = Path(settings['cache_dir'])
+    if not cache_dir.is_absolute():
+        cache_dir = PROJECT_ROOT / cache_dir
+    imgsz = config['model']['input_size']
+
+    data_yaml = PROJECT_ROOT / args.data
+    if not data_yaml.exists():
+        print(f"❌ Error: Data file not found: {data_yaml}")
+        return 1
+    with open(data_yaml, 'r') as f:
+        names = yaml.safe_load(f)['names']
+    data_names = dict(enumerate(names)) if isinstance(names, list) else {int(k): v for k, v in names.items()}
+    images = dataset_images(data_yaml, splits=(settings['split'],))
+    if not images:
+        print(f"❌ Error: No '{settings['split']}' images in {data_yaml}")
+        return 1
+
+    print("=" * 60)
+    print("🎯 Model Evaluation")
+    print("=" * 60)
+    print(f"Split: {settings['split']} ({len(images)} images)")
+    print(f"Models: {', '.join(args.models)} | Backends: {', '.join(args.backends)}")
+    print(f"Confidence thresholds: {settings['conf_thresholds']}")
+
+    rows, labels = [], None
+    for model in args.models:
+        if not Path(model).is_absolute() and (PROJECT_ROOT / model).exists():
+            model = str(PROJECT_ROOT / model)
+        for backend in dict.fromkeys(args.backends if backend_name(model) == 'pytorch'
+                                     else [backend_name(model)]):
+            row = {'model': str(model), 'backend': backend}
+            try:
+                path = resolve_backend(model, backend, imgsz)
+                predictions, hit = cached_predictions(path, images, imgsz, settings, cache_dir,
+                                                      device=args.device, refresh=args.refresh)
+            except Exception as e:
+                row['error'] = f"{type(e).__name__}: {e}"
+                print(f"  ⚠️  {model} ({backend}): {row['error']}")
+                rows.append(row)
+                continue
+            print(f"  {'♻️  Cached' if hit else '🔎 Predicted'}: {path.name} ({backend})")
+            if labels is None:
+                labels = load_labels(images, predictions['shapes'])
+            predictions = remap_predictions(predictions, class_map(predictions['names'], data_names))
+            row.update(evaluate(predictions, labels, data_names, settings['conf_thresholds']))
+            rows.append(row)
+
+    for row in rows:
+        if 'error' not in row:
+            print_details(row)
+    print_table(rows)
+
+    output = Path(args.output) if args.output else \
+        PROJECT_ROOT / 'outputs' / 'evaluation' / f"evaluation_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({'created': datetime.now().isoformat(timespec='seconds'), 'data': str(data_yaml),
+                   'settings': settings, 'imgsz': imgsz, 'results': rows}, f, indent=2)
+    print(f"\n💾 Report saved: {output}")
+    return 0 if any('error' not in row for row in rows) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
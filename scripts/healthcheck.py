@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Edge Safety Monitor - Health Check
+=================================
+Exit 0 if the running monitor is alive and keeping up with
+``edge.target_fps``, 1 otherwise. Used by the Docker HEALTHCHECK.
+
+Reads the heartbeat file written by the monitor's in-process health probe
+(see ``src/utils/health.py``); only the standard library and PyYAML are
+imported, so the check runs in well under a second.
+
+Author: Siddique Akber
+Date: October 2025
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.utils.config import DEFAULT_CONFIG_PATH, load_config
+from src.utils.health import check_heartbeat, health_settings
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description='Edge Safety Monitor - Health Check')
+    parser.add_argument('--config', type=str, default=str(DEFAULT_CONFIG_PATH),
+                        help='Path to config file (health/edge sections)')
+    parser.add_argument('--heartbeat', type=str, default=None,
+                        help='Heartbeat file (overrides health.heartbeat_file)')
+    parser.add_argument('--max-age', type=float, default=None,
+                        help='Max heartbeat / last-frame age in seconds')
+    parser.add_argument('--min-fps-ratio', type=float, default=None,
+                        help='Min fraction of edge.target_fps before reporting unhealthy')
+    parser.add_argument('--json', action='store_true', help='Print the heartbeat as JSON')
+
+    args = parser.parse_args()
+
+    try:
+        config = load_config(args.config)
+    except OSError:
+        config = {}
+    settings = health_settings(config)
+
+    healthy, reasons, data = check_heartbeat(
+        args.heartbeat or settings['heartbeat_file'],
+        max_age_s=args.max_age if args.max_age is not None else settings['max_age_s'],
+        min_fps_ratio=args.min_fps_ratio if args.min_fps_ratio is not None else settings['min_fps_ratio'],
+        startup_grace_s=settings['startup_grace_s'],
+    )
+
+    if args.json and data is not None:
+        print(json.dumps(data, indent=2))
+    if healthy:
+        fps = data.get('recent_fps') if data else None
+        print(f"healthy: {fps} FPS (target {data.get('target_fps') if data else None})")
+        return 0
+
+    for reason in reasons:
+        print(f"unhealthy: {reason}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
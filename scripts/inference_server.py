@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Edge Safety Monitor - HTTP Inference Server
+==========================================
+Serve PPE detection over HTTP so many cameras/clients can share one
+inference box. Concurrent uploads are micro-batched into single model
+calls (see ``src/inference/server.py``).
+
+    python scripts/inference_server.py --model models/ppe_detection_4classes/best.pt
+    curl --data-binary @site.jpg -H "Content-Type: image/jpeg" http://localhost:8000/detect
+
+Author: Siddique Akber
+Date: October 2025
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.utils.config import DEFAULT_CONFIG_PATH, load_config
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description='Edge Safety Monitor - HTTP Inference Server')
+    parser.add_argument('--model', type=str, default='models/ppe_detection_4classes/best.pt',
+                        help='Path to model weights ("stub" for a fixed-output test model)')
+    parser.add_argument('--config', type=str, default=str(DEFAULT_CONFIG_PATH),
+                        help='Path to config file (server section)')
+    parser.add_argument('--conf', type=float, default=0.5, help='Confidence threshold')
+    parser.add_argument('--host', type=str, default=None, help='Bind address')
+    parser.add_argument('--port', type=int, default=None, help='Port')
+    parser.add_argument('--max-batch-size', type=int, default=None, help='Images per model call')
+    parser.add_argument('--max-latency-ms', type=float, default=None,
+                        help='Max time a request waits for its batch to fill')
+    parser.add_argument('--max-queue', type=int, default=None,
+                        help='Queued requests before answering 429')
+
+    args = parser.parse_args()
+
+    config = load_config(args.config) if Path(args.config).exists() else {}
+    settings = config.setdefault('server', {}) or {}
+    for key in ('host', 'port', 'max_batch_size', 'max_latency_ms', 'max_queue'):
+        if getattr(args, key) is not None:
+            settings[key] = getattr(args, key)
+    config['server'] = settings
+
+    if args.model == 'stub':
+        from src.utils.benchmark import StubModel
+        model = StubModel()
+    else:
+        from src.inference.model_cache import load_model
+        model = load_model(args.model)
+
+    # Warm up so the first client does not pay for lazy initialisation
+    import numpy as np
+    model(np.zeros((480, 640, 3), dtype=np.uint8), conf=args.conf, verbose=False)
+
+    from src.inference.server import InferenceServer
+    server = InferenceServer.from_config(model, config, conf_threshold=args.conf)
+
+    async def run():
+        host, port = await server.start(settings.get('host', '0.0.0.0'), settings.get('port', 8000))
+        print(f"🚀 Inference server listening on http://{host}:{port}")
+        print(f"   POST /detect (JPEG/PNG)  |  GET /health")
+        print(f"   batch<={server.batcher.max_batch_size}, "
+              f"wait<={server.batcher.max_latency_s * 1000:.0f} ms, "
+              f"queue<={server.batcher.max_queue}")
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        print("\n👋 Server stopped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
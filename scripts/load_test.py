@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Edge Safety Monitor - Inference Server Load Generator
+====================================================
+Fires concurrent JPEG uploads at ``scripts/inference_server.py`` over
+keep-alive connections and reports throughput, latency percentiles,
+status codes (including 429 backpressure) and the server's batching stats.
+
+    python scripts/inference_server.py --model stub &
+    python scripts/load_test.py --concurrency 32 --requests 2000
+
+Author: Siddique Akber
+Date: October 2025
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.utils.benchmark import create_synthetic_frame, latency_stats
+
+
+async def http_request(reader, writer, method, path, body=b'', content_type='image/jpeg'):
+    """Send one request on an open keep-alive connection; returns (status, json)."""
+    head = (f"{method} {path} HTTP/1.1\r\nHost: load-test\r\n"
+            f"Content-Type: {content_type}\r\nContent-Length: {len(body)}\r\n\r\n")
+    writer.write(head.encode() + body)
+    await writer.drain()
+
+    raw = await reader.readuntil(b'\r\n\r\n')
+    lines = raw.decode('latin-1').split('\r\n')
+    status = int(lines[0].split(' ')[1])
+    headers = {k.strip().lower(): v.strip() for k, _, v in
+               (line.partition(':') for line in lines[1:] if ':' in line)}
+    payload = await reader.readexactly(int(headers.get('content-length', 0)))
+    return status, json.loads(payload) if payload else None, headers
+
+
+async def client(host, port, payloads, counter, results, deadline):
+    """One connection sending requests back-to-back until the budget is used up."""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            index = counter['sent']
+            if index >= counter['total']:
+                break
+            counter['sent'] += 1
+            body = payloads[index % len(payloads)]
+            start = time.perf_counter()
+            status, data, headers = await http_request(reader, writer, 'POST', '/detect', body)
+            results.append((status, time.perf_counter() - start,
+                            data.get('batch_size') if status == 200 and data else None))
+            if headers.get('connection') == 'close':
+                writer.close()
+                reader, writer = await asyncio.open_connection(host, port)
+    finally:
+        writer.close()
+
+
+async def run(args):
+    import cv2
+
+    payloads = []
+    for i in range(8):
+        frame = create_synthetic_frame(i, args.width, args.height, seed=args.seed)
+        ok, buf = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
+        payloads.append(buf.tobytes())
+
+    counter = {'sent': 0, 'total': args.requests}
+    results = []
+    start = time.perf_counter()
+    deadline = start + args.duration if args.duration else float('inf')
+    await asyncio.gather(*(client(args.host, args.port, payloads, counter, results, deadline)
+                           for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+
+    reader, writer = await asyncio.open_connection(args.host, args.port)
+    _, health, _ = await http_request(reader, writer, 'GET', '/health')
+    writer.close()
+    return results, elapsed, health
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description='Edge Safety Monitor - Load Generator')
+    parser.add_argument('--host', type=str, default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--concurrency', type=int, default=16, help='Parallel connections')
+    parser.add_argument('--requests', type=int, default=500, help='Total requests')
+    parser.add_argument('--duration', type=float, default=None, help='Stop after N seconds')
+    parser.add_argument('--width', type=int, default=640)
+    parser.add_argument('--height', type=int, default=480)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', type=str, default=None, help='Write the report as JSON')
+
+    args = parser.parse_args()
+    results, elapsed, health = asyncio.run(run(args))
+
+    statuses = Counter(status for status, _, _ in results)
+    ok_latencies = [lat for status, lat, _ in results if status == 200]
+    batch_sizes = [b for _, _, b in results if b]
+    report = {
+        'requests': len(results),
+        'elapsed_s': round(elapsed, 3),
+        'throughput_rps': round(len(results) / elapsed, 2) if elapsed else 0.0,
+        'ok_rps': round(len(ok_latencies) / elapsed, 2) if elapsed else 0.0,
+        'status_counts': dict(statuses),
+        'latency_ms': latency_stats(ok_latencies),
+        'client_mean_batch_size': round(sum(batch_sizes) / len(batch_sizes), 2) if batch_sizes else 0.0,
+        'server': health,
+    }
+
+    print("=" * 70)
+    print("📈 LOAD TEST SUMMARY")
+    print("=" * 70)
+    print(f"Requests: {report['requests']} in {report['elapsed_s']}s "
+          f"({report['throughput_rps']} req/s, {report['ok_rps']} OK/s)")
+    print(f"Status codes: {report['status_counts']}")
+    lat = report['latency_ms']
+    if lat.get('count'):
+        print(f"Latency (200s): p50 {lat['p50']} ms | p95 {lat['p95']} ms | p99 {lat['p99']} ms")
+    print(f"Mean batch size: {report['client_mean_batch_size']}")
+    print("=" * 70)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
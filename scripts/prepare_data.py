@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Edge Safety Monitor - Dataset Preparation Script
+================================================
+Merges the raw helmet/vest/phone/drowsiness datasets in data/raw/ into the
+YOLO dataset in data/processed/ that config/data.yaml points at:
+VOC/COCO/YOLO annotations are converted, class ids remapped to data.yaml,
+near-duplicate frames dropped, images resized and split into
+train/val/test across a process pool, and cross-split leakage reported.
+
+Re-runs are incremental: only new or changed raw files are processed.
+
+Author: Siddique Akber
+Date: October 2025
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import yaml
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.preprocessing.dataset import DEFAULT_PREPARE_CONFIG, SPLITS, prepare_dataset
+from src.utils.config import load_config
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description='Edge Safety Monitor - Dataset Preparation')
+    parser.add_argument('--raw-dir', type=str, default=str(PROJECT_ROOT / 'data' / 'raw'),
+                       help='Directory with one sub-directory per raw dataset')
+    parser.add_argument('--output-dir', type=str, default=str(PROJECT_ROOT / 'data' / 'processed'),
+                       help='Processed dataset directory')
+    parser.add_argument('--data', type=str, default=str(PROJECT_ROOT / 'config' / 'data.yaml'),
+                       help='data.yaml with the target class names')
+    parser.add_argument('--config', type=str, default=None,
+                       help='Path to config file (prepare section)')
+    parser.add_argument('--sources', nargs='+', default=None,
+                       help='Only these raw datasets (e.g. helmet vest)')
+    parser.add_argument('--max-size', type=int, default=None,
+                       help='Longest image side after resizing (0 = keep)')
+    parser.add_argument('--split', type=float, nargs=3, default=None, metavar=('TRAIN', 'VAL', 'TEST'),
+                       help='Split fractions')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='Worker processes (default: one per CPU)')
+    parser.add_argument('--no-dedup', action='store_true',
+                       help='Keep near-duplicate images')
+    parser.add_argument('--dedup-distance', type=int, default=None,
+                       help='pHash Hamming distance counted as a near-duplicate')
+    parser.add_argument('--force', action='store_true',
+                       help='Ignore the manifest and rebuild everything')
+
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    settings = dict(DEFAULT_PREPARE_CONFIG)
+    settings.update(config.get('prepare') or {})
+    if args.max_size is not None:
+        settings['max_size'] = args.max_size
+    if args.split is not None:
+        settings['split'] = args.split
+    if args.no_dedup:
+        settings['dedup'] = False
+    if args.dedup_distance is not None:
+        settings['dedup_distance'] = args.dedup_distance
+
+    raw_dir = Path(args.raw_dir)
+    if not raw_dir.is_dir():
+        print(f"❌ Error: Raw data directory not found: {raw_dir}")
+        print("   Run scripts/download_datasets.py and place the datasets in data/raw/")
+        return 1
+    with open(args.data, 'r') as f:
+        names = yaml.safe_load(f)['names']
+
+    print("=" * 60)
+    print("🗂️  Preparing Dataset")
+    print("=" * 60)
+    print(f"Raw: {raw_dir}")
+    print(f"Output: {args.output_dir}")
+    print(f"Classes: {names}")
+
+    def progress(done, total):
+        if done % 500 == 0 or done == total:
+            print(f"Processing... {done}/{total} images", end='\r')
+
+    start = time.perf_counter()
+    stats = prepare_dataset(raw_dir, args.output_dir, names, settings, sources=args.sources,
+                            workers=args.workers, force=args.force, progress=progress)
+    elapsed = time.perf_counter() - start
+
+    print(f"\n\n✅ Done in {elapsed:.1f}s")
+    print(f"  Found: {stats['found']} annotated images")
+    if stats['duplicates']:
+        print(f"  Near-duplicates skipped: {stats['duplicates']}")
+    print(f"  Processed: {stats['processed']} new/changed")
+    print(f"  Unchanged: {stats['unchanged'] + stats['touched']}")
+    print(f"  Removed: {stats['removed']}")
+    if stats['errors']:
+        print(f"  ⚠️  Unreadable: {stats['errors']}")
+    print(f"  Splits: " + ", ".join(f"{s} {stats['splits'][s]}" for s in SPLITS))
+    print(f"  Boxes per class: " + ", ".join(
+        f"{names.get(c, c) if isinstance(names, dict) else names[c]} {n}"
+        for c, n in stats['classes'].items()))
+    if stats['dropped_boxes']:
+        print(f"  Dropped boxes (class not in data.yaml, or empty): {stats['dropped_boxes']}")
+    if stats['leaks']:
+        print(f"\n⚠️  {len(stats['leaks'])} near-duplicates across splits "
+              f"(pHash distance <= {settings['leak_distance']}):")
+        for key, split, other, other_split, distance in stats['leaks'][:10]:
+            print(f"  {split}: {key}  ~  {other_split}: {other} (distance {distance})")
+        if len(stats['leaks']) > 10:
+            print(f"  ... and {len(stats['leaks']) - 10} more")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Edge Safety Monitor - Hyperparameter Sweep
+==========================================
+Trains sampled training/augmentation configurations in parallel worker
+processes and prunes weak ones early by successive halving on validation
+mAP. Writes a ranked results.csv and the winning best_config.yaml
+(usable with scripts/train_model.py --config).
+
+Author: Siddique Akber
+Date: October 2025
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import yaml
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.training.image_cache import DEFAULT_IMAGE_CACHE_CONFIG, build_cache, dataset_images
+from src.training.sweep import DEFAULT_SWEEP_CONFIG, apply_params, rung_budgets, run_sweep
+from src.utils.config import load_config
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description='Edge Safety Monitor - Hyperparameter Sweep')
+    parser.add_argument('--data', type=str, default='config/data.yaml',
+                       help='Path to data.yaml file')
+    parser.add_argument('--model', type=str, default='yolov8n.pt',
+                       help='Model variant (yolov8n.pt, yolov8s.pt, etc.)')
+    parser.add_argument('--config', type=str, default=None,
+                       help='Path to config file (sweep section)')
+    parser.add_argument('--trials', type=int, default=None,
+                       help='Number of sampled configurations')
+    parser.add_argument('--threads', type=int, default=None,
+                       help='CPU threads per trial')
+    parser.add_argument('--parallel', type=int, default=None,
+                       help='Concurrent trials (default: CPUs // threads)')
+    parser.add_argument('--min-epochs', type=int, default=None,
+                       help='Epochs of the first rung')
+    parser.add_argument('--max-epochs', type=int, default=None,
+                       help='Epochs of the last rung')
+    parser.add_argument('--eta', type=int, default=None,
+                       help='Keep the best 1/eta trials per rung')
+    parser.add_argument('--max-hours', type=float, default=None,
+                       help='Start no new rung after this many hours')
+    parser.add_argument('--image-cache', action='store_true',
+                       help='Train from the memory-mapped image cache')
+    parser.add_argument('--name', type=str, default=time.strftime('sweep_%Y%m%d_%H%M%S'),
+                       help='Run name under runs/sweep/')
+
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    settings = dict(DEFAULT_SWEEP_CONFIG)
+    settings.update(config.get('sweep') or {})
+    for key, value in (('trials', args.trials), ('threads_per_trial', args.threads),
+                       ('parallel', args.parallel), ('min_epochs', args.min_epochs),
+                       ('max_epochs', args.max_epochs), ('eta', args.eta), ('max_hours', args.max_hours)):
+        if value is not None:
+            settings[key] = value
+
+    data_yaml = PROJECT_ROOT / args.data
+    if not data_yaml.exists():
+        print(f"❌ Error: Data file not found: {data_yaml}")
+        return 1
+    out_dir = PROJECT_ROOT / 'runs' / 'sweep' / args.name
+
+    print("=" * 60)
+    print("🔬 Hyperparameter Sweep")
+    print("=" * 60)
+    print(f"Trials: {settings['trials']} | Rungs (epochs): {rung_budgets(settings['min_epochs'], settings['max_epochs'], settings['eta'])}")
+    print(f"Threads per trial: {settings['threads_per_trial']} | Parallel: {settings['parallel'] or 'auto'}")
+    print(f"Search space: {', '.join(settings['space'])}")
+    print(f"Output: {out_dir}")
+
+    cache_dir = None
+    if args.image_cache or (config.get('image_cache') or {}).get('enabled'):
+        cache_settings = {**DEFAULT_IMAGE_CACHE_CONFIG, **(config.get('image_cache') or {})}
+        cache_dir = Path(cache_settings['cache_dir'])
+        if not cache_dir.is_absolute():
+            cache_dir = PROJECT_ROOT / cache_dir
+        stats = build_cache(dataset_images(data_yaml), cache_dir, config['model']['input_size'],
+                            shard_mb=cache_settings['shard_mb'], workers=cache_settings['workers'])
+        print(f"🗄️  Image cache: {stats['cached']} images ({stats['added']} new)")
+
+    def on_result(trial):
+        if trial['status'] == 'failed':
+            print(f"  ❌ trial {trial['id']:3d} failed: {trial['error']}")
+        else:
+            print(f"  trial {trial['id']:3d} @ {trial['epochs']:3d} epochs: "
+                  f"{settings['metric']} {trial['score']:.4f} ({trial['seconds'] / 60:.1f} min)")
+
+    def on_rung(rung, epochs, ranked):
+        survivors = sum(t['rung'] == rung and t['status'] != 'pruned' for t in ranked)
+        print(f"\n📶 Rung {rung} ({epochs} epochs) done: {survivors} trial(s) left\n")
+
+    start = time.perf_counter()
+    ranked = run_sweep(data_yaml, config, settings, model=args.model, out_dir=out_dir,
+                       cache_dir=cache_dir, on_result=on_result, on_rung=on_rung)
+    elapsed = time.perf_counter() - start
+
+    print("=" * 60)
+    print(f"✅ Sweep finished in {elapsed / 3600:.2f}h")
+    print("=" * 60)
+    print(f"{'rank':>4} {'trial':>5} {'status':>9} {'epochs':>6} {settings['metric']:>9}  params")
+    for rank, trial in enumerate(ranked[:10], 1):
+        score = '-' if trial['score'] is None else f"{trial['score']:.4f}"
+        params = ', '.join(f"{k.split('.')[-1]}={v}" for k, v in trial['params'].items())
+        print(f"{rank:>4} {trial['id']:>5} {trial['status']:>9} {trial['epochs']:>6} {score:>9}  {params}")
+
+    best = ranked[0]
+    if best['status'] == 'failed':
+        print("❌ Every trial failed")
+        return 1
+    best_config = apply_params(config, best['params'])
+    best_config['training']['optimizer'] = settings['optimizer']
+    with open(out_dir / 'best_config.yaml', 'w') as f:
+        yaml.safe_dump(best_config, f, sort_keys=False)
+    print(f"\n🏆 Best: trial {best['id']} -> {best.get('best_weights')}")
+    print(f"📄 Results: {out_dir / 'results.csv'}")
+    print(f"⚙️  Config: {out_dir / 'best_config.yaml'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
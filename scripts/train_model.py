@@ -10,6 +10,7 @@ Date: October 2025
 
 import argparse
 import sys
+import time
 from pathlib import Path
 import yaml
 from ultralytics import YOLO
@@ -17,6 +18,9 @@ from ultralytics import YOLO
 PROJECT_ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
+from src.training.image_cache import (DEFAULT_IMAGE_CACHE_CONFIG, ImageCache, build_cache,
+                                      cached_trainer, dataset_images)
+
 
 def load_config(config_path=None):
     """Load configuration from YAML file."""
@@ -29,7 +33,33 @@ def load_config(config_path=None):
     return config
 
 
-def train_model(data_yaml, config, model_variant='yolov8n.pt'):
+def prepare_image_cache(data_yaml, config, force=False):
+    """Build (or update) the memory-mapped image cache for the train/val splits."""
+    settings = dict(DEFAULT_IMAGE_CACHE_CONFIG)
+    settings.update(config.get('image_cache') or {})
+    cache_dir = Path(settings['cache_dir'])
+    if not cache_dir.is_absolute():
+        cache_dir = PROJECT_ROOT / cache_dir
+    imgsz = config['model']['input_size']
+
+    print(f"\n🗄️  Image cache: {cache_dir} (imgsz {imgsz})")
+    files = dataset_images(data_yaml)
+
+    def progress(done, total):
+        if done % 500 == 0 or done == total:
+            print(f"Caching... {done}/{total} images", end='\r')
+
+    start = time.perf_counter()
+    stats = build_cache(files, cache_dir, imgsz, shard_mb=settings['shard_mb'],
+                        workers=settings['workers'], force=force, progress=progress)
+    print(f"  {stats['cached']} images cached ({stats['added']} new, "
+          f"{stats['size_mb']:.0f} MB) in {time.perf_counter() - start:.1f}s")
+    if stats['errors']:
+        print(f"  ⚠️  Unreadable: {stats['errors']}")
+    return ImageCache(cache_dir)
+
+
+def train_model(data_yaml, config, model_variant='yolov8n.pt', image_cache=None):
     """Train YOLOv8 model."""
     
     print("=" * 60)
@@ -53,6 +83,7 @@ def train_model(data_yaml, config, model_variant='yolov8n.pt'):
     print(f"  Learning Rate: {lr}")
     print(f"  Patience: {patience}")
     print(f"  Device: {device}")
+    print(f"  Image Cache: {'memory-mapped' if image_cache is not None else 'off'}")
     
     # Train the model
     print("\n" + "=" * 60)
@@ -60,10 +91,13 @@ def train_model(data_yaml, config, model_variant='yolov8n.pt'):
     print("=" * 60 + "\n")
     
     results = model.train(
+        trainer=cached_trainer(image_cache) if image_cache is not None else None,
         data=data_yaml,
+        imgsz=config['model']['input_size'],
         epochs=epochs,
         batch=batch_size,
         lr0=lr,
+        optimizer=config['training'].get('optimizer', 'auto'),
         patience=patience,
         device=device,
         save=True,
@@ -72,6 +106,7 @@ def train_model(data_yaml, config, model_variant='yolov8n.pt'):
         project=str(PROJECT_ROOT / "runs" / "train"),
         name="edge_safety_monitor",
         exist_ok=True,
+        **(config.get('augmentation') or {}),
     )
     
     print("\n" + "=" * 60)
@@ -106,6 +141,10 @@ def main():
                        help='Number of epochs (override config)')
     parser.add_argument('--batch', type=int, default=None,
                        help='Batch size (override config)')
+    parser.add_argument('--image-cache', action='store_true',
+                       help='Train from the pre-resized memory-mapped image cache')
+    parser.add_argument('--rebuild-cache', action='store_true',
+                       help='Rebuild the image cache from scratch')
     
     args = parser.parse_args()
     
@@ -128,8 +167,12 @@ def main():
         print("  3. Created data.yaml configuration")
         sys.exit(1)
     
+    image_cache = None
+    if args.image_cache or args.rebuild_cache or (config.get('image_cache') or {}).get('enabled'):
+        image_cache = prepare_image_cache(data_yaml, config, force=args.rebuild_cache)
+
     # Train model
-    train_model(str(data_yaml), config, args.model)
+    train_model(str(data_yaml), config, args.model, image_cache=image_cache)
 
 
 if __name__ == "__main__":
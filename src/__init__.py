@@ -11,9 +11,14 @@ __version__ = "1.0.0"
 __author__ = "Siddique Akber"
 __email__ = "github.com/siddiqueakber"
 
-from . import detection
-from . import preprocessing
-from . import training
-from . import inference
-from . import utils
+import importlib
+
+__all__ = ['detection', 'preprocessing', 'training', 'inference', 'utils']
+
+
+def __getattr__(name):
+    """Import subpackages on first access so ``import src`` stays cheap."""
+    if name in __all__:
+        return importlib.import_module(f'.{name}', __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
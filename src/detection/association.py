@@ -0,0 +1,145 @@
+"""
+Person-PPE association
+======================
+Assigns every PPE detection (``Hardhat``, ``NO-Hardhat``, ``Safety Vest``,
+...) to the worker whose box contains it best and derives one PPE status per
+worker and item:
+
+- ``1`` (wearing) when the best positive detection outranks the best negative
+- ``-1`` (missing) when the best negative detection wins
+- ``0`` (unknown) when neither was seen on that worker
+
+Duplicate or contradictory boxes on the same worker therefore collapse into a
+single status. Everything is computed on (persons x items) NumPy matrices in
+one shot - there are no per-pair Python loops, so crowded frames stay cheap.
+"""
+
+import numpy as np
+
+from src.detection.boxes import box_area, intersection
+
+PPE_ITEMS = ('hardhat', 'mask', 'safety_vest')
+NEGATIVE_ITEMS = ('no_hardhat', 'no_mask', 'no_vest')
+
+WEARING, UNKNOWN, MISSING = 1, 0, -1
+
+
+def association_tables(lookup):
+    """Per-class ``(is_person, item_index, sign)`` arrays for a category lookup.
+
+    ``item_index`` is the position in ``PPE_ITEMS`` (-1 for non-PPE classes)
+    and ``sign`` is +1 for positive, -1 for negative detections.
+    """
+    is_person = np.array([c == 'person' for c in lookup], dtype=bool)
+    item_index = np.full(len(lookup), -1, dtype=np.int64)
+    sign = np.zeros(len(lookup), dtype=np.int8)
+    for i, category in enumerate(lookup):
+        if category in PPE_ITEMS:
+            item_index[i], sign[i] = PPE_ITEMS.index(category), 1
+        elif category in NEGATIVE_ITEMS:
+            item_index[i], sign[i] = NEGATIVE_ITEMS.index(category), -1
+    return is_person, item_index, sign
+
+
+def associate(xyxy, conf, cls, tables, min_containment=0.5):
+    """Associate one frame's PPE detections with its person detections.
+
+    ``tables`` comes from ``association_tables``. An item belongs to the
+    person covering the largest fraction of its box (IoU breaks ties), if
+    that fraction is at least ``min_containment``. Returns a dict with
+    ``person_boxes``, ``person_conf``, ``status`` (persons x ``PPE_ITEMS``,
+    values ``WEARING``/``UNKNOWN``/``MISSING``), ``status_conf`` (confidence
+    of the deciding detection), ``conflict`` (persons x ``PPE_ITEMS``, True
+    where both a positive and a negative box were seen), ``owner`` (person index per PPE detection,
+    -1 if unassigned) and ``ppe_index`` (the PPE detections' indices).
+    """
+    is_person_cls, item_cls, sign_cls = tables
+    cls = np.asarray(cls, dtype=np.int64)
+    valid = (cls >= 0) & (cls < len(is_person_cls))
+    safe_cls = np.where(valid, cls, 0)
+    person_mask = valid & is_person_cls[safe_cls]
+    item_mask = valid & (item_cls[safe_cls] >= 0)
+
+    persons = xyxy[person_mask]
+    ppe_index = np.flatnonzero(item_mask)
+    items = xyxy[ppe_index]
+    kinds = item_cls[cls[ppe_index]]
+    signs = sign_cls[cls[ppe_index]]
+    scores = conf[ppe_index]
+
+    num_persons = len(persons)
+    owner = np.full(len(items), -1, dtype=np.int64)
+    if num_persons and len(items):
+        inter = intersection(persons, items)
+        item_area = box_area(items)
+        containment = inter / np.maximum(item_area, 1e-9)[None, :]
+        # IoU as a small tie-breaker between people covering an item equally
+        union = box_area(persons)[:, None] + item_area[None, :] - inter
+        score = containment + 1e-3 * inter / np.maximum(union, 1e-9)
+        best = score.argmax(axis=0)
+        matched = containment[best, np.arange(len(items))] >= min_containment
+        owner[matched] = best[matched]
+
+    # Best positive / negative confidence per (person, item): scatter-max
+    pos = np.zeros((num_persons, len(PPE_ITEMS)), dtype=np.float32)
+    neg = np.zeros((num_persons, len(PPE_ITEMS)), dtype=np.float32)
+    assigned = owner >= 0
+    positive = assigned & (signs > 0)
+    negative = assigned & (signs < 0)
+    np.maximum.at(pos, (owner[positive], kinds[positive]), scores[positive])
+    np.maximum.at(neg, (owner[negative], kinds[negative]), scores[negative])
+
+    status = np.where(pos > neg, WEARING, np.where(neg > 0, MISSING, UNKNOWN)).astype(np.int8)
+    return {
+        'person_boxes': persons,
+        'person_conf': conf[person_mask],
+        'status': status,
+        'status_conf': np.maximum(pos, neg),
+        'conflict': (pos > 0) & (neg > 0),
+        'owner': owner,
+        'ppe_index': ppe_index,
+    }
+
+
+def worker_violations(association, xyxy, conf, cls, lookup):
+    """Violation list with one entry per non-compliant (worker, item).
+
+    Negative detections that could not be matched to any worker (e.g. the
+    person itself was missed) are still reported, without a ``worker``.
+    """
+    status = association['status']
+    workers, items = np.nonzero(status == MISSING)
+    violations = [
+        {
+            'type': NEGATIVE_ITEMS[item],
+            'confidence': float(association['status_conf'][worker, item]),
+            'worker': int(worker),
+            'box': [float(v) for v in association['person_boxes'][worker]],
+        }
+        for worker, item in zip(workers, items)
+    ]
+
+    orphans = association['ppe_index'][association['owner'] < 0]
+    for i in orphans:
+        category = lookup[int(cls[i])]
+        if category in NEGATIVE_ITEMS:
+            violations.append({'type': category, 'confidence': float(conf[i]),
+                               'worker': None, 'box': [float(v) for v in xyxy[i]]})
+    return violations
+
+
+def worker_records(association):
+    """JSON-friendly per-worker PPE status."""
+    names = {WEARING: 'wearing', UNKNOWN: 'unknown', MISSING: 'missing'}
+    return [
+        {
+            'worker': i,
+            'box': [round(float(v), 1) for v in box],
+            'confidence': round(float(p), 4),
+            'ppe': {item: names[int(s)] for item, s in zip(PPE_ITEMS, row)},
+            'compliant': bool((row != MISSING).all()),
+        }
+        for i, (box, p, row) in enumerate(zip(association['person_boxes'],
+                                              association['person_conf'],
+                                              association['status']))
+    ]
@@ -0,0 +1,82 @@
+"""
+Vectorized box geometry helpers (NumPy, ``[x1, y1, x2, y2]`` boxes)
+"""
+
+import numpy as np
+
+
+def box_area(boxes):
+    """Areas of an (N, 4) box array."""
+    boxes = np.asarray(boxes, dtype=np.float32)
+    return np.clip(boxes[:, 2] - boxes[:, 0], 0, None) * np.clip(boxes[:, 3] - boxes[:, 1], 0, None)
+
+
+def intersection(a, b):
+    """(N, M) intersection areas between two box arrays."""
+    a = np.asarray(a, dtype=np.float32)
+    b = np.asarray(b, dtype=np.float32)
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    return np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+
+
+def box_iou(a, b):
+    """(N, M) IoU matrix between two box arrays."""
+    inter = intersection(a, b)
+    union = box_area(a)[:, None] + box_area(b)[None, :] - inter
+    return inter / np.maximum(union, 1e-9)
+
+
+def nms(boxes, scores, iou_threshold=0.5, classes=None):
+    """Greedy non-maximum suppression; returns kept indices sorted by score.
+
+    With ``classes`` given, boxes only suppress boxes of the same class.
+    """
+    boxes = np.asarray(boxes, dtype=np.float32)
+    scores = np.asarray(scores, dtype=np.float32)
+    if len(boxes) == 0:
+        return np.zeros(0, dtype=np.int64)
+    if classes is not None:
+        # Offset each class into its own coordinate region so classes never overlap
+        offsets = np.asarray(classes, dtype=np.float32)[:, None] * (boxes.max() + 1.0)
+        boxes = boxes + offsets
+
+    order = np.argsort(-scores, kind='stable')
+    iou = box_iou(boxes[order], boxes[order])
+    keep = np.ones(len(order), dtype=bool)
+    for i in range(len(order)):
+        if keep[i]:
+            keep[i + 1:] &= iou[i, i + 1:] <= iou_threshold
+    return order[keep]
+
+
+def expand_boxes(boxes, pad_x, pad_top, pad_bottom, width, height):
+    """Grow boxes by fractions of their size and clip them to the frame."""
+    boxes = np.asarray(boxes, dtype=np.float32)
+    w = boxes[:, 2] - boxes[:, 0]
+    h = boxes[:, 3] - boxes[:, 1]
+    out = np.stack([
+        boxes[:, 0] - w * pad_x,
+        boxes[:, 1] - h * pad_top,
+        boxes[:, 2] + w * pad_x,
+        boxes[:, 3] + h * pad_bottom,
+    ], axis=1)
+    out[:, [0, 2]] = np.clip(out[:, [0, 2]], 0, width)
+    out[:, [1, 3]] = np.clip(out[:, [1, 3]], 0, height)
+    return out
+
+
+def tile_boxes(region, tiles, overlap=0.1):
+    """Split ``[x1, y1, x2, y2]`` into about ``tiles`` overlapping tiles (a near-square grid)."""
+    x1, y1, x2, y2 = region
+    cols = int(np.ceil(np.sqrt(tiles)))
+    rows = int(np.ceil(tiles / cols))
+    tile_w = (x2 - x1) / cols
+    tile_h = (y2 - y1) / rows
+    pad_x, pad_y = tile_w * overlap, tile_h * overlap
+    out = [[max(x1, x1 + c * tile_w - pad_x), max(y1, y1 + r * tile_h - pad_y),
+            min(x2, x1 + (c + 1) * tile_w + pad_x), min(y2, y1 + (r + 1) * tile_h + pad_y)]
+           for r in range(rows) for c in range(cols)]
+    return np.asarray(out, dtype=np.float32)
@@ -0,0 +1,168 @@
+"""
+Person-centric detection cascade
+================================
+Stage 1 runs a cheap pass over the whole frame at low resolution
+(``person_imgsz``) to find workers - and keeps the large, easy objects
+(people, cones, machinery, vehicles) it finds. Stage 2 batches padded
+crops around each worker through the PPE model at ``ppe_imgsz``, so
+hardhats/masks/vests are seen at a much higher effective resolution, and
+maps the PPE boxes back to frame coordinates.
+
+When the crops would cost more than a normal full-frame pass (a crowded
+scene), the detector falls back to that full-frame pass. A frame without
+workers keeps the PPE boxes stage 1 found, or - with a separate person
+model, which does not detect PPE - also gets the full-frame pass. ``CascadeDetector``
+is a drop-in replacement for the YOLO model object used by ``SafetyMonitor``.
+"""
+
+import numpy as np
+
+from src.detection.boxes import expand_boxes, nms
+from src.detection.ppe import category_lookup, result_arrays
+
+PPE_CATEGORIES = ('hardhat', 'mask', 'safety_vest', 'no_hardhat', 'no_mask', 'no_vest')
+
+
+def predict_regions(model, frame, regions, imgsz, conf, keep_classes=None, **kwargs):
+    """Run ``model`` on a batch of frame regions and map boxes back to the frame.
+
+    Returns ``(xyxy, conf, cls)`` arrays in frame coordinates. ``keep_classes``
+    optionally restricts the classes that are returned.
+    """
+    regions = np.asarray(regions, dtype=np.float32).reshape(-1, 4)
+    if len(regions) == 0:
+        return (np.zeros((0, 4), np.float32), np.zeros(0, np.float32), np.zeros(0, np.int64))
+
+    corners = np.round(regions).astype(np.int64)
+    crops = [frame[y1:y2, x1:x2] for x1, y1, x2, y2 in corners]
+    if imgsz is not None:
+        kwargs['imgsz'] = imgsz
+    results = model(crops if len(crops) > 1 else crops[0], conf=conf, verbose=False, **kwargs)
+
+    all_xyxy, all_conf, all_cls = [], [], []
+    for (x1, y1, _, _), result in zip(corners, results):
+        xyxy, scores, cls = result_arrays(result)
+        if keep_classes is not None:
+            mask = np.isin(cls, keep_classes)
+            xyxy, scores, cls = xyxy[mask], scores[mask], cls[mask]
+        all_xyxy.append(xyxy + np.array([x1, y1, x1, y1], dtype=np.float32))
+        all_conf.append(scores)
+        all_cls.append(cls)
+    return np.concatenate(all_xyxy), np.concatenate(all_conf), np.concatenate(all_cls)
+
+
+def make_results(frame, names, xyxy, conf, cls):
+    """Wrap detection arrays in an ultralytics ``Results`` (plots like a normal pass)."""
+    import torch
+    from ultralytics.engine.results import Results
+
+    data = np.concatenate([xyxy, conf[:, None], cls[:, None].astype(np.float32)], axis=1)
+    return Results(orig_img=frame, path='', names=names,
+                   boxes=torch.from_numpy(data.astype(np.float32)))
+
+
+class CascadeDetector:
+    """Two-stage person -> PPE detector with the same call signature as ``YOLO``."""
+
+    def __init__(self, model, person_model=None, person_imgsz=320, ppe_imgsz=256,
+                 full_imgsz=640, person_conf=0.3, crop_padding=0.15, head_padding=0.25,
+                 max_crops=8, merge_iou=0.5):
+        self.model = model
+        self.person_model = person_model
+        self.names = dict(model.names)
+        self.person_imgsz = person_imgsz
+        self.ppe_imgsz = ppe_imgsz
+        self.full_imgsz = full_imgsz
+        self.person_conf = person_conf
+        self.crop_padding = crop_padding
+        self.head_padding = head_padding
+        self.max_crops = max_crops
+        self.merge_iou = merge_iou
+        self.last_mode = None
+
+        lookup = category_lookup(self.names)
+        self.ppe_classes = np.array([i for i, c in enumerate(lookup) if c in PPE_CATEGORIES])
+        self.scene_classes = np.array([i for i, c in enumerate(lookup)
+                                       if c is not None and c not in PPE_CATEGORIES])
+        if person_model is not None:
+            person_lookup = category_lookup(dict(person_model.names))
+            self.person_classes = np.array([i for i, c in enumerate(person_lookup) if c == 'person'])
+        else:
+            self.person_classes = np.array([i for i, c in enumerate(lookup) if c == 'person'])
+        if len(self.person_classes) == 0:
+            raise ValueError("Cascade needs a model with a 'Person' class or a separate person_model")
+
+    @classmethod
+    def from_config(cls, model, config=None):
+        """Build from the ``cascade`` section of config.yaml."""
+        settings = dict((config or {}).get('cascade') or {})
+        person_model = settings.pop('person_model', None)
+        if person_model:
+            from src.inference.model_cache import load_model
+            person_model = load_model(person_model)
+        full_imgsz = ((config or {}).get('model') or {}).get('input_size', 640)
+        return cls(model, person_model=person_model, full_imgsz=full_imgsz,
+                   **{k: v for k, v in settings.items()
+                      if k in ('person_imgsz', 'ppe_imgsz', 'person_conf', 'crop_padding',
+                               'head_padding', 'max_crops', 'merge_iou')})
+
+    def cascade_is_cheaper(self, num_crops):
+        """Compare pixel budgets: low-res pass + crops vs one full-resolution pass."""
+        cascade_cost = self.person_imgsz ** 2 + num_crops * self.ppe_imgsz ** 2
+        return num_crops <= self.max_crops and cascade_cost < self.full_imgsz ** 2
+
+    def __call__(self, source, conf=0.25, verbose=False, **kwargs):
+        frames = source if isinstance(source, (list, tuple)) else [source]
+        return [self._detect(frame, conf, **kwargs) for frame in frames]
+
+    def _detect(self, frame, conf, **kwargs):
+        kwargs.pop('imgsz', None)
+        height, width = frame.shape[:2]
+
+        # Stage 1: cheap low-resolution pass over the whole frame
+        stage1 = (self.person_model or self.model)(
+            frame, imgsz=self.person_imgsz, conf=min(conf, self.person_conf),
+            verbose=False, **kwargs)[0]
+        xyxy, scores, cls = result_arrays(stage1)
+        is_person = np.isin(cls, self.person_classes) & (scores >= self.person_conf)
+        persons = xyxy[is_person]
+
+        # A crowd costs more as crops; with no worker found, a separate person
+        # model has seen no PPE at all (e.g. only a NO-Hardhat head is visible)
+        if (len(persons) and not self.cascade_is_cheaper(len(persons))) or \
+                (not len(persons) and self.person_model is not None):
+            self.last_mode = 'full'
+            return self.model(frame, imgsz=self.full_imgsz, conf=conf, verbose=False, **kwargs)[0]
+
+        # Keep people and large scene objects from stage 1 - and its PPE boxes
+        # when there are no crops to find them in
+        if self.person_model is not None:
+            person_cls = np.full(len(persons), self._own_person_class(), dtype=np.int64)
+            keep_xyxy, keep_conf, keep_cls = [persons], [scores[is_person]], [person_cls]
+        else:
+            stage1_classes = self.scene_classes if len(persons) else \
+                np.concatenate([self.scene_classes, self.ppe_classes])
+            scene = np.isin(cls, stage1_classes) & (scores >= conf)
+            keep_xyxy, keep_conf, keep_cls = [xyxy[scene]], [scores[scene]], [cls[scene]]
+
+        # Stage 2: PPE on padded person crops, batched in one call
+        self.last_mode = 'cascade'
+        if len(persons):
+            regions = expand_boxes(persons, self.crop_padding, self.head_padding,
+                                   self.crop_padding, width, height)
+            regions = regions[((regions[:, 2] - regions[:, 0]) >= 8) &
+                              ((regions[:, 3] - regions[:, 1]) >= 8)]
+            ppe_xyxy, ppe_conf, ppe_cls = predict_regions(
+                self.model, frame, regions, self.ppe_imgsz, conf, self.ppe_classes, **kwargs)
+            # Crops of neighbouring workers overlap - merge duplicate PPE boxes
+            keep = nms(ppe_xyxy, ppe_conf, self.merge_iou, classes=ppe_cls)
+            keep_xyxy.append(ppe_xyxy[keep])
+            keep_conf.append(ppe_conf[keep])
+            keep_cls.append(ppe_cls[keep])
+
+        return make_results(frame, self.names, np.concatenate(keep_xyxy),
+                            np.concatenate(keep_conf), np.concatenate(keep_cls))
+
+    def _own_person_class(self):
+        lookup = category_lookup(self.names)
+        return next(i for i, c in enumerate(lookup) if c == 'person')
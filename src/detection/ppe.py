@@ -0,0 +1,128 @@
+"""
+PPE class normalization and per-frame tallying
+
+Maps the model's class names (``Hardhat``, ``NO-Hardhat``, ``Safety Vest``,
+...) onto the monitor's detection categories, and turns raw detections
+into the per-frame counts / violation list used by the monitor, the HTTP
+inference server and the evaluation tools.
+"""
+
+import numpy as np
+
+from src.detection.association import (associate, association_tables,
+                                       worker_records, worker_violations)
+
+CATEGORIES = (
+    'hardhat', 'mask', 'safety_vest', 'no_hardhat', 'no_mask', 'no_vest',
+    'person', 'safety_cone', 'machinery', 'vehicle',
+)
+VIOLATION_CATEGORIES = ('no_hardhat', 'no_mask', 'no_vest')
+
+
+def label_category(label):
+    """Normalize a model class name to a detection category (None if unknown)."""
+    label = label.lower()
+    # config/data.yaml names (helmet, no_helmet, vest) as well as the deployed model's
+    hardhat = 'hardhat' in label or 'helmet' in label
+    if hardhat and 'no' not in label:
+        return 'hardhat'
+    elif 'mask' in label and 'no' not in label:
+        return 'mask'
+    elif 'vest' in label and 'no' not in label:
+        return 'safety_vest'
+    elif 'no' in label and hardhat:
+        return 'no_hardhat'
+    elif 'no' in label and 'mask' in label:
+        return 'no_mask'
+    elif 'no' in label and 'vest' in label:
+        return 'no_vest'
+    elif 'person' in label:
+        return 'person'
+    elif 'safety cone' in label or 'cone' in label:
+        return 'safety_cone'
+    elif 'machinery' in label:
+        return 'machinery'
+    elif 'vehicle' in label:
+        return 'vehicle'
+    return None
+
+
+def category_lookup(names):
+    """Class id -> category list for a model's ``names`` dict."""
+    size = max(names) + 1 if names else 0
+    return [label_category(names[i]) if i in names else None for i in range(size)]
+
+
+def to_numpy(values):
+    """Convert a torch tensor or array-like to a NumPy array."""
+    if hasattr(values, 'cpu'):
+        values = values.cpu()
+    if hasattr(values, 'numpy'):
+        return values.numpy()
+    return np.asarray(values)
+
+
+def result_arrays(result):
+    """``(xyxy, conf, cls)`` NumPy arrays for one ultralytics ``Results``."""
+    boxes = result.boxes
+    if boxes is None or len(boxes) == 0:
+        return (np.zeros((0, 4), dtype=np.float32), np.zeros(0, dtype=np.float32),
+                np.zeros(0, dtype=np.int64))
+    return (to_numpy(boxes.xyxy).astype(np.float32, copy=False),
+            to_numpy(boxes.conf).astype(np.float32, copy=False),
+            to_numpy(boxes.cls).astype(np.int64))
+
+
+_VIOLATION_INDEX = np.array([CATEGORIES.index(c) for c in VIOLATION_CATEGORIES])
+_INDEX_CACHE = {}
+
+
+def _category_index(lookup):
+    """Class id -> position in ``CATEGORIES`` (-1 when unknown), cached per lookup."""
+    key = tuple(lookup)
+    index = _INDEX_CACHE.get(key)
+    if index is None:
+        index = np.array([CATEGORIES.index(c) if c in CATEGORIES else -1 for c in lookup],
+                         dtype=np.int64)
+        _INDEX_CACHE[key] = index
+    return index
+
+
+def tally(cls_ids, confs, lookup):
+    """Per-category counts and violation list for one frame's detections."""
+    cls_ids = np.asarray(cls_ids, dtype=np.int64)
+    index = _category_index(lookup)
+    valid = (cls_ids >= 0) & (cls_ids < len(index))
+    cats = np.full(len(cls_ids), -1, dtype=np.int64)
+    cats[valid] = index[cls_ids[valid]]
+
+    counts = np.bincount(cats[cats >= 0], minlength=len(CATEGORIES))
+    detections = dict(zip(CATEGORIES, counts.tolist()))
+    violations = [{'type': CATEGORIES[cats[i]], 'confidence': float(confs[i])}
+                  for i in np.flatnonzero(np.isin(cats, _VIOLATION_INDEX))]
+    return detections, violations
+
+
+def summarize_result(result, names, lookup=None):
+    """JSON-friendly detections, counts, per-worker PPE status and compliance."""
+    lookup = lookup if lookup is not None else category_lookup(names)
+    xyxy, conf, cls = result_arrays(result)
+    counts, _ = tally(cls, conf, lookup)
+    association = associate(xyxy, conf, cls, association_tables(lookup))
+    violations = worker_violations(association, xyxy, conf, cls, lookup)
+    items = [
+        {
+            'class': names.get(int(c), str(int(c))),
+            'category': lookup[int(c)] if int(c) < len(lookup) else None,
+            'confidence': round(float(p), 4),
+            'box': [round(float(v), 1) for v in box],
+        }
+        for box, p, c in zip(xyxy, conf, cls)
+    ]
+    return {
+        'detections': items,
+        'counts': counts,
+        'workers': worker_records(association),
+        'violations': violations,
+        'compliant': not violations,
+    }
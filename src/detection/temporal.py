@@ -0,0 +1,114 @@
+"""
+Temporal violation state machine
+================================
+Single-frame detections flicker, so a raw "NO-Hardhat" box is only
+evidence. ``TemporalFilter`` keeps a tiny hysteresis state per violation key
+- ``(track_id, type)`` for tracked workers, ``(None, type)`` per camera
+otherwise - and:
+
+- raises a violation after ``raise_frames`` consecutive frames of evidence
+  at or above ``min_confidence`` (``safety.consecutive_frames`` /
+  ``safety.confidence_threshold`` in config.yaml)
+- clears it after ``clear_frames`` consecutive frames without evidence
+
+Each frame costs O(1) per live key; keys whose track is lost are dropped
+and the number of keys is capped, so state stays bounded.
+
+Untracked violations (tracking off, unconfirmed tracks, negatives with no
+worker) are not told apart: all of one type on a camera are one episode,
+which stays raised while any of them shows it. Only tracking gives
+per-worker episodes.
+"""
+
+from src.detection.association import NEGATIVE_ITEMS
+
+_HITS, _MISSES, _ACTIVE, _LAST = range(4)
+
+
+class TemporalFilter:
+    """Debounces per-frame violations into raised/cleared violation events."""
+
+    def __init__(self, raise_frames=5, clear_frames=None, min_confidence=0.6, max_keys=1024):
+        self.raise_frames = max(1, int(raise_frames))
+        self.clear_frames = max(1, int(clear_frames if clear_frames is not None else raise_frames))
+        self.min_confidence = min_confidence
+        self.max_keys = max_keys
+        self.events = dict.fromkeys(NEGATIVE_ITEMS, 0)   # raised events per violation type
+        self.raised = []                                 # keys raised by the last update
+        self.cleared = []                                # keys cleared by the last update
+        self._state = {}                                 # key -> [hits, misses, active, last]
+
+    @classmethod
+    def from_config(cls, config=None):
+        """Build from the ``safety`` section of config.yaml."""
+        safety = (config or {}).get('safety') or {}
+        return cls(raise_frames=safety.get('consecutive_frames', 5),
+                   clear_frames=safety.get('clear_frames'),
+                   min_confidence=safety.get('confidence_threshold', 0.6))
+
+    @staticmethod
+    def key(violation):
+        return violation.get('track_id'), violation['type']
+
+    def __len__(self):
+        return len(self._state)
+
+    def last(self, key):
+        """Most recent violation dict seen for ``key`` (None if it has no state)."""
+        state = self._state.get(key)
+        return state[_LAST] if state is not None else None
+
+    @property
+    def active(self):
+        """Violation dicts (as last seen) of all currently raised violations."""
+        return [state[_LAST] for state in self._state.values() if state[_ACTIVE]]
+
+    def update(self, violations, removed_tracks=()):
+        """Feed one frame's raw violations; returns the currently active ones."""
+        self.raised, self.cleared = [], []
+        for track_id in removed_tracks:
+            for violation_type in NEGATIVE_ITEMS:
+                self._drop((int(track_id), violation_type))
+
+        seen = set()
+        for violation in violations:
+            if violation['confidence'] < self.min_confidence:
+                continue
+            key = self.key(violation)
+            if key in seen:
+                continue                 # e.g. two untracked workers: one camera-level key
+            seen.add(key)
+            state = self._state.get(key)
+            if state is None:
+                if len(self._state) >= self.max_keys:
+                    self._evict()
+                state = self._state[key] = [0, 0, False, violation]
+            state[_HITS] += 1
+            state[_MISSES] = 0
+            state[_LAST] = violation
+            if not state[_ACTIVE] and state[_HITS] >= self.raise_frames:
+                state[_ACTIVE] = True
+                self.events[key[1]] += 1
+                self.raised.append(key)
+
+        for key in [k for k in self._state if k not in seen]:
+            state = self._state[key]
+            state[_HITS] = 0
+            state[_MISSES] += 1
+            if not state[_ACTIVE]:
+                del self._state[key]     # evidence streak broken before it was raised
+            elif state[_MISSES] >= self.clear_frames:
+                self.cleared.append(key)
+                del self._state[key]
+
+        return self.active
+
+    def _drop(self, key):
+        state = self._state.pop(key, None)
+        if state is not None and state[_ACTIVE]:
+            self.cleared.append(key)
+
+    def _evict(self):
+        # Prefer dropping pending keys, then the longest-silent active one
+        victim = min(self._state, key=lambda k: (self._state[k][_ACTIVE], -self._state[k][_MISSES]))
+        self._drop(victim)
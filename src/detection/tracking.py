@@ -0,0 +1,220 @@
+"""
+Lightweight multi-object tracking for workers
+=============================================
+A ByteTrack-style tracker: constant-velocity Kalman prediction of
+``[cx, cy, aspect, height]`` boxes, greedy IoU association of confident
+detections first and low-confidence ones second (so partly occluded workers
+keep their ID), and persistent integer IDs.
+
+All track state lives in fixed-width NumPy arrays (one row per track) that
+are predicted/updated in batch, and the number of tracks is capped, so
+memory stays flat on 24/7 streams. Track IDs key the per-worker violation
+state in ``src.detection.temporal``.
+"""
+
+import numpy as np
+
+from src.detection.boxes import box_iou
+
+_STD_POSITION = 1.0 / 20
+_STD_VELOCITY = 1.0 / 160
+
+_F = np.eye(8, dtype=np.float64)
+_F[:4, 4:] = np.eye(4)
+_H = np.eye(4, 8, dtype=np.float64)
+
+
+def xyxy_to_xyah(boxes):
+    """``[x1, y1, x2, y2]`` -> ``[cx, cy, w/h, h]``."""
+    boxes = np.asarray(boxes, dtype=np.float64)
+    w = boxes[:, 2] - boxes[:, 0]
+    h = np.maximum(boxes[:, 3] - boxes[:, 1], 1e-6)
+    return np.stack([boxes[:, 0] + w / 2, boxes[:, 1] + h / 2, w / h, h], axis=1)
+
+
+def xyah_to_xyxy(xyah):
+    """``[cx, cy, w/h, h]`` -> ``[x1, y1, x2, y2]``."""
+    w = xyah[:, 2] * xyah[:, 3]
+    h = xyah[:, 3]
+    return np.stack([xyah[:, 0] - w / 2, xyah[:, 1] - h / 2,
+                     xyah[:, 0] + w / 2, xyah[:, 1] + h / 2], axis=1)
+
+
+def greedy_match(iou, threshold):
+    """Match rows to columns by descending IoU; returns ``(rows, cols)`` arrays."""
+    if iou.size == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    rows, cols = np.nonzero(iou >= threshold)
+    order = np.argsort(-iou[rows, cols], kind='stable')
+    used_rows, used_cols = set(), set()
+    matched_rows, matched_cols = [], []
+    for r, c in zip(rows[order], cols[order]):
+        if r not in used_rows and c not in used_cols:
+            used_rows.add(r)
+            used_cols.add(c)
+            matched_rows.append(r)
+            matched_cols.append(c)
+    return np.array(matched_rows, dtype=np.int64), np.array(matched_cols, dtype=np.int64)
+
+
+class Tracker:
+    """ByteTrack-style person tracker with batched Kalman filtering."""
+
+    def __init__(self, high_thresh=0.5, low_thresh=0.1, match_iou=0.3, low_match_iou=0.5,
+                 max_age=30, min_hits=3, max_tracks=256):
+        self.high_thresh = high_thresh
+        self.low_thresh = low_thresh
+        self.match_iou = match_iou
+        self.low_match_iou = low_match_iou
+        self.max_age = max_age
+        self.min_hits = min_hits
+        self.max_tracks = max_tracks
+
+        self.next_id = 1
+        self.frame_count = 0
+        self.total_confirmed = 0          # unique workers seen so far
+        self.removed_ids = np.zeros(0, dtype=np.int64)
+        self._mean = np.zeros((0, 8))
+        self._cov = np.zeros((0, 8, 8))
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._hits = np.zeros(0, dtype=np.int64)
+        self._misses = np.zeros(0, dtype=np.int64)
+        self._confirmed = np.zeros(0, dtype=bool)
+
+    @classmethod
+    def from_config(cls, config=None):
+        """Build from the ``tracking`` section of config.yaml."""
+        settings = (config or {}).get('tracking') or {}
+        return cls(**{k: v for k, v in settings.items()
+                      if k in ('high_thresh', 'low_thresh', 'match_iou', 'low_match_iou',
+                               'max_age', 'min_hits', 'max_tracks')})
+
+    def __len__(self):
+        return len(self._ids)
+
+    @property
+    def boxes(self):
+        """Current ``xyxy`` estimates of all live tracks."""
+        return xyah_to_xyxy(self._mean[:, :4])
+
+    def update(self, boxes, scores):
+        """Advance one frame with this frame's person detections.
+
+        Returns ``(ids, confirmed)`` aligned with ``boxes``: the track ID of
+        each detection (-1 when it was not tracked, e.g. an unmatched
+        low-confidence box) and whether that track is confirmed.
+        """
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        scores = np.asarray(scores, dtype=np.float64).reshape(-1)
+        ids = np.full(len(boxes), -1, dtype=np.int64)
+        self.frame_count += 1
+
+        self._predict()
+        track_boxes = self.boxes
+        unmatched_tracks = np.ones(len(self), dtype=bool)
+
+        # 1) confident detections against every track
+        high = np.flatnonzero(scores >= self.high_thresh)
+        rows, cols = greedy_match(box_iou(track_boxes, boxes[high]), self.match_iou)
+        self._update_tracks(rows, boxes[high[cols]])
+        ids[high[cols]] = self._ids[rows]
+        unmatched_tracks[rows] = False
+        new_dets = np.setdiff1d(high, high[cols])
+
+        # 2) weak detections keep confirmed tracks alive through occlusion
+        low = np.flatnonzero((scores >= self.low_thresh) & (scores < self.high_thresh))
+        candidates = np.flatnonzero(unmatched_tracks & self._confirmed)
+        rows, cols = greedy_match(box_iou(track_boxes[candidates], boxes[low]), self.low_match_iou)
+        self._update_tracks(candidates[rows], boxes[low[cols]])
+        ids[low[cols]] = self._ids[candidates[rows]]
+        unmatched_tracks[candidates[rows]] = False
+
+        # 3) age out lost tracks (tentative ones die on their first miss)
+        self._misses[unmatched_tracks] += 1
+        dead = unmatched_tracks & ((self._misses > self.max_age) | ~self._confirmed)
+        self.removed_ids = self._ids[dead]
+        self._keep(~dead)
+
+        # 4) unmatched confident detections start new tracks
+        if len(new_dets):
+            ids[new_dets] = self._start_tracks(boxes[new_dets])
+
+        # 5) bound memory: drop the longest-lost tracks beyond the cap
+        if len(self) > self.max_tracks:
+            order = np.lexsort((-self._hits, self._misses))[:self.max_tracks]
+            keep = np.zeros(len(self), dtype=bool)
+            keep[order] = True
+            self.removed_ids = np.concatenate([self.removed_ids, self._ids[~keep]])
+            ids[np.isin(ids, self._ids[~keep])] = -1
+            self._keep(keep)
+
+        position = {track_id: i for i, track_id in enumerate(self._ids)}
+        confirmed = np.array([i >= 0 and self._confirmed[position[i]] for i in ids], dtype=bool)
+        return ids, confirmed
+
+    def _predict(self):
+        if not len(self):
+            return
+        h = self._mean[:, 3]
+        std = np.stack([_STD_POSITION * h, _STD_POSITION * h, np.full_like(h, 1e-2),
+                        _STD_POSITION * h, _STD_VELOCITY * h, _STD_VELOCITY * h,
+                        np.full_like(h, 1e-5), _STD_VELOCITY * h], axis=1)
+        self._mean = self._mean @ _F.T
+        self._cov = _F @ self._cov @ _F.T + _diag(std ** 2)
+
+    def _update_tracks(self, rows, boxes):
+        if not len(rows):
+            return
+        z = xyxy_to_xyah(boxes)
+        mean, cov = self._mean[rows], self._cov[rows]
+        h = mean[:, 3]
+        std = np.stack([_STD_POSITION * h, _STD_POSITION * h, np.full_like(h, 1e-1),
+                        _STD_POSITION * h], axis=1)
+        projected_cov = _H @ cov @ _H.T + _diag(std ** 2)
+        gain = np.linalg.solve(projected_cov, (cov @ _H.T).transpose(0, 2, 1)).transpose(0, 2, 1)
+        innovation = z - mean @ _H.T
+        self._mean[rows] = mean + np.einsum('nij,nj->ni', gain, innovation)
+        self._cov[rows] = cov - gain @ projected_cov @ gain.transpose(0, 2, 1)
+
+        self._hits[rows] += 1
+        self._misses[rows] = 0
+        newly = ~self._confirmed[rows] & (self._hits[rows] >= self.min_hits)
+        self.total_confirmed += int(newly.sum())
+        self._confirmed[rows] |= newly
+
+    def _start_tracks(self, boxes):
+        z = xyxy_to_xyah(boxes)
+        h = z[:, 3]
+        std = np.stack([2 * _STD_POSITION * h, 2 * _STD_POSITION * h, np.full_like(h, 1e-2),
+                        2 * _STD_POSITION * h, 10 * _STD_VELOCITY * h, 10 * _STD_VELOCITY * h,
+                        np.full_like(h, 1e-5), 10 * _STD_VELOCITY * h], axis=1)
+        new_ids = np.arange(self.next_id, self.next_id + len(boxes), dtype=np.int64)
+        self.next_id += len(boxes)
+
+        # Tracks from the very first frame confirm immediately - there is no history to wait for
+        confirm = self.min_hits <= 1 or self.frame_count == 1
+        self._mean = np.concatenate([self._mean, np.hstack([z, np.zeros_like(z)])])
+        self._cov = np.concatenate([self._cov, _diag(std ** 2)])
+        self._ids = np.concatenate([self._ids, new_ids])
+        self._hits = np.concatenate([self._hits, np.ones(len(boxes), dtype=np.int64)])
+        self._misses = np.concatenate([self._misses, np.zeros(len(boxes), dtype=np.int64)])
+        self._confirmed = np.concatenate([self._confirmed, np.full(len(boxes), confirm)])
+        if confirm:
+            self.total_confirmed += len(boxes)
+        return new_ids
+
+    def _keep(self, mask):
+        self._mean = self._mean[mask]
+        self._cov = self._cov[mask]
+        self._ids = self._ids[mask]
+        self._hits = self._hits[mask]
+        self._misses = self._misses[mask]
+        self._confirmed = self._confirmed[mask]
+
+
+def _diag(values):
+    """Batch of diagonal matrices from an (N, D) array."""
+    out = np.zeros(values.shape + values.shape[-1:])
+    idx = np.arange(values.shape[-1])
+    out[:, idx, idx] = values
+    return out
@@ -0,0 +1,182 @@
+"""
+Polygon zone rules
+==================
+Per-camera polygons (normalized ``[x, y]`` points in 0-1) from the ``zones``
+section of config.yaml:
+
+- ``type: monitor`` zones enforce their ``require`` list of PPE items
+  (e.g. hardhats only inside the crane zone), or ``default_require``
+- ``type: exclude`` zones are ignored entirely (e.g. an office window)
+- ``outside: ignore`` ignores everything that is in no zone at all
+
+The polygons are rasterized once per frame size into a low-resolution label
+mask (``mask_scale`` of the frame), so a detection's zone is a single array
+lookup at its anchor point (bottom-centre of the box - a worker's feet).
+PPE boxes worn by a worker are placed by that worker's anchor.
+When part of the frame can never matter, ``crop_rect`` gives the bounding
+box of the monitored area so inference can skip the rest.
+"""
+
+import numpy as np
+
+from src.detection.association import NEGATIVE_ITEMS, PPE_ITEMS
+
+ZONE_TYPES = ('monitor', 'exclude')
+OUTSIDE_MODES = ('monitor', 'ignore')
+
+
+def zone_settings(config=None, camera='default'):
+    """The ``zones`` section with the zone list for ``camera`` (None if disabled)."""
+    settings = (config or {}).get('zones') or {}
+    if not settings.get('enabled'):
+        return None
+    cameras = settings.get('cameras') or {}
+    zones = cameras.get(camera, cameras.get('default')) or []
+    if not zones and settings.get('outside', 'monitor') == 'monitor':
+        return None
+    return {**settings, 'zones': zones}
+
+
+def validate_zones(settings):
+    """Human readable problems with a ``zones`` config section."""
+    errors = []
+    if settings.get('outside', 'monitor') not in OUTSIDE_MODES:
+        errors.append(f"zones.outside must be one of {list(OUTSIDE_MODES)}")
+    for camera, zones in (settings.get('cameras') or {}).items():
+        for i, zone in enumerate(zones or []):
+            where = f"zones.cameras.{camera}[{i}]"
+            if not isinstance(zone, dict):
+                errors.append(f"{where} must be a mapping")
+                continue
+            polygon = zone.get('polygon') or []
+            if len(polygon) < 3 or not all(isinstance(p, (list, tuple)) and len(p) == 2
+                                           for p in polygon):
+                errors.append(f"{where}.polygon needs at least 3 [x, y] points")
+            elif not all(0 <= v <= 1 for p in polygon for v in p):
+                errors.append(f"{where}.polygon points must be normalized to [0, 1]")
+            if zone.get('type', 'monitor') not in ZONE_TYPES:
+                errors.append(f"{where}.type must be one of {list(ZONE_TYPES)}")
+            unknown = [r for r in zone.get('require') or [] if r not in PPE_ITEMS]
+            if unknown:
+                errors.append(f"{where}.require has unknown items: {unknown}")
+    return errors
+
+
+class ZoneMap:
+    """Zone label mask for one frame size plus the per-zone rules."""
+
+    def __init__(self, zones, width, height, mask_scale=0.25, outside='monitor',
+                 default_require=PPE_ITEMS):
+        import cv2
+
+        self.width, self.height = width, height
+        self.scale = mask_scale
+        self.names = [z.get('name', f'zone{i}') for i, z in enumerate(zones)]
+        mask_w = max(1, int(round(width * mask_scale)))
+        mask_h = max(1, int(round(height * mask_scale)))
+
+        # Label 0 = outside every zone; later zones win where polygons overlap
+        self.mask = np.zeros((mask_h, mask_w), dtype=np.uint8)
+        self.polygons = []
+        for label, zone in enumerate(zones, start=1):
+            points = np.asarray(zone['polygon'], dtype=np.float32) * [width, height]
+            self.polygons.append(points.round().astype(np.int32))
+            cv2.fillPoly(self.mask, [(points * mask_scale).round().astype(np.int32)], label)
+
+        # Per label: is it monitored, and which violation types count there
+        default_violations = {NEGATIVE_ITEMS[PPE_ITEMS.index(i)] for i in default_require}
+        self.monitored = np.array([outside == 'monitor'] +
+                                  [z.get('type', 'monitor') == 'monitor' for z in zones])
+        self.enforced = [default_violations] + [
+            {NEGATIVE_ITEMS[PPE_ITEMS.index(i)] for i in z['require']} if 'require' in z
+            else default_violations
+            for z in zones]
+        self.crop_rect = self._monitored_rect()
+
+    def labels_at(self, xyxy):
+        """Zone label (0 = none) of each box's anchor point - one array lookup."""
+        xyxy = np.asarray(xyxy, dtype=np.float32).reshape(-1, 4)
+        x = ((xyxy[:, 0] + xyxy[:, 2]) * 0.5 * self.scale).astype(np.int64)
+        y = (xyxy[:, 3] * self.scale).astype(np.int64)
+        np.clip(x, 0, self.mask.shape[1] - 1, out=x)
+        np.clip(y, 0, self.mask.shape[0] - 1, out=y)
+        return self.mask[y, x]
+
+    def keep_detections(self, xyxy, association=None):
+        """Boolean mask of detections that are not in an ignored area.
+
+        With the frame's ``association`` (see ``src.detection.association``),
+        a PPE box assigned to a worker follows that worker's zone instead of
+        its own anchor - a hardhat's bottom edge is at head height, not at
+        the worker's feet. Persons and unassigned boxes use their own anchor.
+        """
+        labels = self.labels_at(xyxy)
+        if association is not None:
+            owner = association['owner']
+            assigned = owner >= 0
+            if assigned.any():
+                worker_labels = self.labels_at(association['person_boxes'])
+                labels[association['ppe_index'][assigned]] = worker_labels[owner[assigned]]
+        return self.monitored[labels]
+
+    def filter_violations(self, violations):
+        """Drop violations in ignored areas or of items the zone does not require."""
+        if not violations:
+            return violations
+        labels = self.labels_at([v['box'] for v in violations])
+        return [v for v, label in zip(violations, labels)
+                if self.monitored[label] and v['type'] in self.enforced[label]]
+
+    def zone_name(self, label):
+        return self.names[label - 1] if label else None
+
+    def _monitored_rect(self):
+        """Pixel bounding box of the monitored area, or None if it is the whole frame."""
+        monitored = self.monitored[self.mask]
+        if monitored.all():
+            return None
+        ys, xs = np.nonzero(monitored)
+        if not len(xs):
+            return (0, 0, 0, 0)
+        inv = 1.0 / self.scale
+        # Pad by one mask cell so boxes straddling the edge are not clipped
+        x1 = max(0, int((xs.min() - 1) * inv))
+        y1 = max(0, int((ys.min() - 1) * inv))
+        x2 = min(self.width, int((xs.max() + 2) * inv))
+        y2 = min(self.height, int((ys.max() + 2) * inv))
+        if (x2 - x1) * (y2 - y1) >= 0.95 * self.width * self.height:
+            return None
+        return (x1, y1, x2, y2)
+
+
+class Zones:
+    """Per-camera zone rules; builds (and caches) a ``ZoneMap`` per frame size."""
+
+    def __init__(self, zones, mask_scale=0.25, outside='monitor', default_require=PPE_ITEMS,
+                 crop_to_zones=True):
+        self.zones = list(zones)
+        self.mask_scale = mask_scale
+        self.outside = outside
+        self.default_require = tuple(default_require)
+        self.crop_to_zones = crop_to_zones
+        self._maps = {}
+
+    @classmethod
+    def from_config(cls, config=None, camera='default'):
+        """Zones for ``camera`` from config.yaml, or None when zones are disabled."""
+        settings = zone_settings(config, camera)
+        if settings is None:
+            return None
+        return cls(settings['zones'], mask_scale=settings.get('mask_scale', 0.25),
+                   outside=settings.get('outside', 'monitor'),
+                   default_require=settings.get('default_require') or PPE_ITEMS,
+                   crop_to_zones=settings.get('crop_to_zones', True))
+
+    def for_frame(self, frame):
+        height, width = frame.shape[:2]
+        zone_map = self._maps.get((width, height))
+        if zone_map is None:
+            zone_map = ZoneMap(self.zones, width, height, self.mask_scale, self.outside,
+                               self.default_require)
+            self._maps = {(width, height): zone_map}    # one camera, one size at a time
+        return zone_map
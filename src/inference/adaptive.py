@@ -0,0 +1,156 @@
+"""
+Adaptive quality controller
+===========================
+Holds ``edge.target_fps`` on whatever box the monitor runs on. Quality
+settings form a ladder from best to cheapest:
+
+    tiled inference (``max_tiles`` > 1)  ->  full frame at each of
+    ``input_sizes`` (largest first)  ->  skipping frames up to ``max_frame_skip``
+
+Every ``window_frames`` input frames the controller compares the measured
+per-frame busy time with the frame budget ``1 / target``. When processing
+alone runs below ``target * (1 - tolerance)`` it steps one rung down; time
+spent waiting for the source (a camera delivering fewer frames than the
+target) is not the monitor's to fix and never lowers quality. It steps back
+up only when the measured per-frame busy time, scaled by the predicted cost
+of the next rung (pixels x tiles / skip), still fits in ``headroom`` of the
+frame budget; a step up that had to be undone doubles the wait before the
+next attempt, so it does not oscillate. Each change is returned to the
+caller, which logs it.
+"""
+
+import time
+from collections import deque
+
+DEFAULT_ADAPTIVE_CONFIG = {
+    'input_sizes': [640, 512, 416, 320],
+    'max_tiles': 1,
+    'max_frame_skip': 3,
+    'window_frames': 30,
+    'tolerance': 0.1,        # allowed shortfall below target before stepping down
+    'headroom': 0.8,         # fraction of the frame budget a step up may use
+}
+
+
+def build_ladder(input_sizes, max_tiles=1, max_frame_skip=1, min_frame_skip=1):
+    """Quality levels ``(imgsz, tiles, skip)`` from best to cheapest."""
+    sizes = sorted(set(int(s) for s in input_sizes), reverse=True)
+    ladder = [(sizes[0], tiles, min_frame_skip) for tiles in range(max_tiles, 1, -1)]
+    ladder += [(size, 1, min_frame_skip) for size in sizes]
+    ladder += [(sizes[-1], 1, skip) for skip in range(min_frame_skip + 1, max_frame_skip + 1)]
+    return ladder
+
+
+def level_cost(level):
+    """Relative inference cost per input frame of a ladder level."""
+    imgsz, tiles, skip = level
+    return imgsz * imgsz * tiles / skip
+
+
+class AdaptiveController:
+    """Feedback loop adjusting resolution, tiles and frame skip to hold a target FPS."""
+
+    def __init__(self, target_fps, input_sizes=(640, 512, 416, 320), max_tiles=1,
+                 max_frame_skip=3, start_size=None, min_frame_skip=1, window_frames=30,
+                 tolerance=0.1, headroom=0.8):
+        self.target_fps = float(target_fps)
+        self.budget_s = 1.0 / self.target_fps
+        self.ladder = build_ladder(input_sizes, max_tiles, max(max_frame_skip, min_frame_skip),
+                                   min_frame_skip)
+        start_size = start_size or max(input_sizes)
+        self.level = next((i for i, (size, tiles, _) in enumerate(self.ladder)
+                           if tiles == 1 and size <= start_size), 0)
+        self.window_frames = window_frames
+        self.tolerance = tolerance
+        self.headroom = headroom
+        self.changes = deque(maxlen=100)
+
+        self._frame_index = 0
+        self._busy = 0.0
+        self._count = 0
+        self._window_start = None
+        self._cooldown = 1           # windows to wait before the next step up
+        self._wait = 0
+        self._last_step_up = False
+
+    @classmethod
+    def from_config(cls, config=None):
+        config = config or {}
+        settings = dict(DEFAULT_ADAPTIVE_CONFIG)
+        settings.update(config.get('adaptive') or {})
+        return cls(target_fps=(config.get('edge') or {}).get('target_fps', 15),
+                   start_size=(config.get('model') or {}).get('input_size'),
+                   min_frame_skip=(config.get('video') or {}).get('frame_skip', 1),
+                   **{k: settings[k] for k in DEFAULT_ADAPTIVE_CONFIG})
+
+    @property
+    def imgsz(self):
+        return self.ladder[self.level][0]
+
+    @property
+    def tiles(self):
+        return self.ladder[self.level][1]
+
+    @property
+    def frame_skip(self):
+        return self.ladder[self.level][2]
+
+    def should_process(self):
+        """True for the input frames that should run inference at the current skip."""
+        process = self._frame_index % self.frame_skip == 0
+        self._frame_index += 1
+        return process
+
+    def record(self, busy_s, now=None):
+        """Account one input frame that kept the loop busy for ``busy_s``.
+
+        Returns a description of the change when the level moved, else None.
+        """
+        now = time.perf_counter() if now is None else now
+        if self._window_start is None:
+            self._window_start = now - busy_s
+        self._busy += busy_s
+        self._count += 1
+        if self._count < self.window_frames:
+            return None
+
+        fps = self._count / max(now - self._window_start, 1e-9)
+        busy_per_frame = self._busy / self._count
+        self._busy, self._count, self._window_start = 0.0, 0, now
+        return self._adjust(fps, busy_per_frame)
+
+    def _adjust(self, fps, busy_per_frame):
+        if busy_per_frame * self.target_fps * (1 - self.tolerance) > 1:
+            if self._last_step_up:
+                self._cooldown = min(self._cooldown * 2, 64)   # that step up did not fit
+            self._last_step_up = False
+            if self.level < len(self.ladder) - 1:
+                return self._move(self.level + 1, fps)
+            return None
+
+        self._last_step_up = False
+        if self.level == 0:
+            return None
+        self._wait += 1
+        if self._wait < self._cooldown:
+            return None
+        predicted = busy_per_frame * level_cost(self.ladder[self.level - 1]) / \
+            level_cost(self.ladder[self.level])
+        if predicted <= self.budget_s * self.headroom:
+            self._last_step_up = True
+            return self._move(self.level - 1, fps)
+        return None
+
+    def _move(self, level, fps):
+        old = self.ladder[self.level]
+        self.level = level
+        self._wait = 0
+        imgsz, tiles, skip = self.ladder[level]
+        change = (f"{fps:.1f} FPS vs target {self.target_fps:g}: "
+                  f"imgsz {old[0]}->{imgsz}, tiles {old[1]}->{tiles}, skip {old[2]}->{skip}")
+        self.changes.append(change)
+        return change
+
+    def snapshot(self):
+        return {'imgsz': self.imgsz, 'tiles': self.tiles, 'frame_skip': self.frame_skip,
+                'level': self.level, 'levels': len(self.ladder)}
@@ -0,0 +1,85 @@
+"""
+Pre-fused model cache for fast startup
+======================================
+``YOLO(weights.pt)`` unpickles a half-precision checkpoint, converts it to
+FP32 and fuses Conv+BN layers on first use - on every launch. This module
+does that work once and stores the resulting FP32, already-fused module in
+a cache file keyed by the SHA-256 of the weights (plus the ultralytics and
+torch versions it was built with), so later launches load it directly.
+"""
+
+import hashlib
+import os
+from pathlib import Path
+
+from src.utils.logger import get_logger
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parents[2] / "models" / ".cache"
+
+
+def weights_sha256(path, chunk_size=1 << 20):
+    """SHA-256 hex digest of a weights file."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cached_model_path(model_path, cache_dir=None):
+    """Cache file that corresponds to ``model_path`` for the installed libraries."""
+    import torch
+    import ultralytics
+
+    model_path = Path(model_path)
+    key = hashlib.sha256(
+        f"{weights_sha256(model_path)}|{ultralytics.__version__}|{torch.__version__}".encode()
+    ).hexdigest()[:16]
+    return Path(cache_dir or DEFAULT_CACHE_DIR) / f"{model_path.stem}-{key}.pt"
+
+
+def build_cache(model_path, cache_path):
+    """Load ``model_path``, fuse it and write the FP32 module to ``cache_path``."""
+    import torch
+    from ultralytics import YOLO, __version__
+
+    yolo = YOLO(str(model_path))
+    yolo.fuse()
+    module = yolo.model.float().eval()
+    ckpt = {
+        'model': module,
+        'ema': None,
+        'train_args': (yolo.ckpt or {}).get('train_args', {}),
+        'version': __version__,
+        'source_weights': str(model_path),
+    }
+
+    cache_path = Path(cache_path)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_name(f".{cache_path.name}.{os.getpid()}.tmp")
+    torch.save(ckpt, tmp_path)
+    os.replace(tmp_path, cache_path)  # atomic: concurrent starters never see partial files
+    return yolo
+
+
+def load_model(model_path, cache_dir=None, use_cache=True):
+    """Load a YOLO model, going through the pre-fused cache for ``.pt`` weights.
+
+    Non-PyTorch backends (ONNX, OpenVINO, ...) and model YAMLs are loaded
+    directly. Any cache problem falls back to loading the original weights.
+    """
+    from ultralytics import YOLO
+
+    model_path = Path(model_path)
+    if not use_cache or model_path.suffix.lower() != '.pt' or not model_path.is_file():
+        return YOLO(str(model_path))
+
+    try:
+        cache_path = cached_model_path(model_path, cache_dir)
+        if cache_path.exists():
+            return YOLO(str(cache_path))
+        return build_cache(model_path, cache_path)
+    except Exception as e:
+        get_logger('edge_safety_monitor.model_cache').warning(
+            f"⚠️  Model cache unavailable ({type(e).__name__}: {e}); loading {model_path}")
+        return YOLO(str(model_path))
@@ -0,0 +1,246 @@
+"""
+Live MJPEG preview server with encode-once fan-out
+==================================================
+Lets supervisors watch the annotated stream from a browser on headless
+boxes without slowing detection:
+
+- ``publish(frame)`` is called from the frame loop. It is rate limited to
+  ``fps``, does nothing when nobody is watching (no stream viewer, and no
+  ``/snapshot.jpg`` request in the last ``snapshot_linger_s``), and otherwise only
+  downscales the frame into a one-slot mailbox (newer frames replace older
+  ones that have not been encoded yet).
+- One encoder thread JPEG-encodes each mailbox frame exactly once.
+- Every viewer gets the same encoded bytes. Viewer threads always send the
+  newest frame, so a slow client simply skips frames; nothing it does can
+  block the encoder or the detection loop.
+
+Endpoints: ``/`` (viewer page), ``/stream.mjpg`` (MJPEG), ``/snapshot.jpg``.
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BOUNDARY = 'edge-safety-frame'
+
+_PAGE = """<!doctype html>
+<html><head><title>Edge Safety Monitor - Live</title>
+<style>body{margin:0;background:#111;color:#ddd;font-family:sans-serif;text-align:center}
+img{max-width:100%;height:auto}</style></head>
+<body><h3>Edge Safety Monitor - Live Preview</h3><img src="/stream.mjpg"></body></html>
+"""
+
+
+class PreviewServer:
+    """Encode-once MJPEG broadcaster for annotated frames."""
+
+    def __init__(self, host='0.0.0.0', port=8080, max_width=640, fps=5.0,
+                 jpeg_quality=70, max_clients=16, client_timeout_s=10.0, snapshot_linger_s=30.0):
+        self.host = host
+        self.port = port
+        self.max_width = max_width
+        self.min_interval = 1.0 / fps if fps and fps > 0 else 0.0
+        self.jpeg_quality = int(jpeg_quality)
+        self.max_clients = max_clients
+        self.client_timeout_s = client_timeout_s
+        self.snapshot_linger_s = snapshot_linger_s
+        self.stats = {'published': 0, 'encoded': 0, 'sent': 0, 'skipped_by_clients': 0}
+
+        self._clients = 0
+        self._last_publish = 0.0
+        self._snapshot_until = 0.0       # keep encoding for snapshot pollers until then
+        self._pending = None             # newest downscaled frame awaiting encode
+        self._pending_ready = threading.Condition()
+        self._jpeg = None                # (sequence, bytes) of the latest encoded frame
+        self._jpeg_ready = threading.Condition()
+        self._running = False
+        self._encoder = None
+        self._httpd = None
+        self._http_thread = None
+
+    @classmethod
+    def from_config(cls, config=None, port=None):
+        settings = dict((config or {}).get('preview') or {})
+        if port is not None:
+            settings['port'] = port
+        return cls(**{k: v for k, v in settings.items()
+                      if k in ('host', 'port', 'max_width', 'fps', 'jpeg_quality',
+                               'max_clients', 'client_timeout_s', 'snapshot_linger_s')})
+
+    @property
+    def clients(self):
+        return self._clients
+
+    def start(self):
+        """Start the encoder thread and the HTTP server."""
+        self._running = True
+        self._encoder = threading.Thread(target=self._encode_loop, name='preview-encoder', daemon=True)
+        self._encoder.start()
+
+        self._httpd = ThreadingHTTPServer((self.host, self.port), _make_handler(self))
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]
+        self._http_thread = threading.Thread(target=self._httpd.serve_forever,
+                                             name='preview-http', daemon=True)
+        self._http_thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        with self._pending_ready:
+            self._pending_ready.notify_all()
+        with self._jpeg_ready:
+            self._jpeg_ready.notify_all()
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def publish(self, frame):
+        """Offer an annotated frame. Called from the frame loop; never blocks on viewers."""
+        now = time.monotonic()
+        if not self._wanted(now):
+            return False
+        if now - self._last_publish < self.min_interval:
+            return False
+        self._last_publish = now
+
+        # The resize produces a private copy, so the caller may reuse ``frame``
+        import cv2
+
+        height, width = frame.shape[:2]
+        if self.max_width and width > self.max_width:
+            scale = self.max_width / width
+            small = cv2.resize(frame, (self.max_width, max(1, int(height * scale))),
+                               interpolation=cv2.INTER_AREA)
+        else:
+            small = frame.copy()
+
+        with self._pending_ready:
+            self._pending = small
+            self._pending_ready.notify()
+        self.stats['published'] += 1
+        return True
+
+    def latest_jpeg(self):
+        """``(sequence, bytes)`` of the newest encoded frame, or None."""
+        return self._jpeg
+
+    def snapshot(self, timeout=1.0):
+        """Newest encoded frame for ``/snapshot.jpg``, or None.
+
+        Keeps ``publish`` encoding for ``snapshot_linger_s``. When nothing was
+        being encoded, the last JPEG is stale, so wait up to ``timeout`` for a
+        fresh one.
+        """
+        now = time.monotonic()
+        idle = not self._wanted(now)
+        self._snapshot_until = now + self.snapshot_linger_s
+        latest = self._jpeg
+        if idle or latest is None:
+            latest = self.wait_for_frame(latest[0] if latest else 0, timeout)
+        return latest
+
+    def wait_for_frame(self, after_sequence, timeout):
+        """Block until a frame newer than ``after_sequence`` is encoded (or timeout)."""
+        with self._jpeg_ready:
+            self._jpeg_ready.wait_for(
+                lambda: not self._running or (self._jpeg is not None and self._jpeg[0] > after_sequence),
+                timeout=timeout)
+            return self._jpeg
+
+    def _encode_loop(self):
+        import cv2
+
+        sequence = 0
+        params = [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality]
+        while self._running:
+            with self._pending_ready:
+                self._pending_ready.wait_for(lambda: self._pending is not None or not self._running)
+                frame, self._pending = self._pending, None
+            if frame is None:
+                continue
+            ok, buf = cv2.imencode('.jpg', frame, params)
+            if not ok:
+                continue
+            sequence += 1
+            with self._jpeg_ready:
+                self._jpeg = (sequence, buf.tobytes())
+                self._jpeg_ready.notify_all()
+            self.stats['encoded'] += 1
+
+    def _wanted(self, now):
+        return self._clients > 0 or now < self._snapshot_until
+
+    def _client_connected(self):
+        with self._jpeg_ready:
+            if self._clients >= self.max_clients:
+                return False
+            self._clients += 1
+            return True
+
+    def _client_disconnected(self):
+        with self._jpeg_ready:
+            self._clients -= 1
+
+
+def _make_handler(preview):
+    class PreviewHandler(BaseHTTPRequestHandler):
+        timeout = preview.client_timeout_s
+
+        def log_message(self, format, *args):
+            pass  # keep the monitor's console output clean
+
+        def do_GET(self):
+            path = self.path.split('?', 1)[0]
+            if path in ('/', '/index.html'):
+                self._send_bytes(_PAGE.encode(), 'text/html; charset=utf-8')
+            elif path == '/snapshot.jpg':
+                latest = preview.snapshot()
+                if latest is None:
+                    self.send_error(503, 'No frame yet')
+                else:
+                    self._send_bytes(latest[1], 'image/jpeg')
+            elif path == '/stream.mjpg':
+                self._stream()
+            else:
+                self.send_error(404)
+
+        def _send_bytes(self, data, content_type):
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(data)))
+            self.send_header('Cache-Control', 'no-cache')
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _stream(self):
+            if not preview._client_connected():
+                self.send_error(503, 'Too many viewers')
+                return
+            try:
+                self.send_response(200)
+                self.send_header('Content-Type', f'multipart/x-mixed-replace; boundary={BOUNDARY}')
+                self.send_header('Cache-Control', 'no-cache, private')
+                self.send_header('Pragma', 'no-cache')
+                self.end_headers()
+
+                last = 0
+                while preview._running:
+                    latest = preview.wait_for_frame(last, timeout=1.0)
+                    if latest is None or latest[0] <= last:
+                        continue
+                    if last:
+                        preview.stats['skipped_by_clients'] += latest[0] - last - 1
+                    last, data = latest
+                    self.wfile.write(
+                        f'--{BOUNDARY}\r\nContent-Type: image/jpeg\r\n'
+                        f'Content-Length: {len(data)}\r\n\r\n'.encode() + data + b'\r\n')
+                    self.wfile.flush()
+                    preview.stats['sent'] += 1
+            except (ConnectionError, TimeoutError, OSError):
+                pass
+            finally:
+                preview._client_disconnected()
+
+    return PreviewHandler
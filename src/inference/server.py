@@ -0,0 +1,335 @@
+"""
+Micro-batching HTTP inference server
+====================================
+A dependency-free asyncio HTTP/1.1 service that lets many lightweight
+cameras/clients share one inference box:
+
+- ``POST /detect`` with a JPEG/PNG body (raw or ``multipart/form-data``)
+  returns detections, per-category counts and compliance status as JSON.
+- ``GET /health`` returns queue depth and batching statistics.
+
+Concurrent requests are coalesced by ``MicroBatcher`` into a single model
+call of up to ``max_batch_size`` images; a batch is dispatched as soon as it
+is full or ``max_latency_ms`` after its oldest request arrived. The request
+queue is bounded and a full queue is answered with ``429 Too Many Requests``
+instead of letting latency grow without limit.
+"""
+
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src.detection.ppe import category_lookup, summarize_result
+
+_REASONS = {
+    200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+    411: 'Length Required', 413: 'Payload Too Large', 429: 'Too Many Requests',
+    431: 'Request Header Fields Too Large', 500: 'Internal Server Error',
+}
+MAX_HEADER_BYTES = 16 * 1024
+
+
+class Overloaded(Exception):
+    """Raised when the request queue is full."""
+
+
+class MicroBatcher:
+    """Coalesces concurrent ``submit()`` calls into batched ``predict_fn`` calls.
+
+    ``predict_fn(items) -> outputs`` runs on a single worker thread so the
+    event loop keeps accepting (or rejecting) requests during inference.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=8, max_latency_ms=20.0, max_queue=64):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_latency_s = max(0.0, max_latency_ms / 1000.0)
+        self.max_queue = max(1, int(max_queue))
+        self.stats = {'requests': 0, 'rejected': 0, 'errors': 0, 'batches': 0,
+                      'batched_items': 0, 'max_batch_seen': 0}
+        self._queue = None
+        self._arrival = None
+        self._task = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='inference')
+
+    async def start(self):
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._arrival = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._executor.shutdown(wait=False)
+
+    def depth(self):
+        """Requests waiting for a batch slot."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def submit(self, item):
+        """Queue ``item`` and wait for ``(output, batch_size)``; raises ``Overloaded``."""
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((item, future, time.perf_counter()))
+        except asyncio.QueueFull:
+            self.stats['rejected'] += 1
+            raise Overloaded() from None
+        self.stats['requests'] += 1
+        self._arrival.set()
+        return await future
+
+    async def _collect(self):
+        """Wait for one request, then gather more until full or the deadline passes."""
+        batch = [await self._queue.get()]
+        deadline = batch[0][2] + self.max_latency_s
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            self._arrival.clear()
+            try:
+                await asyncio.wait_for(self._arrival.wait(), remaining)
+            except asyncio.TimeoutError:
+                pass
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            # Clients that disconnected while queued are not worth inferring
+            batch = [entry for entry in batch if not entry[1].cancelled()]
+            if not batch:
+                continue
+
+            try:
+                outputs = await loop.run_in_executor(
+                    self._executor, self.predict_fn, [entry[0] for entry in batch])
+            except Exception as e:
+                self.stats['errors'] += len(batch)
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            size = len(batch)
+            self.stats['batches'] += 1
+            self.stats['batched_items'] += size
+            self.stats['max_batch_seen'] = max(self.stats['max_batch_seen'], size)
+            for (_, future, _), output in zip(batch, outputs):
+                if not future.done():
+                    future.set_result((output, size))
+
+
+class InferenceServer:
+    """HTTP front end that decodes uploads and feeds them to a ``MicroBatcher``."""
+
+    def __init__(self, model, conf_threshold=0.5, max_batch_size=8, max_latency_ms=20.0,
+                 max_queue=64, max_body_bytes=10 * 1024 * 1024, decode_workers=2):
+        self.model = model
+        self.conf_threshold = conf_threshold
+        self.max_body_bytes = max_body_bytes
+        self.names = dict(model.names)
+        self._categories = category_lookup(self.names)
+        self.batcher = MicroBatcher(self._predict, max_batch_size, max_latency_ms, max_queue)
+        self._decode_pool = ThreadPoolExecutor(max_workers=decode_workers,
+                                               thread_name_prefix='decode')
+        self._server = None
+        self._inflight = 0
+        self.started_at = time.time()
+
+    @classmethod
+    def from_config(cls, model, config=None, conf_threshold=0.5):
+        settings = (config or {}).get('server') or {}
+        return cls(model, conf_threshold=conf_threshold,
+                   max_batch_size=settings.get('max_batch_size', 8),
+                   max_latency_ms=settings.get('max_latency_ms', 20.0),
+                   max_queue=settings.get('max_queue', 64),
+                   max_body_bytes=int(settings.get('max_body_mb', 10) * 1024 * 1024))
+
+    def _predict(self, frames):
+        results = self.model(frames, conf=self.conf_threshold, verbose=False)
+        return [summarize_result(r, self.names, self._categories) for r in results]
+
+    @staticmethod
+    def _decode(data):
+        import cv2
+
+        return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+    async def start(self, host='0.0.0.0', port=8000):
+        await self.batcher.start()
+        self._server = await asyncio.start_server(self._handle, host, port,
+                                                  limit=MAX_HEADER_BYTES)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        await self.batcher.stop()
+        self._decode_pool.shutdown(wait=False)
+
+    def health(self):
+        stats = dict(self.batcher.stats)
+        stats['mean_batch_size'] = round(
+            stats['batched_items'] / stats['batches'], 2) if stats['batches'] else 0.0
+        return {
+            'status': 'ok',
+            'uptime_s': round(time.time() - self.started_at, 1),
+            'queue_depth': self.batcher.depth(),
+            'in_flight': self._inflight,
+            'max_queue': self.batcher.max_queue,
+            'max_batch_size': self.batcher.max_batch_size,
+            'max_latency_ms': self.batcher.max_latency_s * 1000.0,
+            'stats': stats,
+        }
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except asyncio.IncompleteReadError:
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._respond(writer, 431, {'error': 'headers too large'}, keep_alive=False)
+                    break
+
+                method, path, version, headers = _parse_head(head)
+                if method is None:
+                    await self._respond(writer, 400, {'error': 'malformed request'}, keep_alive=False)
+                    break
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+
+                if 'transfer-encoding' in headers:
+                    await self._respond(writer, 411, {'error': 'Content-Length required'}, keep_alive=False)
+                    break
+                try:
+                    length = int(headers.get('content-length', 0))
+                except ValueError:
+                    length = -1
+                if length < 0 or length > self.max_body_bytes:
+                    status = 400 if length < 0 else 413
+                    await self._respond(writer, status, {'error': 'invalid or oversized body'},
+                                        keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                status, payload, extra = await self._route(method, path, headers, body)
+                await self._respond(writer, status, payload, extra, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method, path, headers, body):
+        path = path.split('?', 1)[0]
+        if path == '/health':
+            if method != 'GET':
+                return 405, {'error': 'use GET'}, {}
+            return 200, self.health(), {}
+        if path != '/detect':
+            return 404, {'error': 'unknown endpoint', 'endpoints': ['POST /detect', 'GET /health']}, {}
+        if method != 'POST':
+            return 405, {'error': 'use POST'}, {}
+
+        started = time.perf_counter()
+        data = _extract_upload(headers.get('content-type', ''), body)
+        if not data:
+            return 400, {'error': 'empty upload'}, {}
+        # Admission control covers decoding too, so the whole pipeline is
+        # bounded: at most one queue's worth waiting plus the running batch.
+        if self._inflight >= self.batcher.max_queue + self.batcher.max_batch_size:
+            self.batcher.stats['rejected'] += 1
+            return 429, {'error': 'server overloaded, retry later'}, {'Retry-After': '1'}
+
+        self._inflight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            frame = await loop.run_in_executor(self._decode_pool, self._decode, data)
+            if frame is None:
+                return 400, {'error': 'could not decode image (JPEG/PNG expected)'}, {}
+            summary, batch_size = await self.batcher.submit(frame)
+        except Overloaded:
+            return 429, {'error': 'server overloaded, retry later'}, {'Retry-After': '1'}
+        except Exception as e:
+            return 500, {'error': f'inference failed: {type(e).__name__}: {e}'}, {}
+        finally:
+            self._inflight -= 1
+
+        payload = dict(summary)
+        payload['image_size'] = [int(frame.shape[1]), int(frame.shape[0])]
+        payload['batch_size'] = batch_size
+        payload['latency_ms'] = round((time.perf_counter() - started) * 1000.0, 2)
+        return 200, payload, {}
+
+    @staticmethod
+    async def _respond(writer, status, payload, extra_headers=None, keep_alive=True):
+        body = json.dumps(payload).encode()
+        lines = [
+            f'HTTP/1.1 {status} {_REASONS.get(status, "")}',
+            'Content-Type: application/json',
+            f'Content-Length: {len(body)}',
+            f'Connection: {"keep-alive" if keep_alive else "close"}',
+        ]
+        lines.extend(f'{k}: {v}' for k, v in (extra_headers or {}).items())
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+        await writer.drain()
+
+
+def _parse_head(head):
+    """Parse the request line and headers; returns (method, path, version, headers)."""
+    try:
+        lines = head.decode('latin-1').split('\r\n')
+        method, path, version = lines[0].split(' ', 2)
+    except ValueError:
+        return None, None, None, {}
+    headers = {}
+    for line in lines[1:]:
+        if ':' in line:
+            key, value = line.split(':', 1)
+            headers[key.strip().lower()] = value.strip()
+    return method.upper(), path, version.strip(), headers
+
+
+def _extract_upload(content_type, body):
+    """Image bytes from a raw body or the first file part of a multipart form."""
+    if not content_type.lower().startswith('multipart/form-data'):
+        return body
+
+    boundary = None
+    for param in content_type.split(';')[1:]:
+        key, _, value = param.strip().partition('=')
+        if key.lower() == 'boundary':
+            boundary = value.strip('"')
+    if not boundary:
+        return b''
+
+    for part in body.split(b'--' + boundary.encode())[1:]:
+        if part.startswith(b'--'):
+            break
+        head, sep, content = part.partition(b'\r\n\r\n')
+        head = head.lower()
+        if sep and (b'filename=' in head or b'name="file"' in head):
+            return content[:-2] if content.endswith(b'\r\n') else content
+    return b''
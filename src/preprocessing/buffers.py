@@ -0,0 +1,185 @@
+"""
+Preallocated frame buffers
+==========================
+The default frame loop allocates a fresh frame per ``cap.read()``, a copy
+per ``Results.plot()`` and several temporaries in the model's letterbox
+preprocessing. On 2 GB edge boards that churn shows up as GC pauses and a
+higher peak RSS. The buffer-pool mode replaces them with arrays allocated
+once per stream:
+
+- ``FramePool`` decodes into a small ring of reused frames
+  (``cap.read(image=buf)``); a ring rather than a single buffer, so frames
+  still held elsewhere (the adaptive controller's last annotated frame) are
+  not overwritten by the next decode
+- ``Letterbox`` resizes into a fixed buffer and writes the normalized RGB
+  CHW input tensor in place, so the model skips its own preprocessing
+- ``MemoryReport`` measures what is still allocated per frame once the
+  stream is warm (``tracemalloc``), plus GC collections and peak RSS
+"""
+
+import gc
+import tracemalloc
+
+import numpy as np
+
+DEFAULT_BUFFERS_CONFIG = {
+    'pool_size': 3,              # decode buffers in rotation
+    'memory_report': False,      # tracemalloc report at the end of the session (slow)
+    'report_warmup_frames': 30,  # frames ignored before measuring steady state
+}
+
+
+class FramePool:
+    """Ring of reused decode buffers for ``cv2.VideoCapture.read``."""
+
+    def __init__(self, size=3):
+        self._slots = [None] * max(1, int(size))
+        self._index = 0
+        self.allocations = 0        # buffers (re)allocated; stays at ``size`` once warm
+
+    def __len__(self):
+        return len(self._slots)
+
+    def read(self, cap):
+        """``cap.read()`` into the next buffer of the ring; returns ``(ret, frame)``."""
+        slot = self._slots[self._index]
+        ret, frame = cap.read(slot) if slot is not None else cap.read()
+        if not ret:
+            return False, None
+        if slot is None or frame.ctypes.data != slot.ctypes.data:
+            # First use, or the stream changed size and OpenCV reallocated
+            self._slots[self._index] = frame
+            self.allocations += 1
+        self._index = (self._index + 1) % len(self._slots)
+        return True, frame
+
+
+class Letterbox:
+    """Fixed-buffer letterbox into a ``(1, 3, H, W)`` float32 RGB input tensor.
+
+    Like ultralytics' own preprocessing the longest side is scaled to
+    ``imgsz`` and the short side is padded to a multiple of ``stride`` (grey
+    114), but every array is allocated once per frame size and reused.
+    """
+
+    def __init__(self, imgsz=640, stride=32, fill=114):
+        self.imgsz = int(imgsz)
+        self.stride = stride
+        self.fill = fill
+        self.allocations = 0
+        self._shape = None
+
+    def _allocate(self, height, width):
+        self.ratio = min(self.imgsz / height, self.imgsz / width)
+        new_w, new_h = int(round(width * self.ratio)), int(round(height * self.ratio))
+        in_w = -(-new_w // self.stride) * self.stride
+        in_h = -(-new_h // self.stride) * self.stride
+        self.left, self.top = (in_w - new_w) // 2, (in_h - new_h) // 2
+        self.size = (new_w, new_h)
+        self._resized = np.empty((new_h, new_w, 3), dtype=np.uint8)
+        self.input = np.full((1, 3, in_h, in_w), self.fill / 255.0, dtype=np.float32)
+        self._interior = self.input[0, :, self.top:self.top + new_h, self.left:self.left + new_w]
+        self._offset = np.array([self.left, self.top, self.left, self.top], dtype=np.float32)
+        self.tensor = None
+        self._shape = (height, width)
+        self.allocations += 1
+
+    def __call__(self, frame):
+        """Letterbox a BGR frame; returns the shared input array (valid until the next call)."""
+        import cv2
+
+        height, width = frame.shape[:2]
+        if self._shape != (height, width):
+            self._allocate(height, width)
+        if self.size != (width, height):
+            cv2.resize(frame, self.size, dst=self._resized, interpolation=cv2.INTER_LINEAR)
+            source = self._resized
+        else:
+            source = frame
+        # BGR HWC uint8 -> RGB CHW float32 in [0, 1], written straight into the tensor
+        np.multiply(source[..., ::-1].transpose(2, 0, 1), np.float32(1 / 255), out=self._interior)
+        return self.input
+
+    def as_tensor(self, frame):
+        """Same as calling, but as a ``torch`` tensor sharing the buffer."""
+        self(frame)
+        if self.tensor is None:
+            import torch
+            self.tensor = torch.from_numpy(self.input)
+        return self.tensor
+
+    def scale_boxes(self, xyxy):
+        """Map ``(N, 4)`` boxes from input-tensor to frame coordinates (in place)."""
+        xyxy -= self._offset
+        xyxy /= self.ratio
+        height, width = self._shape
+        np.clip(xyxy[:, 0::2], 0, width, out=xyxy[:, 0::2])
+        np.clip(xyxy[:, 1::2], 0, height, out=xyxy[:, 1::2])
+        return xyxy
+
+
+class MemoryReport:
+    """Steady-state per-frame allocation statistics via ``tracemalloc``.
+
+    Call ``tick()`` once per loop iteration. After ``warmup_frames`` it
+    records, per frame, the transient peak of traced memory above the
+    previous frame's level and the net growth, plus GC collections.
+    Tracing slows the loop noticeably, so this is a profiling aid.
+    """
+
+    def __init__(self, warmup_frames=30, top=5):
+        self.warmup_frames = warmup_frames
+        self.top = top
+        self.frames = 0
+        self._transient = []
+        self._retained = []
+        self._level = None
+        self._start_snapshot = None
+        self._started_tracing = False
+        self._gc_start = None
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        return self
+
+    def tick(self):
+        self.frames += 1
+        current, peak = tracemalloc.get_traced_memory()
+        if self.frames > self.warmup_frames and self._level is not None:
+            self._transient.append(peak - self._level)
+            self._retained.append(current - self._level)
+        elif self._gc_start is None and self.frames >= self.warmup_frames:
+            # Baseline at the end of warm-up (the first tick when there is none)
+            self._start_snapshot = tracemalloc.take_snapshot()
+            self._gc_start = sum(s['collections'] for s in gc.get_stats())
+        tracemalloc.reset_peak()
+        self._level = current
+
+    def summary(self):
+        """Dict of steady-state numbers (None fields before warm-up ends)."""
+        from src.utils.benchmark import peak_rss_mb
+
+        frames = len(self._transient)
+        summary = {'frames': frames, 'peak_rss_mb': peak_rss_mb(),
+                   'transient_kb_per_frame': None, 'retained_bytes_per_frame': None,
+                   'gc_collections': None, 'top_growth': []}
+        if not frames:
+            return summary
+        summary['transient_kb_per_frame'] = round(float(np.mean(self._transient)) / 1024, 1)
+        summary['retained_bytes_per_frame'] = round(float(np.mean(self._retained)), 1)
+        summary['gc_collections'] = sum(s['collections'] for s in gc.get_stats()) - self._gc_start
+        if self._start_snapshot is not None and tracemalloc.is_tracing():
+            ignore = [tracemalloc.Filter(False, __file__)]      # the report's own bookkeeping
+            diff = tracemalloc.take_snapshot().filter_traces(ignore).compare_to(
+                self._start_snapshot.filter_traces(ignore), 'lineno')
+            summary['top_growth'] = [
+                (str(stat.traceback[0]), stat.size_diff, stat.count_diff)
+                for stat in diff[:self.top] if stat.size_diff > 0]
+        return summary
+
+    def stop(self):
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
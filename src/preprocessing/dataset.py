@@ -0,0 +1,451 @@
+"""
+Dataset preparation
+===================
+Merges the raw datasets in ``data/raw/<source>/`` into one YOLO dataset in
+``data/processed/{train,val,test}/{images,labels}``:
+
+- annotations in YOLO (``.txt`` + ``data.yaml``/``classes.txt``), Pascal VOC
+  (``.xml``) or COCO (``.json``) format are converted to YOLO boxes
+- source class names are remapped to the ids in ``config/data.yaml``
+  (through ``CLASS_ALIASES``, e.g. ``hardhat`` -> ``helmet``); classes with
+  no target are dropped
+- images are downscaled so the longest side is at most ``max_size``
+- near-duplicate images (consecutive video frames) are dropped before
+  splitting, and near-duplicates that still straddle splits are reported
+  (``src.preprocessing.dedup``)
+- the split is derived from the image's content hash, so it is stable
+  across runs and exact copies of an image always land in the same split
+- output files are named after the source and path (``helmet/images/a.jpg``
+  -> ``helmet_images_a``); raw files whose names map to the same stem
+  (``a b.jpg``/``a_b.jpg``, ``a.jpg``/``a.png``) get a short hash of their
+  path appended instead of overwriting each other
+
+Work is spread over a process pool. ``manifest.json`` in the output
+directory records each raw file's size/mtime and content hash, so a re-run
+only touches new or changed files (and removes outputs of deleted ones).
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from src.preprocessing.dedup import find_duplicates, find_leaks, image_phash
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+SPLITS = ('train', 'val', 'test')
+MANIFEST_NAME = 'manifest.json'
+
+DEFAULT_PREPARE_CONFIG = {
+    'max_size': 640,             # longest image side after resizing (0 = keep)
+    'split': [0.8, 0.1, 0.1],    # train / val / test fractions
+    'jpeg_quality': 95,
+    'workers': 0,                # 0 = one per CPU
+    'class_aliases': {},         # extra source name -> data.yaml name entries
+    'dedup': True,               # drop near-duplicate raw images before splitting
+    'dedup_distance': 4,         # pHash Hamming distance (of 64 bits) counted as a duplicate
+    'check_leaks': True,         # report near-duplicates that ended up in different splits
+    'leak_distance': 8,
+}
+
+# Source dataset class names (normalized) -> config/data.yaml class names
+CLASS_ALIASES = {
+    'hardhat': 'helmet', 'hard_hat': 'helmet', 'helmet': 'helmet', 'safety_helmet': 'helmet',
+    'no_hardhat': 'no_helmet', 'no_helmet': 'no_helmet', 'head': 'no_helmet', 'without_helmet': 'no_helmet',
+    'vest': 'vest', 'safety_vest': 'vest', 'reflective_vest': 'vest',
+    'no_vest': 'no_vest', 'no_safety_vest': 'no_vest', 'without_vest': 'no_vest',
+    'person': 'person', 'worker': 'person', 'people': 'person',
+    'phone': 'phone', 'cell_phone': 'phone', 'mobile_phone': 'phone', 'cellphone': 'phone',
+    'drowsy': 'drowsy', 'sleepy': 'drowsy', 'closed_eyes': 'drowsy',
+    'alert': 'alert', 'awake': 'alert', 'open_eyes': 'alert',
+}
+
+
+def normalize_name(name):
+    return re.sub(r'[\s\-]+', '_', str(name).strip().lower())
+
+
+def class_index(target_names, aliases=None):
+    """Normalized source name -> target class id, from ``data.yaml`` names and aliases."""
+    if isinstance(target_names, dict):
+        targets = {normalize_name(n): int(i) for i, n in target_names.items()}
+    else:
+        targets = {normalize_name(n): i for i, n in enumerate(target_names)}
+    index = dict(targets)
+    for source, target in {**CLASS_ALIASES, **(aliases or {})}.items():
+        target = normalize_name(target)
+        if target in targets:
+            index[normalize_name(source)] = targets[target]
+    return index
+
+
+def parse_voc(data):
+    """``(width, height, [(name, x1, y1, x2, y2), ...])`` from VOC XML bytes."""
+    root = ET.fromstring(data)
+    size = root.find('size')
+    width = float(size.findtext('width', 0)) if size is not None else 0.0
+    height = float(size.findtext('height', 0)) if size is not None else 0.0
+    objects = []
+    for obj in root.iter('object'):
+        box = obj.find('bndbox')
+        if box is None:
+            continue
+        objects.append((obj.findtext('name', ''),) +
+                       tuple(float(box.findtext(k, 0)) for k in ('xmin', 'ymin', 'xmax', 'ymax')))
+    return width, height, objects
+
+
+def load_coco(path):
+    """``{image file name: (width, height, [(name, x1, y1, x2, y2), ...])}`` from a COCO JSON."""
+    with open(path, 'r', encoding='utf-8') as f:
+        coco = json.load(f)
+    categories = {c['id']: c['name'] for c in coco.get('categories', [])}
+    images = {img['id']: (img['file_name'], img.get('width', 0), img.get('height', 0), [])
+              for img in coco.get('images', [])}
+    for ann in coco.get('annotations', []):
+        entry = images.get(ann.get('image_id'))
+        if entry is None or ann.get('iscrowd'):
+            continue
+        x, y, w, h = ann['bbox']
+        entry[3].append((categories.get(ann['category_id'], ''), x, y, x + w, y + h))
+    return {name: (w, h, objects) for name, w, h, objects in images.values()}
+
+
+def _source_names(root):
+    """Class names of a YOLO-format source (its data.yaml or classes.txt), if any."""
+    for path in sorted(root.rglob('data.yaml')) + sorted(root.rglob('*.yaml')):
+        try:
+            import yaml
+            with open(path, 'r', encoding='utf-8') as f:
+                names = (yaml.safe_load(f) or {}).get('names')
+        except Exception:
+            continue
+        if names:
+            return [names[k] for k in sorted(names)] if isinstance(names, dict) else list(names)
+    for path in sorted(root.rglob('classes.txt')):
+        return [line.strip() for line in path.read_text(encoding='utf-8').splitlines() if line.strip()]
+    return None
+
+
+def _stat(path):
+    st = path.stat()
+    return [st.st_size, st.st_mtime_ns]
+
+
+def discover(raw_dir, sources=None):
+    """Annotated images under ``raw_dir/<source>/`` as task dicts (no file contents read)."""
+    raw_dir = Path(raw_dir)
+    tasks = []
+    for root in sorted(p for p in raw_dir.iterdir() if p.is_dir()):
+        if sources and root.name not in sources:
+            continue
+        images = {p.resolve(): p for p in sorted(root.rglob('*'))
+                  if p.suffix.lower() in IMAGE_EXTENSIONS and p.is_file()}
+
+        # COCO files claim their images first
+        claimed = set()
+        by_name = {}
+        for path in images.values():
+            by_name.setdefault(path.name, path)
+        for json_path in sorted(root.rglob('*.json')):
+            try:
+                coco = load_coco(json_path)
+            except (ValueError, KeyError, TypeError, AttributeError):
+                continue
+            for file_name, (width, height, objects) in coco.items():
+                path = json_path.parent / file_name
+                path = images.get(path.resolve()) or by_name.get(Path(file_name).name)
+                if path is None or path.resolve() in claimed:
+                    continue
+                claimed.add(path.resolve())
+                # The boxes themselves are the annotation signature
+                signature = hashlib.sha1(repr(objects).encode()).hexdigest()
+                tasks.append({'key': f"{root.name}/{path.relative_to(root).as_posix()}",
+                              'image': str(path), 'format': 'coco', 'objects': objects,
+                              'size': (width, height), 'ann_stat': signature})
+
+        names = None
+        for resolved, path in images.items():
+            if resolved in claimed:
+                continue
+            task = {'key': f"{root.name}/{path.relative_to(root).as_posix()}", 'image': str(path)}
+            voc = [path.with_suffix('.xml'), path.parent.parent / 'Annotations' / (path.stem + '.xml')]
+            parts = list(path.parts)
+            yolo = [path.with_suffix('.txt')]
+            if 'images' in parts:
+                i = len(parts) - 1 - parts[::-1].index('images')
+                yolo.append(Path(*parts[:i], 'labels', *parts[i + 1:]).with_suffix('.txt'))
+            annotation = next((p for p in voc if p.is_file()), None)
+            if annotation is not None:
+                task['format'] = 'voc'
+            else:
+                annotation = next((p for p in yolo if p.is_file()), None)
+                if annotation is None:
+                    continue
+                if names is None:
+                    names = _source_names(root) or []
+                task.update({'format': 'yolo', 'names': names})
+            task.update({'annotation': str(annotation), 'ann_stat': _stat(annotation)})
+            tasks.append(task)
+    return tasks
+
+
+def _to_yolo(task, image_size, annotation, index):
+    """YOLO label lines for a task plus counts of kept boxes per class and dropped boxes."""
+    img_w, img_h = image_size
+    boxes, dropped = [], 0
+    if task['format'] == 'yolo':
+        names = task['names']
+        for line in annotation.decode('utf-8').splitlines():
+            parts = line.split()
+            if len(parts) < 5:
+                continue
+            source = int(float(parts[0]))
+            name = names[source] if source < len(names) else str(source)
+            cls = index.get(normalize_name(name))
+            if cls is None:
+                dropped += 1
+                continue
+            boxes.append((cls,) + tuple(float(v) for v in parts[1:5]))
+    else:
+        if task['format'] == 'voc':
+            width, height, objects = parse_voc(annotation)
+        else:
+            (width, height), objects = task['size'], task['objects']
+        width, height = width or img_w, height or img_h
+        for name, x1, y1, x2, y2 in objects:
+            cls = index.get(normalize_name(name))
+            if cls is None:
+                dropped += 1
+                continue
+            x1, x2 = np.clip([x1, x2], 0, width)
+            y1, y2 = np.clip([y1, y2], 0, height)
+            if x2 <= x1 or y2 <= y1:
+                dropped += 1
+                continue
+            boxes.append((cls, (x1 + x2) / 2 / width, (y1 + y2) / 2 / height,
+                          (x2 - x1) / width, (y2 - y1) / height))
+    counts = {}
+    for box in boxes:
+        counts[box[0]] = counts.get(box[0], 0) + 1
+    lines = [f"{c} {x:.6f} {y:.6f} {w:.6f} {h:.6f}" for c, x, y, w, h in boxes]
+    return lines, counts, dropped
+
+
+def split_for(digest, ratios):
+    """Deterministic split from a hex content digest."""
+    position = int(digest[:8], 16) / 0xFFFFFFFF
+    total = float(sum(ratios))
+    edge = 0.0
+    for name, ratio in zip(SPLITS, ratios):
+        edge += ratio / total
+        if position < edge:
+            return name
+    return SPLITS[len(ratios) - 1]
+
+
+def output_stem(key):
+    """File name stem of a raw file's outputs (``helmet/images/a.jpg`` -> ``helmet_images_a``)."""
+    return re.sub(r'[^\w.-]+', '_', key.rsplit('.', 1)[0])
+
+
+def process_task(task, output_dir, index, settings, previous=None):
+    """Convert one image (runs in a pool worker); returns ``(key, manifest entry)``."""
+    import cv2
+
+    output_dir = Path(output_dir)
+    image_path = Path(task['image'])
+    data = image_path.read_bytes()
+    annotation = Path(task['annotation']).read_bytes() if 'annotation' in task else b''
+    image_digest = hashlib.sha1(data).hexdigest()
+    digest = hashlib.sha1(data + annotation + repr(task.get('objects')).encode()).hexdigest()
+
+    entry = {'stat': _stat(image_path), 'ann_stat': task['ann_stat'], 'sha1': digest}
+    if previous and previous.get('sha1') == digest and \
+            all((output_dir / previous[k]).exists() for k in ('image', 'label')):
+        # Touched but identical: nothing to rewrite
+        return task['key'], {**previous, **entry, 'changed': False}
+
+    image = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        return task['key'], {**entry, 'error': 'unreadable image'}
+    height, width = image.shape[:2]
+    lines, counts, dropped = _to_yolo(task, (width, height), annotation, index)
+
+    split = split_for(image_digest, settings['split'])
+    stem = task.get('stem') or output_stem(task['key'])
+    image_rel = f"{split}/images/{stem}.jpg"
+    label_rel = f"{split}/labels/{stem}.txt"
+    (output_dir / split / 'images').mkdir(parents=True, exist_ok=True)
+    (output_dir / split / 'labels').mkdir(parents=True, exist_ok=True)
+
+    max_size = settings['max_size']
+    if max_size and max(width, height) > max_size:
+        scale = max_size / max(width, height)
+        image = cv2.resize(image, (max(1, round(width * scale)), max(1, round(height * scale))),
+                           interpolation=cv2.INTER_AREA)
+        cv2.imwrite(str(output_dir / image_rel), image,
+                    [cv2.IMWRITE_JPEG_QUALITY, settings['jpeg_quality']])
+    elif image_path.suffix.lower() in ('.jpg', '.jpeg'):
+        (output_dir / image_rel).write_bytes(data)        # already small enough: no re-encode
+    else:
+        cv2.imwrite(str(output_dir / image_rel), image,
+                    [cv2.IMWRITE_JPEG_QUALITY, settings['jpeg_quality']])
+    (output_dir / label_rel).write_text("\n".join(lines) + ("\n" if lines else ""))
+
+    if previous:
+        for k in ('image', 'label'):
+            if previous.get(k) and previous[k] != (image_rel, label_rel)[k == 'label']:
+                (output_dir / previous[k]).unlink(missing_ok=True)
+
+    return task['key'], {**entry, 'split': split, 'image': image_rel, 'label': label_rel,
+                         'classes': {str(k): v for k, v in counts.items()},
+                         'dropped': dropped, 'changed': True}
+
+
+def _process_star(args):
+    return process_task(*args)
+
+
+def _fingerprint(index, settings):
+    return hashlib.sha1(json.dumps([sorted(index.items()), settings['max_size'],
+                                    list(settings['split']), settings['jpeg_quality']]
+                                   ).encode()).hexdigest()
+
+
+def load_manifest(output_dir):
+    path = Path(output_dir) / MANIFEST_NAME
+    if not path.exists():
+        return {'fingerprint': None, 'files': {}}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_manifest(output_dir, manifest):
+    path = Path(output_dir) / MANIFEST_NAME
+    tmp = path.with_suffix('.json.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    os.replace(tmp, path)
+
+
+def _update_hashes(manifest, tasks, executor, workers):
+    """Perceptual hash per task key, computing only new or changed images."""
+    cache = manifest.get('phash') or {}
+    stats = {task['key']: _stat(Path(task['image'])) for task in tasks}
+    todo = [task for task in tasks if (cache.get(task['key']) or [None])[0] != stats[task['key']]]
+    paths = [task['image'] for task in todo]
+    if executor is not None and len(paths) > 1:
+        values = executor.map(image_phash, paths, chunksize=max(1, len(paths) // (workers * 8)))
+    else:
+        values = map(image_phash, paths)
+    for task, value in zip(todo, values):
+        cache[task['key']] = [stats[task['key']], value]
+    manifest['phash'] = cache
+    return {key: entry[1] for key, entry in cache.items()}
+
+
+def prepare_dataset(raw_dir, output_dir, target_names, settings=None, sources=None,
+                    workers=None, force=False, progress=None):
+    """Build or incrementally update the processed dataset; returns run statistics."""
+    settings = {**DEFAULT_PREPARE_CONFIG, **(settings or {})}
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    index = class_index(target_names, settings.get('class_aliases'))
+    fingerprint = _fingerprint(index, settings)
+
+    manifest = load_manifest(output_dir)
+    if force or manifest.get('fingerprint') != fingerprint:
+        for split in SPLITS:
+            shutil.rmtree(output_dir / split, ignore_errors=True)
+        # Perceptual hashes only depend on the raw files, so they survive a rebuild
+        manifest = {'fingerprint': fingerprint, 'files': {}, 'phash': manifest.get('phash', {})}
+    files = manifest['files']
+
+    tasks = discover(raw_dir, sources)
+    stats = {'found': len(tasks), 'duplicates': 0, 'processed': 0, 'unchanged': 0, 'touched': 0,
+             'removed': 0, 'errors': 0, 'leaks': []}
+
+    workers = workers if workers is not None else settings['workers']
+    workers = workers or os.cpu_count() or 1
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        hashes = {}
+        if settings['dedup'] or settings['check_leaks']:
+            hashes = _update_hashes(manifest, tasks, executor, workers)
+        if settings['dedup']:
+            # Near-identical frames: keep the first of each run (raw files are in name order)
+            duplicates = find_duplicates(
+                [(t['key'], hashes[t['key']]) for t in tasks if hashes.get(t['key']) is not None],
+                settings['dedup_distance'])
+            tasks = [t for t in tasks if t['key'] not in duplicates]
+            stats['duplicates'] = len(duplicates)
+        seen = {task['key'] for task in tasks}
+
+        # Keys that sanitize to the same name would overwrite each other's outputs
+        stems = {}
+        for task in tasks:
+            stems.setdefault(output_stem(task['key']), []).append(task)
+        for stem, same in stems.items():
+            if len(same) > 1:
+                for task in same:
+                    task['stem'] = f"{stem}_{hashlib.sha1(task['key'].encode()).hexdigest()[:8]}"
+
+        # Deleted (or now duplicate) raw files: drop their outputs, within the sources prepared
+        for key in [k for k in files if k not in seen and (not sources or k.split('/', 1)[0] in sources)]:
+            for k in ('image', 'label'):
+                if files[key].get(k):
+                    (output_dir / files[key][k]).unlink(missing_ok=True)
+            del files[key]
+            stats['removed'] += 1
+
+        todo = []
+        for task in tasks:
+            previous = files.get(task['key'])
+            if previous and 'error' not in previous and \
+                    previous['stat'] == _stat(Path(task['image'])) and \
+                    previous['ann_stat'] == task['ann_stat'] and \
+                    (output_dir / previous['image']).exists():
+                stats['unchanged'] += 1
+                continue
+            todo.append((task, str(output_dir), index, settings, previous))
+
+        if executor is not None and len(todo) > 1:
+            results = executor.map(_process_star, todo, chunksize=max(1, len(todo) // (workers * 8)))
+        else:
+            results = map(_process_star, todo)
+        for done, (key, entry) in enumerate(results, start=1):
+            changed = entry.pop('changed', True)
+            stats['errors' if 'error' in entry else 'processed' if changed else 'touched'] += 1
+            files[key] = entry
+            if done % 1000 == 0:
+                save_manifest(output_dir, manifest)     # a killed run resumes from here
+            if progress is not None:
+                progress(done, len(todo))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    save_manifest(output_dir, manifest)
+
+    stats['splits'] = {split: sum(1 for e in files.values() if e.get('split') == split)
+                       for split in SPLITS}
+    counts = {}
+    for entry in files.values():
+        for cls, n in (entry.get('classes') or {}).items():
+            counts[int(cls)] = counts.get(int(cls), 0) + n
+    stats['classes'] = dict(sorted(counts.items()))
+    stats['dropped_boxes'] = sum(e.get('dropped', 0) for e in files.values())
+
+    if settings['check_leaks']:
+        split_hashes = {}
+        for key, entry in sorted(files.items()):
+            if entry.get('split') and hashes.get(key) is not None:
+                split_hashes.setdefault(entry['split'], []).append((key, hashes[key]))
+        stats['leaks'] = find_leaks(split_hashes, settings['leak_distance'])
+    return stats
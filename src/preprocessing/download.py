@@ -0,0 +1,339 @@
+"""
+Dataset downloads
+=================
+Fetches the files listed in a dataset manifest (``config/datasets.yaml``)
+into ``data/downloads/`` and unpacks archives into ``data/raw/<source>/``,
+where ``scripts/prepare_data.py`` picks them up:
+
+- files download concurrently on a thread pool, in ``chunk_kb`` chunks
+- a broken transfer leaves ``<file>.part`` behind; the retry (or the next
+  run) asks the server for the rest with an HTTP ``Range`` request, and
+  starts over if the server ignores it
+- the SHA-256 is computed while streaming (a resumed file hashes its
+  partial bytes first) and checked against the manifest's ``sha256`` and
+  ``size``; only a verified file is renamed into place
+- archives (``.zip``, ``.tar``, ``.tar.gz``, ``.tgz``, ...) are extracted in a
+  process pool as soon as their download is verified, while the others
+  are still downloading
+- ``state.json`` in the download directory records each verified file's
+  size/mtime and digest and each extraction, so a re-run skips them
+
+Manifest format (YAML or JSON)::
+
+    datasets:
+      - name: helmet                 # key in state.json (default: file stem)
+        url: https://example.com/hard-hat.zip
+        sha256: 9f86d08188...        # optional, verified after download
+        size: 104857600              # optional, in bytes
+        extract_to: raw/helmet       # archives only, relative to data/ (default: raw/<name>)
+"""
+
+import hashlib
+import json
+import os
+import tarfile
+import time
+import urllib.error
+import urllib.request
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from pathlib import Path, PurePosixPath
+from urllib.parse import unquote, urlparse
+
+import yaml
+
+STATE_NAME = 'state.json'
+ARCHIVE_SUFFIXES = ('.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+USER_AGENT = 'edge-safety-monitor'
+
+DEFAULT_DOWNLOAD_CONFIG = {
+    'manifest': 'config/datasets.yaml',
+    'download_dir': 'data/downloads',
+    'workers': 4,            # concurrent downloads
+    'extract_workers': 0,    # extraction processes (0 = one per CPU)
+    'chunk_kb': 1024,
+    'retries': 3,            # per file; each retry resumes from the partial file
+    'timeout_s': 30,
+}
+
+
+class DownloadError(Exception):
+    """Raised when a file cannot be downloaded or fails verification."""
+
+
+def read_manifest(path):
+    """Normalized manifest entries (``name``, ``url``, ``filename``, ``sha256``, ``size``, ``extract_to``)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = yaml.safe_load(f) or {}
+    items = data.get('datasets') or [] if isinstance(data, dict) else data
+    entries, names = [], set()
+    for i, item in enumerate(items):
+        if not isinstance(item, dict) or not item.get('url'):
+            raise ValueError(f"{path}: entry {i} has no url")
+        filename = item.get('filename') or unquote(PurePosixPath(urlparse(item['url']).path).name)
+        if not filename:
+            raise ValueError(f"{path}: cannot derive a file name from {item['url']}")
+        name = str(item.get('name') or _stem(filename))
+        if name in names:
+            raise ValueError(f"{path}: duplicate dataset name '{name}'")
+        names.add(name)
+        digest = item.get('sha256')
+        entries.append({
+            'name': name,
+            'url': item['url'],
+            'filename': filename,
+            'sha256': str(digest).lower() if digest else None,
+            'size': int(item['size']) if item.get('size') is not None else None,
+            'extract_to': item.get('extract_to') or (f"raw/{name}" if is_archive(filename) else None),
+        })
+    return entries
+
+
+def _stem(filename):
+    for suffix in ARCHIVE_SUFFIXES:
+        if filename.lower().endswith(suffix):
+            return filename[:-len(suffix)]
+    return Path(filename).stem
+
+
+def is_archive(filename):
+    """True for the archive types ``extract_archive`` unpacks."""
+    return str(filename).lower().endswith(ARCHIVE_SUFFIXES)
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    """Hex SHA-256 of a file."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _stat(path):
+    st = Path(path).stat()
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _retriable(error):
+    if isinstance(error, urllib.error.HTTPError):
+        return error.code in (408, 429) or error.code >= 500
+    return isinstance(error, (urllib.error.URLError, OSError))
+
+
+def _transfer(url, part, digest, chunk_size, timeout):
+    """One request for the rest of ``part``; returns ``(digest, start offset, bytes received)``."""
+    offset = part.stat().st_size if part.exists() else 0
+    request = urllib.request.Request(url, headers={'User-Agent': USER_AGENT})
+    if offset:
+        request.add_header('Range', f"bytes={offset}-")
+    try:
+        response = urllib.request.urlopen(request, timeout=timeout)
+    except urllib.error.HTTPError as e:
+        total = (e.headers.get('Content-Range') or '').rpartition('/')[2]
+        if e.code == 416 and total.isdigit() and int(total) == offset:
+            return digest, offset, 0                # the partial file is already complete
+        if e.code == 416:
+            part.unlink()
+            raise DownloadError("server rejected the resume range") from e
+        raise
+
+    with response:
+        if offset and response.status == 206 and \
+                (response.headers.get('Content-Range') or '').startswith(f"bytes {offset}-"):
+            total = (response.headers['Content-Range']).rpartition('/')[2]
+            total = int(total) if total.isdigit() else None
+            mode = 'ab'
+        else:
+            # Fresh download, or the server ignored the range: start over
+            digest, offset, mode = hashlib.sha256(), 0, 'wb'
+            length = response.headers.get('Content-Length')
+            total = int(length) if length and length.isdigit() else None
+        received = 0
+        with open(part, mode) as f:
+            for block in iter(lambda: response.read(chunk_size), b''):
+                f.write(block)
+                digest.update(block)
+                received += len(block)
+    if total is not None and offset + received < total:
+        raise DownloadError(f"connection closed at {offset + received} of {total} bytes")
+    return digest, offset, received
+
+
+def fetch(url, destination, sha256=None, size=None, chunk_size=1 << 20, timeout=30, retries=3,
+          backoff_s=1.0):
+    """Download ``url`` to ``destination`` through a resumable ``.part`` file.
+
+    Returns ``{'bytes', 'resumed_at', 'sha256', 'seconds'}``. Raises
+    ``DownloadError`` for a URL that is not http(s), when the file is still
+    incomplete after ``retries`` retries, or when it does not match
+    ``sha256``/``size`` (the partial file is then discarded).
+    """
+    if urlparse(url).scheme not in ('http', 'https'):
+        raise DownloadError(f"{url}: not an http(s) URL")
+    destination = Path(destination)
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    part = destination.with_name(destination.name + '.part')
+    start = time.perf_counter()
+    resumed_at = part.stat().st_size if part.exists() else 0
+    received = 0
+    for attempt in range(retries + 1):
+        digest = hashlib.sha256()
+        if part.exists():
+            with open(part, 'rb') as f:
+                for block in iter(lambda: f.read(chunk_size), b''):
+                    digest.update(block)
+        try:
+            digest, offset, count = _transfer(url, part, digest, chunk_size, timeout)
+            received += count
+            if not offset:
+                resumed_at = 0                      # the server sent the whole file
+            break
+        except (DownloadError, urllib.error.URLError, OSError) as e:
+            if attempt == retries or not (isinstance(e, DownloadError) or _retriable(e)):
+                raise DownloadError(f"{url}: {e}") from e
+            time.sleep(backoff_s * 2 ** attempt)
+
+    actual_size = part.stat().st_size
+    value = digest.hexdigest()
+    if (size is not None and actual_size != size) or (sha256 and value != sha256.lower()):
+        part.unlink()
+        expected = f"sha256 {sha256}" if sha256 else f"{size} bytes"
+        raise DownloadError(f"{url}: verification failed (expected {expected}, "
+                            f"got sha256 {value}, {actual_size} bytes)")
+    os.replace(part, destination)
+    return {'bytes': received, 'resumed_at': resumed_at, 'sha256': value,
+            'seconds': time.perf_counter() - start}
+
+
+def extract_archive(archive, target):
+    """Unpack a zip/tar archive into ``target``; returns the number of members."""
+    target = Path(target)
+    target.mkdir(parents=True, exist_ok=True)
+    if str(archive).lower().endswith('.zip'):
+        with zipfile.ZipFile(archive) as zf:
+            zf.extractall(target)               # member paths are sanitized by zipfile
+            return len(zf.namelist())
+    with tarfile.open(archive) as tf:
+        members = tf.getmembers()
+        tf.extractall(target, members=members, filter='data')
+        return len(members)
+
+
+def load_state(download_dir):
+    path = Path(download_dir) / STATE_NAME
+    if not path.exists():
+        return {'files': {}}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_state(download_dir, state):
+    path = Path(download_dir) / STATE_NAME
+    tmp = path.with_suffix('.json.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=1)
+    os.replace(tmp, path)
+
+
+def _verified(entry, record, path):
+    """Whether ``path`` is the verified download ``record`` describes (re-hashes unknown files)."""
+    if not path.exists():
+        return None
+    if record and record.get('url') == entry['url'] and record.get('stat') == _stat(path) and \
+            (not entry['sha256'] or record.get('sha256') == entry['sha256']):
+        return record
+    if entry['sha256'] and file_sha256(path) == entry['sha256'] and \
+            (entry['size'] is None or path.stat().st_size == entry['size']):
+        # Already on disk (e.g. copied by hand) and intact
+        return {'url': entry['url'], 'file': path.name, 'stat': _stat(path), 'sha256': entry['sha256']}
+    return None
+
+
+def download_all(entries, download_dir, data_dir, workers=4, extract_workers=0, chunk_kb=1024,
+                 retries=3, timeout_s=30, extract=True, force=False, progress=None):
+    """Download, verify and extract manifest ``entries``; returns run statistics.
+
+    ``progress(event, entry, info)`` is called from the calling thread with
+    ``event`` one of ``'skipped'``, ``'downloaded'``, ``'extracted'`` or
+    ``'failed'``.
+    """
+    download_dir, data_dir = Path(download_dir), Path(data_dir)
+    download_dir.mkdir(parents=True, exist_ok=True)
+    state = {'files': {}} if force else load_state(download_dir)
+    files = state['files']
+    stats = {'total': len(entries), 'skipped': 0, 'downloaded': 0, 'resumed': 0, 'bytes': 0,
+             'extracted': 0, 'failed': []}
+    report = progress or (lambda event, entry, info: None)
+
+    def extract_target(entry):
+        if not extract or not entry['extract_to'] or not is_archive(entry['filename']):
+            return None
+        return data_dir / entry['extract_to']
+
+    downloads, extractions = {}, {}
+    extract_workers = extract_workers or os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool, \
+            ProcessPoolExecutor(max_workers=extract_workers) as extractor:
+
+        def schedule_extraction(entry):
+            target = extract_target(entry)
+            record = files[entry['name']]
+            if target is None or (record.get('extracted') == str(target) and target.is_dir()):
+                return
+            record.pop('extracted', None)
+            extractions[extractor.submit(extract_archive, str(download_dir / entry['filename']),
+                                         str(target))] = (entry, target)
+
+        for entry in entries:
+            path = download_dir / entry['filename']
+            if force:
+                path.with_name(path.name + '.part').unlink(missing_ok=True)
+            record = None if force else _verified(entry, files.get(entry['name']), path)
+            if record is not None:
+                files[entry['name']] = record
+                stats['skipped'] += 1
+                report('skipped', entry, record)
+                schedule_extraction(entry)
+                continue
+            future = pool.submit(fetch, entry['url'], path, sha256=entry['sha256'], size=entry['size'],
+                                 chunk_size=chunk_kb * 1024, timeout=timeout_s, retries=retries)
+            downloads[future] = entry
+        save_state(download_dir, state)
+
+        # Extract each archive as soon as it is verified, while the rest keep downloading
+        pending = set(downloads) | set(extractions)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in downloads:
+                    entry = downloads.pop(future)
+                    try:
+                        result = future.result()
+                    except DownloadError as e:
+                        files.pop(entry['name'], None)
+                        stats['failed'].append((entry['name'], str(e)))
+                        report('failed', entry, {'error': str(e)})
+                        continue
+                    path = download_dir / entry['filename']
+                    files[entry['name']] = {'url': entry['url'], 'file': entry['filename'],
+                                            'stat': _stat(path), 'sha256': result['sha256']}
+                    stats['downloaded'] += 1
+                    stats['resumed'] += bool(result['resumed_at'])
+                    stats['bytes'] += result['bytes']
+                    report('downloaded', entry, result)
+                    schedule_extraction(entry)
+                else:
+                    entry, target = extractions.pop(future)
+                    try:
+                        members = future.result()
+                    except (OSError, zipfile.BadZipFile, tarfile.TarError) as e:
+                        stats['failed'].append((entry['name'], f"extraction failed: {e}"))
+                        report('failed', entry, {'error': f"extraction failed: {e}"})
+                        continue
+                    files[entry['name']]['extracted'] = str(target)
+                    stats['extracted'] += 1
+                    report('extracted', entry, {'members': members, 'target': str(target)})
+                save_state(download_dir, state)         # a killed run resumes from here
+            pending |= set(extractions)
+    return stats
@@ -0,0 +1,225 @@
+"""
+Distillation and pruning to a smaller edge model
+================================================
+Produces a lighter tier of the deployed model for low-end hardware from the
+same data, in two optional stages:
+
+1. Distillation. A student with the teacher's architecture at
+   ``student_width`` x its channels (and ``student_depth`` x its blocks)
+   trains with the teacher's features as an extra target. This uses
+   ultralytics' ``distill_model``/``dis`` training arguments; older
+   releases without them fail up front with a clear error.
+2. Structured pruning. The output channels with the smallest BatchNorm
+   scale (``|gamma|``, "network slimming") are physically removed from every
+   conv whose output feeds exactly one other conv: the hidden conv of each
+   bottleneck and the stacked convs of the detection head. Then the model is
+   fine-tuned, again distilling from the teacher. Kept channel counts are
+   rounded to multiples of 8 so CPU kernels stay vectorized.
+
+``profile_model`` reports parameters, file size, CPU latency and validation
+mAP, so teacher and student can be compared side by side.
+"""
+
+import copy
+import time
+from pathlib import Path
+
+import numpy as np
+
+DEFAULT_DISTILL_CONFIG = {
+    'teacher': 'models/ppe_detection_4classes/best.pt',
+    'student_width': 0.5,        # channels relative to the teacher (null = teacher architecture, prune only)
+    'student_depth': 1.0,        # blocks relative to the teacher
+    'epochs': 50,
+    'distill_weight': 6.0,       # weight of the feature distillation loss (ultralytics `dis`)
+    'prune_ratio': 0.0,          # fraction of prunable channels removed (0 = no pruning)
+    'finetune_epochs': 10,       # training after pruning
+    'latency_runs': 50,          # timed CPU forward passes per model in the report
+}
+
+
+def student_cfg(teacher_yaml, width=0.5, depth=1.0):
+    """Model yaml dict of the teacher's architecture scaled by ``width``/``depth``."""
+    cfg = copy.deepcopy(teacher_yaml)
+    scales = cfg.pop('scales', None)
+    if scales:
+        d, w, max_channels = scales[cfg.get('scale') or next(iter(scales))]
+    else:
+        d, w = cfg.get('depth_multiple', 1.0), cfg.get('width_multiple', 1.0)
+        max_channels = cfg.get('max_channels', 1024)
+    cfg['scales'] = {'student': [d * depth, w * width, max_channels]}
+    cfg['scale'] = 'student'
+    cfg.pop('yaml_file', None)
+    return cfg
+
+
+def prunable_pairs(model):
+    """``(producer Conv, consumer)`` pairs where the producer's output feeds only the consumer."""
+    from torch import nn
+    from ultralytics.nn.modules import Bottleneck, Conv
+
+    def plain(module):
+        conv = module.conv if isinstance(module, Conv) else module
+        return isinstance(conv, nn.Conv2d) and conv.groups == 1
+
+    pairs = []
+    for module in model.modules():
+        if isinstance(module, Bottleneck) and plain(module.cv1) and plain(module.cv2):
+            pairs.append((module.cv1, module.cv2))
+        elif isinstance(module, nn.Sequential):
+            children = list(module)
+            for producer, consumer in zip(children, children[1:]):
+                if (isinstance(producer, Conv) and isinstance(consumer, (Conv, nn.Conv2d))
+                        and isinstance(producer.bn, nn.BatchNorm2d) and plain(producer) and plain(consumer)):
+                    pairs.append((producer, consumer))
+    return pairs
+
+
+def prune_channels(model, ratio, round_to=8):
+    """Remove the ``ratio`` least important channels of every prunable pair, in place.
+
+    Returns ``(channels before, channels after)`` over the pruned layers.
+    """
+    import torch
+    from torch import nn
+
+    before = after = 0
+    for producer, consumer in prunable_pairs(model):
+        conv, bn = producer.conv, producer.bn
+        channels = conv.out_channels
+        keep = max(round_to, int(np.ceil(channels * (1 - ratio) / round_to)) * round_to)
+        before += channels
+        if keep >= channels:
+            after += channels
+            continue
+        index = torch.argsort(bn.weight.detach().abs(), descending=True)[:keep].sort().values
+
+        conv.weight = nn.Parameter(conv.weight.detach()[index].clone())
+        if conv.bias is not None:
+            conv.bias = nn.Parameter(conv.bias.detach()[index].clone())
+        conv.out_channels = keep
+        bn.weight = nn.Parameter(bn.weight.detach()[index].clone())
+        bn.bias = nn.Parameter(bn.bias.detach()[index].clone())
+        bn.running_mean = bn.running_mean[index].clone()
+        bn.running_var = bn.running_var[index].clone()
+        bn.num_features = keep
+
+        target = consumer.conv if hasattr(consumer, 'conv') else consumer
+        target.weight = nn.Parameter(target.weight.detach()[:, index].clone())
+        target.in_channels = keep
+        after += keep
+    return before, after
+
+
+def model_trainer(model):
+    """``DetectionTrainer`` subclass that trains ``model`` as is instead of rebuilding it from its yaml.
+
+    Rebuilding would restore the unpruned channel counts and drop the pruned weights.
+    """
+    from ultralytics.models.yolo.detect import DetectionTrainer
+
+    class ModelTrainer(DetectionTrainer):
+        def get_model(self, cfg=None, weights=None, verbose=True):
+            return self.set_model_names_for_load(copy.deepcopy(model))
+
+    return ModelTrainer
+
+
+def check_distill_support():
+    """Raise if the installed ultralytics has no ``distill_model``/``dis`` train arguments."""
+    import ultralytics
+    from ultralytics.cfg import DEFAULT_CFG_DICT
+
+    missing = [k for k in ('distill_model', 'dis') if k not in DEFAULT_CFG_DICT]
+    if missing:
+        raise RuntimeError(f"ultralytics {ultralytics.__version__} does not support distillation "
+                           f"(no {'/'.join(missing)} training argument); upgrade ultralytics "
+                           f"(developed against 8.4.177)")
+
+
+def _train(model_or_cfg, data, out_dir, name, epochs, teacher, distill_weight, train_kwargs, trainer=None):
+    from ultralytics import YOLO
+
+    yolo = YOLO(model_or_cfg) if not isinstance(model_or_cfg, dict) else YOLO(_write_cfg(model_or_cfg, out_dir, name))
+    yolo.train(trainer=trainer, data=str(data), epochs=epochs, project=str(out_dir), name=name,
+               exist_ok=True, plots=False, distill_model=str(teacher) if teacher else None,
+               dis=distill_weight, **train_kwargs)
+    return Path(yolo.trainer.best)
+
+
+def _write_cfg(cfg, out_dir, name):
+    import yaml
+
+    path = Path(out_dir) / f"{name}.yaml"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        yaml.safe_dump(cfg, f, sort_keys=False)
+    return str(path)
+
+
+def compress(teacher, data, settings=None, out_dir='runs/distill', train_kwargs=None, log=print):
+    """Distill and/or prune ``teacher`` into a student; returns the student weights path.
+
+    ``settings`` overrides ``DEFAULT_DISTILL_CONFIG``; ``train_kwargs`` go to
+    ``model.train`` (batch, imgsz, device, augmentation, ...).
+    """
+    from ultralytics.nn.tasks import load_checkpoint
+
+    check_distill_support()
+    settings = {**DEFAULT_DISTILL_CONFIG, **(settings or {})}
+    train_kwargs = dict(train_kwargs or {})
+    train_kwargs.pop('epochs', None)
+    out_dir = Path(out_dir).resolve()
+    teacher = Path(teacher).resolve()
+    distill_weight = settings['distill_weight']
+
+    student = teacher
+    if settings['student_width']:
+        teacher_model = load_checkpoint(teacher)[0]
+        cfg = student_cfg(teacher_model.yaml, settings['student_width'], settings['student_depth'])
+        log(f"🎓 Distilling into a {settings['student_width']:g}x width student "
+            f"({settings['epochs']} epochs)")
+        student = _train(cfg, data, out_dir, 'student', settings['epochs'], teacher, distill_weight, train_kwargs)
+
+    if settings['prune_ratio']:
+        model = load_checkpoint(student)[0].float().requires_grad_(True)    # checkpoints are saved frozen
+        before, after = prune_channels(model, settings['prune_ratio'])
+        log(f"✂️  Pruned {before - after}/{before} channels; fine-tuning ({settings['finetune_epochs']} epochs)")
+        student = _train(str(student), data, out_dir, 'pruned', settings['finetune_epochs'], teacher,
+                         distill_weight, train_kwargs, trainer=model_trainer(model))
+    return student
+
+
+def profile_model(weights, data=None, imgsz=640, runs=50, device='cpu'):
+    """Parameters, file size, CPU latency and (with ``data``) validation mAP of a model."""
+    import torch
+    from ultralytics import YOLO
+
+    from src.utils.benchmark import latency_stats
+
+    model = YOLO(str(weights))
+    net = model.model
+    report = {
+        'weights': str(weights),
+        'params': sum(p.numel() for p in net.parameters()),
+        'size_mb': round(Path(weights).stat().st_size / (1024 * 1024), 2) if Path(weights).is_file() else None,
+    }
+
+    # Raw forward passes: the network cost, without pre/post-processing
+    inference = copy.deepcopy(net).to(device).float().eval()
+    inference = inference.fuse() if hasattr(inference, 'fuse') else inference
+    x = torch.rand(1, 3, imgsz, imgsz, device=device)
+    samples = []
+    with torch.inference_mode():
+        for i in range(runs + 5):
+            start = time.perf_counter()
+            inference(x)
+            if i >= 5:
+                samples.append(time.perf_counter() - start)
+    report['latency_ms'] = latency_stats(samples)
+
+    if data is not None:
+        metrics = model.val(data=str(data), imgsz=imgsz, device=device, plots=False, verbose=False)
+        report['map50'] = round(float(metrics.box.map50), 4)
+        report['map50_95'] = round(float(metrics.box.map), 4)
+    return report
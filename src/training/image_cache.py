@@ -0,0 +1,255 @@
+"""
+Memory-mapped training image cache
+==================================
+On a CPU-only training box most of an epoch goes to decoding JPEGs and
+resizing them, and ultralytics repeats that for every image in every epoch.
+The cache does it once:
+
+- ``build_cache`` decodes each train/val image across a process pool and
+  resizes it exactly as ultralytics' ``load_image`` would (longest side to
+  ``imgsz``). The pixels are appended to raw ``uint8`` shard files
+  (``shard_0000.bin``, ...), and ``index.json`` records each image's shard,
+  byte offset and shapes. Re-runs only add new or changed images.
+- ``ImageCache`` opens the shards as copy-on-write memmaps. ``get`` returns
+  an image as a view straight into the page cache, without decoding or
+  copying it.
+- ``attach`` puts those views into a ``YOLODataset``'s RAM-cache slots, and
+  ``cached_trainer`` builds a ``DetectionTrainer`` that attaches the cache to
+  its train and val datasets. Dataloader workers fork and share the pages.
+
+Images are stored at their resized shape rather than padded to a square,
+because YOLO labels are normalized to the image that ``load_image`` returns.
+The letterbox padding is still added per batch by the augmentation pipeline.
+"""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+INDEX_NAME = 'index.json'
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+DEFAULT_IMAGE_CACHE_CONFIG = {
+    'enabled': False,
+    'cache_dir': 'data/cache',   # relative to the project root
+    'shard_mb': 1024,            # start a new shard file after this many MB
+    'workers': 0,                # decode processes (0 = one per CPU)
+}
+
+
+def load_resized(path, imgsz):
+    """Decode ``path`` and resize its longest side to ``imgsz`` (ultralytics' rect resize)."""
+    import math
+
+    import cv2
+
+    im = cv2.imread(str(path), cv2.IMREAD_COLOR)
+    if im is None:
+        return None
+    h0, w0 = im.shape[:2]
+    r = imgsz / max(h0, w0)
+    if r != 1:
+        w, h = min(math.ceil(w0 * r), imgsz), min(math.ceil(h0 * r), imgsz)
+        im = cv2.resize(im, (w, h), interpolation=cv2.INTER_LINEAR)
+    return im, (h0, w0)
+
+
+def _load_star(args):
+    return load_resized(*args)
+
+
+def _stat(path):
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+
+def dataset_images(data_yaml, splits=('train', 'val')):
+    """Image files of the given splits of a YOLO ``data.yaml`` (dirs or ``.txt`` lists)."""
+    import yaml
+
+    data_yaml = Path(data_yaml)
+    with open(data_yaml, 'r') as f:
+        data = yaml.safe_load(f)
+    root = Path(data.get('path') or '.')
+    if not root.is_absolute():
+        root = data_yaml.parent / root
+    files = []
+    for split in splits:
+        entries = data.get(split) or []
+        for entry in [entries] if isinstance(entries, str) else entries:
+            source = root / entry
+            if source.is_dir():
+                files += sorted(p for p in source.rglob('*')
+                                if p.suffix.lower() in IMAGE_EXTENSIONS and p.is_file())
+            elif source.suffix == '.txt' and source.is_file():
+                lines = source.read_text().split()
+                files += [(source.parent / line).resolve() for line in lines]
+    return [p.resolve() for p in files]
+
+
+def _load_index(cache_dir):
+    path = Path(cache_dir) / INDEX_NAME
+    if not path.exists():
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _save_index(cache_dir, index):
+    path = Path(cache_dir) / INDEX_NAME
+    tmp = path.with_suffix('.json.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(index, f)
+    os.replace(tmp, path)
+
+
+def build_cache(image_files, cache_dir, imgsz=640, shard_mb=1024, workers=None,
+                force=False, progress=None):
+    """Decode, resize and pack ``image_files`` into ``cache_dir``.
+
+    Images already in the cache with the same size/mtime are kept; changed
+    ones are appended again. Shards are rewritten from scratch when ``imgsz``
+    changes, with ``force``, or once stale bytes exceed half of the cache.
+    Returns ``{'cached', 'added', 'errors', 'size_mb'}``.
+    """
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    files = [str(Path(p).resolve()) for p in image_files]
+    stats = {f: _stat(f) for f in files}
+
+    index = None if force else _load_index(cache_dir)
+    if index is not None and index['imgsz'] == imgsz:
+        kept = {f: e for f, e in index['images'].items() if f in stats and e['stat'] == stats[f]}
+        live = sum(e['nbytes'] for e in kept.values())
+        total = sum(s['nbytes'] for s in index['shards'])
+        if total and live < total / 2:
+            index = None
+    else:
+        index = None
+    if index is None:
+        for path in cache_dir.glob('shard_*.bin'):
+            path.unlink()
+        index, kept = {'imgsz': imgsz, 'shards': [], 'images': {}}, {}
+    index['images'] = kept
+
+    todo = [f for f in files if f not in kept]
+    added = errors = 0
+    if todo:
+        workers = workers or os.cpu_count() or 1
+        executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 and len(todo) > 1 else None
+        shard = out = None
+        try:
+            jobs = [(f, imgsz) for f in todo]
+            if executor is not None:
+                results = executor.map(_load_star, jobs, chunksize=max(1, len(jobs) // (workers * 8)))
+            else:
+                results = map(_load_star, jobs)
+            for done, (path, result) in enumerate(zip(todo, results), 1):
+                if result is None:
+                    errors += 1
+                else:
+                    im, (h0, w0) = result
+                    if shard is None or shard['nbytes'] + im.nbytes > shard_mb * 1024 * 1024:
+                        if out is not None:
+                            out.close()
+                        shard = {'file': f"shard_{len(index['shards']):04d}.bin", 'nbytes': 0}
+                        index['shards'].append(shard)
+                        out = open(cache_dir / shard['file'], 'wb')
+                    out.write(np.ascontiguousarray(im).data)
+                    kept[path] = {'shard': len(index['shards']) - 1, 'offset': shard['nbytes'],
+                                  'shape': list(im.shape), 'hw0': [h0, w0], 'nbytes': im.nbytes,
+                                  'stat': stats[path]}
+                    shard['nbytes'] += im.nbytes
+                    added += 1
+                if progress is not None:
+                    progress(done, len(todo))
+        finally:
+            if out is not None:
+                out.close()
+            if executor is not None:
+                executor.shutdown()
+    _save_index(cache_dir, index)
+
+    return {'cached': len(kept), 'added': added, 'errors': errors,
+            'size_mb': sum(s['nbytes'] for s in index['shards']) / (1024 * 1024)}
+
+
+class ImageCache:
+    """Read side of a cache built by ``build_cache``."""
+
+    def __init__(self, cache_dir):
+        self.cache_dir = Path(cache_dir)
+        index = _load_index(self.cache_dir)
+        if index is None:
+            raise FileNotFoundError(f"No image cache in {self.cache_dir} (run build_cache first)")
+        self.imgsz = index['imgsz']
+        self._shard_files = [s['file'] for s in index['shards']]
+        self._images = index['images']
+        self._shards = {}
+
+    def __len__(self):
+        return len(self._images)
+
+    def __contains__(self, path):
+        return str(Path(path).resolve()) in self._images
+
+    def __getstate__(self):
+        # Memmaps are reopened lazily instead of being pickled as copies
+        state = dict(self.__dict__)
+        state['_shards'] = {}
+        return state
+
+    def _shard(self, i):
+        shard = self._shards.get(i)
+        if shard is None:
+            # Copy-on-write: an in-place augmentation never reaches the file
+            shard = self._shards[i] = np.memmap(self.cache_dir / self._shard_files[i],
+                                                dtype=np.uint8, mode='c')
+        return shard
+
+    def get(self, path):
+        """``(image, (h0, w0), (h, w))`` for an image file, or None if not cached."""
+        entry = self._images.get(str(Path(path).resolve()))
+        if entry is None:
+            return None
+        im = self._shard(entry['shard'])[entry['offset']:entry['offset'] + entry['nbytes']]
+        im = im.reshape(entry['shape'])
+        return im, tuple(entry['hw0']), tuple(entry['shape'][:2])
+
+    def attach(self, dataset):
+        """Serve a ``YOLODataset``'s images from the cache; returns the number served.
+
+        Cached images fill the dataset's RAM-cache slots, so ``load_image``
+        returns them directly. Images missing from the cache are still decoded
+        as usual. A dataset at a different ``imgsz`` is left untouched.
+        """
+        if dataset.imgsz != self.imgsz or getattr(dataset, 'channels', 3) != 3:
+            return 0
+        hits = 0
+        for i, path in enumerate(dataset.im_files):
+            cached = self.get(path)
+            if cached is not None:
+                dataset.ims[i], dataset.im_hw0[i], dataset.im_hw[i] = cached
+                hits += 1
+        if hits:
+            # In RAM mode load_image never evicts slots from its mosaic buffer
+            dataset.cache = 'ram'
+        return hits
+
+
+def cached_trainer(cache):
+    """``DetectionTrainer`` subclass whose train/val datasets read from ``cache``."""
+    from ultralytics.models.yolo.detect import DetectionTrainer
+    from ultralytics.utils import LOGGER
+
+    class CachedDetectionTrainer(DetectionTrainer):
+        def build_dataset(self, img_path, mode='train', batch=None):
+            dataset = super().build_dataset(img_path, mode, batch)
+            hits = cache.attach(dataset)
+            LOGGER.info(f"Image cache: {hits}/{len(dataset.im_files)} {mode} images memory-mapped")
+            return dataset
+
+    return CachedDetectionTrainer
@@ -0,0 +1,280 @@
+"""
+Hyperparameter sweep with successive halving
+============================================
+Samples ``trials`` configurations from a search space over config.yaml keys
+(``training.learning_rate``, ``augmentation.mosaic``, ...) and trains them in
+parallel worker processes. Each trial gets ``threads_per_trial`` CPU threads.
+
+Trials are pruned early by successive halving. All trials train for the
+first rung's ``min_epochs``. Only the best ``1/eta`` by validation mAP move
+on to the next rung, which has ``eta`` times the epochs, and so on up to
+``max_epochs``. A promoted trial continues from its last weights instead of
+starting over, and it is ranked by the validation of those same weights
+(the final epoch), not by ultralytics' best.pt. Most of the compute
+therefore goes to the few configurations that are still competitive.
+
+After every rung the ranked table is rewritten to ``results.csv`` (and
+``results.json``), so a sweep cut short still leaves its results behind.
+"""
+
+import copy
+import csv
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from multiprocessing import get_context
+from pathlib import Path
+
+import numpy as np
+
+METRICS = ('map50', 'map50_95')
+
+DEFAULT_SWEEP_CONFIG = {
+    'trials': 9,
+    'threads_per_trial': 4,
+    'parallel': 0,               # concurrent trials (0 = CPU count // threads_per_trial)
+    'min_epochs': 3,             # epochs of the first rung
+    'max_epochs': 27,            # epochs of the last rung
+    'eta': 3,                    # keep the best 1/eta trials per rung
+    'metric': 'map50_95',        # or map50
+    'max_hours': 10.0,           # no new rung starts after this (0 = no limit)
+    'optimizer': 'SGD',          # ultralytics' 'auto' optimizer ignores the learning rate
+    'seed': 0,
+    'space': {
+        'training.learning_rate': {'low': 0.001, 'high': 0.02, 'log': True},
+        'training.batch_size': [8, 16, 32],
+    },
+}
+
+
+def sample_space(space, trials, seed=0):
+    """``trials`` parameter dicts: lists are choices, ``{low, high, log}`` are ranges."""
+    rng = np.random.default_rng(seed)
+    samples = []
+    for _ in range(trials):
+        params = {}
+        for key, spec in space.items():
+            if isinstance(spec, dict):
+                low, high = float(spec['low']), float(spec['high'])
+                if spec.get('log'):
+                    value = float(np.exp(rng.uniform(np.log(low), np.log(high))))
+                else:
+                    value = float(rng.uniform(low, high))
+                params[key] = int(round(value)) if spec.get('int') else round(value, 6)
+            else:
+                params[key] = spec[int(rng.integers(len(spec)))]
+        samples.append(params)
+    return samples
+
+
+def apply_params(config, params):
+    """Copy of ``config`` with dotted keys (``training.batch_size``) overridden."""
+    config = copy.deepcopy(config)
+    for key, value in params.items():
+        section = config
+        *parents, name = key.split('.')
+        for parent in parents:
+            section = section.setdefault(parent, {})
+        section[name] = value
+    return config
+
+
+def rung_budgets(min_epochs, max_epochs, eta=3):
+    """Cumulative epochs per rung: ``min_epochs * eta**k``, capped by ``max_epochs``."""
+    budgets = [int(min_epochs)]
+    while budgets[-1] < max_epochs:
+        budgets.append(min(int(max_epochs), budgets[-1] * int(eta)))
+    return budgets
+
+
+def train_args(config):
+    """``model.train`` keyword arguments for a config.yaml dict."""
+    training = config['training']
+    args = {
+        'epochs': training['epochs'],
+        'batch': training['batch_size'],
+        'lr0': training['learning_rate'],
+        'patience': training['patience'],
+        'device': training['device'],
+        'workers': training['workers'],
+        'imgsz': config['model']['input_size'],
+    }
+    args.update(config.get('augmentation') or {})
+    return args
+
+
+def _init_worker(threads):
+    # Before torch/ultralytics are imported in this (spawned) process
+    for var in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS'):
+        os.environ[var] = str(threads)
+    os.environ.setdefault('YOLO_VERBOSE', 'False')
+
+
+def last_epoch_metrics(results_csv):
+    """Metrics of the final epoch in ultralytics' ``results.csv`` - the weights in last.pt."""
+    with open(results_csv, newline='') as f:
+        rows = list(csv.DictReader(f))
+    if not rows:
+        return {}
+    return {key.strip(): float(value) for key, value in rows[-1].items() if value.strip()}
+
+
+def run_trial(job):
+    """Train one trial up to its rung's epochs; returns its metrics and weights."""
+    import torch
+    from ultralytics import YOLO
+
+    torch.set_num_threads(job['threads'])
+    config = apply_params(job['config'], job['params'])
+    args = train_args(config)
+    args['workers'] = min(args['workers'], job['threads'])
+    args['epochs'] = job['epochs']
+    if job['weights']:
+        args['warmup_epochs'] = 0           # continuing: no second warm-up
+    if job.get('optimizer'):
+        args['optimizer'] = job['optimizer']
+
+    trainer = None
+    if job.get('cache_dir'):
+        from src.training.image_cache import ImageCache, cached_trainer
+        trainer = cached_trainer(ImageCache(job['cache_dir']))
+
+    start = time.perf_counter()
+    model = YOLO(job['weights'] or job['model'])
+    model.train(trainer=trainer, data=job['data'], project=job['project'], name=job['name'],
+                exist_ok=True, plots=False, seed=job['seed'], **args)
+    # A promoted trial continues from last.pt, so score last.pt. After training
+    # trainer.metrics holds the validation of best.pt instead.
+    results_csv = Path(model.trainer.csv)
+    metrics = last_epoch_metrics(results_csv) if results_csv.exists() else model.trainer.metrics or {}
+    return {
+        'map50': float(metrics.get('metrics/mAP50(B)', 0.0)),
+        'map50_95': float(metrics.get('metrics/mAP50-95(B)', 0.0)),
+        'weights': str(model.trainer.last),
+        'best_weights': str(model.trainer.best),
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def successive_halving(trials, evaluate, budgets, eta=3, parallel=1, metric='map50_95',
+                       deadline=None, on_result=None, on_rung=None):
+    """Run ``trials`` (dicts with ``id`` and ``params``) through the rungs of ``budgets``.
+
+    ``evaluate(trial, epochs)`` trains a trial up to ``epochs`` (continuing
+    from ``trial['weights']``) and returns a result dict with ``metric``; up
+    to ``parallel`` calls run at once. Each trial ends up with ``status``
+    'complete', 'pruned', 'stopped' (deadline) or 'failed'. Returns the
+    trials ranked best first.
+    """
+    for trial in trials:
+        trial.update({'epochs': 0, 'rung': -1, 'score': None, 'weights': None,
+                      'seconds': 0.0, 'status': 'running'})
+    alive = list(trials)
+    pool = ThreadPoolExecutor(max_workers=parallel) if parallel > 1 else None
+    try:
+        for rung, epochs in enumerate(budgets):
+            if pool is not None:
+                futures = {pool.submit(evaluate, trial, epochs): trial for trial in alive}
+                outcomes = ((futures[f], f.result) for f in as_completed(futures))
+            else:
+                outcomes = ((t, lambda t=t: evaluate(t, epochs)) for t in alive)
+            for trial, result in outcomes:
+                try:
+                    result = result()
+                except Exception as e:
+                    trial.update({'status': 'failed', 'error': f"{type(e).__name__}: {e}"})
+                else:
+                    trial.update(result)
+                    trial.update({'epochs': epochs, 'rung': rung, 'score': result[metric]})
+                if on_result is not None:
+                    on_result(trial)
+
+            alive = [t for t in alive if t['status'] != 'failed']
+            alive.sort(key=lambda t: t['score'], reverse=True)
+            last = rung == len(budgets) - 1
+            keep = len(alive) if last else max(1, len(alive) // eta)
+            for trial in alive[keep:]:
+                trial['status'] = 'pruned'
+            alive = alive[:keep]
+            stop = not last and deadline is not None and time.time() >= deadline
+            if last or stop:
+                for trial in alive:
+                    trial['status'] = 'complete' if last else 'stopped'
+            if on_rung is not None:
+                on_rung(rung, epochs, rank_trials(trials))
+            if stop:
+                break
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return rank_trials(trials)
+
+
+def rank_trials(trials):
+    """Furthest rung first, then by score (failed trials last)."""
+    return sorted(trials, key=lambda t: (t['status'] != 'failed', t['rung'],
+                                         -math.inf if t['score'] is None else t['score']),
+                  reverse=True)
+
+
+def write_results(ranked, out_dir, metric='map50_95'):
+    """Ranked ``results.csv`` and ``results.json`` in ``out_dir``."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    keys = sorted({key for trial in ranked for key in trial['params']})
+    with open(out_dir / 'results.csv', 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['rank', 'trial', 'status', 'epochs', metric, *[m for m in METRICS if m != metric],
+                         'train_s', *keys, 'weights'])
+        for rank, trial in enumerate(ranked, 1):
+            writer.writerow([rank, trial['id'], trial['status'], trial['epochs'],
+                             *[trial.get(metric), *[trial.get(m) for m in METRICS if m != metric]],
+                             round(trial['seconds'], 1), *[trial['params'].get(k) for k in keys],
+                             trial.get('best_weights') or ''])
+    with open(out_dir / 'results.json', 'w') as f:
+        json.dump({'metric': metric, 'trials': ranked}, f, indent=2, default=str)
+
+
+def run_sweep(data_yaml, config, settings=None, model='yolov8n.pt', out_dir='runs/sweep',
+              cache_dir=None, on_result=None, on_rung=None):
+    """Sample, train and prune a sweep; returns the ranked trials.
+
+    ``settings`` overrides ``DEFAULT_SWEEP_CONFIG`` (the ``sweep`` section).
+    ``cache_dir`` is a built ``src.training.image_cache`` directory to train from.
+    """
+    settings = {**DEFAULT_SWEEP_CONFIG, **(settings or {})}
+    out_dir = Path(out_dir).resolve()
+    threads = max(1, int(settings['threads_per_trial']))
+    parallel = settings['parallel'] or max(1, (os.cpu_count() or 1) // threads)
+    trials = [{'id': i, 'params': params}
+              for i, params in enumerate(sample_space(settings['space'], settings['trials'], settings['seed']))]
+    budgets = rung_budgets(settings['min_epochs'], settings['max_epochs'], settings['eta'])
+    deadline = time.time() + settings['max_hours'] * 3600 if settings['max_hours'] else None
+
+    base_job = {'config': config, 'data': str(Path(data_yaml).resolve()), 'model': model,
+                'threads': threads, 'project': str(out_dir), 'seed': settings['seed'],
+                'optimizer': settings['optimizer'],
+                'cache_dir': str(cache_dir) if cache_dir else None}
+
+    def evaluate(trial, epochs):
+        job = dict(base_job, params=trial['params'], weights=trial['weights'], epochs=epochs - trial['epochs'],
+                   name=f"trial_{trial['id']:03d}_e{epochs}")
+        result = executor.submit(run_trial, job).result()
+        result['seconds'] += trial['seconds']
+        return result
+
+    def rung_done(rung, epochs, ranked):
+        write_results(ranked, out_dir, settings['metric'])
+        if on_rung is not None:
+            on_rung(rung, epochs, ranked)
+
+    # One fresh process per trial run: clean thread settings and no memory carried over
+    executor = ProcessPoolExecutor(max_workers=parallel, mp_context=get_context('spawn'),
+                                   initializer=_init_worker, initargs=(threads,), max_tasks_per_child=1)
+    try:
+        return successive_halving(trials, evaluate, budgets, settings['eta'], parallel, settings['metric'],
+                                  deadline=deadline, on_result=on_result, on_rung=rung_done)
+    finally:
+        executor.shutdown()
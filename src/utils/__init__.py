@@ -1,6 +1,5 @@
 """Utility functions for Edge Safety Monitor"""
 
-from .logger import setup_logger
-
-__all__ = ['setup_logger']
+from .logger import configure_logging, get_logger, setup_logger
 
+__all__ = ['setup_logger', 'configure_logging', 'get_logger']
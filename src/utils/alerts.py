@@ -0,0 +1,291 @@
+"""
+Non-blocking alert dispatcher
+=============================
+The frame loop calls ``AlertDispatcher.submit(alert)``, which is a
+``put_nowait`` on a bounded queue and never waits on the network (when the
+queue is full the alert is counted as dropped). One background thread does
+everything else:
+
+- **Coalescing** - the first alert for a camera goes out immediately; repeats
+  within ``coalesce_window_s`` are gathered into a single digest sent when
+  the window closes.
+- **Rate limiting** - a token bucket (``rate_limit_per_min``) caps deliveries;
+  when it is empty, alerts wait in the camera's digest instead of flooding.
+- **Retries** - each sink is retried independently with exponential backoff,
+  so a failing webhook never re-sends console or email alerts.
+
+Sinks are pluggable: anything with ``send(alerts)`` (a list of alert dicts,
+one for a single alert, several for a digest) can be registered with
+``register_sink``. Built in: ``console``, ``log``, ``email`` (SMTP) and
+``webhook`` (JSON POST).
+"""
+
+import heapq
+import json
+import logging
+import queue
+import smtplib
+import threading
+import time
+import urllib.request
+from datetime import datetime
+from email.message import EmailMessage
+
+from src.utils.logger import get_logger
+
+DEFAULT_ALERTS_CONFIG = {
+    'max_queue': 256,            # alerts buffered before new ones are dropped
+    'coalesce_window_s': 30.0,   # repeats per camera within this window -> one digest
+    'rate_limit_per_min': 20,    # deliveries per minute across all cameras
+    'max_retries': 3,            # per sink, per delivery
+    'retry_backoff_s': 2.0,      # first retry delay (doubles each attempt)
+}
+
+SINKS = {}
+
+
+def register_sink(name, factory):
+    """Register ``factory(settings)`` -> sink for ``alerts.methods`` entry ``name``."""
+    SINKS[name] = factory
+
+
+def format_alert(alert):
+    """One-line human readable description of an alert."""
+    when = datetime.fromtimestamp(alert['timestamp']).strftime('%Y-%m-%d %H:%M:%S')
+    who = f" (worker {alert['track_id']})" if alert.get('track_id') is not None else ""
+    return (f"{alert['type'].replace('_', '-').upper()}{who} on camera {alert['camera']} "
+            f"at {when} ({alert['confidence'] * 100:.0f}% confidence)")
+
+
+def format_batch(alerts):
+    """Subject and body for a single alert or a digest."""
+    if len(alerts) == 1:
+        return f"Safety violation: {format_alert(alerts[0])}", format_alert(alerts[0])
+    counts = {}
+    for alert in alerts:
+        counts[alert['type']] = counts.get(alert['type'], 0) + 1
+    summary = ", ".join(f"{kind.replace('_', '-')} x{n}" for kind, n in sorted(counts.items()))
+    subject = f"Safety digest: {len(alerts)} violations on camera {alerts[0]['camera']} ({summary})"
+    return subject, "\n".join(format_alert(a) for a in alerts)
+
+
+class ConsoleSink:
+    def send(self, alerts):
+        subject, body = format_batch(alerts)
+        get_logger('edge_safety_monitor.alerts').warning(
+            f"🚨 {subject}" if len(alerts) > 1 else f"🚨 {body}")
+
+
+class LogSink:
+    def __init__(self, logger_name='edge_safety_monitor.alerts'):
+        self.logger = logging.getLogger(logger_name)
+
+    def send(self, alerts):
+        for alert in alerts:
+            self.logger.warning(format_alert(alert))
+
+
+class EmailSink:
+    def __init__(self, smtp_server, smtp_port=587, sender=None, password=None, recipients=(),
+                 use_tls=True, timeout_s=10.0):
+        self.smtp_server = smtp_server
+        self.smtp_port = smtp_port
+        self.sender = sender
+        self.password = password
+        self.recipients = list(recipients)
+        self.use_tls = use_tls
+        self.timeout_s = timeout_s
+
+    def send(self, alerts):
+        subject, body = format_batch(alerts)
+        message = EmailMessage()
+        message['Subject'] = subject
+        message['From'] = self.sender
+        message['To'] = ", ".join(self.recipients)
+        message.set_content(body)
+        with smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=self.timeout_s) as smtp:
+            if self.use_tls:
+                smtp.starttls()
+            if self.password:
+                smtp.login(self.sender, self.password)
+            smtp.send_message(message)
+
+
+class WebhookSink:
+    def __init__(self, url, timeout_s=5.0, headers=None):
+        self.url = url
+        self.timeout_s = timeout_s
+        self.headers = dict(headers or {})
+
+    def send(self, alerts):
+        subject, _ = format_batch(alerts)
+        payload = json.dumps({'summary': subject, 'alerts': alerts}).encode()
+        request = urllib.request.Request(self.url, data=payload, method='POST',
+                                         headers={'Content-Type': 'application/json', **self.headers})
+        with urllib.request.urlopen(request, timeout=self.timeout_s) as response:
+            response.read()
+
+
+register_sink('console', lambda settings: ConsoleSink())
+register_sink('log', lambda settings: LogSink())
+register_sink('email', lambda settings: EmailSink(**{
+    k: v for k, v in (settings.get('email') or {}).items()
+    if k in ('smtp_server', 'smtp_port', 'sender', 'password', 'recipients', 'use_tls', 'timeout_s')}))
+register_sink('webhook', lambda settings: WebhookSink(**{
+    k: v for k, v in (settings.get('webhook') or {}).items() if k in ('url', 'timeout_s', 'headers')}))
+
+
+class AlertDispatcher:
+    """Delivers alerts to sinks from a background thread (see module docstring)."""
+
+    def __init__(self, sinks, max_queue=256, coalesce_window_s=30.0, rate_limit_per_min=20,
+                 max_retries=3, retry_backoff_s=2.0):
+        self.sinks = dict(sinks)
+        self.coalesce_window_s = coalesce_window_s
+        self.rate_per_s = rate_limit_per_min / 60.0 if rate_limit_per_min else None
+        self.burst = max(1, int(rate_limit_per_min or 1))
+        self.max_retries = max_retries
+        self.retry_backoff_s = retry_backoff_s
+        self.stats = {'submitted': 0, 'dropped': 0, 'deliveries': 0, 'coalesced': 0,
+                      'sent': 0, 'failed': 0, 'retries': 0}
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._tokens = float(self.burst)
+        self._tokens_at = time.monotonic()
+        self._last_sent = {}      # camera -> monotonic time of last delivery
+        self._digests = {}        # camera -> alerts waiting for the window to close
+        self._retries = []        # heap of (due, seq, sink name, alerts, attempt)
+        self._seq = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def from_config(cls, config=None):
+        """Build from the ``alerts`` section of config.yaml (unknown methods are skipped)."""
+        settings = dict(DEFAULT_ALERTS_CONFIG)
+        settings.update((config or {}).get('alerts') or {})
+        sinks = {}
+        for method in settings.get('methods') or ['console']:
+            factory = SINKS.get(method)
+            if factory is None:
+                get_logger('edge_safety_monitor.alerts').warning(
+                    "No alert sink for method %r - skipped", method)
+                continue
+            sinks[method] = factory(settings)
+        return cls(sinks, **{k: settings[k] for k in DEFAULT_ALERTS_CONFIG})
+
+    def queue_depth(self):
+        """Alerts waiting in the queue (for ``HealthProbe.register_queue``)."""
+        return self._queue.qsize()
+
+    def submit(self, alert):
+        """Queue an alert without blocking; returns False if it had to be dropped."""
+        self.stats['submitted'] += 1
+        try:
+            self._queue.put_nowait(alert)
+            return True
+        except queue.Full:
+            self.stats['dropped'] += 1
+            return False
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='alert-dispatcher', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=5.0):
+        """Stop the worker after flushing queued alerts and open digests."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def _run(self):
+        while True:
+            stopping = self._stop.is_set()
+            try:
+                alert = self._queue.get(timeout=self._wait_time())
+                self._accept(alert, time.monotonic())
+                while True:      # drain whatever else is already queued
+                    self._accept(self._queue.get_nowait(), time.monotonic())
+            except queue.Empty:
+                pass
+            self._flush(time.monotonic(), force=stopping)
+            if stopping:
+                break
+
+    def _wait_time(self):
+        if self._stop.is_set():
+            return 0.01
+        waits = [0.5]
+        now = time.monotonic()
+        if self._retries:
+            waits.append(self._retries[0][0] - now)
+        for camera in self._digests:
+            waits.append(self._last_sent.get(camera, 0.0) + self.coalesce_window_s - now)
+        return max(0.01, min(waits))
+
+    def _accept(self, alert, now):
+        camera = alert.get('camera')
+        last = self._last_sent.get(camera)
+        if camera not in self._digests and (last is None or now - last >= self.coalesce_window_s) \
+                and self._take_token(now):
+            self._last_sent[camera] = now
+            self._deliver([alert], now)
+        else:
+            self._digests.setdefault(camera, []).append(alert)
+            self.stats['coalesced'] += 1
+
+    def _flush(self, now, force=False):
+        for camera in list(self._digests):
+            last = self._last_sent.get(camera, 0.0)
+            if (force or now - last >= self.coalesce_window_s) and (force or self._take_token(now)):
+                self._last_sent[camera] = now
+                self._deliver(self._digests.pop(camera), now)
+
+        while self._retries and (force or self._retries[0][0] <= now):
+            _, _, name, alerts, attempt = heapq.heappop(self._retries)
+            self.stats['retries'] += 1
+            self._send(name, alerts, attempt, now)
+
+    def _take_token(self, now):
+        if self.rate_per_s is None:
+            return True
+        self._tokens = min(self.burst, self._tokens + (now - self._tokens_at) * self.rate_per_s)
+        self._tokens_at = now
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return True
+        return False
+
+    def _deliver(self, alerts, now):
+        self.stats['deliveries'] += 1
+        for name in self.sinks:
+            self._send(name, alerts, 0, now)
+
+    def _send(self, name, alerts, attempt, now):
+        try:
+            self.sinks[name].send(alerts)
+            self.stats['sent'] += 1
+        except Exception as error:   # a broken sink must never kill the dispatcher
+            if attempt < self.max_retries and not self._stop.is_set():
+                self._seq += 1
+                due = now + self.retry_backoff_s * (2 ** attempt)
+                heapq.heappush(self._retries, (due, self._seq, name, alerts, attempt + 1))
+            else:
+                self.stats['failed'] += 1
+                get_logger('edge_safety_monitor.alerts').error("Alert sink %r failed: %s", name, error)
+
+
+def make_alert(violation, camera):
+    """Alert dict for a raised violation from ``SafetyMonitor``."""
+    return {
+        'camera': camera,
+        'type': violation['type'],
+        'track_id': violation.get('track_id'),
+        'confidence': round(float(violation['confidence']), 4),
+        'box': violation.get('box'),
+        'timestamp': time.time(),
+    }
@@ -0,0 +1,278 @@
+"""
+Benchmark helpers for Edge Safety Monitor
+=========================================
+Deterministic synthetic media, a stub detection model and timing/memory
+statistics used by ``scripts/benchmark.py`` and the performance tests.
+Nothing here touches the network or the GPU.
+"""
+
+import json
+import os
+import platform
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Class names of the PPE detection model
+STUB_CLASS_NAMES = {
+    0: 'Hardhat', 1: 'Mask', 2: 'NO-Hardhat', 3: 'NO-Mask', 4: 'NO-Safety Vest',
+    5: 'Person', 6: 'Safety Cone', 7: 'Safety Vest', 8: 'machinery', 9: 'vehicle',
+}
+
+
+def stub_detections(width=640, height=480, num_workers=6, seed=0):
+    """Fixed (N, 6) ``[x1, y1, x2, y2, conf, cls]`` detections for a crowded scene.
+
+    Every worker gets a person box plus head and torso PPE boxes (positive or
+    negative), and the scene contains a few cones and one machine.
+    """
+    rng = np.random.default_rng(seed)
+    rows = []
+    box_w, box_h = width / 10, height / 3
+    for i in range(num_workers):
+        x1 = (i + 0.5) * width / (num_workers + 1)
+        y1 = height / 3 + rng.uniform(-20, 20)
+        conf = rng.uniform(0.55, 0.95, size=3)
+        rows.append([x1, y1, x1 + box_w, y1 + box_h, conf[0], 5])
+        head_cls = 0 if i % 3 else 2
+        rows.append([x1 + box_w * 0.25, y1, x1 + box_w * 0.75, y1 + box_h * 0.2, conf[1], head_cls])
+        vest_cls = 7 if i % 2 else 4
+        rows.append([x1, y1 + box_h * 0.3, x1 + box_w, y1 + box_h * 0.6, conf[2], vest_cls])
+    for i in range(3):
+        x1 = 20 + i * 60
+        rows.append([x1, height - 80, x1 + 30, height - 30, 0.8, 6])
+    rows.append([width * 0.6, 30, width * 0.95, height * 0.3, 0.9, 8])
+    return np.asarray(rows, dtype=np.float32)
+
+
+class StubModel:
+    """Stand-in for ``YOLO`` that returns fixed detections without a network.
+
+    It produces real ``ultralytics`` ``Results`` objects, so everything
+    downstream of inference (tallying, plotting, banners) runs exactly as in
+    production and only the network forward pass is removed.
+    """
+
+    def __init__(self, detections=None, names=None):
+        self.names = dict(names or STUB_CLASS_NAMES)
+        self.detections = stub_detections() if detections is None else \
+            np.asarray(detections, dtype=np.float32)
+
+    def __call__(self, source, conf=0.25, verbose=False, **kwargs):
+        import torch
+        from ultralytics.engine.results import Results
+
+        data = torch.from_numpy(self.detections[self.detections[:, 4] >= conf])
+        sources = source if isinstance(source, (list, tuple)) else [source]
+        return [Results(orig_img=img, path='', names=self.names, boxes=data.clone())
+                for img in sources]
+
+
+def create_synthetic_frame(index=0, width=640, height=480, seed=0):
+    """Create a deterministic construction-scene-like frame.
+
+    Workers are drawn as coloured rectangles (with a yellow "hardhat" on
+    some of them) that drift across a textured background, so consecutive
+    frames differ the way real footage does while every run is identical.
+    """
+    import cv2
+
+    rng = np.random.default_rng(seed)
+
+    # Static background: ground gradient plus fixed noise texture
+    gradient = np.linspace(90, 170, height, dtype=np.float32)[:, None, None]
+    noise = rng.integers(0, 25, size=(height, width, 1), dtype=np.uint8)
+    img = np.broadcast_to(gradient, (height, width, 3)).astype(np.uint8) + noise
+
+    # Moving "workers" - positions depend only on seed and frame index
+    num_workers = 4
+    starts = rng.integers(0, width, size=num_workers)
+    speeds = rng.integers(2, 8, size=num_workers)
+    colors = rng.integers(0, 255, size=(num_workers, 3))
+    box_w = max(width // 12, 8)
+    box_h = max(height // 4, 16)
+    for i in range(num_workers):
+        x = int((starts[i] + speeds[i] * index) % max(width - box_w, 1))
+        y = int(height // 3 + (i * height // 10) % max(height // 3, 1))
+        color = tuple(int(c) for c in colors[i])
+        cv2.rectangle(img, (x, y), (x + box_w, y + box_h), color, -1)
+        if i % 2 == 0:
+            cv2.rectangle(img, (x, y - box_h // 6), (x + box_w, y), (0, 220, 255), -1)
+
+    cv2.putText(img, f'Frame {index}', (10, 25), cv2.FONT_HERSHEY_SIMPLEX,
+                0.7, (255, 255, 255), 2)
+    return img
+
+
+def create_synthetic_video(path, num_frames=300, width=640, height=480, fps=30, seed=0):
+    """Write a deterministic synthetic video and return its path."""
+    import cv2
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+    writer = cv2.VideoWriter(str(path), fourcc, fps, (width, height))
+    if not writer.isOpened():
+        raise RuntimeError(f"Could not open video writer for {path}")
+
+    for index in range(num_frames):
+        writer.write(create_synthetic_frame(index, width, height, seed))
+    writer.release()
+    return path
+
+
+def create_synthetic_images(directory, count=20, width=640, height=480, seed=0):
+    """Write ``count`` deterministic synthetic JPEG images and return their paths."""
+    import cv2
+
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for index in range(count):
+        path = directory / f"synthetic_{index:04d}.jpg"
+        cv2.imwrite(str(path), create_synthetic_frame(index * 7, width, height, seed))
+        paths.append(path)
+    return paths
+
+
+def latency_stats(samples_s):
+    """Summarize per-frame latencies (seconds) as milliseconds percentiles."""
+    if len(samples_s) == 0:
+        return {'count': 0}
+
+    ms = np.asarray(samples_s, dtype=np.float64) * 1000.0
+    p50, p90, p95, p99 = np.percentile(ms, [50, 90, 95, 99])
+    return {
+        'count': int(ms.size),
+        'mean': round(float(ms.mean()), 3),
+        'std': round(float(ms.std()), 3),
+        'min': round(float(ms.min()), 3),
+        'p50': round(float(p50), 3),
+        'p90': round(float(p90), 3),
+        'p95': round(float(p95), 3),
+        'p99': round(float(p99), 3),
+        'max': round(float(ms.max()), 3),
+    }
+
+
+def peak_rss_mb():
+    """Return this process' peak resident set size in MB (None if unknown)."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        try:
+            import psutil
+        except ImportError:
+            return None
+        info = psutil.Process().memory_info()
+        return round(getattr(info, 'peak_wset', info.rss) / (1024 * 1024), 1)
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return round(peak / divisor, 1)
+
+
+def backend_name(model_path):
+    """Infer the inference backend from a model path."""
+    if model_path == 'stub':
+        return 'stub'
+    path = Path(str(model_path))
+    suffix = path.suffix.lower()
+    if suffix == '.pt':
+        return 'pytorch'
+    if suffix in ('.yaml', '.yml'):
+        return 'pytorch-untrained'
+    if suffix == '.onnx':
+        return 'onnx'
+    if suffix == '.engine':
+        return 'tensorrt'
+    if suffix == '.torchscript':
+        return 'torchscript'
+    if suffix == '.tflite':
+        return 'tflite'
+    if path.name.endswith('_openvino_model'):
+        return 'openvino'
+    if path.name.endswith('_ncnn_model'):
+        return 'ncnn'
+    return suffix.lstrip('.') or 'unknown'
+
+
+def environment_info(project_root=None):
+    """Collect the host/software facts needed to compare runs across commits."""
+    info = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': _cpu_count(),
+        'git_commit': None,
+        'git_dirty': None,
+    }
+
+    for module in ('numpy', 'cv2', 'torch', 'ultralytics'):
+        try:
+            info[module] = __import__(module).__version__
+        except Exception:
+            info[module] = None
+
+    cwd = str(project_root) if project_root else None
+    try:
+        info['git_commit'] = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=cwd, capture_output=True,
+            text=True, check=True).stdout.strip()
+        info['git_dirty'] = bool(subprocess.run(
+            ['git', 'status', '--porcelain', '--untracked-files=no'], cwd=cwd,
+            capture_output=True, text=True, check=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        pass
+
+    return info
+
+
+def compare_reports(baseline, current):
+    """Compare two benchmark reports; returns rows keyed by (mode, backend, model)."""
+    def index(report):
+        return {(r['mode'], r['backend'], r['model']): r for r in report.get('results', [])}
+
+    old, new = index(baseline), index(current)
+    rows = []
+    for key in sorted(new):
+        if key not in old or 'error' in new[key] or 'error' in old[key]:
+            continue
+        before, after = old[key], new[key]
+        rows.append({
+            'mode': key[0],
+            'backend': key[1],
+            'model': key[2],
+            'fps_before': before['fps'],
+            'fps_after': after['fps'],
+            'fps_change_pct': _pct(before['fps'], after['fps']),
+            'p95_before_ms': before['latency_ms'].get('p95'),
+            'p95_after_ms': after['latency_ms'].get('p95'),
+            'p95_change_pct': _pct(before['latency_ms'].get('p95'), after['latency_ms'].get('p95')),
+            'rss_before_mb': before.get('peak_rss_mb'),
+            'rss_after_mb': after.get('peak_rss_mb'),
+        })
+    return rows
+
+
+def load_report(path):
+    """Load a JSON benchmark report."""
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def _pct(before, after):
+    if not before or after is None:
+        return None
+    return round((after - before) / before * 100.0, 1)
+
+
+def _cpu_count():
+    try:
+        return len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        return os.cpu_count()
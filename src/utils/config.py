@@ -0,0 +1,190 @@
+"""
+Configuration loading and validation for Edge Safety Monitor
+
+Only depends on PyYAML so it can run (e.g. from ``--check-config`` or a
+health check) without importing torch, ultralytics or OpenCV.
+"""
+
+from pathlib import Path
+
+import yaml
+
+DEFAULT_CONFIG_PATH = Path(__file__).resolve().parents[2] / "config" / "config.yaml"
+
+# (section, key, type, predicate, description) - missing keys are allowed
+_RULES = [
+    ('model', 'input_size', int, lambda v: v > 0 and v % 32 == 0, 'a positive multiple of 32'),
+    ('inference', 'confidence_threshold', (int, float), lambda v: 0 <= v <= 1, 'in [0, 1]'),
+    ('inference', 'iou_threshold', (int, float), lambda v: 0 <= v <= 1, 'in [0, 1]'),
+    ('inference', 'max_detections', int, lambda v: v > 0, 'positive'),
+    ('safety', 'confidence_threshold', (int, float), lambda v: 0 <= v <= 1, 'in [0, 1]'),
+    ('safety', 'consecutive_frames', int, lambda v: v >= 1, '>= 1'),
+    ('safety', 'clear_frames', int, lambda v: v >= 1, '>= 1'),
+    ('zones', 'mask_scale', (int, float), lambda v: 0 < v <= 1, 'in (0, 1]'),
+    ('heatmap', 'cell_size', int, lambda v: v >= 1, '>= 1'),
+    ('heatmap', 'half_life_frames', (int, float), lambda v: v >= 0, '>= 0'),
+    ('heatmap', 'export_interval_s', (int, float), lambda v: v >= 0, '>= 0'),
+    ('checkpoint', 'interval_s', (int, float), lambda v: v >= 0, '>= 0'),
+    ('checkpoint', 'interval_frames', int, lambda v: v >= 0, '>= 0'),
+    ('mining', 'max_frames', int, lambda v: v >= 1, '>= 1'),
+    ('mining', 'min_score', (int, float), lambda v: v >= 0, '>= 0'),
+    ('mining', 'min_interval_frames', int, lambda v: v >= 0, '>= 0'),
+    ('mining', 'dedup_distance', int, lambda v: 0 <= v <= 64, 'in [0, 64]'),
+    ('tracking', 'high_thresh', (int, float), lambda v: 0 <= v <= 1, 'in [0, 1]'),
+    ('tracking', 'low_thresh', (int, float), lambda v: 0 <= v <= 1, 'in [0, 1]'),
+    ('tracking', 'match_iou', (int, float), lambda v: 0 <= v <= 1, 'in [0, 1]'),
+    ('tracking', 'max_age', int, lambda v: v >= 0, '>= 0'),
+    ('tracking', 'min_hits', int, lambda v: v >= 1, '>= 1'),
+    ('tracking', 'max_tracks', int, lambda v: v >= 1, '>= 1'),
+    ('edge', 'target_fps', (int, float), lambda v: v > 0, 'positive'),
+    ('edge', 'max_model_size_mb', (int, float), lambda v: v > 0, 'positive'),
+    ('video', 'frame_skip', int, lambda v: v >= 1, '>= 1'),
+    ('cascade', 'person_imgsz', int, lambda v: v > 0 and v % 32 == 0, 'a positive multiple of 32'),
+    ('cascade', 'ppe_imgsz', int, lambda v: v > 0 and v % 32 == 0, 'a positive multiple of 32'),
+    ('cascade', 'person_conf', (int, float), lambda v: 0 <= v <= 1, 'in [0, 1]'),
+    ('cascade', 'crop_padding', (int, float), lambda v: v >= 0, '>= 0'),
+    ('cascade', 'head_padding', (int, float), lambda v: v >= 0, '>= 0'),
+    ('cascade', 'max_crops', int, lambda v: v >= 0, '>= 0'),
+    ('cascade', 'merge_iou', (int, float), lambda v: 0 <= v <= 1, 'in [0, 1]'),
+    ('adaptive', 'max_tiles', int, lambda v: v >= 1, '>= 1'),
+    ('adaptive', 'max_frame_skip', int, lambda v: v >= 1, '>= 1'),
+    ('adaptive', 'window_frames', int, lambda v: v >= 1, '>= 1'),
+    ('adaptive', 'tolerance', (int, float), lambda v: 0 <= v < 1, 'in [0, 1)'),
+    ('adaptive', 'headroom', (int, float), lambda v: 0 < v <= 1, 'in (0, 1]'),
+    ('buffers', 'pool_size', int, lambda v: v >= 1, '>= 1'),
+    ('buffers', 'report_warmup_frames', int, lambda v: v >= 0, '>= 0'),
+    ('logging', 'max_file_mb', (int, float), lambda v: v > 0, 'positive'),
+    ('logging', 'backup_count', int, lambda v: v >= 0, '>= 0'),
+    ('logging', 'rate_limit_s', (int, float), lambda v: v >= 0, '>= 0'),
+    ('logging', 'max_queue', int, lambda v: v >= 1, '>= 1'),
+    ('alerts', 'max_queue', int, lambda v: v >= 1, '>= 1'),
+    ('alerts', 'coalesce_window_s', (int, float), lambda v: v >= 0, '>= 0'),
+    ('alerts', 'rate_limit_per_min', (int, float), lambda v: v >= 0, '>= 0'),
+    ('alerts', 'max_retries', int, lambda v: v >= 0, '>= 0'),
+    ('alerts', 'retry_backoff_s', (int, float), lambda v: v >= 0, '>= 0'),
+    ('server', 'port', int, lambda v: 0 <= v <= 65535, 'a TCP port'),
+    ('server', 'max_batch_size', int, lambda v: v >= 1, '>= 1'),
+    ('server', 'max_latency_ms', (int, float), lambda v: v >= 0, '>= 0'),
+    ('server', 'max_queue', int, lambda v: v >= 1, '>= 1'),
+    ('preview', 'port', int, lambda v: 0 <= v <= 65535, 'a TCP port'),
+    ('preview', 'fps', (int, float), lambda v: v >= 0, '>= 0'),
+    ('preview', 'jpeg_quality', int, lambda v: 1 <= v <= 100, 'in [1, 100]'),
+    ('preview', 'snapshot_linger_s', (int, float), lambda v: v >= 0, '>= 0'),
+    ('health', 'interval_s', (int, float), lambda v: v > 0, 'positive'),
+    ('health', 'max_age_s', (int, float), lambda v: v > 0, 'positive'),
+    ('health', 'min_fps_ratio', (int, float), lambda v: 0 <= v <= 1, 'in [0, 1]'),
+    ('download', 'workers', int, lambda v: v >= 1, '>= 1'),
+    ('download', 'extract_workers', int, lambda v: v >= 0, '>= 0'),
+    ('download', 'chunk_kb', int, lambda v: v >= 1, '>= 1'),
+    ('download', 'retries', int, lambda v: v >= 0, '>= 0'),
+    ('download', 'timeout_s', (int, float), lambda v: v > 0, 'positive'),
+    ('prepare', 'max_size', int, lambda v: v >= 0, '>= 0'),
+    ('prepare', 'jpeg_quality', int, lambda v: 1 <= v <= 100, 'in [1, 100]'),
+    ('prepare', 'workers', int, lambda v: v >= 0, '>= 0'),
+    ('prepare', 'dedup_distance', int, lambda v: 0 <= v <= 32, 'in [0, 32]'),
+    ('prepare', 'leak_distance', int, lambda v: 0 <= v <= 32, 'in [0, 32]'),
+    ('training', 'epochs', int, lambda v: v > 0, 'positive'),
+    ('training', 'batch_size', int, lambda v: v > 0, 'positive'),
+    ('training', 'workers', int, lambda v: v >= 0, '>= 0'),
+    ('sweep', 'trials', int, lambda v: v >= 1, '>= 1'),
+    ('sweep', 'threads_per_trial', int, lambda v: v >= 1, '>= 1'),
+    ('sweep', 'parallel', int, lambda v: v >= 0, '>= 0'),
+    ('sweep', 'min_epochs', int, lambda v: v >= 1, '>= 1'),
+    ('sweep', 'eta', int, lambda v: v >= 2, '>= 2'),
+    ('sweep', 'max_hours', (int, float), lambda v: v >= 0, '>= 0'),
+    ('distill', 'student_depth', (int, float), lambda v: 0 < v <= 1, 'in (0, 1]'),
+    ('distill', 'epochs', int, lambda v: v >= 1, '>= 1'),
+    ('distill', 'prune_ratio', (int, float), lambda v: 0 <= v < 1, 'in [0, 1)'),
+    ('distill', 'finetune_epochs', int, lambda v: v >= 1, '>= 1'),
+    ('distill', 'latency_runs', int, lambda v: v >= 1, '>= 1'),
+    ('evaluation', 'split', str, lambda v: v in ('train', 'val', 'test'), "'train', 'val' or 'test'"),
+    ('evaluation', 'min_conf', (int, float), lambda v: 0 <= v < 1, 'in [0, 1)'),
+    ('evaluation', 'nms_iou', (int, float), lambda v: 0 < v <= 1, 'in (0, 1]'),
+    ('image_cache', 'shard_mb', (int, float), lambda v: v > 0, 'positive'),
+    ('image_cache', 'workers', int, lambda v: v >= 0, '>= 0'),
+]
+
+_LOG_LEVELS = {'DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'}
+
+
+def load_config(config_path=None):
+    """Load configuration from YAML file."""
+    if config_path is None:
+        config_path = DEFAULT_CONFIG_PATH
+
+    with open(config_path, 'r') as f:
+        config = yaml.safe_load(f)
+
+    return config or {}
+
+
+def validate_config(config):
+    """Return a list of human readable problems (empty if the config is valid)."""
+    if not isinstance(config, dict):
+        return ["configuration root must be a mapping"]
+
+    errors = []
+    for section, key, types, predicate, description in _RULES:
+        block = config.get(section)
+        if block is None:
+            continue
+        if not isinstance(block, dict):
+            errors.append(f"'{section}' must be a mapping")
+            continue
+        if key not in block:
+            continue
+        value = block[key]
+        if isinstance(value, bool) or not isinstance(value, types) or not predicate(value):
+            errors.append(f"{section}.{key} must be {description} (got {value!r})")
+
+    level = (config.get('logging') or {}).get('level')
+    if level is not None and str(level).upper() not in _LOG_LEVELS:
+        errors.append(f"logging.level must be one of {sorted(_LOG_LEVELS)} (got {level!r})")
+
+    methods = (config.get('alerts') or {}).get('methods') or []
+    unknown = [m for m in methods if m not in ('console', 'log', 'email', 'sms', 'webhook')]
+    if unknown:
+        errors.append(f"alerts.methods has unknown entries: {unknown}")
+
+    split = (config.get('prepare') or {}).get('split')
+    if split is not None and (not isinstance(split, list) or not 1 <= len(split) <= 3 or not all(
+            isinstance(v, (int, float)) and not isinstance(v, bool) and v >= 0 for v in split)
+            or not sum(split) > 0):
+        errors.append(f"prepare.split must be 1-3 non-negative fractions (got {split!r})")
+
+    sizes = (config.get('adaptive') or {}).get('input_sizes')
+    if sizes is not None and (not isinstance(sizes, list) or not sizes or not all(
+            isinstance(v, int) and not isinstance(v, bool) and v > 0 and v % 32 == 0 for v in sizes)):
+        errors.append(f"adaptive.input_sizes must be a non-empty list of positive multiples of 32 "
+                      f"(got {sizes!r})")
+
+    sweep = config.get('sweep') or {}
+    metric = sweep.get('metric')
+    if metric is not None and metric not in ('map50', 'map50_95'):
+        errors.append(f"sweep.metric must be 'map50' or 'map50_95' (got {metric!r})")
+    for key, spec in (sweep.get('space') or {}).items():
+        if not (isinstance(spec, list) and spec) and not (isinstance(spec, dict) and {'low', 'high'} <= set(spec)):
+            errors.append(f"sweep.space.{key} must be a list of choices or {{low, high}} (got {spec!r})")
+
+    width = (config.get('distill') or {}).get('student_width')
+    if width is not None and (isinstance(width, bool) or not isinstance(width, (int, float)) or not 0 <= width <= 1):
+        errors.append(f"distill.student_width must be in [0, 1] or null (got {width!r})")
+
+    for key, weight in ((config.get('mining') or {}).get('weights') or {}).items():
+        if key not in ('uncertainty', 'conflict', 'flicker') or isinstance(weight, bool) or \
+                not isinstance(weight, (int, float)) or weight < 0:
+            errors.append(f"mining.weights.{key} must be a non-negative weight of uncertainty, "
+                          f"conflict or flicker (got {weight!r})")
+
+    thresholds = (config.get('evaluation') or {}).get('conf_thresholds')
+    if thresholds is not None and (not isinstance(thresholds, list) or not thresholds or not all(
+            isinstance(v, (int, float)) and not isinstance(v, bool) and 0 <= v <= 1 for v in thresholds)):
+        errors.append(f"evaluation.conf_thresholds must be a non-empty list of values in [0, 1] "
+                      f"(got {thresholds!r})")
+
+    zones = config.get('zones')
+    if isinstance(zones, dict):
+        from src.detection.zones import validate_zones
+        errors.extend(validate_zones(zones))
+
+    return errors
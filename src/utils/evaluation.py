@@ -0,0 +1,376 @@
+"""
+Offline evaluation with cached predictions
+==========================================
+Scores models and inference backends on a labeled split without retraining
+or rerunning anything that has not changed:
+
+- ``cached_predictions`` runs a model over the split once at a low
+  confidence (``min_conf``) and stores every box, plus the per-image
+  latency, in an ``.npz`` keyed by the weights' hash, the backend settings
+  and the images. Later evaluations of the same model load that file.
+- Matching follows COCO. Same-class ``(prediction, ground truth, IoU)``
+  candidate pairs are collected per image. Then, for all ten IoU
+  thresholds of mAP50-95 at once, predictions are visited from the most
+  confident down and each takes its best still-unmatched ground truth. A
+  more confident prediction always wins a ground-truth box, so the
+  matches above any confidence threshold are exactly what matching only
+  those predictions would give. Sweeping thresholds therefore needs no new
+  inference and no new matching.
+- ``average_precision`` computes COCO-style 101-point AP for all classes
+  and IoU thresholds together. Offsetting each class by a constant keeps
+  the per-class precision envelopes and recall lookups inside one sorted
+  array.
+- ``worker_metrics`` scores what the monitor actually reports. It runs
+  person-PPE association (``src.detection.association``) on ground truth
+  and predictions, then compares per-worker violations and compliance
+  verdicts.
+
+Predicted classes are mapped onto the dataset's classes by name (with the
+aliases of ``src.preprocessing.dataset``), so models trained on differently
+named datasets can be compared on the same split.
+"""
+
+import hashlib
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+from src.detection.association import MISSING, associate, association_tables
+from src.detection.boxes import box_iou
+from src.detection.ppe import category_lookup
+
+IOU_THRESHOLDS = np.linspace(0.5, 0.95, 10)
+RECALL_POINTS = np.linspace(0, 1, 101)
+
+DEFAULT_EVALUATION_CONFIG = {
+    'split': 'val',
+    'min_conf': 0.001,           # predictions are cached down to this confidence
+    'nms_iou': 0.7,              # NMS IoU of the cached predictions (ultralytics' val default)
+    'conf_thresholds': [0.1, 0.25, 0.4, 0.5, 0.6, 0.75],
+    'cache_dir': 'outputs/evaluation/cache',
+}
+
+# Exported formats: ultralytics export name and the path it writes next to the weights
+EXPORTS = {
+    'onnx': ('onnx', '{stem}.onnx'),
+    'openvino': ('openvino', '{stem}_openvino_model'),
+    'torchscript': ('torchscript', '{stem}.torchscript'),
+    'ncnn': ('ncnn', '{stem}_ncnn_model'),
+}
+
+
+def label_path(image_path):
+    """YOLO label file of an image (``.../images/x.jpg`` -> ``.../labels/x.txt``)."""
+    parts = Path(image_path).parts
+    if 'images' not in parts:
+        return Path(image_path).with_suffix('.txt')
+    i = len(parts) - 1 - parts[::-1].index('images')
+    return Path(*parts[:i], 'labels', *parts[i + 1:]).with_suffix('.txt')
+
+
+def load_labels(image_files, shapes):
+    """Ground truth of ``image_files`` as flat ``{'boxes', 'cls', 'offsets'}`` (pixel xyxy).
+
+    ``shapes`` are the images' ``(height, width)``.
+    """
+    boxes, classes, counts = [], [], []
+    for path, (h, w) in zip(image_files, shapes):
+        path = label_path(path)
+        rows = np.loadtxt(path, ndmin=2, dtype=np.float32) if path.exists() and path.stat().st_size else \
+            np.zeros((0, 5), dtype=np.float32)
+        rows = rows[:, :5]
+        cx, cy, bw, bh = rows[:, 1] * w, rows[:, 2] * h, rows[:, 3] * w, rows[:, 4] * h
+        boxes.append(np.stack([cx - bw / 2, cy - bh / 2, cx + bw / 2, cy + bh / 2], axis=1))
+        classes.append(rows[:, 0].astype(np.int64))
+        counts.append(len(rows))
+    return {'boxes': np.concatenate(boxes) if boxes else np.zeros((0, 4), dtype=np.float32),
+            'cls': np.concatenate(classes) if classes else np.zeros(0, dtype=np.int64),
+            'offsets': np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)}
+
+
+def class_map(model_names, data_names):
+    """Model class id -> dataset class id (-1 when the dataset has no such class)."""
+    from src.preprocessing.dataset import class_index, normalize_name
+
+    index = class_index(data_names)
+    mapping = np.full(max(model_names) + 1 if model_names else 0, -1, dtype=np.int64)
+    for i, name in model_names.items():
+        mapping[i] = index.get(normalize_name(name), -1)
+    return mapping
+
+
+def export_model(weights, backend, imgsz=640):
+    """Path of ``weights`` exported to ``backend`` (reused when newer than the weights)."""
+    from ultralytics import YOLO
+
+    fmt, pattern = EXPORTS[backend]
+    weights = Path(weights)
+    target = weights.parent / pattern.format(stem=weights.stem)
+    if target.exists() and target.stat().st_mtime >= weights.stat().st_mtime:
+        return target
+    return Path(YOLO(str(weights)).export(format=fmt, imgsz=imgsz))
+
+
+def _fingerprint(model_path, image_files, settings):
+    from src.inference.model_cache import weights_sha256
+
+    model_path = Path(model_path)
+    files = sorted(p for p in model_path.rglob('*') if p.is_file()) if model_path.is_dir() else [model_path]
+    digest = hashlib.sha256()
+    for path in files:
+        # Architecture yamls (untrained models) resolve inside ultralytics
+        digest.update(weights_sha256(path).encode() if path.exists() else str(path).encode())
+    for path in image_files:
+        st = Path(path).stat()
+        digest.update(f"{path}|{st.st_size}|{st.st_mtime_ns}".encode())
+    digest.update(json.dumps(settings, sort_keys=True).encode())
+    return digest.hexdigest()[:16]
+
+
+def predict_images(model_path, image_files, imgsz=640, min_conf=0.001, nms_iou=0.7, device='cpu'):
+    """Run a model (any ultralytics backend) over ``image_files``; flat prediction dict.
+
+    Latency covers the model call (pre-processing, inference and NMS), not
+    the image decode, and excludes one warm-up call.
+    """
+    import cv2
+    from ultralytics import YOLO
+
+    from src.detection.ppe import result_arrays
+
+    model = YOLO(str(model_path), task='detect')
+    kwargs = dict(imgsz=imgsz, conf=min_conf, iou=nms_iou, device=device, verbose=False, max_det=300)
+    boxes, confs, classes, counts, shapes, latency = [], [], [], [], [], []
+    for i, path in enumerate(image_files):
+        im = cv2.imread(str(path))
+        if i == 0:
+            model.predict(im, **kwargs)
+        start = time.perf_counter()
+        result = model.predict(im, **kwargs)[0]
+        latency.append(time.perf_counter() - start)
+        xyxy, conf, cls = result_arrays(result)
+        boxes.append(xyxy)
+        confs.append(conf)
+        classes.append(cls)
+        counts.append(len(conf))
+        shapes.append(im.shape[:2])
+    return {
+        'boxes': np.concatenate(boxes) if boxes else np.zeros((0, 4), dtype=np.float32),
+        'conf': np.concatenate(confs) if confs else np.zeros(0, dtype=np.float32),
+        'cls': np.concatenate(classes) if classes else np.zeros(0, dtype=np.int64),
+        'offsets': np.concatenate([[0], np.cumsum(counts)]).astype(np.int64),
+        'shapes': np.array(shapes, dtype=np.int64).reshape(-1, 2),
+        'latency_s': np.array(latency, dtype=np.float64),
+        'names': dict(model.names),
+    }
+
+
+def cached_predictions(model_path, image_files, imgsz=640, settings=None, cache_dir=None,
+                       device='cpu', refresh=False):
+    """``predict_images`` through the on-disk cache; returns ``(predictions, cache hit)``."""
+    settings = {**DEFAULT_EVALUATION_CONFIG, **(settings or {})}
+    key_settings = {'imgsz': imgsz, 'min_conf': settings['min_conf'], 'nms_iou': settings['nms_iou'],
+                    'device': device}
+    cache_dir = Path(cache_dir or settings['cache_dir'])
+    path = cache_dir / f"{Path(model_path).stem}-{_fingerprint(model_path, image_files, key_settings)}.npz"
+    if path.exists() and not refresh:
+        with np.load(path) as data:
+            predictions = {k: data[k] for k in data.files if k != 'names'}
+            predictions['names'] = {int(k): v for k, v in json.loads(str(data['names'])).items()}
+        return predictions, True
+
+    predictions = predict_images(model_path, image_files, imgsz, settings['min_conf'],
+                                 settings['nms_iou'], device)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix('.tmp.npz')
+    np.savez(tmp, **{k: v for k, v in predictions.items() if k != 'names'},
+             names=json.dumps(predictions['names']))
+    tmp.replace(path)
+    return predictions, False
+
+
+def remap_predictions(predictions, mapping):
+    """Predictions with classes mapped through ``class_map`` (unmapped ones dropped)."""
+    cls = predictions['cls']
+    valid = (cls >= 0) & (cls < len(mapping))
+    mapped = np.where(valid, mapping[np.where(valid, cls, 0)], -1)
+    keep = mapped >= 0
+    image = np.repeat(np.arange(len(predictions['offsets']) - 1), np.diff(predictions['offsets']))
+    offsets = np.searchsorted(image[keep], np.arange(len(predictions['offsets'])), side='left')
+    return dict(predictions, boxes=predictions['boxes'][keep], conf=predictions['conf'][keep],
+                cls=mapped[keep], offsets=offsets.astype(np.int64))
+
+
+def candidate_pairs(predictions, labels, min_iou=IOU_THRESHOLDS[0]):
+    """Same-image, same-class ``(pred, gt, iou)`` index arrays with IoU >= ``min_iou``."""
+    preds, gts, ious = [], [], []
+    p_off, g_off = predictions['offsets'], labels['offsets']
+    for i in range(len(p_off) - 1):
+        p0, p1, g0, g1 = p_off[i], p_off[i + 1], g_off[i], g_off[i + 1]
+        if p0 == p1 or g0 == g1:
+            continue
+        iou = box_iou(predictions['boxes'][p0:p1], labels['boxes'][g0:g1])
+        iou[predictions['cls'][p0:p1, None] != labels['cls'][None, g0:g1]] = 0
+        p, g = np.nonzero(iou >= min_iou)
+        preds.append(p + p0)
+        gts.append(g + g0)
+        ious.append(iou[p, g])
+    if not preds:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+    return np.concatenate(preds), np.concatenate(gts), np.concatenate(ious)
+
+
+def match_predictions(pairs, conf, iou_thresholds=IOU_THRESHOLDS):
+    """``(predictions, thresholds)`` true-positive matrix from ``candidate_pairs``.
+
+    COCO greedy matching: predictions are visited from the most confident
+    down, and each one takes the highest-IoU ground truth that is still
+    unmatched at that IoU threshold. One pass over the pairs serves all
+    thresholds.
+    """
+    pred, gt, iou = pairs
+    thresholds = np.asarray(iou_thresholds)
+    tp = np.zeros((len(conf), len(thresholds)), dtype=bool)
+    if not len(pred):
+        return tp
+    # Most confident prediction first, its candidate ground truths by falling IoU
+    order = np.lexsort((-iou, pred, -conf[pred]))
+    hits = iou[order, None] >= thresholds
+    taken = np.zeros((int(gt.max()) + 1, len(thresholds)), dtype=bool)
+    for p, g, ok in zip(pred[order].tolist(), gt[order].tolist(), hits):
+        ok = ok & ~taken[g] & ~tp[p]
+        if ok.any():
+            taken[g] |= ok
+            tp[p] |= ok
+    return tp
+
+
+def average_precision(tp, conf, pred_cls, num_gt):
+    """``(classes, thresholds)`` COCO 101-point AP; NaN for classes without ground truth."""
+    num_gt = np.asarray(num_gt)
+    nc, num_t = len(num_gt), tp.shape[1]
+    ap = np.full((nc, num_t), np.nan)
+    has_gt = num_gt > 0
+    ap[has_gt] = 0.0
+    if not len(conf):
+        return ap
+
+    order = np.lexsort((-conf, pred_cls))
+    cls = pred_cls[order]
+    hits = tp[order].astype(np.float64)
+    starts = np.searchsorted(cls, np.arange(nc))
+    cumulative = np.cumsum(hits, axis=0)
+    tpc = cumulative - np.vstack([np.zeros((1, num_t)), cumulative])[starts[cls]]
+    rank = (np.arange(len(cls)) - starts[cls] + 1)[:, None]
+    precision = tpc / rank
+    recall = tpc / np.maximum(num_gt[cls], 1)[:, None]
+
+    # Shifting class c by 2c keeps every class in its own band of one sorted array:
+    # a running max from the end never crosses into a lower class, and recall stays sorted
+    offset = 2.0 * cls[:, None]
+    envelope = np.maximum.accumulate((precision - offset)[::-1], axis=0)[::-1] + offset
+    query_cls = np.repeat(np.arange(nc), len(RECALL_POINTS))
+    queries = RECALL_POINTS[None, :] + 2.0 * np.arange(nc)[:, None]
+    for t in range(num_t):
+        idx = np.searchsorted(recall[:, t] + offset[:, 0], queries.ravel(), side='left')
+        idx_safe = np.minimum(idx, len(cls) - 1)
+        valid = (idx < len(cls)) & (cls[idx_safe] == query_cls)
+        points = np.where(valid, envelope[idx_safe, t], 0.0).reshape(nc, -1)
+        ap[has_gt, t] = points.mean(axis=1)[has_gt]
+    return ap
+
+
+def threshold_sweep(tp50, conf, pred_cls, num_gt, thresholds):
+    """Per-class ``(precision, recall)``, each ``(thresholds, classes)``, at IoU 0.5."""
+    num_gt = np.asarray(num_gt)
+    above = conf[:, None] >= np.asarray(thresholds)[None, :]
+    onehot = np.eye(len(num_gt), dtype=np.float64)[pred_cls]
+    predicted = (onehot.T @ above).T
+    correct = (onehot.T @ (above & tp50[:, None])).T
+    precision = correct / np.maximum(predicted, 1)
+    recall = np.where(num_gt > 0, correct / np.maximum(num_gt, 1), np.nan)
+    return precision, recall
+
+
+def worker_metrics(predictions, labels, data_names, thresholds, match_iou=0.5):
+    """Violation-level accuracy per confidence threshold.
+
+    Ground-truth and predicted workers come from person-PPE association and
+    are matched by IoU. A (worker, item) violation is a true positive when
+    the matched predicted worker misses that item too. ``worker_accuracy``
+    is the share of ground-truth workers that were found with the right
+    compliant/non-compliant verdict.
+    """
+    from src.detection.tracking import greedy_match
+
+    tables = association_tables(category_lookup(data_names))
+    ones = np.ones(len(labels['cls']), dtype=np.float32)
+    counts = np.zeros((len(thresholds), 4), dtype=np.int64)    # tp, fp, fn, correct workers
+    total_workers = 0
+    p_off, g_off = predictions['offsets'], labels['offsets']
+    for i in range(len(p_off) - 1):
+        g = slice(g_off[i], g_off[i + 1])
+        truth = associate(labels['boxes'][g], ones[g], labels['cls'][g], tables)
+        gt_missing = truth['status'] == MISSING
+        total_workers += len(gt_missing)
+        p = slice(p_off[i], p_off[i + 1])
+        boxes, conf, cls = predictions['boxes'][p], predictions['conf'][p], predictions['cls'][p]
+        for k, threshold in enumerate(thresholds):
+            keep = conf >= threshold
+            found = associate(boxes[keep], conf[keep], cls[keep], tables)
+            pred_missing = found['status'] == MISSING
+            rows, cols = greedy_match(box_iou(found['person_boxes'], truth['person_boxes']), match_iou)
+            matched = np.zeros_like(gt_missing)
+            matched[cols] = pred_missing[rows]
+            tp = int((gt_missing & matched).sum())
+            counts[k] += [tp, int(pred_missing.sum()) - tp, int((gt_missing & ~matched).sum()),
+                          int((gt_missing[cols].any(axis=1) == pred_missing[rows].any(axis=1)).sum())]
+    tp, fp, fn, correct = counts.T
+    return [{'conf': float(t),
+             'violation_precision': float(tp[k] / max(tp[k] + fp[k], 1)),
+             'violation_recall': float(tp[k] / max(tp[k] + fn[k], 1)),
+             'worker_accuracy': float(correct[k] / max(total_workers, 1))}
+            for k, t in enumerate(thresholds)]
+
+
+def evaluate(predictions, labels, data_names, thresholds=None):
+    """Detection and worker-level metrics of cached predictions against ground truth.
+
+    ``predictions`` must already use the dataset's class ids (``remap_predictions``).
+    """
+    from src.utils.benchmark import latency_stats
+
+    thresholds = list(thresholds or DEFAULT_EVALUATION_CONFIG['conf_thresholds'])
+    nc = max(data_names) + 1
+    num_gt = np.bincount(labels['cls'], minlength=nc)[:nc]
+    tp = match_predictions(candidate_pairs(predictions, labels), predictions['conf'])
+    ap = average_precision(tp, predictions['conf'], predictions['cls'], num_gt)
+    precision, recall = threshold_sweep(tp[:, 0], predictions['conf'], predictions['cls'], num_gt, thresholds)
+
+    present = num_gt > 0
+    mean_p = precision[:, present].mean(axis=1) if present.any() else np.zeros(len(thresholds))
+    mean_r = np.nanmean(recall[:, present], axis=1) if present.any() else np.zeros(len(thresholds))
+    f1 = 2 * mean_p * mean_r / np.maximum(mean_p + mean_r, 1e-9)
+    workers = worker_metrics(predictions, labels, data_names, thresholds)
+    sweep = [{'conf': float(t), 'precision': float(mean_p[k]), 'recall': float(mean_r[k]),
+              'f1': float(f1[k]), **{key: v for key, v in workers[k].items() if key != 'conf'}}
+             for k, t in enumerate(thresholds)]
+    best = int(f1.argmax())
+
+    per_class = {
+        data_names[c]: {'instances': int(num_gt[c]), 'ap50': float(ap[c, 0]), 'ap50_95': float(ap[c].mean()),
+                        'precision': float(precision[best, c]), 'recall': float(recall[best, c])}
+        for c in range(nc) if c in data_names and present[c]
+    }
+    return {
+        'images': len(labels['offsets']) - 1,
+        'instances': int(num_gt.sum()),
+        'map50': float(np.nanmean(ap[:, 0])) if present.any() else 0.0,
+        'map50_95': float(np.nanmean(ap.mean(axis=1))) if present.any() else 0.0,
+        'best_conf': float(thresholds[best]),
+        'per_class': per_class,
+        'thresholds': sweep,
+        'latency_ms': latency_stats(list(predictions['latency_s'])) if 'latency_s' in predictions else None,
+    }
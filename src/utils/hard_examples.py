@@ -0,0 +1,214 @@
+"""
+Hard-example mining into a labeling queue
+=========================================
+The frames where the deployed model struggles are the ones worth labeling,
+and the monitor sees them every day. ``HardExampleMiner`` scores each
+processed frame from values the monitor has already computed:
+
+- ``uncertainty``: ``1 -`` the frame's highest detection confidence
+- ``conflict``: a worker carries both a positive and a negative box for
+  the same item (``Hardhat`` and ``NO-Hardhat`` on one person)
+- ``flicker``: the share of tracked workers whose PPE status flipped
+  between wearing and missing since the previous frame, plus weak person
+  boxes that no track took (needs tracking; 0 without it)
+
+The weighted sum is compared against the lowest score in a bounded
+reservoir of ``max_frames`` frames per camera. Only frames that make the cut
+are touched. Such a frame is perceptual-hashed and skipped if it looks like
+a queued frame that scored at least as high. Otherwise it is written as a
+JPEG with its detections as YOLO pre-annotations, and the lowest-scoring
+frame is evicted when the reservoir is full. A typical frame therefore
+costs a few NumPy reductions and no copy.
+
+The queue is a YOLO dataset directory that survives restarts::
+
+    data/mining/<camera>/images/<stem>.jpg
+    data/mining/<camera>/labels/<stem>.txt   # class cx cy w h (normalized)
+    data/mining/<camera>/classes.txt
+    data/mining/<camera>/queue.json          # scores and signals, best first
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+
+from src.preprocessing.dedup import hamming, phash
+
+QUEUE_NAME = 'queue.json'
+
+DEFAULT_MINING_CONFIG = {
+    'enabled': False,
+    'output_dir': 'data/mining',   # one sub-directory per camera
+    'max_frames': 500,             # reservoir size per camera (lowest scores are evicted)
+    'min_score': 0.6,              # frames scoring below this are never queued
+    'min_interval_frames': 15,     # processed frames between two queued frames
+    'dedup_distance': 6,           # pHash distance at which a frame repeats a queued one (0 = off)
+    'weights': {'uncertainty': 1.0, 'conflict': 1.0, 'flicker': 0.5},
+}
+
+
+def frame_signals(confs, association, track_ids=None, previous=None):
+    """``(signals, state)`` for one frame; pass ``state`` back in as ``previous`` next frame.
+
+    ``association`` comes from ``src.detection.association.associate`` and
+    ``track_ids`` (aligned with its persons, -1 = untracked) from the
+    tracker. Every signal is in [0, 1].
+    """
+    confs = np.asarray(confs)
+    uncertainty = 1.0 - float(confs.max()) if len(confs) else 0.0
+    conflict = float(association['conflict'].any())
+    if track_ids is None:
+        return {'uncertainty': uncertainty, 'conflict': conflict, 'flicker': 0.0}, None
+
+    previous = previous or {}
+    track_ids = np.asarray(track_ids)
+    state = {int(t): row for t, row in zip(track_ids, association['status']) if t >= 0}
+    # WEARING * MISSING is the only product below zero
+    flips = sum(bool((row * previous[t] < 0).any()) for t, row in state.items() if t in previous)
+    untracked = int((track_ids < 0).sum())
+    flicker = min(1.0, (flips + untracked) / max(len(track_ids), 1))
+    return {'uncertainty': uncertainty, 'conflict': conflict, 'flicker': flicker}, state
+
+
+def yolo_labels(xyxy, cls_ids, width, height):
+    """YOLO label lines (``class cx cy w h``, normalized) for pixel ``xyxy`` boxes."""
+    boxes = np.clip(np.asarray(xyxy, dtype=np.float64).reshape(-1, 4), 0, [width, height, width, height])
+    cx = (boxes[:, 0] + boxes[:, 2]) / 2 / width
+    cy = (boxes[:, 1] + boxes[:, 3]) / 2 / height
+    w = (boxes[:, 2] - boxes[:, 0]) / width
+    h = (boxes[:, 3] - boxes[:, 1]) / height
+    return [f"{int(c)} {x:.6f} {y:.6f} {bw:.6f} {bh:.6f}"
+            for c, x, y, bw, bh in zip(cls_ids, cx, cy, w, h) if bw > 0 and bh > 0]
+
+
+class HardExampleMiner:
+    """Bounded queue of a camera's most informative frames for labeling."""
+
+    def __init__(self, output_dir, names, max_frames=500, min_score=0.6, min_interval_frames=15,
+                 dedup_distance=6, weights=None):
+        self.output_dir = Path(output_dir)
+        self.names = dict(enumerate(names)) if isinstance(names, (list, tuple)) else dict(names)
+        self.max_frames = max_frames
+        self.min_score = min_score
+        self.min_interval_frames = min_interval_frames
+        self.dedup_distance = dedup_distance
+        self.weights = {**DEFAULT_MINING_CONFIG['weights'], **(weights or {})}
+        self.frames = 0
+        self.queued = 0                  # frames queued this session
+        self._last_queued = None
+        self._previous = None
+        self._entries = self._load()
+        self._update_floor()
+
+    @classmethod
+    def from_config(cls, config, names, camera='default'):
+        """Build from the ``mining`` section of config.yaml (queue in ``output_dir/<camera>``)."""
+        settings = dict(DEFAULT_MINING_CONFIG)
+        settings.update((config or {}).get('mining') or {})
+        return cls(Path(settings['output_dir']) / str(camera), names,
+                   max_frames=settings['max_frames'], min_score=settings['min_score'],
+                   min_interval_frames=settings['min_interval_frames'],
+                   dedup_distance=settings['dedup_distance'], weights=settings['weights'])
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def entries(self):
+        """Queued frames, best first."""
+        return sorted(self._entries, key=lambda e: e['score'], reverse=True)
+
+    def reset(self):
+        """Forget per-stream state (track IDs restart with a new stream)."""
+        self._previous = None
+        self._last_queued = None
+
+    def score(self, signals):
+        """Weighted sum of a frame's signals."""
+        return sum(self.weights.get(name, 0.0) * value for name, value in signals.items())
+
+    def observe(self, frame, xyxy, confs, cls_ids, association, track_ids=None):
+        """Score one frame and queue it if it makes the cut; returns the score.
+
+        Call before anything draws on ``frame``.
+        """
+        self.frames += 1
+        signals, self._previous = frame_signals(confs, association, track_ids, self._previous)
+        score = self.score(signals)
+        if score < self._floor or (self._last_queued is not None
+                                   and self.frames - self._last_queued < self.min_interval_frames):
+            return score
+
+        value, evict = None, None
+        if self.dedup_distance:
+            import cv2
+
+            value = phash(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
+            hashed = [i for i, e in enumerate(self._entries) if e['phash'] is not None]
+            if hashed:
+                distances = hamming(np.array([self._entries[i]['phash'] for i in hashed], dtype=np.uint64),
+                                    np.uint64(value))
+                nearest = int(distances.argmin())
+                if distances[nearest] <= self.dedup_distance:
+                    if self._entries[hashed[nearest]]['score'] >= score:
+                        return score
+                    evict = hashed[nearest]     # same scene, better example
+        if evict is None and len(self._entries) >= self.max_frames:
+            evict = min(range(len(self._entries)), key=lambda i: self._entries[i]['score'])
+        if evict is not None:
+            self._remove(evict)
+
+        stem = f"{time.strftime('%Y%m%d_%H%M%S')}_{self.frames:07d}"
+        self._write(stem, frame, xyxy, cls_ids)
+        self._entries.append({'stem': stem, 'score': round(score, 4),
+                              'signals': {k: round(v, 4) for k, v in signals.items()},
+                              'detections': len(confs), 'phash': value,
+                              'time': time.strftime('%Y-%m-%dT%H:%M:%S')})
+        self._save()
+        self._update_floor()
+        self._last_queued = self.frames
+        self.queued += 1
+        return score
+
+    def _update_floor(self):
+        full = len(self._entries) >= self.max_frames
+        lowest = min((e['score'] for e in self._entries), default=0.0)
+        self._floor = max(self.min_score, lowest) if full else self.min_score
+
+    def _write(self, stem, frame, xyxy, cls_ids):
+        import cv2
+
+        images, labels = self.output_dir / 'images', self.output_dir / 'labels'
+        if not images.is_dir():
+            images.mkdir(parents=True, exist_ok=True)
+            labels.mkdir(parents=True, exist_ok=True)
+            names = [self.names[i] for i in sorted(self.names)]
+            (self.output_dir / 'classes.txt').write_text('\n'.join(names) + '\n')
+        cv2.imwrite(str(images / f"{stem}.jpg"), frame)
+        lines = yolo_labels(xyxy, cls_ids, frame.shape[1], frame.shape[0])
+        (labels / f"{stem}.txt").write_text(''.join(f"{line}\n" for line in lines))
+
+    def _remove(self, index):
+        entry = self._entries.pop(index)
+        for path in (self.output_dir / 'images' / f"{entry['stem']}.jpg",
+                     self.output_dir / 'labels' / f"{entry['stem']}.txt"):
+            path.unlink(missing_ok=True)
+
+    def _load(self):
+        path = self.output_dir / QUEUE_NAME
+        if not path.exists():
+            return []
+        with open(path, 'r', encoding='utf-8') as f:
+            entries = json.load(f)['frames']
+        # Frames labeled (moved out) or deleted by hand leave the queue
+        return [e for e in entries if (self.output_dir / 'images' / f"{e['stem']}.jpg").exists()]
+
+    def _save(self):
+        path = self.output_dir / QUEUE_NAME
+        tmp = path.with_suffix('.json.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'weights': self.weights, 'frames': self.entries}, f, indent=1)
+        os.replace(tmp, path)
@@ -0,0 +1,191 @@
+"""
+Liveness / throughput health probe for Edge Safety Monitor
+==========================================================
+The frame loop calls ``HealthProbe.frame_done()`` (a deque append, no I/O).
+A daemon thread periodically writes a JSON heartbeat file with the last
+frame timestamp, recent FPS versus ``edge.target_fps``, registered queue
+depths and model-loaded state. ``check_heartbeat()`` - used by
+``scripts/healthcheck.py`` and the Docker HEALTHCHECK - turns that file
+into a healthy/unhealthy verdict, so a frozen or collapsed monitor gets
+restarted, not only a crashed one.
+
+This module only uses the standard library so health checks start instantly.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+DEFAULT_HEARTBEAT_FILE = Path(tempfile.gettempdir()) / "edge_safety_monitor" / "heartbeat.json"
+
+DEFAULT_HEALTH_CONFIG = {
+    'heartbeat_file': str(DEFAULT_HEARTBEAT_FILE),
+    'interval_s': 2.0,        # heartbeat write period
+    'fps_window_s': 10.0,     # window used for recent FPS
+    'max_age_s': 30.0,        # heartbeat / last frame older than this -> unhealthy
+    'min_fps_ratio': 0.5,     # recent FPS below target * ratio -> unhealthy
+    'startup_grace_s': 120.0,  # allowance for model loading and first frames
+}
+
+
+def health_settings(config=None):
+    """Health settings from the ``health`` section of config.yaml, with defaults."""
+    settings = dict(DEFAULT_HEALTH_CONFIG)
+    settings.update((config or {}).get('health') or {})
+    settings['target_fps'] = ((config or {}).get('edge') or {}).get('target_fps')
+    return settings
+
+
+class HealthProbe:
+    """Collects liveness/throughput facts and publishes them as a heartbeat file."""
+
+    def __init__(self, heartbeat_file=None, target_fps=None, interval_s=2.0,
+                 fps_window_s=10.0, max_frames=1024):
+        self.heartbeat_file = Path(heartbeat_file or DEFAULT_HEARTBEAT_FILE)
+        self.target_fps = target_fps
+        self.interval_s = interval_s
+        self.fps_window_s = fps_window_s
+        self.started_at = time.time()
+        self.model_loaded = False
+        self.frames_total = 0
+        self._frame_times = deque(maxlen=max_frames)
+        self._queues = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def from_config(cls, config=None, heartbeat_file=None):
+        """Build a probe from config.yaml's ``health``/``edge`` sections."""
+        settings = health_settings(config)
+        return cls(heartbeat_file=heartbeat_file or settings['heartbeat_file'],
+                   target_fps=settings['target_fps'],
+                   interval_s=settings['interval_s'],
+                   fps_window_s=settings['fps_window_s'])
+
+    def frame_done(self):
+        """Record a processed frame. Called from the frame loop - O(1), no I/O."""
+        self._frame_times.append(time.time())
+        self.frames_total += 1
+
+    def set_model_loaded(self, loaded=True):
+        self.model_loaded = loaded
+
+    def register_queue(self, name, depth_fn):
+        """Report ``depth_fn()`` as the depth of queue ``name`` in each heartbeat."""
+        self._queues[name] = depth_fn
+
+    def recent_fps(self, now=None):
+        """Frames per second over the last ``fps_window_s`` seconds."""
+        now = time.time() if now is None else now
+        times = list(self._frame_times)
+        cutoff = now - self.fps_window_s
+        recent = [t for t in times if t >= cutoff]
+        if len(recent) < 2:
+            return 0.0
+        # Measure over the window actually covered, but never less than 1s
+        span = max(now - recent[0], 1.0)
+        return round(len(recent) / span, 2)
+
+    def snapshot(self):
+        """Current health facts as a JSON-serialisable dict."""
+        now = time.time()
+        queues = {}
+        for name, depth_fn in list(self._queues.items()):
+            try:
+                queues[name] = depth_fn()
+            except Exception:
+                queues[name] = None
+        return {
+            'pid': os.getpid(),
+            'timestamp': now,
+            'started_at': self.started_at,
+            'model_loaded': self.model_loaded,
+            'frames_total': self.frames_total,
+            'last_frame_ts': self._frame_times[-1] if self._frame_times else None,
+            'recent_fps': self.recent_fps(now),
+            'target_fps': self.target_fps,
+            'queues': queues,
+        }
+
+    def write(self):
+        """Atomically write the heartbeat file."""
+        self.heartbeat_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.heartbeat_file.with_name(f".{self.heartbeat_file.name}.{os.getpid()}.tmp")
+        with open(tmp, 'w') as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp, self.heartbeat_file)
+
+    def start(self):
+        """Start the background heartbeat writer."""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="health-heartbeat", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the writer (a final heartbeat is written)."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join(timeout=self.interval_s + 1)
+            self._thread = None
+
+    def _run(self):
+        while True:
+            stopping = self._stop.is_set()
+            try:
+                self.write()
+            except OSError:
+                pass  # a full or read-only disk must never take down monitoring
+            if stopping:
+                break
+            self._stop.wait(self.interval_s)
+
+
+def evaluate_heartbeat(data, now=None, max_age_s=30.0, min_fps_ratio=0.5,
+                       startup_grace_s=120.0):
+    """Return ``(healthy, reasons)`` for a heartbeat dict."""
+    now = time.time() if now is None else now
+    reasons = []
+
+    age = now - data.get('timestamp', 0)
+    if age > max_age_s:
+        reasons.append(f"heartbeat is {age:.0f}s old (> {max_age_s:.0f}s): process hung or dead")
+        return False, reasons
+
+    in_grace = now - data.get('started_at', now) < startup_grace_s
+    if not data.get('model_loaded'):
+        if not in_grace:
+            reasons.append("model not loaded after startup grace period")
+        return not reasons, reasons
+
+    last_frame = data.get('last_frame_ts')
+    if last_frame is None:
+        if not in_grace:
+            reasons.append("no frame processed since startup")
+    elif now - last_frame > max_age_s:
+        reasons.append(f"last frame {now - last_frame:.0f}s ago (> {max_age_s:.0f}s): frame loop frozen")
+
+    target = data.get('target_fps')
+    if target and last_frame is not None and not in_grace:
+        fps = data.get('recent_fps', 0.0)
+        if fps < target * min_fps_ratio:
+            reasons.append(f"throughput collapsed: {fps:.1f} FPS < {min_fps_ratio:.0%} of target {target}")
+
+    return not reasons, reasons
+
+
+def check_heartbeat(heartbeat_file=None, **thresholds):
+    """Read and evaluate a heartbeat file; returns ``(healthy, reasons, data)``."""
+    path = Path(heartbeat_file or DEFAULT_HEARTBEAT_FILE)
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        return False, [f"cannot read heartbeat {path}: {e}"], None
+    healthy, reasons = evaluate_heartbeat(data, **thresholds)
+    return healthy, reasons, data
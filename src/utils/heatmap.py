@@ -0,0 +1,174 @@
+"""
+Incremental spatial violation heatmaps
+======================================
+``ViolationHeatmap`` accumulates where violations happen on a fixed
+low-resolution float32 grid (one channel per violation type). Each frame's
+boxes are splatted with a 2D difference array - four scatter-adds per box,
+no per-pixel work - and the grid is only integrated (``cumsum``) when it is
+read. Exponential decay uses a running scale factor instead of touching the
+whole grid every frame, so an update costs microseconds and the heatmap can
+stay on permanently.
+
+``save`` writes the raw grid as ``.npy`` and a colour PNG per type (blended
+over a background frame when one is given). ``HeatmapRecorder`` keeps a
+small private copy of a recent frame as that background - the frame it is
+handed may be a pooled buffer that is drawn on and reused.
+"""
+
+import time
+from pathlib import Path
+
+import numpy as np
+
+from src.detection.association import NEGATIVE_ITEMS
+
+DEFAULT_HEATMAP_CONFIG = {
+    'cell_size': 16,             # frame pixels per heatmap cell
+    'half_life_frames': 0,       # exponential decay half-life (0 = no decay)
+    'export_interval_s': 300,    # periodic PNG/NPY export (0 = only at the end)
+    'output_dir': 'outputs/heatmaps',
+}
+
+BACKGROUND_WIDTH = 640           # exported backgrounds are stored at most this wide
+
+
+class ViolationHeatmap:
+    """Per-type violation density over the frame, updated incrementally."""
+
+    def __init__(self, width, height, cell_size=16, half_life_frames=0, types=NEGATIVE_ITEMS):
+        self.width, self.height = width, height
+        self.cell_size = cell_size
+        self.types = tuple(types)
+        self.grid_w = -(-width // cell_size)
+        self.grid_h = -(-height // cell_size)
+        self.decay = 0.5 ** (1.0 / half_life_frames) if half_life_frames else 1.0
+        self.frames = 0
+        self._type_index = {t: i for i, t in enumerate(self.types)}
+        # Difference array; one extra row/column for the closing corners
+        self._diff = np.zeros((len(self.types), self.grid_h + 1, self.grid_w + 1), dtype=np.float32)
+        self._weight = 1.0     # current weight of a new sample (grows instead of decaying the grid)
+
+    @classmethod
+    def from_config(cls, config, width, height):
+        settings = dict(DEFAULT_HEATMAP_CONFIG)
+        settings.update((config or {}).get('heatmap') or {})
+        return cls(width, height, cell_size=settings['cell_size'],
+                   half_life_frames=settings['half_life_frames'])
+
+    def add(self, violations):
+        """Splat one frame's violations (dicts with ``type`` and ``box``)."""
+        self.frames += 1
+        if self.decay != 1.0:
+            self._weight /= self.decay
+            if self._weight > 1e6:       # renormalize long before float32 overflows
+                self._diff /= self._weight
+                self._weight = 1.0
+        violations = [v for v in violations if v['type'] in self._type_index]
+        if not violations:
+            return
+        boxes = np.array([v['box'] for v in violations], dtype=np.float32)
+        channels = np.array([self._type_index[v['type']] for v in violations])
+        self.add_boxes(channels, boxes)
+
+    def add_boxes(self, channels, boxes, weights=None):
+        """Vectorized splat of (N, 4) pixel boxes into the given channels."""
+        scale = 1.0 / self.cell_size
+        x1 = np.clip((boxes[:, 0] * scale).astype(np.int64), 0, self.grid_w - 1)
+        y1 = np.clip((boxes[:, 1] * scale).astype(np.int64), 0, self.grid_h - 1)
+        x2 = np.clip(np.ceil(boxes[:, 2] * scale).astype(np.int64), x1 + 1, self.grid_w)
+        y2 = np.clip(np.ceil(boxes[:, 3] * scale).astype(np.int64), y1 + 1, self.grid_h)
+        w = np.full(len(boxes), self._weight, dtype=np.float32) if weights is None else \
+            np.asarray(weights, dtype=np.float32) * self._weight
+
+        c = np.concatenate([channels] * 4)
+        ys = np.concatenate([y1, y1, y2, y2])
+        xs = np.concatenate([x1, x2, x1, x2])
+        np.add.at(self._diff, (c, ys, xs), np.concatenate([w, -w, -w, w]))
+
+    def grid(self):
+        """Integrated ``(types, grid_h, grid_w)`` float32 heat (in units of box-frames)."""
+        heat = self._diff.cumsum(axis=1).cumsum(axis=2)[:, :-1, :-1]
+        return heat / self._weight
+
+    def render(self, channel=None, background=None, alpha=0.5):
+        """Colour image of one type's heat (or the total) at frame size."""
+        import cv2
+
+        heat = self.grid()
+        heat = heat.sum(axis=0) if channel is None else heat[self._type_index[channel]]
+        peak = float(heat.max())
+        norm = (heat / peak * 255).astype(np.uint8) if peak > 0 else heat.astype(np.uint8)
+        norm = cv2.resize(norm, (self.width, self.height), interpolation=cv2.INTER_LINEAR)
+        colour = cv2.applyColorMap(norm, cv2.COLORMAP_JET)
+        if background is not None:
+            if background.shape[:2] != (self.height, self.width):
+                background = cv2.resize(background, (self.width, self.height),
+                                        interpolation=cv2.INTER_LINEAR)
+            colour = cv2.addWeighted(background, 1 - alpha, colour, alpha, 0)
+        return colour
+
+    def save(self, output_dir, prefix='heatmap', background=None):
+        """Write ``<prefix>.npy`` and one PNG per type plus ``<prefix>_all.png``."""
+        import cv2
+
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        paths = [output_dir / f"{prefix}.npy"]
+        np.save(paths[0], self.grid())
+        for channel in self.types + (None,):
+            path = output_dir / f"{prefix}_{channel or 'all'}.png"
+            cv2.imwrite(str(path), self.render(channel, background))
+            paths.append(path)
+        return paths
+
+
+class HeatmapRecorder:
+    """Owns a camera's heatmap and exports it every ``export_interval_s``."""
+
+    def __init__(self, config=None, camera='default'):
+        self.config = config or {}
+        settings = dict(DEFAULT_HEATMAP_CONFIG)
+        settings.update(self.config.get('heatmap') or {})
+        self.export_interval_s = settings['export_interval_s']
+        self.output_dir = Path(settings['output_dir'])
+        self.camera = camera
+        self.heatmap = None
+        self._last_export = time.monotonic()
+        self._background = None
+
+    def update(self, frame, violations):
+        """Accumulate one frame; exports when the interval has passed.
+
+        The background is captured from the first frame and again before each
+        periodic export, as a downscaled copy (``frame`` is not kept).
+        """
+        if self.heatmap is None or (self.heatmap.width, self.heatmap.height) != \
+                (frame.shape[1], frame.shape[0]):
+            self.heatmap = ViolationHeatmap.from_config(self.config, frame.shape[1], frame.shape[0])
+            self._background = None
+        self.heatmap.add(violations)
+        due = self.export_interval_s and time.monotonic() - self._last_export >= self.export_interval_s
+        if due or self._background is None:
+            self._background = self._capture(frame)
+        if due:
+            self.export()
+
+    def export(self):
+        """Save the current heatmap (no-op before the first frame)."""
+        self._last_export = time.monotonic()
+        if self.heatmap is None:
+            return []
+        prefix = f"heatmap_{self.camera}"
+        return self.heatmap.save(self.output_dir, prefix, background=self._background)
+
+    @staticmethod
+    def _capture(frame):
+        """Private, downscaled copy of ``frame`` for the export background."""
+        import cv2
+
+        height, width = frame.shape[:2]
+        if width <= BACKGROUND_WIDTH:
+            return frame.copy()
+        scale = BACKGROUND_WIDTH / width
+        return cv2.resize(frame, (BACKGROUND_WIDTH, max(1, int(height * scale))),
+                          interpolation=cv2.INTER_AREA)
@@ -1,47 +1,185 @@
 """
 Logging utility for Edge Safety Monitor
+=======================================
+Logging must never stall the frame loop (a slow SD card write can take
+tens of milliseconds), so the application logger only has a
+``QueueHandler``: emitting a record costs a filter check and a
+``put_nowait``. A ``QueueListener`` thread does the formatting and I/O:
+
+- console: the plain message, as the monitor always printed it
+- file: one JSON object per line, size-rotated (``RotatingFileHandler``)
+
+Repetitive per-frame messages pass ``extra={'rate_key': ...}``; records with
+the same key are let through at most once per ``rate_limit_s`` and the next
+one that passes carries the number suppressed. Any other ``extra`` fields
+end up in the JSON record.
 """
 
+import atexit
+import json
 import logging
+import logging.handlers
+import queue
 import sys
-from pathlib import Path
 from datetime import datetime
+from pathlib import Path
+
+# Attributes every LogRecord has; anything else came in through ``extra``
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+_LISTENERS = {}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, including ``extra`` fields."""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and key != 'rate_key':
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """Passes records with a ``rate_key`` at most once per ``interval_s`` per key."""
+
+    def __init__(self, interval_s=5.0, max_keys=1024):
+        super().__init__()
+        self.interval_s = interval_s
+        self.max_keys = max_keys
+        self._last = {}         # key -> [created of last passed record, suppressed since]
+
+    def filter(self, record):
+        key = getattr(record, 'rate_key', None)
+        if key is None or not self.interval_s:
+            return True
+        state = self._last.get(key)
+        if state is not None and record.created - state[0] < self.interval_s:
+            state[1] += 1
+            return False
+        if state is None:
+            if len(self._last) >= self.max_keys:
+                del self._last[next(iter(self._last))]     # oldest key
+            self._last[key] = state = [0.0, 0]
+        if state[1]:
+            record.suppressed = state[1]
+        state[0], state[1] = record.created, 0
+        return True
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """``QueueHandler`` that counts records dropped on a full queue instead of raising."""
+
+    dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _Listener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self):
+        # Blocking, so stopping behind a full queue waits for the backlog instead of raising
+        self.queue.put(self._sentinel)
+
 
+class _ConsoleHandler(logging.StreamHandler):
+    """Writes to whatever ``sys.stdout`` is at emit time (it may be swapped after setup)."""
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+def setup_logger(name="edge_safety_monitor", log_file=None, level=logging.INFO,
+                 max_bytes=10 * 1024 * 1024, backup_count=5, rate_limit_s=5.0,
+                 max_queue=10000, console=True):
+    """Setup a queue-backed logger with console and (JSON, rotating) file output."""
+    stop_logger(name)
 
-def setup_logger(name="edge_safety_monitor", log_file=None, level=logging.INFO):
-    """Setup logger with console and file handlers."""
-    
     logger = logging.getLogger(name)
     logger.setLevel(level)
-    
-    # Remove existing handlers
-    logger.handlers = []
-    
-    # Create formatters
-    detailed_formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    
-    simple_formatter = logging.Formatter(
-        '%(levelname)s: %(message)s'
-    )
-    
-    # Console handler
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(level)
-    console_handler.setFormatter(simple_formatter)
-    logger.addHandler(console_handler)
-    
-    # File handler
+    logger.propagate = False
+
+    handlers = []
+    if console:
+        console_handler = _ConsoleHandler()
+        console_handler.setLevel(level)
+        console_handler.setFormatter(logging.Formatter('%(message)s'))
+        handlers.append(console_handler)
+
     if log_file:
         log_path = Path(log_file)
         log_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        file_handler = logging.FileHandler(log_file)
+
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_path, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
         file_handler.setLevel(level)
-        file_handler.setFormatter(detailed_formatter)
-        logger.addHandler(file_handler)
-    
+        file_handler.setFormatter(JsonFormatter())
+        handlers.append(file_handler)
+
+    log_queue = queue.Queue(maxsize=max_queue)
+    queue_handler = _DroppingQueueHandler(log_queue)
+    queue_handler.addFilter(RateLimitFilter(rate_limit_s))
+    logger.handlers = [queue_handler]
+
+    listener = _Listener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    _LISTENERS[name] = listener
+
     return logger
 
+
+def configure_logging(config=None, name="edge_safety_monitor"):
+    """``setup_logger`` from the ``logging`` section of config.yaml."""
+    settings = (config or {}).get('logging') or {}
+    return setup_logger(
+        name,
+        log_file=settings.get('log_file') if settings.get('save_logs') else None,
+        level=getattr(logging, str(settings.get('level', 'INFO')).upper(), logging.INFO),
+        max_bytes=int(settings.get('max_file_mb', 10) * 1024 * 1024),
+        backup_count=settings.get('backup_count', 5),
+        rate_limit_s=settings.get('rate_limit_s', 5.0),
+        max_queue=settings.get('max_queue', 10000))
+
+
+def get_logger(name="edge_safety_monitor"):
+    """Logger under the application logger, set up (console only) on first use."""
+    root_name = name.split('.', 1)[0]
+    if not logging.getLogger(root_name).handlers:
+        setup_logger(root_name)
+    return logging.getLogger(name)
+
+
+def stop_logger(name="edge_safety_monitor"):
+    """Flush queued records and stop the listener thread of ``name`` (if running)."""
+    listener = _LISTENERS.pop(name, None)
+    if listener is not None:
+        logging.getLogger(name).handlers = []      # get_logger sets it up again if needed
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+def shutdown_logging():
+    for name in list(_LISTENERS):
+        stop_logger(name)
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,23 @@
+"""
+Shared pytest configuration for Edge Safety Monitor
+"""
+
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+
+def pytest_addoption(parser):
+    """Options for the performance regression tests."""
+    group = parser.getgroup("performance")
+    group.addoption("--update-perf-baselines", action="store_true", default=False,
+                    help="Rewrite tests/perf_baselines.json from this run")
+    group.addoption("--perf-threshold", type=float, default=None,
+                    help="Allowed slowdown factor vs baseline "
+                         "(default: $PERF_SLOWDOWN_THRESHOLD or 1.5)")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "perf: performance regression micro-benchmark")
@@ -0,0 +1,126 @@
+"""
+Tests for the adaptive quality controller
+"""
+
+import pytest
+
+from src.inference.adaptive import AdaptiveController, build_ladder
+
+
+def _run(controller, seconds_per_frame, frames, clock):
+    """Feed ``frames`` frames whose busy time follows ``seconds_per_frame(controller)``."""
+    changes = []
+    for _ in range(frames):
+        busy = seconds_per_frame(controller) if controller.should_process() else 0.001
+        clock[0] += busy
+        change = controller.record(busy, now=clock[0])
+        if change:
+            changes.append(change)
+    return changes
+
+
+def test_ladder_order():
+    ladder = build_ladder([320, 640, 416], max_tiles=2, max_frame_skip=3)
+    assert ladder == [(640, 2, 1), (640, 1, 1), (416, 1, 1), (320, 1, 1),
+                      (320, 1, 2), (320, 1, 3)]
+    assert build_ladder([640], max_frame_skip=2, min_frame_skip=2) == [(640, 1, 2)]
+
+
+def test_steps_down_until_target_holds_then_recovers():
+    controller = AdaptiveController(target_fps=20, input_sizes=[640, 512, 416, 320],
+                                    max_frame_skip=3, window_frames=10)
+    assert (controller.imgsz, controller.frame_skip) == (640, 1)
+    clock = [0.0]
+
+    # Inference time scales with pixels: 640 -> 100 ms, 416 -> 42 ms
+    def slow(c):
+        return 0.1 * (c.imgsz / 640) ** 2
+
+    changes = _run(controller, slow, 200, clock)
+    assert changes and all('imgsz' in change for change in changes)
+    assert controller.imgsz == 416 and controller.frame_skip == 1   # 42 ms fits 50 ms
+    assert list(controller.changes) == changes
+
+    # The box gets 4x faster: quality climbs back to the top
+    _run(controller, lambda c: slow(c) / 4, 400, clock)
+    assert (controller.imgsz, controller.tiles, controller.frame_skip) == (640, 1, 1)
+
+
+def test_slow_source_does_not_lower_quality():
+    controller = AdaptiveController(target_fps=20, input_sizes=[640, 320], window_frames=10)
+    clock = [0.0]
+    for _ in range(100):
+        clock[0] += 0.09                     # a 10 FPS camera: waiting in cap.read()
+        busy = 0.02
+        clock[0] += busy
+        assert controller.record(busy, now=clock[0]) is None
+    assert controller.imgsz == 640
+
+
+def test_frame_skip_is_last_resort():
+    controller = AdaptiveController(target_fps=30, input_sizes=[640, 320], max_frame_skip=3,
+                                    window_frames=10)
+    _run(controller, lambda c: 0.09, 200, [0.0])     # even 320 misses the budget
+    assert controller.imgsz == 320 and controller.frame_skip == 3
+
+
+def test_no_oscillation_at_the_edge():
+    controller = AdaptiveController(target_fps=10, input_sizes=[640, 512], max_frame_skip=1,
+                                    window_frames=10, headroom=1.0)
+    clock = [0.0]
+
+    # 512 fits, 640 is predicted to fit (pixel scaling) but is really much slower
+    def frame_time(c):
+        return 0.15 if c.imgsz == 640 else 0.06
+
+    changes = _run(controller, frame_time, 2000, clock)
+    assert controller._cooldown > 1          # failed step ups back off exponentially
+    assert len(changes) < 20                 # vs. ~100 if it retried every window
+
+
+def test_from_config():
+    config = {'edge': {'target_fps': 12}, 'model': {'input_size': 512},
+              'video': {'frame_skip': 2},
+              'adaptive': {'input_sizes': [640, 512, 320], 'max_frame_skip': 4}}
+    controller = AdaptiveController.from_config(config)
+    assert controller.target_fps == 12
+    assert (controller.imgsz, controller.frame_skip) == (512, 2)
+    assert controller.ladder[-1] == (320, 1, 4)
+
+
+def test_monitor_tiles_and_skips(tmp_path):
+    pytest.importorskip("cv2")
+    pytest.importorskip("ultralytics")
+    from real_time_safety_monitor import SafetyMonitor
+    from src.utils.benchmark import StubModel, create_synthetic_frame, stub_detections
+
+    class RecordingStub(StubModel):
+        calls = []
+
+        def __call__(self, source, **kwargs):
+            self.calls.append((len(source) if isinstance(source, list) else 1, kwargs.get('imgsz')))
+            return super().__call__(source, **kwargs)
+
+    config = {'adaptive': {'enabled': True, 'max_tiles': 4, 'window_frames': 5}}
+    model = RecordingStub(stub_detections(640, 480, num_workers=3))
+    monitor = SafetyMonitor("stub", model=model, display=False, config=config)
+    monitor.output_dir = tmp_path
+    monitor.start_stream()
+    frame = create_synthetic_frame(0, 640, 480)
+
+    assert monitor.adaptive.tiles == 1           # tiling is only reached by stepping up
+    monitor.adaptive.level = 0
+    assert monitor.adaptive.tiles == 4
+    results, _, _ = monitor.detect_violations(frame)
+    assert model.calls[-1] == (4, 640)
+    assert results[0].orig_img.shape == frame.shape
+
+    # Force the cheapest level: only every 3rd frame reaches the model
+    monitor.adaptive.level = len(monitor.adaptive.ladder) - 1
+    monitor.adaptive.window_frames = 100
+    calls = len(model.calls)
+    for i in range(6):
+        annotated = monitor.process_frame(create_synthetic_frame(i, 640, 480))
+        assert annotated.shape == frame.shape
+    assert len(model.calls) - calls == 2
+    assert model.calls[-1] == (1, 320)
@@ -0,0 +1,231 @@
+"""
+Tests for the non-blocking alert dispatcher (local SMTP / HTTP stand-ins)
+"""
+
+import json
+import logging
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from src.utils.alerts import AlertDispatcher, ConsoleSink, EmailSink, WebhookSink, format_batch
+
+
+def _alert(camera='cam-1', kind='no_hardhat', track_id=7):
+    return {'camera': camera, 'type': kind, 'track_id': track_id, 'confidence': 0.9,
+            'box': [0, 0, 10, 10], 'timestamp': time.time()}
+
+
+class RecordingSink:
+    def __init__(self, fail_times=0, delay_s=0.0):
+        self.batches = []
+        self.fail_times = fail_times
+        self.delay_s = delay_s
+
+    def send(self, alerts):
+        time.sleep(self.delay_s)
+        if self.fail_times:
+            self.fail_times -= 1
+            raise ConnectionError("sink down")
+        self.batches.append(list(alerts))
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.time() + timeout
+    while not predicate() and time.time() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_submit_never_blocks_and_drops_when_full():
+    sink = RecordingSink(delay_s=0.1)
+    dispatcher = AlertDispatcher({'slow': sink}, max_queue=4, coalesce_window_s=0,
+                                 rate_limit_per_min=0).start()
+    try:
+        start = time.perf_counter()
+        accepted = [dispatcher.submit(_alert(camera=f'cam-{i}')) for i in range(50)]
+        assert time.perf_counter() - start < 0.1
+        assert not all(accepted)
+        assert dispatcher.stats['dropped'] == accepted.count(False)
+        assert dispatcher.queue_depth() <= 4
+    finally:
+        dispatcher.stop(timeout=10)
+
+
+def test_repeats_per_camera_are_coalesced_into_a_digest():
+    sink = RecordingSink()
+    dispatcher = AlertDispatcher({'rec': sink}, coalesce_window_s=0.3, rate_limit_per_min=0).start()
+    try:
+        for _ in range(5):
+            dispatcher.submit(_alert('cam-1'))
+        dispatcher.submit(_alert('cam-2'))
+        assert _wait_for(lambda: len(sink.batches) == 3)
+    finally:
+        dispatcher.stop()
+
+    sizes = sorted((batch[0]['camera'], len(batch)) for batch in sink.batches)
+    assert sizes == [('cam-1', 1), ('cam-1', 4), ('cam-2', 1)]
+    subject, body = format_batch(max(sink.batches, key=len))
+    assert 'digest' in subject and 'no-hardhat x4' in subject
+    assert len(body.splitlines()) == 4
+
+
+def test_rate_limit_defers_into_digests():
+    sink = RecordingSink()
+    dispatcher = AlertDispatcher({'rec': sink}, coalesce_window_s=0, rate_limit_per_min=2).start()
+    try:
+        for i in range(10):
+            dispatcher.submit(_alert(f'cam-{i}'))
+        time.sleep(0.3)
+        assert len(sink.batches) == 2          # burst of 2, the rest wait for tokens
+    finally:
+        dispatcher.stop()                      # stop flushes what is pending
+    assert sum(len(b) for b in sink.batches) == 10
+
+
+def test_failing_sink_is_retried_with_backoff_independently():
+    flaky, healthy = RecordingSink(fail_times=2), RecordingSink()
+    dispatcher = AlertDispatcher({'flaky': flaky, 'ok': healthy}, coalesce_window_s=0,
+                                 rate_limit_per_min=0, max_retries=3, retry_backoff_s=0.05).start()
+    try:
+        dispatcher.submit(_alert())
+        assert _wait_for(lambda: len(flaky.batches) == 1)
+    finally:
+        dispatcher.stop()
+    assert len(healthy.batches) == 1
+    assert dispatcher.stats['retries'] == 2
+    assert dispatcher.stats['failed'] == 0
+
+
+def test_console_output_and_failures_go_through_the_app_logger():
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+    logger = logging.getLogger('edge_safety_monitor.alerts')
+    logger.addHandler(handler)
+    dispatcher = AlertDispatcher({'down': RecordingSink(fail_times=5)}, coalesce_window_s=0,
+                                 rate_limit_per_min=0, max_retries=1, retry_backoff_s=0.01).start()
+    try:
+        ConsoleSink().send([_alert()])
+        dispatcher.submit(_alert())
+        assert _wait_for(lambda: dispatcher.stats['failed'] == 1)
+    finally:
+        dispatcher.stop()
+        logger.removeHandler(handler)
+    messages = [r.getMessage() for r in records]
+    assert messages[0].startswith('🚨 NO-HARDHAT (worker 7)')
+    assert "Alert sink 'down' failed: sink down" in messages
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP to accept one message."""
+
+    def handle(self):
+        self.wfile.write(b"220 localhost test\r\n")
+        data_mode, lines = False, []
+        for raw in self.rfile:
+            line = raw.decode().rstrip('\r\n')
+            if data_mode:
+                if line == '.':
+                    self.server.messages.append('\n'.join(lines))
+                    data_mode, lines = False, []
+                    self.wfile.write(b"250 OK\r\n")
+                else:
+                    lines.append(line)
+                continue
+            command = line[:4].upper()
+            if command == 'EHLO':
+                self.wfile.write(b"250 localhost\r\n")
+            elif command == 'DATA':
+                data_mode = True
+                self.wfile.write(b"354 End data with .\r\n")
+            elif command == 'QUIT':
+                self.wfile.write(b"221 Bye\r\n")
+                return
+            else:
+                self.wfile.write(b"250 OK\r\n")
+
+
+@pytest.fixture
+def smtp_server():
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), _SMTPHandler)
+    server.messages = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def webhook_server():
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_POST(self):
+            received.append(json.loads(self.rfile.read(int(self.headers['Content-Length']))))
+            self.send_response(204)
+            self.end_headers()
+
+    server = HTTPServer(('127.0.0.1', 0), Handler)
+    server.received = received
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_email_and_webhook_sinks(smtp_server, webhook_server):
+    email = EmailSink('127.0.0.1', smtp_server.server_address[1], sender='monitor@site.test',
+                      recipients=['safety@site.test'], use_tls=False, timeout_s=5)
+    webhook = WebhookSink(f'http://127.0.0.1:{webhook_server.server_address[1]}/alerts')
+    dispatcher = AlertDispatcher({'email': email, 'webhook': webhook},
+                                 coalesce_window_s=0, rate_limit_per_min=0).start()
+    try:
+        dispatcher.submit(_alert())
+        assert _wait_for(lambda: smtp_server.messages and webhook_server.received)
+    finally:
+        dispatcher.stop()
+
+    assert 'Subject: Safety violation: NO-HARDHAT (worker 7) on camera cam-1' in smtp_server.messages[0]
+    payload = webhook_server.received[0]
+    assert payload['alerts'][0]['type'] == 'no_hardhat'
+
+
+def test_from_config_builds_known_sinks():
+    dispatcher = AlertDispatcher.from_config(
+        {'alerts': {'methods': ['console', 'log', 'sms'], 'coalesce_window_s': 5}})
+    assert sorted(dispatcher.sinks) == ['console', 'log']
+    assert dispatcher.coalesce_window_s == 5
+
+
+def test_monitor_submits_confirmed_violations_once(tmp_path):
+    pytest.importorskip("torch")
+    pytest.importorskip("ultralytics")
+    from real_time_safety_monitor import SafetyMonitor
+    from src.utils.benchmark import StubModel, create_synthetic_frame
+
+    sink = RecordingSink()
+    dispatcher = AlertDispatcher({'rec': sink}, coalesce_window_s=60, rate_limit_per_min=0).start()
+    monitor = SafetyMonitor("stub", model=StubModel(), display=False, alerts=dispatcher,
+                            camera='gate-3',
+                            config={'tracking': {'enabled': True},
+                                    'safety': {'consecutive_frames': 3, 'confidence_threshold': 0.5}})
+    monitor.output_dir = tmp_path
+    monitor.start_stream()
+    frame = create_synthetic_frame(0, 640, 480)
+    for _ in range(20):
+        monitor.process_frame(frame)
+    dispatcher.stop()
+
+    episodes = sum(monitor.temporal.events.values())
+    assert episodes > 0
+    assert dispatcher.stats['submitted'] == episodes
+    alerts = [a for batch in sink.batches for a in batch]
+    assert len(alerts) == episodes and {a['camera'] for a in alerts} == {'gate-3'}
+    assert len(sink.batches) == 2           # first alert, then one digest
@@ -0,0 +1,86 @@
+"""
+Tests for person-PPE association
+"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.detection.association import (MISSING, UNKNOWN, WEARING, associate,
+                                       association_tables, worker_records, worker_violations)
+from src.detection.ppe import category_lookup
+from src.utils.benchmark import STUB_CLASS_NAMES
+
+HARDHAT, NO_HARDHAT, NO_VEST, PERSON, CONE, VEST = 0, 2, 4, 5, 6, 7
+LOOKUP = category_lookup(STUB_CLASS_NAMES)
+TABLES = association_tables(LOOKUP)
+
+
+def _split(rows):
+    rows = np.asarray(rows, dtype=np.float32)
+    return rows[:, :4], rows[:, 4], rows[:, 5].astype(np.int64)
+
+
+def test_items_go_to_the_worker_wearing_them():
+    xyxy, conf, cls = _split([
+        [0, 0, 100, 300, 0.9, PERSON],
+        [200, 0, 300, 300, 0.9, PERSON],
+        [20, 0, 80, 40, 0.8, HARDHAT],        # worker 0
+        [220, 0, 280, 40, 0.7, NO_HARDHAT],   # worker 1
+        [200, 100, 300, 200, 0.6, VEST],      # worker 1
+        [500, 500, 520, 540, 0.9, CONE],
+    ])
+    assoc = associate(xyxy, conf, cls, TABLES)
+    assert assoc['owner'].tolist() == [0, 1, 1]
+    assert assoc['status'].tolist() == [[WEARING, UNKNOWN, UNKNOWN],
+                                        [MISSING, UNKNOWN, WEARING]]
+
+    violations = worker_violations(assoc, xyxy, conf, cls, LOOKUP)
+    assert [(v['type'], v['worker']) for v in violations] == [('no_hardhat', 1)]
+    records = worker_records(assoc)
+    assert [r['compliant'] for r in records] == [True, False]
+    assert records[1]['ppe']['safety_vest'] == 'wearing'
+
+
+def test_duplicates_and_conflicts_resolve_per_worker():
+    xyxy, conf, cls = _split([
+        [0, 0, 100, 300, 0.9, PERSON],
+        [10, 0, 90, 40, 0.6, NO_HARDHAT],
+        [12, 2, 88, 42, 0.5, NO_HARDHAT],     # duplicate negative
+        [15, 0, 85, 35, 0.8, HARDHAT],        # stronger positive wins
+        [0, 100, 100, 200, 0.7, NO_VEST],
+        [5, 105, 95, 195, 0.4, NO_VEST],
+    ])
+    assoc = associate(xyxy, conf, cls, TABLES)
+    assert assoc['status'][0].tolist() == [WEARING, UNKNOWN, MISSING]
+    assert assoc['conflict'][0].tolist() == [True, False, False]
+    violations = worker_violations(assoc, xyxy, conf, cls, LOOKUP)
+    assert len(violations) == 1
+    assert violations[0]['type'] == 'no_vest'
+    assert violations[0]['confidence'] == pytest.approx(0.7)
+
+
+def test_unmatched_negatives_are_still_reported():
+    xyxy, conf, cls = _split([
+        [0, 0, 100, 300, 0.9, PERSON],
+        [400, 0, 460, 40, 0.8, NO_HARDHAT],   # its person was not detected
+        [90, 0, 190, 40, 0.8, NO_HARDHAT],    # only 10% inside the person
+    ])
+    assoc = associate(xyxy, conf, cls, TABLES)
+    assert assoc['owner'].tolist() == [-1, -1]
+    violations = worker_violations(assoc, xyxy, conf, cls, LOOKUP)
+    assert [v['worker'] for v in violations] == [None, None]
+
+    empty = associate(np.zeros((0, 4), np.float32), np.zeros(0, np.float32),
+                      np.zeros(0, np.int64), TABLES)
+    assert empty['status'].shape == (0, 3)
+
+
+def test_crowded_frame_is_vectorized():
+    from src.utils.benchmark import stub_detections
+
+    rows = stub_detections(1920, 1080, num_workers=200)
+    xyxy, conf, cls = rows[:, :4], rows[:, 4], rows[:, 5].astype(np.int64)
+    assoc = associate(xyxy, conf, cls, TABLES)
+    assert assoc['status'].shape == (200, 3)
+    assert (assoc['owner'] >= 0).all()
@@ -0,0 +1,56 @@
+"""
+Unit tests for the benchmark helpers
+"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+
+from src.utils.benchmark import (
+    backend_name,
+    compare_reports,
+    create_synthetic_frame,
+    latency_stats,
+)
+
+
+def test_synthetic_frames_are_deterministic():
+    """Same seed and index must give identical pixels; frames must move."""
+    a = create_synthetic_frame(5, 320, 240, seed=1)
+    b = create_synthetic_frame(5, 320, 240, seed=1)
+    c = create_synthetic_frame(6, 320, 240, seed=1)
+    assert a.shape == (240, 320, 3)
+    assert a.dtype == np.uint8
+    assert np.array_equal(a, b)
+    assert not np.array_equal(a, c)
+
+
+def test_latency_stats_percentiles():
+    """Latencies are reported in milliseconds with ordered percentiles."""
+    stats = latency_stats([0.010] * 90 + [0.100] * 10)
+    assert stats['count'] == 100
+    assert stats['p50'] == pytest.approx(10.0)
+    assert stats['p99'] == pytest.approx(100.0)
+    assert stats['min'] <= stats['p50'] <= stats['p95'] <= stats['max']
+    assert latency_stats([]) == {'count': 0}
+
+
+def test_backend_name():
+    """Backends are inferred from model file names."""
+    assert backend_name('models/best.pt') == 'pytorch'
+    assert backend_name('models/best.onnx') == 'onnx'
+    assert backend_name('models/best_openvino_model') == 'openvino'
+    assert backend_name('yolov8n.yaml') == 'pytorch-untrained'
+
+
+def test_compare_reports():
+    """Comparison pairs results by (mode, backend, model)."""
+    def report(fps, p95):
+        return {'results': [{'mode': 'video', 'backend': 'pytorch', 'model': 'm.pt',
+                             'fps': fps, 'latency_ms': {'p95': p95}, 'peak_rss_mb': 100}]}
+
+    rows = compare_reports(report(10.0, 100.0), report(12.0, 80.0))
+    assert len(rows) == 1
+    assert rows[0]['fps_change_pct'] == pytest.approx(20.0)
+    assert rows[0]['p95_change_pct'] == pytest.approx(-20.0)
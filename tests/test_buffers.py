@@ -0,0 +1,96 @@
+"""
+Tests for preallocated frame buffers
+"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+cv2 = pytest.importorskip("cv2")
+
+from src.preprocessing.buffers import FramePool, Letterbox, MemoryReport
+
+
+def test_frame_pool_reuses_buffers(tmp_path):
+    from src.utils.benchmark import create_synthetic_video
+
+    video = tmp_path / 'clip.mp4'
+    create_synthetic_video(video, num_frames=12, width=320, height=240)
+    cap = cv2.VideoCapture(str(video))
+    pool = FramePool(size=3)
+    addresses = []
+    while True:
+        ret, frame = pool.read(cap)
+        if not ret:
+            break
+        assert frame.shape == (240, 320, 3)
+        addresses.append(frame.ctypes.data)
+    cap.release()
+
+    assert len(addresses) == 12
+    assert pool.allocations == 3
+    assert len(set(addresses)) == 3
+    assert addresses[:3] == addresses[3:6] == addresses[9:12]
+
+
+def test_letterbox_matches_ultralytics_and_maps_boxes_back():
+    frame = np.random.default_rng(0).integers(0, 255, (720, 1280, 3), dtype=np.uint8)
+    letterbox = Letterbox(640)
+    tensor = letterbox(frame)
+    assert tensor.shape == (1, 3, 384, 640) and tensor.dtype == np.float32
+    assert letterbox(frame) is tensor and letterbox.allocations == 1
+    # Padding rows are grey, content is RGB scaled to [0, 1]
+    assert np.allclose(tensor[0, :, 0, 0], 114 / 255)
+    assert 0.0 <= tensor.min() and tensor.max() <= 1.0
+
+    ultralytics = pytest.importorskip("ultralytics.data.augment")
+    reference = ultralytics.LetterBox((640, 640), auto=True, stride=32)(image=frame)
+    assert reference.shape[:2] == tensor.shape[2:]
+
+    boxes = np.array([[100, 112, 200, 212]], dtype=np.float32)    # input tensor coordinates
+    assert np.allclose(letterbox.scale_boxes(boxes), [[200, 200, 400, 400]])
+
+
+def test_monitor_buffer_pool_renders_in_place(tmp_path):
+    pytest.importorskip("ultralytics")
+    from real_time_safety_monitor import SafetyMonitor
+    from src.utils.benchmark import StubModel, create_synthetic_frame, stub_detections
+
+    class TensorStub(StubModel):
+        """Checks it gets the letterboxed tensor; detections are in its coordinates."""
+
+        def __call__(self, source, **kwargs):
+            assert tuple(source.shape) == (1, 3, 480, 640)
+            return super().__call__(np.zeros((480, 640, 3), np.uint8), **kwargs)
+
+    config = {'buffers': {'enabled': True, 'memory_report': True, 'report_warmup_frames': 2}}
+    monitor = SafetyMonitor("stub", model=TensorStub(stub_detections(640, 480)), display=False,
+                            config=config)
+    monitor.output_dir = tmp_path
+    monitor.start_stream()
+    for i in range(5):
+        frame = create_synthetic_frame(i, 640, 480)
+        before = frame.copy()
+        annotated = monitor.process_frame(frame)
+        assert annotated is frame
+        assert not np.array_equal(annotated, before)
+
+    summary = monitor.memory.summary()
+    monitor.memory.stop()
+    assert summary['frames'] == 3
+    assert summary['transient_kb_per_frame'] > 0
+
+
+def test_memory_report_before_warmup():
+    report = MemoryReport(warmup_frames=10).start()
+    report.tick()
+    summary = report.summary()
+    report.stop()
+    assert summary['frames'] == 0 and summary['transient_kb_per_frame'] is None
+
+    # Without warm-up the first tick is the baseline
+    report = MemoryReport(warmup_frames=0).start()
+    for _ in range(4):
+        report.tick()
+    summary = report.summary()
+    report.stop()
+    assert summary['frames'] == 3 and summary['gc_collections'] >= 0
@@ -0,0 +1,126 @@
+"""
+Tests for the person-centric detection cascade
+"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("torch")
+pytest.importorskip("ultralytics")
+
+from src.detection.boxes import box_iou, expand_boxes, nms
+from src.detection.cascade import CascadeDetector
+from src.utils.benchmark import STUB_CLASS_NAMES
+
+HARDHAT, NO_VEST, PERSON, CONE = 0, 4, 5, 6
+
+
+class FakeModel:
+    """Full frames get people + a cone; each crop gets a hardhat near its top."""
+
+    names = STUB_CLASS_NAMES
+
+    def __init__(self, persons):
+        self.persons = persons
+        self.calls = []
+
+    def __call__(self, source, imgsz=640, conf=0.25, verbose=False):
+        import torch
+        from ultralytics.engine.results import Results
+
+        batch = isinstance(source, list)
+        sources = source if batch else [source]
+        self.calls.append((len(sources), imgsz, batch))
+        results = []
+        for img in sources:
+            if batch:
+                h, w = img.shape[:2]
+                rows = [[w * 0.3, 2, w * 0.7, h * 0.2, 0.9, HARDHAT],
+                        [0, 0, w, h, 0.8, PERSON]]       # crop-stage people are dropped
+            else:
+                rows = [p + [0.9, PERSON] for p in self.persons]
+                rows.append([10, 400, 40, 460, 0.8, CONE])
+                rows.append([0, 0, 5, 5, 0.2, NO_VEST])  # below conf
+            data = torch.tensor(rows, dtype=torch.float32).reshape(-1, 6)
+            results.append(Results(orig_img=img, path='', names=self.names, boxes=data))
+        return results
+
+
+def _frame():
+    return np.zeros((480, 640, 3), dtype=np.uint8)
+
+
+def test_box_helpers():
+    a = np.array([[0, 0, 10, 10], [5, 5, 15, 15]], dtype=np.float32)
+    iou = box_iou(a, a)
+    assert iou[0, 0] == pytest.approx(1.0)
+    assert iou[0, 1] == pytest.approx(25 / 175)
+
+    boxes = np.array([[0, 0, 10, 10], [1, 1, 10, 10], [0, 0, 10, 10]], dtype=np.float32)
+    keep = nms(boxes, np.array([0.9, 0.8, 0.7]), 0.5, classes=np.array([0, 0, 1]))
+    assert sorted(keep.tolist()) == [0, 2]
+
+    grown = expand_boxes(np.array([[100, 100, 200, 300]]), 0.1, 0.25, 0.0, 640, 480)
+    assert grown.tolist() == [[90, 50, 210, 300]]
+    assert expand_boxes(np.array([[0, 0, 50, 50]]), 1, 1, 1, 60, 60).tolist() == [[0, 0, 60, 60]]
+
+
+def test_cascade_maps_crop_detections_to_frame():
+    model = FakeModel([[100, 100, 200, 300], [400, 120, 480, 320]])
+    detector = CascadeDetector(model, person_imgsz=320, ppe_imgsz=256, full_imgsz=640)
+
+    result = detector(_frame(), conf=0.5)[0]
+    assert detector.last_mode == 'cascade'
+    # one low-res full-frame pass, then one batched call for both crops
+    assert model.calls == [(1, 320, False), (2, 256, True)]
+
+    boxes = result.boxes
+    cls = boxes.cls.numpy().astype(int)
+    assert sorted(cls.tolist()) == [HARDHAT, HARDHAT, PERSON, PERSON, CONE]
+    hardhats = boxes.xyxy.numpy()[cls == HARDHAT]
+    # hardhats land inside the padded crop of their own worker, near the top
+    for hat in hardhats:
+        owner = 0 if hat[0] < 300 else 1
+        person = model.persons[owner]
+        assert person[0] - 20 <= hat[0] and hat[2] <= person[2] + 20
+        assert hat[1] < person[1]
+
+
+def test_cascade_without_people_skips_crop_stage():
+    model = FakeModel([])
+    detector = CascadeDetector(model)
+    result = detector(_frame(), conf=0.5)[0]
+    assert len(model.calls) == 1
+    assert result.boxes.cls.numpy().tolist() == [CONE]
+
+    # PPE seen without any worker is kept from the low-resolution pass
+    result = detector(_frame(), conf=0.1)[0]
+    assert len(model.calls) == 2
+    assert sorted(result.boxes.cls.numpy().tolist()) == [NO_VEST, CONE]
+
+    # A person-only model saw no PPE, so the frame gets the full pass
+    detector = CascadeDetector(model, person_model=FakeModel([]), full_imgsz=640)
+    detector(_frame(), conf=0.5)
+    assert detector.last_mode == 'full' and model.calls[-1] == (1, 640, False)
+
+
+def test_crowded_frame_falls_back_to_full_pass():
+    persons = [[20 + 60 * i, 100, 70 + 60 * i, 300] for i in range(6)]
+    model = FakeModel(persons)
+    detector = CascadeDetector(model, person_imgsz=320, ppe_imgsz=256, full_imgsz=640)
+    detector(_frame(), conf=0.5)
+    assert detector.last_mode == 'full'
+    assert model.calls[-1] == (1, 640, False)
+
+
+def test_from_config_and_missing_person_class():
+    config = {'model': {'input_size': 480},
+              'cascade': {'enabled': True, 'ppe_imgsz': 224, 'max_crops': 3, 'unknown': 1}}
+    detector = CascadeDetector.from_config(FakeModel([]), config)
+    assert (detector.full_imgsz, detector.ppe_imgsz, detector.max_crops) == (480, 224, 3)
+
+    class NoPerson(FakeModel):
+        names = {0: 'Hardhat', 1: 'NO-Hardhat'}
+
+    with pytest.raises(ValueError):
+        CascadeDetector(NoPerson([]))
@@ -0,0 +1,118 @@
+"""
+Tests for crash-resumable video checkpoints
+"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+cv2 = pytest.importorskip("cv2")
+
+from src.utils.checkpoint import VideoCheckpoint, seek_frame
+
+CONFIG = {'tracking': {'enabled': True},
+          'safety': {'consecutive_frames': 2, 'confidence_threshold': 0.5}}
+
+
+def _video(tmp_path, frames=24):
+    from src.utils.benchmark import create_synthetic_video
+
+    tmp_path.mkdir(exist_ok=True)
+    path = tmp_path / 'shift.mp4'
+    create_synthetic_video(path, num_frames=frames, width=320, height=240, fps=10)
+    return path
+
+
+def _frame_count(path):
+    cap = cv2.VideoCapture(str(path))
+    count = 0
+    while cap.grab():
+        count += 1
+    cap.release()
+    return count
+
+
+def test_checkpoint_round_trip_and_seek(tmp_path):
+    video = _video(tmp_path)
+    checkpoint = VideoCheckpoint(tmp_path / 'ckpt' / 'shift.ckpt', video, interval_s=0, interval_frames=5)
+    assert checkpoint.load() is None and not checkpoint.due(4) and checkpoint.due(5)
+    checkpoint.save({'frame': 5, 'segments': ['a.mp4']})
+    assert not checkpoint.due(9) and checkpoint.due(10)
+    assert VideoCheckpoint(checkpoint.path, video).load()['segments'] == ['a.mp4']
+
+    # A checkpoint of another (or re-encoded) file is ignored
+    other = _video(tmp_path / 'other', frames=30)
+    assert VideoCheckpoint(checkpoint.path, other).load() is None
+    # ... and same-named videos in different directories get their own files
+    config = {'checkpoint': {'output_dir': str(tmp_path / 'ckpt')}}
+    paths = {VideoCheckpoint.from_config(config, v).path for v in (video, other)}
+    assert len(paths) == 2 and all(p.name.startswith('shift-') for p in paths)
+
+    cap = cv2.VideoCapture(str(video))
+    frames = [cap.read()[1] for _ in range(12)]
+    assert seek_frame(cap, 7)
+    assert np.array_equal(cap.read()[1], frames[7])
+    cap.release()
+
+
+def test_interrupted_job_resumes_with_identical_results(tmp_path):
+    pytest.importorskip("torch")
+    pytest.importorskip("ultralytics")
+    from real_time_safety_monitor import SafetyMonitor
+    from src.utils.benchmark import StubModel
+
+    class FlakyStub(StubModel):
+        """Detections depend on the frame; raises on call ``crash_at`` like a dying node."""
+
+        def __init__(self, crash_at=None, error=RuntimeError):
+            super().__init__()
+            self.calls, self.crash_at, self.error = 0, crash_at, error
+            self.all = self.detections
+
+        def __call__(self, source, **kwargs):
+            self.calls += 1
+            if self.calls == self.crash_at:
+                raise self.error("node restarted")
+            self.detections = self.all[:len(self.all) - int(source.mean()) % 3]
+            return super().__call__(source, **kwargs)
+
+    video = _video(tmp_path)
+
+    def run(name, crash_at=None, resume=False, error=RuntimeError):
+        config = dict(CONFIG, checkpoint={'enabled': True, 'output_dir': str(tmp_path / name / 'ckpt'),
+                                          'interval_s': 0, 'interval_frames': 5})
+        monitor = SafetyMonitor("stub", model=FlakyStub(crash_at, error), display=False, config=config)
+        monitor.output_dir = tmp_path / name
+        monitor.output_dir.mkdir(exist_ok=True)
+        monitor.monitor_video(str(video), resume=resume)
+        return monitor
+
+    reference = run('reference')
+    with pytest.raises(RuntimeError):
+        run('job', crash_at=13)
+    state = VideoCheckpoint.from_config({'checkpoint': {'output_dir': str(tmp_path / 'job' / 'ckpt')}},
+                                        video).load()
+    assert state['frame'] == 10 and len(state['segments']) == 2 and not state['complete']
+
+    resumed = run('job', resume=True)
+    assert resumed.model.calls == 14                  # frames 11-24 only
+    assert resumed.violations == reference.violations
+    assert resumed.temporal.events == reference.temporal.events
+
+    listed = (tmp_path / 'job').glob('monitored_*_segments.txt')
+    segments = [line.split("'")[1] for line in next(listed).read_text().splitlines()]
+    assert len(segments) == 5
+    assert sum(_frame_count(tmp_path / 'job' / name) for name in segments) == 24
+    assert sorted(p.name for p in (tmp_path / 'job').glob('*.mp4')) == sorted(segments)
+
+    again = run('job', resume=True)
+    assert again.model.calls == 0                     # already complete
+
+    # Ctrl+C during inference of frame 13 checkpoints the 12 written frames
+    run('stopped', crash_at=13, error=KeyboardInterrupt)
+    state = VideoCheckpoint.from_config({'checkpoint': {'output_dir': str(tmp_path / 'stopped' / 'ckpt')}},
+                                        video).load()
+    assert state['frame'] == 12 and not state['complete']
+    resumed = run('stopped', resume=True)
+    assert resumed.model.calls == 12                  # frames 13-24
+    assert resumed.violations == reference.violations
+    assert resumed.temporal.events == reference.temporal.events
@@ -0,0 +1,114 @@
+"""
+Tests for dataset preparation
+"""
+
+import json
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+cv2 = pytest.importorskip("cv2")
+
+from src.preprocessing.dataset import class_index, prepare_dataset, split_for
+
+NAMES = {0: 'person', 1: 'helmet', 2: 'no_helmet', 3: 'vest', 4: 'no_vest'}
+
+
+def _image(path, width, height, value=0):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    img = np.random.default_rng(value).integers(0, 255, (height, width, 3), dtype=np.uint8)
+    cv2.imwrite(str(path), img)
+
+
+def _raw_tree(raw):
+    # YOLO source with its own class order
+    _image(raw / 'helmet' / 'images' / 'a.jpg', 400, 200, 1)
+    (raw / 'helmet' / 'labels').mkdir(parents=True)
+    (raw / 'helmet' / 'labels' / 'a.txt').write_text("0 0.5 0.5 0.2 0.4\n1 0.2 0.2 0.1 0.1\n2 0.1 0.1 0.1 0.1\n")
+    (raw / 'helmet' / 'classes.txt').write_text("head\nHardhat\nladder\n")
+
+    # VOC source
+    _image(raw / 'vest' / 'b.png', 1280, 960, 2)
+    (raw / 'vest' / 'b.xml').write_text(
+        "<annotation><size><width>1280</width><height>960</height></size>"
+        "<object><name>Safety Vest</name><bndbox><xmin>100</xmin><ymin>200</ymin>"
+        "<xmax>300</xmax><ymax>600</ymax></bndbox></object></annotation>")
+
+    # COCO source
+    _image(raw / 'site' / 'imgs' / 'c.jpg', 320, 240, 3)
+    coco = {'images': [{'id': 7, 'file_name': 'imgs/c.jpg', 'width': 320, 'height': 240}],
+            'categories': [{'id': 1, 'name': 'person'}],
+            'annotations': [{'image_id': 7, 'category_id': 1, 'bbox': [32, 24, 64, 48]}]}
+    (raw / 'site' / 'coco.json').write_text(json.dumps(coco))
+
+
+def _labels(out):
+    return {p.name: p.read_text().split("\n")[:-1] for p in out.glob('*/labels/*.txt')}
+
+
+def test_convert_remap_resize_split(tmp_path):
+    raw, out = tmp_path / 'raw', tmp_path / 'processed'
+    _raw_tree(raw)
+    stats = prepare_dataset(raw, out, NAMES, {'max_size': 640}, workers=2)
+    assert stats['found'] == 3 and stats['processed'] == 3
+    assert stats['dropped_boxes'] == 1                       # "ladder" has no target class
+
+    labels = _labels(out)
+    assert [l.split()[0] for l in labels['helmet_images_a.txt']] == ['2', '1']   # head, Hardhat
+    assert labels['vest_b.txt'] == ['3 0.156250 0.416667 0.156250 0.416667']
+    assert labels['site_imgs_c.txt'] == ['0 0.200000 0.200000 0.200000 0.200000']
+
+    vest = next(out.glob('*/images/vest_b.jpg'))
+    assert cv2.imread(str(vest)).shape == (480, 640, 3)        # longest side -> 640
+    assert sum(stats['splits'].values()) == 3
+
+
+def test_colliding_names_do_not_overwrite(tmp_path):
+    raw, out = tmp_path / 'raw', tmp_path / 'processed'
+    for name, value in (('a b', 1), ('a_b', 2)):
+        _image(raw / 'cam' / f'{name}.jpg', 64, 48, value)
+        (raw / 'cam' / f'{name}.txt').write_text(f"0 0.5 0.5 0.{value} 0.{value}\n")
+    (raw / 'cam' / 'classes.txt').write_text("person\n")
+    stats = prepare_dataset(raw, out, NAMES, workers=1)
+    assert stats['processed'] == 2
+
+    labels = _labels(out)
+    assert len(labels) == 2 and all(name.startswith('cam_a_b_') for name in labels)
+    assert sorted(v[0].split()[3] for v in labels.values()) == ['0.100000', '0.200000']
+    assert len(list(out.glob('*/images/*.jpg'))) == 2
+
+
+def test_incremental_rerun(tmp_path):
+    raw, out = tmp_path / 'raw', tmp_path / 'processed'
+    _raw_tree(raw)
+    prepare_dataset(raw, out, NAMES, workers=1)
+
+    stats = prepare_dataset(raw, out, NAMES, workers=1)
+    assert stats['processed'] == 0 and stats['unchanged'] == 3
+
+    # A touched but identical file is re-hashed, not re-written
+    os.utime(raw / 'vest' / 'b.png', ns=(1, 1))
+    stats = prepare_dataset(raw, out, NAMES, workers=1)
+    assert stats['touched'] == 1 and stats['processed'] == 0
+
+    (raw / 'helmet' / 'labels' / 'a.txt').write_text("1 0.5 0.5 0.2 0.4\n")
+    (raw / 'site' / 'imgs' / 'c.jpg').unlink()
+    stats = prepare_dataset(raw, out, NAMES, workers=1)
+    assert stats['processed'] == 1 and stats['removed'] == 1 and stats['unchanged'] == 1
+    labels = _labels(out)
+    assert labels['helmet_images_a.txt'] == ['1 0.500000 0.500000 0.200000 0.400000']
+    assert 'site_imgs_c.txt' not in labels
+
+    # Different settings rebuild everything
+    stats = prepare_dataset(raw, out, NAMES, {'max_size': 320}, workers=1)
+    assert stats['processed'] == 2
+
+
+def test_class_index_and_split():
+    index = class_index(NAMES, aliases={'hi-vis': 'vest'})
+    assert index['hardhat'] == 1 and index['no_safety_vest'] == 4 and index['hi_vis'] == 3
+    assert 'phone' not in index                  # target has no phone class
+    digests = [f"{i:08x}" + "0" * 32 for i in range(0, 0xFFFFFFFF, 0x01000000)]
+    splits = [split_for(d, [0.8, 0.1, 0.1]) for d in digests]
+    assert splits.count('train') > splits.count('val') > 0 and splits.count('test') > 0
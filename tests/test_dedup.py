@@ -0,0 +1,76 @@
+"""
+Tests for the near-duplicate image index
+"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+cv2 = pytest.importorskip("cv2")
+
+from src.preprocessing.dedup import (MultiIndexHash, find_duplicates, find_leaks, hamming,
+                                     image_phash, phash)
+
+
+def test_index_matches_brute_force():
+    rng = np.random.default_rng(0)
+    hashes = rng.integers(0, 2 ** 63, 5000, dtype=np.int64).astype(np.uint64) << np.uint64(1)
+    index = MultiIndexHash(max_distance=5)
+    for value in hashes.tolist():
+        index.add(value)
+    # Plant neighbours at known distances
+    for flips in (0, 3, 5, 6):
+        query = int(hashes[42]) ^ sum(1 << b for b in range(0, flips * 9, 9))
+        expected = set(np.nonzero(hamming(hashes, np.uint64(query)) <= 5)[0].tolist())
+        found = index.query(query)
+        assert {item for item, _ in found} == expected
+        assert (42 in expected) == (flips <= 5)
+    assert all(d1 <= d2 for (_, d1), (_, d2) in zip(found, found[1:]))
+
+
+def test_phash_is_robust_to_small_changes(tmp_path):
+    rng = np.random.default_rng(1)
+    scene = cv2.GaussianBlur(rng.integers(0, 255, (480, 640), dtype=np.uint8), (31, 31), 0)
+    other = cv2.GaussianBlur(rng.integers(0, 255, (480, 640), dtype=np.uint8), (31, 31), 0)
+    noisy = np.clip(scene + rng.normal(0, 3, scene.shape), 0, 255).astype(np.uint8)
+    cv2.imwrite(str(tmp_path / 'scene.jpg'), scene, [cv2.IMWRITE_JPEG_QUALITY, 60])
+
+    base = phash(scene)
+    assert hamming(base, phash(noisy)) <= 4
+    assert hamming(base, image_phash(tmp_path / 'scene.jpg')) <= 4
+    assert hamming(base, phash(other)) > 12
+    assert image_phash(tmp_path / 'missing.jpg') is None
+
+
+def test_greedy_dedup_and_leaks():
+    base = 0x0F0F_F0F0_1234_5678
+    frames = [('v/000.jpg', base), ('v/001.jpg', base ^ 0b1), ('v/002.jpg', base ^ 0b11),
+              ('v/003.jpg', base ^ 0b11111111), ('w/000.jpg', ~base & (2 ** 64 - 1))]
+    duplicates = find_duplicates(frames, max_distance=4)
+    assert duplicates == {'v/001.jpg': 'v/000.jpg', 'v/002.jpg': 'v/000.jpg'}
+
+    leaks = find_leaks({'train': [('a', base)], 'val': [('b', base ^ 0b111), ('c', ~base & (2 ** 64 - 1))],
+                        'test': [('d', base ^ 0b1)]}, max_distance=8)
+    assert sorted((k, o) for k, _, o, _, _ in leaks) == [('b', 'a'), ('d', 'a')]
+
+
+def test_prepare_skips_duplicate_frames(tmp_path):
+    from src.preprocessing.dataset import prepare_dataset
+
+    raw = tmp_path / 'raw' / 'cam'
+    raw.mkdir(parents=True)
+    rng = np.random.default_rng(2)
+    scenes = [cv2.GaussianBlur(rng.integers(0, 255, (240, 320, 3), dtype=np.uint8), (21, 21), 0)
+              for _ in range(2)]
+    for i in range(6):
+        frame = np.clip(scenes[i // 3] + rng.normal(0, 2, scenes[0].shape), 0, 255).astype(np.uint8)
+        cv2.imwrite(str(raw / f"{i:03d}.jpg"), frame)
+        (raw / f"{i:03d}.txt").write_text("0 0.5 0.5 0.1 0.1\n")
+    (raw / 'classes.txt').write_text("person\n")
+
+    stats = prepare_dataset(tmp_path / 'raw', tmp_path / 'out', ['person'], workers=1)
+    assert stats['duplicates'] == 4 and stats['processed'] == 2
+    stats = prepare_dataset(tmp_path / 'raw', tmp_path / 'out', ['person'], workers=1)
+    assert stats['unchanged'] == 2 and stats['removed'] == 0
+    stats = prepare_dataset(tmp_path / 'raw', tmp_path / 'out', ['person'], {'dedup': False},
+                            workers=1)
+    assert stats['processed'] == 4
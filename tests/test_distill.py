@@ -0,0 +1,63 @@
+"""
+Tests for distillation and structured pruning
+"""
+
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("ultralytics")
+
+from ultralytics.nn.tasks import DetectionModel
+
+from src.training.distill import (check_distill_support, profile_model, prunable_pairs, prune_channels,
+                                  student_cfg)
+
+
+def _model(cfg='yolov8n.yaml'):
+    return DetectionModel(cfg, nc=4, verbose=False).eval()
+
+
+def test_student_is_narrower():
+    teacher = _model()
+    student = DetectionModel(student_cfg(teacher.yaml, width=0.5), nc=4, verbose=False)
+    params = [sum(p.numel() for p in m.parameters()) for m in (teacher, student)]
+    assert params[1] < params[0] * 0.4
+    assert len(student.model) == len(teacher.model)
+
+
+@pytest.mark.parametrize("cfg", ['yolov8n.yaml', 'yolo11n.yaml'])
+def test_pruning_removes_dead_channels_exactly(cfg):
+    torch.manual_seed(0)
+    model = _model(cfg)
+    for producer, _ in prunable_pairs(model):
+        channels = producer.bn.num_features
+        producer.bn.weight.data.uniform_(0.5, 1.0)
+        # Half the channels output SiLU(0) = 0, so removing them changes nothing
+        producer.bn.weight.data[channels // 2:] = 0
+        producer.bn.bias.data[channels // 2:] = 0
+    x = torch.rand(1, 3, 128, 128)
+    with torch.no_grad():
+        expected = model(x)[0]
+    params = sum(p.numel() for p in model.parameters())
+
+    before, after = prune_channels(model, 0.5)
+    assert after <= before // 2 + 8 * len(prunable_pairs(model))
+    assert all(p.conv.out_channels % 8 == 0 for p, _ in prunable_pairs(model))
+    assert sum(p.numel() for p in model.parameters()) < params
+    with torch.no_grad():
+        assert torch.allclose(model(x)[0], expected, atol=1e-4)
+
+
+def test_profile_reports_latency():
+    report = profile_model('yolov8n.yaml', imgsz=64, runs=3)
+    assert report['params'] > 0 and report['size_mb'] is None
+    assert report['latency_ms']['count'] == 3
+
+
+def test_old_ultralytics_fails_with_a_clear_error(monkeypatch):
+    from ultralytics import cfg
+
+    check_distill_support()
+    monkeypatch.delitem(cfg.DEFAULT_CFG_DICT, 'dis', raising=False)
+    with pytest.raises(RuntimeError, match='does not support distillation'):
+        check_distill_support()
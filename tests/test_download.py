@@ -0,0 +1,173 @@
+"""
+Tests for the manifest-driven dataset downloader
+"""
+
+import hashlib
+import io
+import json
+import shutil
+import threading
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.preprocessing.download import DownloadError, download_all, fetch, read_manifest
+
+
+class FileServer(ThreadingHTTPServer):
+    """Local stand-in for a dataset host: serves ``files`` with Range support."""
+
+    daemon_threads = True
+
+    def __init__(self, files, ranges=True):
+        super().__init__(('127.0.0.1', 0), RangeHandler)
+        self.files = files
+        self.ranges = ranges
+        self.cut_after = {}          # path -> bytes to send before dropping the connection (once)
+        self.requests = []           # (path, Range header)
+        self.lock = threading.Lock()
+
+    def url(self, name):
+        return f"http://127.0.0.1:{self.server_port}/{name}"
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        name = self.path.lstrip('/')
+        with server.lock:
+            server.requests.append((name, self.headers.get('Range')))
+            cut = server.cut_after.pop(name, None)
+        if name not in server.files:
+            self.send_error(404)
+            return
+        data = server.files[name]
+        start = 0
+        header = self.headers.get('Range')
+        if server.ranges and header and header.startswith('bytes='):
+            start = int(header[6:].split('-')[0])
+            if start >= len(data):
+                self.send_response(416)
+                self.send_header('Content-Range', f"bytes */{len(data)}")
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header('Content-Range', f"bytes {start}-{len(data) - 1}/{len(data)}")
+        else:
+            self.send_response(200)
+        self.send_header('Content-Length', str(len(data) - start))
+        self.end_headers()
+        body = data[start:]
+        if cut is not None:
+            self.wfile.write(body[:cut])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server():
+    payload = bytes(range(256)) * 4096                     # 1 MiB
+    server = FileServer({'big.bin': payload})
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _sha(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _zip(files):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as zf:
+        for name, text in files.items():
+            zf.writestr(name, text)
+    return buffer.getvalue()
+
+
+def test_broken_transfer_resumes_with_a_range_request(server, tmp_path):
+    data = server.files['big.bin']
+    server.cut_after['big.bin'] = 300_000
+    result = fetch(server.url('big.bin'), tmp_path / 'big.bin', sha256=_sha(data),
+                   chunk_size=64 * 1024, backoff_s=0)
+    assert (tmp_path / 'big.bin').read_bytes() == data
+    assert result['sha256'] == _sha(data) and result['bytes'] == len(data) - 300_000
+    assert [r for _, r in server.requests] == [None, 'bytes=300000-']
+    assert not (tmp_path / 'big.bin.part').exists()
+
+    # A partial file from an earlier run continues where it stopped
+    (tmp_path / 'again.bin.part').write_bytes(data[:1000])
+    result = fetch(server.url('big.bin'), tmp_path / 'again.bin', sha256=_sha(data))
+    assert result['resumed_at'] == 1000 and result['bytes'] == len(data) - 1000
+    assert server.requests[-1] == ('big.bin', 'bytes=1000-')
+
+
+def test_servers_without_ranges_and_bad_checksums(server, tmp_path):
+    data = server.files['big.bin']
+    server.ranges = False
+    (tmp_path / 'big.bin.part').write_bytes(b'stale bytes')
+    result = fetch(server.url('big.bin'), tmp_path / 'big.bin', sha256=_sha(data))
+    assert result['resumed_at'] == 0
+    assert (tmp_path / 'big.bin').read_bytes() == data
+
+    with pytest.raises(DownloadError, match='verification failed'):
+        fetch(server.url('big.bin'), tmp_path / 'bad.bin', sha256='0' * 64)
+    assert not (tmp_path / 'bad.bin').exists() and not (tmp_path / 'bad.bin.part').exists()
+    with pytest.raises(DownloadError, match='404'):
+        fetch(server.url('missing.bin'), tmp_path / 'missing.bin', retries=0)
+
+
+def test_manifest_downloads_extract_and_reruns_skip(server, tmp_path):
+    archives = {f"set{i}.zip": _zip({f"images/{i}.jpg": f"image {i}", f"labels/{i}.txt": '0 0.5 0.5 1 1\n'})
+                for i in range(3)}
+    server.files.update(archives)
+    manifest = tmp_path / 'datasets.yaml'
+    manifest.write_text(json.dumps({'datasets': [
+        {'url': server.url(name), 'sha256': _sha(data), 'size': len(data)} for name, data in archives.items()
+    ] + [{'name': 'weights', 'url': server.url('big.bin'), 'sha256': _sha(server.files['big.bin'])},
+         {'url': server.url('missing.zip')}]}))
+    entries = read_manifest(manifest)
+    assert [e['name'] for e in entries] == ['set0', 'set1', 'set2', 'weights', 'missing']
+    assert entries[0]['extract_to'] == 'raw/set0' and entries[3]['extract_to'] is None
+
+    events = []
+    stats = download_all(entries, tmp_path / 'downloads', tmp_path / 'data', workers=3, extract_workers=2,
+                         retries=0, progress=lambda event, entry, info: events.append((event, entry['name'])))
+    assert (stats['downloaded'], stats['extracted'], stats['skipped']) == (4, 3, 0)
+    assert [name for name, _ in stats['failed']] == ['missing']
+    assert (tmp_path / 'data' / 'raw' / 'set1' / 'labels' / '1.txt').read_text() == '0 0.5 0.5 1 1\n'
+    for name in ('set0', 'set1', 'set2'):
+        assert events.index(('downloaded', name)) < events.index(('extracted', name))
+
+    server.requests.clear()
+    stats = download_all(entries[:4], tmp_path / 'downloads', tmp_path / 'data', retries=0)
+    assert (stats['downloaded'], stats['extracted'], stats['skipped']) == (0, 0, 4)
+    assert server.requests == []
+
+    # A deleted extraction is redone from the verified archive; a changed file is fetched again
+    shutil.rmtree(tmp_path / 'data' / 'raw' / 'set2')
+    (tmp_path / 'downloads' / 'set0.zip').write_bytes(b'corrupt')
+    stats = download_all(entries[:4], tmp_path / 'downloads', tmp_path / 'data', retries=0)
+    assert (stats['downloaded'], stats['extracted'], stats['skipped']) == (1, 2, 3)
+    assert [name for name, _ in server.requests] == ['set0.zip']
+    assert (tmp_path / 'data' / 'raw' / 'set2' / 'images' / '2.jpg').read_text() == 'image 2'
+
+
+def test_schemeless_url_fails_its_entry_only(server, tmp_path):
+    manifest = tmp_path / 'datasets.yaml'
+    manifest.write_text(json.dumps({'datasets': [
+        {'url': 'example.com/helmet.zip'},
+        {'url': server.url('big.bin'), 'sha256': _sha(server.files['big.bin'])}]}))
+    stats = download_all(read_manifest(manifest), tmp_path / 'downloads', tmp_path / 'data', retries=0)
+    assert stats['downloaded'] == 1
+    assert sorted(name for name, _ in stats['failed']) == ['helmet']
+    assert 'not an http(s) URL' in dict(stats['failed'])['helmet']
@@ -0,0 +1,142 @@
+"""
+Tests for the cached-prediction evaluation harness
+"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.detection.ppe import label_category
+from src.utils.evaluation import (average_precision, candidate_pairs, class_map, evaluate,
+                                  label_path, load_labels, match_predictions, remap_predictions)
+
+NAMES = {0: 'person', 1: 'helmet', 2: 'no_helmet'}
+
+
+def _flat(per_image, with_conf=True):
+    """Flat prediction/label dict from per-image lists of ``[x1, y1, x2, y2, (conf,) cls]`` rows."""
+    rows = [np.asarray(r, dtype=np.float32).reshape(-1, 6 if with_conf else 5) for r in per_image]
+    data = np.concatenate(rows)
+    flat = {'boxes': data[:, :4], 'cls': data[:, -1].astype(np.int64),
+            'offsets': np.concatenate([[0], np.cumsum([len(r) for r in rows])]).astype(np.int64)}
+    if with_conf:
+        flat['conf'] = data[:, 4]
+    return flat
+
+
+def _random_set(rng, images=150, nc=3):
+    truth, preds = [], []
+    for _ in range(images):
+        n = rng.integers(0, 6)
+        xy = rng.uniform(0, 400, (n, 2))
+        gt = np.hstack([xy, xy + rng.uniform(20, 120, (n, 2)), rng.integers(0, nc, (n, 1))])
+        found = gt[rng.random(n) < 0.8]
+        boxes = found[:, :4] + rng.normal(0, 6, (len(found), 4))
+        extra = rng.uniform(0, 400, (rng.integers(0, 3), 2))
+        boxes = np.vstack([boxes, np.hstack([extra, extra + 50])])
+        cls = np.concatenate([found[:, 4], rng.integers(0, nc, len(extra))])
+        truth.append(gt)
+        preds.append(np.hstack([boxes, rng.random((len(cls), 1)), cls[:, None]]))
+    return _flat(preds), _flat(truth, with_conf=False)
+
+
+def _naive_ap(tp, conf, cls, num_gt, c, t):
+    order = np.argsort(-conf[cls == c], kind='stable')
+    hits = np.cumsum(tp[cls == c][order, t])
+    precision = hits / np.arange(1, len(hits) + 1)
+    recall = hits / num_gt[c]
+    envelope = np.maximum.accumulate(precision[::-1])[::-1]
+    points = [envelope[i] if i < len(recall) else 0.0
+              for i in np.searchsorted(recall, np.linspace(0, 1, 101), side='left')]
+    return np.mean(points)
+
+
+def test_vectorized_ap_matches_per_class_reference():
+    preds, labels = _random_set(np.random.default_rng(0))
+    tp = match_predictions(candidate_pairs(preds, labels), preds['conf'])
+    num_gt = np.bincount(labels['cls'], minlength=3)
+    ap = average_precision(tp, preds['conf'], preds['cls'], num_gt)
+    for c in range(3):
+        for t in (0, 5, 9):
+            assert ap[c, t] == pytest.approx(_naive_ap(tp, preds['conf'], preds['cls'], num_gt, c, t))
+    assert 0.2 < np.nanmean(ap[:, 0]) < 1
+
+
+def _naive_match(preds, labels, thresholds=np.linspace(0.5, 0.95, 10)):
+    """pycocotools' evaluateImg loop, per image and IoU threshold."""
+    from src.detection.boxes import box_iou
+
+    tp = np.zeros((len(preds['conf']), len(thresholds)), dtype=bool)
+    for i in range(len(preds['offsets']) - 1):
+        p0, p1 = preds['offsets'][i:i + 2]
+        g0, g1 = labels['offsets'][i:i + 2]
+        order = p0 + np.argsort(-preds['conf'][p0:p1], kind='stable')
+        for t, threshold in enumerate(thresholds):
+            taken = set()
+            for p in order:
+                best, best_iou = None, min(threshold, 1 - 1e-10)
+                for g in range(g0, g1):
+                    if g in taken or labels['cls'][g] != preds['cls'][p]:
+                        continue
+                    iou = box_iou(preds['boxes'][p:p + 1], labels['boxes'][g:g + 1])[0, 0]
+                    if iou >= best_iou:
+                        best, best_iou = g, iou
+                if best is not None:
+                    taken.add(best)
+                    tp[p, t] = True
+    return tp
+
+
+def test_matching_takes_the_best_unmatched_ground_truth():
+    # pred1 loses A to pred0 but still overlaps the free B
+    labels = _flat([[[0, 0, 100, 100, 0], [30, 0, 130, 100, 0]]], with_conf=False)
+    preds = _flat([[[0, 0, 100, 100, 0.9, 0], [13, 0, 113, 100, 0.8, 0]]])
+    tp = match_predictions(candidate_pairs(preds, labels), preds['conf'])
+    assert tp[:, 0].tolist() == [True, True]
+
+    for seed in range(3):
+        preds, labels = _random_set(np.random.default_rng(seed), images=60)
+        tp = match_predictions(candidate_pairs(preds, labels), preds['conf'])
+        assert (tp == _naive_match(preds, labels)).all()
+
+
+def test_matches_above_a_threshold_do_not_depend_on_weaker_predictions():
+    preds, labels = _random_set(np.random.default_rng(1))
+    tp = match_predictions(candidate_pairs(preds, labels), preds['conf'])
+    for threshold in (0.3, 0.7):
+        keep = preds['conf'] >= threshold
+        image = np.repeat(np.arange(len(preds['offsets']) - 1), np.diff(preds['offsets']))
+        subset = {'boxes': preds['boxes'][keep], 'conf': preds['conf'][keep], 'cls': preds['cls'][keep],
+                  'offsets': np.searchsorted(image[keep], np.arange(len(preds['offsets'])))}
+        assert (match_predictions(candidate_pairs(subset, labels), subset['conf']) == tp[keep]).all()
+
+
+def test_perfect_predictions_and_worker_violations():
+    worker = [[0, 0, 100, 300, 0], [20, 0, 80, 40, 2]]            # a worker without a helmet
+    labels = _flat([worker, [[200, 0, 300, 300, 0], [220, 0, 280, 40, 1]]], with_conf=False)
+    preds = _flat([[row[:4] + [0.9, row[4]] for row in worker],
+                   [[200, 0, 300, 300, 0.8, 0], [220, 0, 280, 40, 0.3, 2]]])    # weak wrong box
+    report = evaluate(preds, labels, NAMES, thresholds=[0.2, 0.5])
+    assert report['map50'] == pytest.approx(2 / 3)          # helmet is never found
+    low, high = report['thresholds']
+    assert (low['violation_precision'], low['violation_recall'], low['worker_accuracy']) == (0.5, 1.0, 0.5)
+    assert (high['violation_precision'], high['violation_recall'], high['worker_accuracy']) == (1.0, 1.0, 1.0)
+    assert report['per_class']['person']['ap50'] == pytest.approx(1.0)
+
+
+def test_labels_and_class_mapping(tmp_path):
+    image = tmp_path / 'val' / 'images' / 'a.jpg'
+    assert label_path(image) == tmp_path / 'val' / 'labels' / 'a.txt'
+    label_path(image).parent.mkdir(parents=True)
+    label_path(image).write_text("1 0.5 0.5 0.2 0.4\n")
+    labels = load_labels([image, tmp_path / 'val' / 'images' / 'b.jpg'], [(100, 200), (100, 200)])
+    assert labels['boxes'].tolist() == [[80, 30, 120, 70]]
+    assert labels['offsets'].tolist() == [0, 1, 1]
+
+    model_names = {0: 'Hardhat', 1: 'Mask', 2: 'NO-Hardhat', 3: 'Person'}
+    mapping = class_map(model_names, NAMES)
+    assert mapping.tolist() == [1, -1, 2, 0]
+    preds = _flat([[[0, 0, 1, 1, 0.9, 1], [0, 0, 1, 1, 0.9, 3]], [[0, 0, 1, 1, 0.5, 0]]])
+    remapped = remap_predictions(preds, mapping)
+    assert remapped['cls'].tolist() == [0, 1] and remapped['offsets'].tolist() == [0, 1, 2]
+    assert [label_category(n) for n in NAMES.values()] == ['person', 'hardhat', 'no_hardhat']
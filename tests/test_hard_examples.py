@@ -0,0 +1,94 @@
+"""
+Tests for hard-example mining
+"""
+
+import json
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+
+from src.detection.association import associate, association_tables
+from src.detection.ppe import category_lookup
+from src.utils.benchmark import STUB_CLASS_NAMES
+from src.utils.hard_examples import HardExampleMiner, frame_signals, yolo_labels
+
+HARDHAT, NO_HARDHAT, PERSON = 0, 2, 5
+TABLES = association_tables(category_lookup(STUB_CLASS_NAMES))
+
+
+def _frame_inputs(rows):
+    rows = np.asarray(rows, dtype=np.float32).reshape(-1, 6)
+    xyxy, conf, cls = rows[:, :4], rows[:, 4], rows[:, 5].astype(np.int64)
+    return xyxy, conf, cls, associate(xyxy, conf, cls, TABLES)
+
+
+def _scene(seed):
+    return np.random.default_rng(seed).integers(0, 256, (96, 128, 3), dtype=np.uint8)
+
+
+def test_signals_capture_conflicts_and_flicker():
+    _, conf, _, assoc = _frame_inputs([
+        [0, 0, 100, 300, 0.9, PERSON],
+        [10, 0, 90, 40, 0.6, NO_HARDHAT],
+        [15, 0, 85, 35, 0.7, HARDHAT],
+    ])
+    signals, state = frame_signals(conf, assoc, track_ids=np.array([7]))
+    assert signals == pytest.approx({'uncertainty': 0.1, 'conflict': 1.0, 'flicker': 0.0})
+
+    # Same track, now only the negative box: wearing -> missing is a flip
+    _, conf, _, assoc = _frame_inputs([
+        [0, 0, 100, 300, 0.9, PERSON],
+        [10, 0, 90, 40, 0.6, NO_HARDHAT],
+        [300, 0, 400, 300, 0.3, PERSON],          # weak box no track took
+    ])
+    signals, _ = frame_signals(conf, assoc, track_ids=np.array([7, -1]), previous=state)
+    assert signals['conflict'] == 0.0
+    assert signals['flicker'] == 1.0
+
+    empty = _frame_inputs([])
+    assert frame_signals(empty[1], empty[3])[0] == {'uncertainty': 0.0, 'conflict': 0.0, 'flicker': 0.0}
+
+
+def test_yolo_labels_are_normalized_and_clipped():
+    lines = yolo_labels([[0, 0, 64, 48], [100, 40, 140, 60]], [5, 2], 128, 96)
+    assert lines == ['5 0.250000 0.250000 0.500000 0.500000',
+                     '2 0.890625 0.520833 0.218750 0.208333']
+
+
+def test_reservoir_keeps_the_highest_scores(tmp_path):
+    miner = HardExampleMiner(tmp_path / 'cam', STUB_CLASS_NAMES, max_frames=3, min_score=0.2,
+                             min_interval_frames=0, dedup_distance=0)
+    confidences = [0.7, 0.5, 0.9, 0.3, 0.6, 0.95]
+    for seed, confidence in enumerate(confidences):
+        xyxy, conf, cls, assoc = _frame_inputs([[10, 10, 60, 90, confidence, PERSON]])
+        miner.observe(_scene(seed), xyxy, conf, cls, assoc)
+
+    assert [e['score'] for e in miner.entries] == pytest.approx([0.7, 0.5, 0.4])
+    assert len(list((tmp_path / 'cam' / 'images').glob('*.jpg'))) == 3
+    stem = miner.entries[0]['stem']
+    assert (tmp_path / 'cam' / 'labels' / f"{stem}.txt").read_text().startswith('5 ')
+    assert (tmp_path / 'cam' / 'classes.txt').read_text().split('\n')[PERSON] == STUB_CLASS_NAMES[PERSON]
+
+    # The queue survives a restart; labeled (removed) frames leave it
+    (tmp_path / 'cam' / 'images' / f"{stem}.jpg").unlink()
+    reloaded = HardExampleMiner(tmp_path / 'cam', STUB_CLASS_NAMES, max_frames=3)
+    assert len(reloaded) == 2
+    queue = json.loads((tmp_path / 'cam' / 'queue.json').read_text())
+    assert [f['score'] for f in queue['frames']] == pytest.approx([0.7, 0.5, 0.4])
+
+
+def test_near_duplicates_only_replace_weaker_frames(tmp_path):
+    miner = HardExampleMiner(tmp_path, STUB_CLASS_NAMES, min_score=0.2, min_interval_frames=0)
+    scene = _scene(0)
+    for confidence in (0.6, 0.7, 0.5):
+        xyxy, conf, cls, assoc = _frame_inputs([[10, 10, 60, 90, confidence, PERSON]])
+        miner.observe(scene.copy(), xyxy, conf, cls, assoc)
+    assert len(miner) == 1
+    assert miner.entries[0]['score'] == pytest.approx(0.5)
+    assert len(list((tmp_path / 'images').glob('*.jpg'))) == 1
+
+    xyxy, conf, cls, assoc = _frame_inputs([[10, 10, 60, 90, 0.7, PERSON]])
+    miner.observe(_scene(1), xyxy, conf, cls, assoc)
+    assert len(miner) == 2
@@ -0,0 +1,101 @@
+"""
+Tests for the liveness/throughput health probe
+"""
+
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from src.utils.health import HealthProbe, check_heartbeat, evaluate_heartbeat
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+def _heartbeat(now, **overrides):
+    data = {
+        'timestamp': now,
+        'started_at': now - 600,
+        'model_loaded': True,
+        'last_frame_ts': now - 0.1,
+        'recent_fps': 14.0,
+        'target_fps': 15,
+        'queues': {},
+    }
+    data.update(overrides)
+    return data
+
+
+def test_healthy_when_keeping_up():
+    now = time.time()
+    assert evaluate_heartbeat(_heartbeat(now), now=now) == (True, [])
+
+
+def test_unhealthy_on_stale_heartbeat_or_frozen_loop():
+    now = time.time()
+    healthy, reasons = evaluate_heartbeat(_heartbeat(now, timestamp=now - 120), now=now)
+    assert not healthy and 'hung' in reasons[0]
+
+    healthy, reasons = evaluate_heartbeat(_heartbeat(now, last_frame_ts=now - 120), now=now)
+    assert not healthy and 'frozen' in reasons[0]
+
+
+def test_unhealthy_on_throughput_collapse():
+    now = time.time()
+    healthy, reasons = evaluate_heartbeat(_heartbeat(now, recent_fps=1.0), now=now)
+    assert not healthy
+    assert 'throughput collapsed' in reasons[0]
+
+
+def test_startup_grace_period():
+    now = time.time()
+    starting = _heartbeat(now, started_at=now - 5, model_loaded=False, last_frame_ts=None)
+    assert evaluate_heartbeat(starting, now=now)[0]
+
+    stuck = _heartbeat(now, started_at=now - 600, model_loaded=False, last_frame_ts=None)
+    assert not evaluate_heartbeat(stuck, now=now)[0]
+
+
+def test_probe_writes_heartbeat(tmp_path):
+    heartbeat = tmp_path / 'heartbeat.json'
+    probe = HealthProbe(heartbeat, target_fps=15, interval_s=0.05)
+    probe.register_queue('alerts', lambda: 3)
+    probe.set_model_loaded()
+    probe.start()
+    for _ in range(20):
+        probe.frame_done()
+        time.sleep(0.01)
+    probe.stop()
+
+    data = json.loads(heartbeat.read_text())
+    assert data['model_loaded'] is True
+    assert data['frames_total'] == 20
+    assert data['queues'] == {'alerts': 3}
+    assert data['recent_fps'] > 0
+
+    healthy, reasons, _ = check_heartbeat(heartbeat, min_fps_ratio=0.0)
+    assert healthy, reasons
+
+
+def test_stop_writes_a_final_heartbeat(tmp_path):
+    heartbeat = tmp_path / 'heartbeat.json'
+    probe = HealthProbe(heartbeat, target_fps=15, interval_s=30).start()
+    deadline = time.time() + 5
+    while not heartbeat.exists() and time.time() < deadline:     # first heartbeat written
+        time.sleep(0.01)
+    for _ in range(5):
+        probe.frame_done()
+    probe.stop()
+    assert json.loads(heartbeat.read_text())['frames_total'] == 5
+
+
+def test_healthcheck_script_exit_codes(tmp_path):
+    heartbeat = tmp_path / 'heartbeat.json'
+    cmd = [sys.executable, 'scripts/healthcheck.py', '--heartbeat', str(heartbeat)]
+
+    assert subprocess.run(cmd, cwd=PROJECT_ROOT, capture_output=True).returncode == 1
+
+    heartbeat.write_text(json.dumps(_heartbeat(time.time())))
+    result = subprocess.run(cmd, cwd=PROJECT_ROOT, capture_output=True, text=True)
+    assert result.returncode == 0, result.stdout
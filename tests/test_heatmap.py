@@ -0,0 +1,77 @@
+"""
+Tests for incremental violation heatmaps
+"""
+
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.utils.heatmap import HeatmapRecorder, ViolationHeatmap
+
+
+def _violation(kind, box):
+    return {'type': kind, 'confidence': 0.9, 'box': box}
+
+
+def test_splat_matches_dense_accumulation():
+    heatmap = ViolationHeatmap(640, 480, cell_size=16)
+    rng = np.random.default_rng(0)
+    dense = np.zeros((3, 30, 40), dtype=np.float32)
+    for _ in range(50):
+        x1, y1 = rng.integers(0, 600), rng.integers(0, 440)
+        box = [x1, y1, x1 + rng.integers(16, 200), y1 + rng.integers(16, 200)]
+        heatmap.add([_violation('no_vest', box)])
+        gx1, gy1 = box[0] // 16, box[1] // 16
+        gx2, gy2 = min(40, -(-box[2] // 16)), min(30, -(-box[3] // 16))
+        dense[2, gy1:gy2, gx1:gx2] += 1
+    assert np.allclose(heatmap.grid(), dense, atol=1e-3)
+    assert heatmap.grid()[:2].sum() == 0
+
+
+def test_decay_halves_old_heat():
+    heatmap = ViolationHeatmap(160, 160, cell_size=16, half_life_frames=10)
+    heatmap.add([_violation('no_hardhat', [0, 0, 16, 16])])
+    for _ in range(10):
+        heatmap.add([])
+    assert heatmap.grid()[0, 0, 0] == pytest.approx(0.5, rel=1e-3)
+    for _ in range(2000):          # forces the running weight to renormalize
+        heatmap.add([])
+    assert heatmap.grid()[0, 0, 0] == pytest.approx(0.5 ** 201, abs=1e-12)
+
+
+def test_update_costs_microseconds():
+    heatmap = ViolationHeatmap(1920, 1080, cell_size=16, half_life_frames=300)
+    violations = [_violation('no_hardhat', [40 * i, 100, 40 * i + 60, 400]) for i in range(20)]
+    heatmap.add(violations)
+    start = time.perf_counter()
+    for _ in range(200):
+        heatmap.add(violations)
+    per_frame = (time.perf_counter() - start) / 200
+    assert per_frame < 1e-3
+
+
+def test_recorder_exports_png_and_npy(tmp_path):
+    cv2 = pytest.importorskip("cv2")
+    config = {'heatmap': {'output_dir': str(tmp_path), 'export_interval_s': 0}}
+    recorder = HeatmapRecorder(config, camera='gate')
+    frame = np.zeros((120, 160, 3), dtype=np.uint8)
+    for _ in range(5):
+        recorder.update(frame, [_violation('no_hardhat', [10, 10, 60, 100])])
+    paths = recorder.export()
+
+    names = sorted(p.name for p in paths)
+    assert names == ['heatmap_gate.npy', 'heatmap_gate_all.png', 'heatmap_gate_no_hardhat.png',
+                     'heatmap_gate_no_mask.png', 'heatmap_gate_no_vest.png']
+    grid = np.load(tmp_path / 'heatmap_gate.npy')
+    assert grid.shape == (3, 8, 10) and grid.max() == pytest.approx(5)
+    assert cv2.imread(str(tmp_path / 'heatmap_gate_all.png')).shape == frame.shape
+
+    # The background is a private copy: a pooled frame drawn on later does not leak in
+    frame[:] = 255
+    assert recorder._background.max() == 0
+    wide = np.zeros((720, 1280, 3), dtype=np.uint8)
+    recorder.update(wide, [])
+    assert recorder._background.shape == (360, 640, 3)
+    assert cv2.imread(str(recorder.export()[1])).shape == wide.shape
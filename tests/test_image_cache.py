@@ -0,0 +1,71 @@
+"""
+Tests for the memory-mapped training image cache
+"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+cv2 = pytest.importorskip("cv2")
+
+from src.training.image_cache import ImageCache, build_cache, dataset_images, load_resized
+
+
+def _dataset(root, count=4):
+    rng = np.random.default_rng(0)
+    for split in ('train', 'val'):
+        images, labels = root / split / 'images', root / split / 'labels'
+        images.mkdir(parents=True)
+        labels.mkdir(parents=True)
+        for i in range(count):
+            cv2.imwrite(str(images / f"{i}.jpg"), rng.integers(0, 255, (240 + 40 * i, 320, 3), dtype=np.uint8))
+            (labels / f"{i}.txt").write_text("0 0.5 0.5 0.2 0.3\n")
+    (root / 'data.yaml').write_text(
+        "path: .\ntrain: train/images\nval: val/images\nnames:\n  0: person\n")
+    return root / 'data.yaml'
+
+
+def test_cache_matches_decode_and_updates_incrementally(tmp_path):
+    data_yaml = _dataset(tmp_path)
+    files = dataset_images(data_yaml)
+    assert len(files) == 8
+
+    stats = build_cache(files, tmp_path / 'cache', imgsz=160, shard_mb=0.2, workers=1)
+    assert stats == {'cached': 8, 'added': 8, 'errors': 0, 'size_mb': pytest.approx(stats['size_mb'])}
+    assert len(list((tmp_path / 'cache').glob('shard_*.bin'))) > 1
+
+    cache = ImageCache(tmp_path / 'cache')
+    for path in files:
+        im, hw0, hw = cache.get(path)
+        expected, expected_hw0 = load_resized(path, 160)
+        assert np.array_equal(im, expected) and hw0 == expected_hw0 and hw == expected.shape[:2]
+        assert max(hw) == 160
+    assert cache.get(tmp_path / 'missing.jpg') is None
+
+    cv2.imwrite(str(files[0]), np.zeros((100, 100, 3), dtype=np.uint8))
+    files[1].unlink()
+    stats = build_cache(files[:1] + files[2:], tmp_path / 'cache', imgsz=160, workers=1)
+    assert stats['cached'] == 7 and stats['added'] == 1
+    cache = ImageCache(tmp_path / 'cache')
+    assert cache.get(files[0])[0].shape == (160, 160, 3) and files[1] not in cache
+
+
+def test_attach_serves_yolo_dataset(tmp_path):
+    pytest.importorskip("ultralytics")
+    from ultralytics.data import YOLODataset
+
+    data_yaml = _dataset(tmp_path)
+    build_cache(dataset_images(data_yaml), tmp_path / 'cache', imgsz=160, workers=1)
+    cache = ImageCache(tmp_path / 'cache')
+
+    dataset = YOLODataset(img_path=str(tmp_path / 'train' / 'images'), imgsz=160, augment=False,
+                          data={'names': {0: 'person'}, 'channels': 3})
+    assert cache.attach(dataset) == 4
+    im, hw0, hw = dataset.load_image(2)
+    assert isinstance(im, np.memmap)                   # no decode, no copy
+    assert np.array_equal(im, load_resized(dataset.im_files[2], 160)[0])
+    im[:] = 0                                          # copy-on-write: the shard is untouched
+    assert ImageCache(tmp_path / 'cache').get(dataset.im_files[2])[0].any()
+
+    other = YOLODataset(img_path=str(tmp_path / 'val' / 'images'), imgsz=320, augment=False,
+                        data={'names': {0: 'person'}, 'channels': 3})
+    assert cache.attach(other) == 0
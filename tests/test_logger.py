@@ -0,0 +1,81 @@
+"""
+Tests for the queue-backed structured logger
+"""
+
+import json
+import logging
+import threading
+import time
+
+from src.utils import logger as logger_module
+from src.utils.logger import RateLimitFilter, configure_logging, get_logger, setup_logger, stop_logger
+
+
+def _record(created, key='progress'):
+    record = logging.LogRecord('test', logging.INFO, __file__, 1, 'frame', None, None)
+    record.created = created
+    if key is not None:
+        record.rate_key = key
+    return record
+
+
+def test_rate_limit_per_key():
+    limiter = RateLimitFilter(interval_s=5.0)
+    passed = [limiter.filter(_record(t)) for t in (0.0, 1.0, 2.0)]
+    assert passed == [True, False, False]
+    assert limiter.filter(_record(1.5, key='other'))
+    assert limiter.filter(_record(1.5, key=None))
+
+    record = _record(6.0)
+    assert limiter.filter(record) and record.suppressed == 2
+    record = _record(12.0)
+    assert limiter.filter(record) and not hasattr(record, 'suppressed')
+
+
+def test_json_file_and_rotation(tmp_path):
+    log_file = tmp_path / 'logs' / 'monitor.log'
+    logger = setup_logger('test_json_logger', log_file=log_file, max_bytes=2000, backup_count=2,
+                          console=False)
+    for i in range(60):
+        logger.info("frame %d processed ✅", i, extra={'event': 'frame', 'frame': i})
+    logger.info("progress", extra={'rate_key': 'progress'})
+    logger.info("progress", extra={'rate_key': 'progress'})
+    stop_logger('test_json_logger')
+
+    files = sorted(log_file.parent.glob('monitor.log*'))
+    assert len(files) == 3                        # current file plus two backups
+    entries = [json.loads(line) for line in log_file.read_text(encoding='utf-8').splitlines()]
+    assert entries[-1]['message'] == 'progress'   # the second one was rate limited
+    frames = [e for e in entries if e.get('event') == 'frame']
+    assert frames and frames[-1] == {**frames[-1], 'level': 'INFO', 'frame': 59,
+                                     'message': 'frame 59 processed ✅'}
+    assert 'rate_key' not in entries[-1]
+
+
+def test_emit_does_not_wait_for_slow_handlers():
+    release = threading.Event()
+
+    class SlowHandler(logging.Handler):
+        def emit(self, record):
+            release.wait(5)
+
+    logger = setup_logger('test_slow_logger', console=False, max_queue=4)
+    logger_module._LISTENERS['test_slow_logger'].handlers = (SlowHandler(),)
+    start = time.perf_counter()
+    for i in range(50):             # the writer is stuck: records beyond the queue are dropped
+        logger.info("message %d", i)
+    assert time.perf_counter() - start < 1.0
+    assert logger.handlers[0].dropped > 0
+    release.set()
+    stop_logger('test_slow_logger')
+
+
+def test_configure_from_config(tmp_path):
+    log_file = tmp_path / 'safety.log'
+    config = {'logging': {'level': 'WARNING', 'save_logs': True, 'log_file': str(log_file)}}
+    configure_logging(config, name='test_config_logger')
+    child = get_logger('test_config_logger.monitor')
+    child.info("hidden")
+    child.warning("shown")
+    stop_logger('test_config_logger')
+    assert [json.loads(l)['message'] for l in log_file.read_text().splitlines()] == ['shown']
@@ -0,0 +1,152 @@
+"""
+Performance regression tests for the SafetyMonitor hot path
+
+Each benchmark is timed as the best of several repeats and divided by a
+fixed calibration workload measured in the same session, so the stored
+baselines in ``perf_baselines.json`` transfer between machines. A test
+fails when its normalized cost exceeds the baseline by more than the
+slowdown threshold (``--perf-threshold`` / ``$PERF_SLOWDOWN_THRESHOLD``,
+default 1.5x).
+
+Refresh the baselines after an intentional change with:
+
+    python -m pytest tests/test_performance.py --update-perf-baselines
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+cv2 = pytest.importorskip("cv2")
+pytest.importorskip("ultralytics")
+
+from src.utils.benchmark import StubModel, create_synthetic_frame
+
+pytestmark = pytest.mark.perf
+
+BASELINE_FILE = Path(__file__).parent / "perf_baselines.json"
+DEFAULT_THRESHOLD = 1.5
+REPEATS = 7
+
+
+def _best_of(fn, number, repeats=REPEATS):
+    """Best per-call time (seconds) over ``repeats`` batches of ``number`` calls."""
+    fn()  # warm caches / lazy imports
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def _calibration_workload():
+    """Fixed mix of dict/attribute work and OpenCV drawing, like the hot path."""
+    img = np.zeros((480, 640, 3), dtype=np.uint8)
+    counts = {}
+    for i in range(400):
+        key = i % 10
+        counts[key] = counts.get(key, 0) + 1
+        x = (i * 13) % 600
+        cv2.rectangle(img, (x, 10), (x + 20, 40), (0, 0, 255), 2)
+    cv2.putText(img, "calibration", (10, 100), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
+    return counts
+
+
+@pytest.fixture(scope="session")
+def perf_gate(request):
+    """Compare a benchmark against its stored baseline (or record it)."""
+    update = request.config.getoption("--update-perf-baselines")
+    threshold = request.config.getoption("--perf-threshold") or \
+        float(os.environ.get("PERF_SLOWDOWN_THRESHOLD", DEFAULT_THRESHOLD))
+
+    calibration_s = _best_of(_calibration_workload, number=20)
+    baselines = json.loads(BASELINE_FILE.read_text()) if BASELINE_FILE.exists() else {}
+    recorded = {}
+
+    def check(name, seconds):
+        normalized = seconds / calibration_s
+        recorded[name] = {"normalized": round(normalized, 4), "seconds": round(seconds, 7)}
+        if update:
+            return
+        if name not in baselines.get("benchmarks", {}):
+            pytest.skip(f"no baseline for {name}; run with --update-perf-baselines")
+        allowed = baselines["benchmarks"][name]["normalized"] * threshold
+        assert normalized <= allowed, (
+            f"{name} regressed: {normalized:.3f} calibration units "
+            f"(baseline {baselines['benchmarks'][name]['normalized']:.3f}, "
+            f"threshold {threshold}x, {seconds * 1000:.3f} ms/call)")
+
+    yield check
+
+    if update and recorded:
+        merged = dict(baselines.get("benchmarks", {}), **recorded)
+        BASELINE_FILE.write_text(json.dumps({
+            "calibration_seconds": round(calibration_s, 7),
+            "benchmarks": dict(sorted(merged.items())),
+        }, indent=2) + "\n")
+
+
+@pytest.fixture(scope="module")
+def stub_monitor(tmp_path_factory):
+    """SafetyMonitor wired to the fixed-output stub model."""
+    from real_time_safety_monitor import SafetyMonitor
+
+    monitor = SafetyMonitor("stub", conf_threshold=0.5, model=StubModel())
+    monitor.output_dir = tmp_path_factory.mktemp("perf_outputs")
+    return monitor
+
+
+@pytest.fixture(scope="module")
+def frame():
+    return create_synthetic_frame(0, 640, 480, seed=0)
+
+
+def test_detect_violations_tally(perf_gate, stub_monitor, frame):
+    """Tallying and per-worker association of a crowded frame (stub inference)."""
+    results, violations, detections = stub_monitor.detect_violations(frame)
+    assert detections["person"] == 6
+    assert violations
+
+    perf_gate("detect_violations_tally",
+              _best_of(lambda: stub_monitor.detect_violations(frame), number=50))
+
+
+def test_draw_violations_render(perf_gate, stub_monitor, frame):
+    """Rendering boxes, banner and info bar on a fixed result."""
+    results, violations, detections = stub_monitor.detect_violations(frame)
+    annotated = stub_monitor.draw_violations(frame, results, violations, detections)
+    assert annotated.shape == frame.shape
+
+    perf_gate("draw_violations_render",
+              _best_of(lambda: stub_monitor.draw_violations(frame, results, violations, detections),
+                       number=20))
+
+
+def test_single_frame_end_to_end_stub(perf_gate, stub_monitor, frame):
+    """Detect + draw for one frame with the stub model."""
+    def process():
+        results, violations, detections = stub_monitor.detect_violations(frame)
+        return stub_monitor.draw_violations(frame, results, violations, detections)
+
+    perf_gate("single_frame_end_to_end_stub", _best_of(process, number=20))
+
+
+def test_single_frame_end_to_end_network(perf_gate, frame, tmp_path):
+    """Detect + draw for one frame through an (untrained) YOLOv8n network."""
+    os.environ.setdefault("YOLO_OFFLINE", "true")
+    from real_time_safety_monitor import SafetyMonitor
+
+    monitor = SafetyMonitor("yolov8n.yaml", conf_threshold=0.5)
+    monitor.output_dir = tmp_path
+
+    def process():
+        results, violations, detections = monitor.detect_violations(frame)
+        return monitor.draw_violations(frame, results, violations, detections)
+
+    perf_gate("single_frame_end_to_end_network", _best_of(process, number=3, repeats=5))
@@ -0,0 +1,101 @@
+"""
+Tests for the live MJPEG preview server
+"""
+
+import http.client
+import threading
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+cv2 = pytest.importorskip("cv2")
+
+from src.inference.preview import BOUNDARY, PreviewServer
+
+
+@pytest.fixture
+def preview():
+    server = PreviewServer(host='127.0.0.1', port=0, max_width=160, fps=0).start()
+    yield server
+    server.stop()
+
+
+def _read_frames(port, count, received):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+    conn.request('GET', '/stream.mjpg')
+    response = conn.getresponse()
+    assert BOUNDARY in response.getheader('Content-Type')
+    while len(received) < count:
+        line = response.fp.readline()
+        if line.lower().startswith(b'content-length:'):
+            length = int(line.split(b':')[1])
+            response.fp.readline()
+            received.append(response.fp.read(length))
+    conn.close()
+
+
+def _wait_for_clients(preview, n):
+    deadline = time.time() + 5
+    while preview.clients < n and time.time() < deadline:
+        time.sleep(0.01)
+    assert preview.clients == n
+
+
+def test_publish_is_noop_without_viewers(preview):
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    assert preview.publish(frame) is False
+    assert preview.stats['published'] == 0
+
+
+def test_frames_are_encoded_once_and_fanned_out(preview):
+    received = [[], []]
+    readers = [threading.Thread(target=_read_frames, args=(preview.port, 3, r)) for r in received]
+    for t in readers:
+        t.start()
+    _wait_for_clients(preview, 2)
+
+    frame = np.full((480, 640, 3), 128, dtype=np.uint8)
+    deadline = time.time() + 5
+    while any(len(r) < 3 for r in received) and time.time() < deadline:
+        preview.publish(frame)
+        time.sleep(0.02)
+    for t in readers:
+        t.join(timeout=5)
+
+    assert all(len(r) >= 3 for r in received)
+    decoded = cv2.imdecode(np.frombuffer(received[0][0], np.uint8), cv2.IMREAD_COLOR)
+    assert decoded.shape == (120, 160, 3)  # downscaled to max_width
+    # Two viewers, but each frame was encoded only once
+    assert preview.stats['encoded'] <= preview.stats['published']
+    assert preview.stats['sent'] >= 6
+
+
+def test_publish_is_rate_limited():
+    server = PreviewServer(fps=2)
+    server._clients = 1  # pretend a viewer is attached; no HTTP needed
+    frame = np.zeros((48, 64, 3), dtype=np.uint8)
+    results = [server.publish(frame) for _ in range(10)]
+    assert results[0] is True
+    assert results.count(True) == 1
+
+
+def test_snapshot_endpoint(preview):
+    conn = http.client.HTTPConnection('127.0.0.1', preview.port, timeout=5)
+    conn.request('GET', '/snapshot.jpg')
+    assert conn.getresponse().status == 503  # nothing encoded yet
+    conn.close()
+
+    # No stream viewer: the request alone keeps the frame loop's frames encoding
+    frame = np.full((480, 640, 3), 200, dtype=np.uint8)
+    assert preview.publish(frame) is True
+    conn = http.client.HTTPConnection('127.0.0.1', preview.port, timeout=5)
+    conn.request('GET', '/snapshot.jpg')
+    response = conn.getresponse()
+    assert response.status == 200
+    decoded = cv2.imdecode(np.frombuffer(response.read(), np.uint8), cv2.IMREAD_COLOR)
+    assert decoded.shape == (120, 160, 3)
+    conn.close()
+
+    preview._snapshot_until = 0.0                     # the poller went away
+    assert preview.publish(frame) is False
@@ -0,0 +1,122 @@
+"""
+Tests for the micro-batching HTTP inference server
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+pytest.importorskip("ultralytics")
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from load_test import http_request
+from src.inference.server import InferenceServer, MicroBatcher, Overloaded, _extract_upload
+from src.utils.benchmark import StubModel, create_synthetic_frame
+
+
+def _jpeg():
+    ok, buf = cv2.imencode('.jpg', create_synthetic_frame(0, 320, 240))
+    return buf.tobytes()
+
+
+async def _with_server(coro, **kwargs):
+    server = InferenceServer(StubModel(), **kwargs)
+    host, port = await server.start('127.0.0.1', 0)
+    try:
+        return await coro(host, port, server)
+    finally:
+        await server.close()
+
+
+async def _post(host, port, body, path='/detect'):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        return await http_request(reader, writer, 'POST', path, body)
+    finally:
+        writer.close()
+
+
+def test_detect_returns_detections_and_compliance():
+    async def scenario(host, port, server):
+        return await _post(host, port, _jpeg())
+
+    status, data, _ = asyncio.run(_with_server(scenario))
+    assert status == 200
+    assert data['image_size'] == [320, 240]
+    assert data['counts']['person'] == 6
+    assert data['compliant'] is False
+    assert {v['type'] for v in data['violations']} == {'no_hardhat', 'no_vest'}
+    assert all(len(d['box']) == 4 for d in data['detections'])
+
+
+def test_concurrent_requests_are_batched():
+    async def scenario(host, port, server):
+        body = _jpeg()
+        responses = await asyncio.gather(*(_post(host, port, body) for _ in range(16)))
+        return responses, server.health()
+
+    responses, health = asyncio.run(_with_server(scenario, max_batch_size=8, max_latency_ms=50))
+    assert all(status == 200 for status, _, _ in responses)
+    assert max(data['batch_size'] for _, data, _ in responses) > 1
+    assert health['stats']['batches'] < 16
+
+
+def test_bad_requests():
+    async def scenario(host, port, server):
+        return (await _post(host, port, b'not an image'),
+                await _post(host, port, _jpeg(), path='/nope'))
+
+    (bad_status, _, _), (missing_status, _, _) = asyncio.run(_with_server(scenario))
+    assert bad_status == 400
+    assert missing_status == 404
+
+
+def test_batcher_rejects_when_queue_full():
+    def slow_predict(items):
+        time.sleep(0.2)
+        return items
+
+    async def scenario():
+        batcher = MicroBatcher(slow_predict, max_batch_size=1, max_latency_ms=0, max_queue=2)
+        await batcher.start()
+        try:
+            outcomes = await asyncio.gather(*(batcher.submit(i) for i in range(6)),
+                                            return_exceptions=True)
+        finally:
+            await batcher.stop()
+        return outcomes
+
+    outcomes = asyncio.run(scenario())
+    rejected = [o for o in outcomes if isinstance(o, Overloaded)]
+    served = [o for o in outcomes if not isinstance(o, Exception)]
+    assert rejected
+    assert served and all(batch_size == 1 for _, batch_size in served)
+
+
+def test_batcher_respects_max_latency():
+    """A lone request is dispatched after max_latency_ms, not held for a full batch."""
+    async def scenario():
+        batcher = MicroBatcher(lambda items: items, max_batch_size=64, max_latency_ms=30)
+        await batcher.start()
+        try:
+            start = time.perf_counter()
+            result = await batcher.submit('x')
+            return result, time.perf_counter() - start
+        finally:
+            await batcher.stop()
+
+    (output, batch_size), elapsed = asyncio.run(scenario())
+    assert output == 'x' and batch_size == 1
+    assert elapsed < 0.5
+
+
+def test_multipart_upload_extraction():
+    body = (b'--XyZ\r\nContent-Disposition: form-data; name="file"; filename="a.jpg"\r\n'
+            b'Content-Type: image/jpeg\r\n\r\nJPEGDATA\r\n--XyZ--\r\n')
+    assert _extract_upload('multipart/form-data; boundary=XyZ', body) == b'JPEGDATA'
+    assert _extract_upload('image/jpeg', b'RAW') == b'RAW'
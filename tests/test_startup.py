@@ -0,0 +1,86 @@
+"""
+Tests for fast startup: lazy imports, config validation and the model cache
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from src.utils.config import load_config, validate_config
+
+PROJECT_ROOT = Path(__file__).parent.parent
+HEAVY_MODULES = ("torch", "ultralytics", "cv2")
+
+
+def _loaded_modules(code):
+    """Run ``code`` in a fresh interpreter and report which heavy modules it loaded."""
+    probe = code + "\nimport sys\nprint('LOADED:' + ','.join(m for m in %r if m in sys.modules))" % (
+        HEAVY_MODULES,)
+    out = subprocess.run([sys.executable, "-c", probe], cwd=PROJECT_ROOT,
+                         capture_output=True, text=True, check=True).stdout
+    loaded = out.rsplit("LOADED:", 1)[1].strip()
+    return loaded.split(",") if loaded else []
+
+
+def test_import_monitor_is_lightweight():
+    """Importing the monitor module and ``src`` must not pull in heavy deps."""
+    assert _loaded_modules("import real_time_safety_monitor, src, src.utils") == []
+
+
+def test_help_and_check_config_are_fast_paths():
+    """--help and --check-config run without heavy imports."""
+    code = (
+        "import sys\n"
+        "sys.argv = ['real_time_safety_monitor.py', '--check-config']\n"
+        "import real_time_safety_monitor as m\n"
+        "assert m.main() == 0\n"
+    )
+    assert _loaded_modules(code) == []
+
+    result = subprocess.run([sys.executable, "real_time_safety_monitor.py", "--help"],
+                            cwd=PROJECT_ROOT, capture_output=True, text=True)
+    assert result.returncode == 0
+    assert "--check-config" in result.stdout
+
+
+def test_repository_config_is_valid():
+    assert validate_config(load_config()) == []
+
+
+def test_validate_config_reports_problems():
+    config = {
+        "model": {"input_size": 600},
+        "safety": {"consecutive_frames": 0, "confidence_threshold": 1.5},
+        "edge": {"target_fps": "fast"},
+        "logging": {"level": "LOUD"},
+    }
+    errors = validate_config(config)
+    assert len(errors) == 5
+    assert any("model.input_size" in e for e in errors)
+    assert any("edge.target_fps" in e for e in errors)
+
+
+def test_model_cache_roundtrip(tmp_path):
+    """The cache is built once, keyed by the weights hash, and loads the same model."""
+    pytest.importorskip("torch")
+    ultralytics = pytest.importorskip("ultralytics")
+    from src.inference.model_cache import cached_model_path, load_model
+
+    weights = tmp_path / "tiny.pt"
+    ultralytics.YOLO("yolov8n.yaml").save(str(weights))
+    cache_dir = tmp_path / "cache"
+
+    first = load_model(weights, cache_dir=cache_dir)
+    cache_file = cached_model_path(weights, cache_dir)
+    assert cache_file.exists()
+    assert list(cache_dir.glob("*.pt")) == [cache_file]
+
+    second = load_model(weights, cache_dir=cache_dir)
+    assert second.model.is_fused()
+    assert second.names == first.names
+
+    # Changing the weights changes the cache key
+    weights.write_bytes(weights.read_bytes() + b"\0")
+    assert cached_model_path(weights, cache_dir) != cache_file
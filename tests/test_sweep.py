@@ -0,0 +1,80 @@
+"""
+Tests for the successive-halving hyperparameter sweep
+"""
+
+import csv
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from src.training.sweep import (apply_params, last_epoch_metrics, rung_budgets, sample_space,
+                                successive_halving, train_args, write_results)
+
+
+def test_space_sampling_and_params():
+    space = {'training.learning_rate': {'low': 0.001, 'high': 0.1, 'log': True},
+             'training.batch_size': [8, 16], 'augmentation.mosaic': {'low': 0.0, 'high': 1.0}}
+    samples = sample_space(space, 20, seed=1)
+    assert samples == sample_space(space, 20, seed=1)
+    assert all(0.001 <= p['training.learning_rate'] <= 0.1 and p['training.batch_size'] in (8, 16)
+               and 0 <= p['augmentation.mosaic'] <= 1 for p in samples)
+
+    config = {'model': {'input_size': 320},
+              'training': {'epochs': 5, 'batch_size': 16, 'learning_rate': 0.01, 'patience': 5,
+                           'device': 'cpu', 'workers': 2},
+              'augmentation': {'mosaic': 1.0}}
+    tuned = apply_params(config, samples[0])
+    assert config['training']['batch_size'] == 16
+    args = train_args(tuned)
+    assert args['batch'] == samples[0]['training.batch_size']
+    assert args['lr0'] == samples[0]['training.learning_rate'] and args['imgsz'] == 320
+    assert args['mosaic'] == samples[0]['augmentation.mosaic']
+
+    assert rung_budgets(3, 27, 3) == [3, 9, 27]
+    assert rung_budgets(2, 10, 3) == [2, 6, 10]
+
+
+@pytest.mark.parametrize("parallel", [1, 3])
+def test_successive_halving_promotes_best(parallel):
+    trials = [{'id': i, 'params': {'quality': q}} for i, q in enumerate([0.2, 0.9, 0.5, 0.1, 0.7, 0.3, 0.8, 0.4, 0.6])]
+    trained = []
+
+    def evaluate(trial, epochs):
+        if trial['params']['quality'] == 0.1:
+            raise RuntimeError("diverged")
+        trained.append((trial['id'], epochs - trial['epochs'], trial['weights']))
+        return {'map50_95': trial['params']['quality'] * epochs / 27, 'map50': 0.0,
+                'weights': f"w{trial['id']}_{epochs}", 'seconds': trial['seconds'] + 1.0}
+
+    ranked = successive_halving(trials, evaluate, [3, 9, 27], eta=3, parallel=parallel)
+
+    assert [t['id'] for t in ranked[:3]] == [1, 6, 4]
+    assert ranked[0]['status'] == 'complete' and ranked[0]['epochs'] == 27
+    assert [t['status'] for t in ranked[1:3]] == ['pruned', 'pruned']
+    assert ranked[-1]['status'] == 'failed' and 'diverged' in ranked[-1]['error']
+    # 8 of 9 trials survive rung 0, so 8 // 3 are promoted; they continue from their last weights
+    assert sorted(trained[8:10]) == [(1, 6, 'w1_3'), (6, 6, 'w6_3')]
+    assert trained[10:] == [(1, 18, 'w1_9')]
+
+
+def test_deadline_stops_after_a_rung(tmp_path):
+    trials = [{'id': i, 'params': {'x': i}} for i in range(4)]
+    ranked = successive_halving(
+        trials, lambda t, e: {'map50_95': t['params']['x'], 'map50': 0, 'weights': None, 'seconds': 1.0},
+        [1, 2, 4], eta=2, deadline=0)
+    assert [(t['id'], t['status']) for t in ranked] == [(3, 'stopped'), (2, 'stopped'), (1, 'pruned'), (0, 'pruned')]
+
+    write_results(ranked, tmp_path)
+    with open(tmp_path / 'results.csv') as f:
+        rows = list(csv.DictReader(f))
+    assert [row['trial'] for row in rows] == ['3', '2', '1', '0'] and rows[0]['x'] == '3'
+
+
+def test_trials_are_scored_on_their_last_epoch(tmp_path):
+    # ultralytics' results.csv; best.pt is epoch 2, but last.pt (epoch 3) is what a trial continues from
+    results = tmp_path / 'results.csv'
+    results.write_text("epoch,time,metrics/mAP50(B),metrics/mAP50-95(B)\n"
+                       "1,10,0.3,0.1\n2,20,0.6,0.4\n3,30,0.5,0.3\n")
+    metrics = last_epoch_metrics(results)
+    assert metrics['epoch'] == 3 and metrics['metrics/mAP50-95(B)'] == 0.3
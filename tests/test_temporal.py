@@ -0,0 +1,64 @@
+"""
+Tests for the temporal violation state machine
+"""
+
+from src.detection.temporal import TemporalFilter
+
+
+def _violation(track_id=None, kind='no_hardhat', confidence=0.9):
+    violation = {'type': kind, 'confidence': confidence, 'worker': 0, 'box': [0, 0, 10, 10]}
+    if track_id is not None:
+        violation['track_id'] = track_id
+    return violation
+
+
+def test_raises_after_consecutive_frames_and_clears_with_hysteresis():
+    temporal = TemporalFilter(raise_frames=3, clear_frames=2, min_confidence=0.6)
+    assert temporal.update([_violation()]) == []
+    assert temporal.update([_violation()]) == []
+    active = temporal.update([_violation()])
+    assert [v['type'] for v in active] == ['no_hardhat']
+    assert temporal.raised == [(None, 'no_hardhat')]
+
+    for _ in range(50):
+        temporal.update([_violation()])
+    assert temporal.events['no_hardhat'] == 1       # one event, not 53
+
+    assert temporal.update([]) != []                # one missed frame does not clear
+    assert temporal.update([]) == []
+    assert temporal.cleared == [(None, 'no_hardhat')]
+    assert len(temporal) == 0
+
+
+def test_flicker_and_low_confidence_never_raise():
+    temporal = TemporalFilter(raise_frames=3, min_confidence=0.6)
+    for frame in range(30):
+        evidence = [_violation()] if frame % 2 else [_violation(confidence=0.4)]
+        assert temporal.update(evidence) == []
+    assert temporal.events['no_hardhat'] == 0
+
+
+def test_tracked_workers_have_independent_state():
+    temporal = TemporalFilter(raise_frames=2, clear_frames=3)
+    for _ in range(2):
+        active = temporal.update([_violation(1), _violation(2, 'no_vest')])
+    assert sorted((v['track_id'], v['type']) for v in active) == [(1, 'no_hardhat'), (2, 'no_vest')]
+
+    # track 1 is lost: its violation clears at once, track 2 stays raised
+    active = temporal.update([_violation(2, 'no_vest')], removed_tracks=[1])
+    assert [(v['track_id'], v['type']) for v in active] == [(2, 'no_vest')]
+    assert (1, 'no_hardhat') in temporal.cleared
+
+
+def test_state_is_bounded():
+    temporal = TemporalFilter(raise_frames=1, clear_frames=1000, max_keys=8)
+    for track_id in range(100):
+        temporal.update([_violation(track_id)])
+        assert len(temporal) <= 8
+    assert temporal.events['no_hardhat'] == 100
+
+
+def test_from_config_reads_safety_section():
+    temporal = TemporalFilter.from_config(
+        {'safety': {'consecutive_frames': 4, 'confidence_threshold': 0.7}})
+    assert (temporal.raise_frames, temporal.clear_frames, temporal.min_confidence) == (4, 4, 0.7)
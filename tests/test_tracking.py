@@ -0,0 +1,91 @@
+"""
+Tests for worker tracking and violation episodes
+"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.detection.tracking import Tracker, greedy_match
+
+
+def _boxes(offset, count=3):
+    return np.array([[100 * i + offset, 50, 100 * i + offset + 40, 150] for i in range(count)],
+                    dtype=np.float32)
+
+
+def test_ids_persist_while_workers_move():
+    tracker = Tracker(min_hits=3)
+    first, confirmed = tracker.update(_boxes(0), [0.9, 0.9, 0.9])
+    assert confirmed.all()                       # first frame confirms immediately
+    for step in range(1, 20):
+        ids, confirmed = tracker.update(_boxes(3 * step)[::-1], [0.9, 0.9, 0.9])
+        assert ids.tolist() == first[::-1].tolist()
+    assert tracker.total_confirmed == 3
+    assert len(tracker) == 3
+
+
+def test_low_confidence_detections_bridge_occlusion():
+    tracker = Tracker(high_thresh=0.5, low_thresh=0.1, max_age=2)
+    ids, _ = tracker.update(_boxes(0, 1), [0.9])
+    for step in range(1, 4):
+        again, _ = tracker.update(_boxes(2 * step, 1), [0.2])   # partly occluded
+        assert again.tolist() == ids.tolist()
+
+    for _ in range(3):
+        tracker.update(np.zeros((0, 4)), [])
+    assert len(tracker) == 0
+    assert tracker.removed_ids.tolist() == ids.tolist()
+
+    new_ids, _ = tracker.update(_boxes(0, 1), [0.9])
+    assert new_ids[0] != ids[0]
+
+
+def test_tentative_tracks_need_min_hits_and_state_is_bounded():
+    tracker = Tracker(min_hits=3, max_tracks=5, max_age=1000)
+    tracker.update(np.zeros((0, 4)), [])
+    _, confirmed = tracker.update(_boxes(0, 1), [0.9])
+    assert not confirmed[0]
+    tracker.update(_boxes(1, 1), [0.9])
+    _, confirmed = tracker.update(_boxes(2, 1), [0.9])
+    assert confirmed[0] and tracker.total_confirmed == 1
+
+    # A long stream of ever-new workers never grows past max_tracks
+    for i in range(200):
+        x = 1000 + 60 * i
+        tracker.update(np.array([[x, 0, x + 40, 100]] * 1), [0.9])
+        assert len(tracker) <= 5
+
+
+def test_greedy_match_prefers_highest_iou():
+    iou = np.array([[0.9, 0.8], [0.85, 0.1]])
+    rows, cols = greedy_match(iou, 0.3)
+    assert sorted(zip(rows.tolist(), cols.tolist())) == [(0, 0)]
+    rows, cols = greedy_match(np.array([[0.9, 0.8], [0.85, 0.4]]), 0.3)
+    assert sorted(zip(rows.tolist(), cols.tolist())) == [(0, 0), (1, 1)]
+
+
+def test_monitor_counts_unique_workers_and_episodes(tmp_path):
+    pytest.importorskip("torch")
+    pytest.importorskip("ultralytics")
+    from real_time_safety_monitor import SafetyMonitor
+    from src.utils.benchmark import StubModel, create_synthetic_frame, stub_detections
+
+    detections = stub_detections(640, 480, num_workers=6)
+    monitor = SafetyMonitor("stub", model=StubModel(detections), display=False,
+                            config={'tracking': {'enabled': True},
+                                    'safety': {'consecutive_frames': 5, 'confidence_threshold': 0.5}})
+    monitor.output_dir = tmp_path
+    monitor.start_stream()
+    frame = create_synthetic_frame(0, 640, 480)
+    for _ in range(30):
+        monitor.process_frame(frame)
+
+    _, violations, _ = monitor.detect_violations(frame)
+    assert all('track_id' in v for v in violations)
+    stats = monitor.violations
+    assert stats['unique_workers'] == 6
+    assert stats['no_hardhat_detections'] > 30
+    # one confirmed episode per (worker, missing item), not one per frame
+    assert stats['no_hardhat_episodes'] + stats['no_vest_episodes'] == len(violations)
+    assert stats['violations_detected'] == 30 - 4
@@ -0,0 +1,103 @@
+"""
+Tests for polygon zone rules
+"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+
+from src.detection.zones import ZoneMap, Zones, validate_zones
+
+CRANE = {'name': 'crane', 'type': 'monitor', 'require': ['hardhat'],
+         'polygon': [[0.5, 0.0], [1.0, 0.0], [1.0, 1.0], [0.5, 1.0]]}
+WINDOW = {'name': 'window', 'type': 'exclude',
+          'polygon': [[0.0, 0.0], [0.25, 0.0], [0.25, 0.5], [0.0, 0.5]]}
+
+
+def _violation(kind, box):
+    return {'type': kind, 'confidence': 0.9, 'worker': 0, 'box': box}
+
+
+def test_zone_lookup_and_rules():
+    zone_map = ZoneMap([CRANE, WINDOW], 640, 480, mask_scale=0.25)
+    assert zone_map.mask.shape == (120, 160)
+    # anchors are box bottom-centres
+    boxes = [[400, 100, 440, 300], [40, 20, 80, 200], [200, 100, 240, 400]]
+    assert zone_map.labels_at(boxes).tolist() == [1, 2, 0]
+    assert zone_map.keep_detections(boxes).tolist() == [True, False, True]
+
+    violations = [
+        _violation('no_hardhat', [400, 100, 440, 300]),   # crane: enforced
+        _violation('no_vest', [400, 100, 440, 300]),      # crane: not required there
+        _violation('no_vest', [200, 100, 240, 400]),      # outside: default rules
+        _violation('no_hardhat', [40, 20, 80, 200]),      # office window: ignored
+    ]
+    kept = zone_map.filter_violations(violations)
+    assert [(v['type'], v['box'][0]) for v in kept] == [('no_hardhat', 400), ('no_vest', 200)]
+    assert zone_map.crop_rect is None
+
+
+def test_ppe_follows_the_zone_of_its_worker():
+    from src.detection.association import associate, association_tables
+
+    zone_map = ZoneMap([CRANE], 640, 480, mask_scale=0.25, outside='ignore')
+    tables = association_tables(['person', 'hardhat', 'no_hardhat'])
+    # Worker standing in the crane zone with the hardhat box left of its edge,
+    # a worker outside, and an unassigned NO-Hardhat inside the zone
+    xyxy = np.array([[280, 100, 400, 460], [290, 100, 330, 140],
+                     [40, 100, 140, 460], [60, 100, 100, 140], [500, 300, 540, 340]],
+                    dtype=np.float32)
+    cls = np.array([0, 1, 0, 2, 2])
+    association = associate(xyxy, np.full(5, 0.9, dtype=np.float32), cls, tables)
+    assert zone_map.keep_detections(xyxy).tolist() == [True, False, False, False, True]
+    assert zone_map.keep_detections(xyxy, association).tolist() == [True, True, False, False, True]
+
+
+def test_ignoring_outside_crops_inference_to_zones():
+    zone_map = ZoneMap([CRANE], 640, 480, mask_scale=0.25, outside='ignore')
+    x1, y1, x2, y2 = zone_map.crop_rect
+    assert 310 <= x1 <= 320 and (y1, x2, y2) == (0, 640, 480)
+    assert zone_map.keep_detections([[100, 100, 140, 200]]).tolist() == [False]
+
+
+def test_config_parsing_and_validation():
+    config = {'zones': {'enabled': True, 'outside': 'ignore',
+                        'cameras': {'gate': [CRANE], 'default': [WINDOW]}}}
+    assert Zones.from_config(config, 'gate').zones == [CRANE]
+    assert Zones.from_config(config, 'other').zones == [WINDOW]
+    assert Zones.from_config({'zones': {'enabled': False}}) is None
+
+    bad = {'cameras': {'x': [{'polygon': [[0, 0], [2, 0], [0, 1]], 'type': 'nope',
+                              'require': ['gloves']}]}}
+    errors = validate_zones(bad)
+    assert len(errors) == 3
+
+
+def test_monitor_applies_zones(tmp_path):
+    pytest.importorskip("torch")
+    pytest.importorskip("ultralytics")
+    from real_time_safety_monitor import SafetyMonitor
+    from src.utils.benchmark import StubModel, create_synthetic_frame, stub_detections
+
+    class RecordingStub(StubModel):
+        shapes = []
+
+        def __call__(self, source, **kwargs):
+            self.shapes.append(source.shape[:2])
+            return super().__call__(source, **kwargs)
+
+    # Only the right half matters - the stub output is the same either way
+    config = {'zones': {'enabled': True, 'outside': 'ignore', 'cameras': {'default': [CRANE]}}}
+    model = RecordingStub(stub_detections(640, 480, num_workers=6))
+    monitor = SafetyMonitor("stub", model=model, display=False, config=config)
+    monitor.output_dir = tmp_path
+    frame = create_synthetic_frame(0, 640, 480)
+    results, violations, detections = monitor.detect_violations(frame)
+
+    assert model.shapes[-1][1] < 640                  # inference ran on the crop only
+    assert results[0].orig_img.shape == frame.shape
+    xyxy = results[0].boxes.xyxy.numpy()
+    assert (((xyxy[:, 0] + xyxy[:, 2]) / 2) >= 310).all()
+    assert {v['type'] for v in violations} <= {'no_hardhat'}
+    assert monitor.draw_violations(frame, results, violations, detections).shape == frame.shape